@@ -9,6 +9,7 @@ from pyHaasAPI.parameters import (LabParameter, LabStatus, LabConfig, LabSetting
 from pyHaasAPI.model import (ApiResponse, LabDetails)
 from .market_manager import MarketManager
 from .lab_manager import LabManager, LabConfig, LabSettings
+from .lab_scheduler import LabExecutionScheduler, LabSchedulerConfig, LabCompletion
 from .parameter_handler import ParameterHandler
 
 # Import new analysis functionality
@@ -28,6 +29,7 @@ __all__ = [
     "SyncExecutor", "Guest", "Authenticated", "HaasApiError", 
     "ApiResponse", "LabStatus", "BacktestStatus", "LabConfig", 
     "LabSettings", "LabDetails", "MarketManager", "LabManager", 
+    "LabExecutionScheduler", "LabSchedulerConfig", "LabCompletion",
     "ParameterHandler",
     # New analysis functionality
     "BacktestAnalysis", "BotCreationResult", "LabAnalysisResult",
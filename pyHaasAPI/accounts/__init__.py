@@ -6,11 +6,15 @@ account creation, verification, naming schemas, and automated management.
 """
 
 from .management import AccountManager, AccountInfo, AccountType, AccountStatus, AccountNamingManager
+from .allocation import AccountAllocationIndex, AccountSlot, account_market_type
 
 __all__ = [
     'AccountManager',
     'AccountInfo',
     'AccountType', 
     'AccountStatus',
-    'AccountNamingManager'
+    'AccountNamingManager',
+    'AccountAllocationIndex',
+    'AccountSlot',
+    'account_market_type'
 ]
\ No newline at end of file
@@ -10,9 +10,20 @@ from .models import BacktestAnalysis, BotCreationResult, LabAnalysisResult
 from .cache import UnifiedCacheManager
 from .analyzer import HaasAnalyzer
 from .wfo import WFOAnalyzer, WFOConfig, WFOMode, WFOResult, WFOAnalysisResult
+from .wfo_engine import WFOExecutionEngine, WFOEngineConfig
 from .robustness import StrategyRobustnessAnalyzer, RobustnessMetrics, DrawdownAnalysis, TimePeriodAnalysis
+from .periods import TradePeriodSlicer, PeriodSlicing, PeriodSlicingConfig
+from .monte_carlo import MonteCarloSimulator, MonteCarloConfig, MonteCarloMethod, MonteCarloResult
+from .neighborhood import ParameterNeighborhoodIndex, NeighborhoodConfig, NeighborhoodStability
+from .fingerprint import ParameterFingerprintIndex, parameter_fingerprint
+from .job_journal import JobJournal
+from .harvester import ResultHarvester, ResultPageCursor, HarvestProgress
 from .backtest_manager import BacktestManager, BacktestJob, WFOJob
-from .live_bot_validator import LiveBotValidator, LiveBotValidationJob, LiveBotValidationReport, BotRecommendation
+from .position_collector import ClosedPositionCollector, PositionStore, PositionMetrics, BotPositionWatermark
+from .live_bot_validator import (
+    LiveBotValidator, LiveBotValidationJob, LiveBotValidationReport, BotRecommendation,
+    FleetValidationRun, MarketValidationSummary
+)
 
 # Legacy imports (if they exist)
 try:
@@ -36,23 +47,47 @@ __all__ = [
     'WFOMode',
     'WFOResult',
     'WFOAnalysisResult',
+    'WFOExecutionEngine',
+    'WFOEngineConfig',
     
     # Strategy Robustness Analysis
     'StrategyRobustnessAnalyzer',
     'RobustnessMetrics',
     'DrawdownAnalysis',
     'TimePeriodAnalysis',
+    'TradePeriodSlicer',
+    'PeriodSlicing',
+    'PeriodSlicingConfig',
+    'MonteCarloSimulator',
+    'MonteCarloConfig',
+    'MonteCarloMethod',
+    'MonteCarloResult',
+    'ParameterNeighborhoodIndex',
+    'NeighborhoodConfig',
+    'NeighborhoodStability',
+    'ParameterFingerprintIndex',
+    'parameter_fingerprint',
     
     # Backtest Management
     'BacktestManager',
     'BacktestJob',
     'WFOJob',
+    'JobJournal',
+    'ResultHarvester',
+    'ResultPageCursor',
+    'HarvestProgress',
     
     # Live Bot Validation
     'LiveBotValidator',
     'LiveBotValidationJob',
     'LiveBotValidationReport',
     'BotRecommendation',
+    'FleetValidationRun',
+    'MarketValidationSummary',
+    'ClosedPositionCollector',
+    'PositionStore',
+    'PositionMetrics',
+    'BotPositionWatermark',
     
     # Legacy extraction
     'BacktestDataExtractor',
@@ -18,6 +18,7 @@ from ..model import AddBotFromLabRequest
 from ..tools.utils import BacktestFetcher, BacktestFetchConfig
 from .models import BacktestAnalysis, BotCreationResult, LabAnalysisResult, DrawdownAnalysis
 from .cache import UnifiedCacheManager
+from .fingerprint import ParameterFingerprintIndex, parameter_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ class HaasAnalyzer:
     
     def __init__(self, cache_manager: Optional[UnifiedCacheManager] = None):
         self.cache_manager = cache_manager or UnifiedCacheManager()
+        self.fingerprint_index = ParameterFingerprintIndex(self.cache_manager)
         self.executor = None
         self.accounts = None
     
@@ -70,8 +72,14 @@ class HaasAnalyzer:
                 self.accounts = []
         return self.accounts
     
-    def analyze_backtest(self, lab_id: str, backtest_obj) -> Optional[BacktestAnalysis]:
-        """Analyze a single backtest with full data extraction"""
+    def analyze_backtest(self, lab_id: str, backtest_obj, fingerprint_key: Optional[str] = None) -> Optional[BacktestAnalysis]:
+        """
+        Analyze a single backtest with full data extraction
+
+        When a fingerprint key is given and an identical parameter set on the same
+        market and period was analyzed before, its cached data is reused instead of
+        fetching the runtime again.
+        """
         try:
             # Handle different backtest object structures
             if hasattr(backtest_obj, 'backtest_id'):
@@ -92,6 +100,12 @@ class HaasAnalyzer:
                 logger.info(f"📁 Using cached data for {backtest_id[:8]}")
                 return self._create_analysis_from_cache(cached_data, lab_id, backtest_obj)
             
+            # Reuse results of an identical parameter set analyzed before
+            if fingerprint_key:
+                reused = self._analysis_from_fingerprint(fingerprint_key, lab_id, backtest_id, backtest_obj)
+                if reused:
+                    return reused
+            
             # Get full runtime data
             runtime_data = get_full_backtest_runtime_data(self.executor, lab_id, backtest_id)
             if not runtime_data:
@@ -204,6 +218,8 @@ class HaasAnalyzer:
             cache_data = asdict(analysis)
             cache_data['runtime_data'] = runtime_data.model_dump() if hasattr(runtime_data, 'model_dump') else str(runtime_data)
             self.cache_manager.cache_backtest_data(lab_id, backtest_id, cache_data)
+            if fingerprint_key:
+                self.fingerprint_index.put(fingerprint_key, lab_id, backtest_id, save=False)
             
             # Enhanced logging with drawdown details
             drawdown_info = ""
@@ -218,6 +234,38 @@ class HaasAnalyzer:
             logger.error(f"❌ Error analyzing backtest: {e}")
             return None
     
+    def _analysis_from_fingerprint(self, fingerprint_key: str, lab_id: str, backtest_id: str,
+                                   backtest_obj) -> Optional[BacktestAnalysis]:
+        """Copy the cached analysis of an identical parameter set to this backtest"""
+        entry = self.fingerprint_index.get(fingerprint_key)
+        if not entry or not entry.get('backtest_id'):
+            return None
+        if (entry['lab_id'], entry['backtest_id']) == (lab_id, backtest_id):
+            return None
+        source_data = self.cache_manager.load_backtest_cache(entry['lab_id'], entry['backtest_id'])
+        if not source_data:
+            return None
+        
+        logger.info(f"♻️ Reusing results of identical parameters from {entry['backtest_id'][:8]} for {backtest_id[:8]}")
+        cached_data = dict(source_data, backtest_id=backtest_id, lab_id=lab_id)
+        self.cache_manager.cache_backtest_data(lab_id, backtest_id, cached_data)
+        return self._create_analysis_from_cache(cached_data, lab_id, backtest_obj)
+    
+    def _fingerprint_key(self, lab, backtest_obj) -> Optional[str]:
+        """Fingerprint index key of a lab backtest, or None if its parameters are unknown"""
+        fingerprint = parameter_fingerprint(getattr(backtest_obj, 'parameters', None))
+        if not fingerprint:
+            return None
+        settings = getattr(backtest_obj, 'settings', None)
+        return ParameterFingerprintIndex.make_key(
+            getattr(lab, 'script_id', ''),
+            getattr(settings, 'market_tag', '') or '',
+            fingerprint,
+            getattr(lab, 'start_unix', None),
+            getattr(lab, 'end_unix', None),
+            settings=settings
+        )
+    
     def _create_analysis_from_cache(self, cached_data: Dict[str, Any], lab_id: str, backtest_obj) -> BacktestAnalysis:
         """Create analysis from cached data"""
         
@@ -562,13 +610,27 @@ class HaasAnalyzer:
             total_backtests = len(backtests)
             logger.info(f"📈 Found {total_backtests} backtests")
             
-            # Analyze backtests
+            # Analyze backtests, collapsing identical parameter sets (genetic runs repeat them)
             analyzed_backtests = []
+            seen_keys = set()
+            duplicate_backtests = 0
             for i, backtest in enumerate(backtests, 1):
+                fingerprint_key = self._fingerprint_key(lab, backtest)
+                if fingerprint_key and fingerprint_key in seen_keys:
+                    duplicate_backtests += 1
+                    logger.debug(f"Skipping backtest {i}/{total_backtests}: duplicate parameter set")
+                    continue
+                if fingerprint_key:
+                    seen_keys.add(fingerprint_key)
+                
                 logger.info(f"📊 Analyzing backtest {i}/{total_backtests}")
-                analysis = self.analyze_backtest(lab_id, backtest)
+                analysis = self.analyze_backtest(lab_id, backtest, fingerprint_key)
                 if analysis:
                     analyzed_backtests.append(analysis)
+            self.fingerprint_index.save()
+            
+            if duplicate_backtests:
+                logger.info(f"♻️ Collapsed {duplicate_backtests} backtests with duplicate parameter sets")
             
             # Select top performers
             positive_backtests = [bt for bt in analyzed_backtests if bt.roi_percentage > 0]
@@ -594,28 +656,31 @@ class HaasAnalyzer:
                 top_backtests=top_backtests,
                 bots_created=[],
                 analysis_timestamp=datetime.now().isoformat(),
-                processing_time=processing_time
+                processing_time=processing_time,
+                duplicate_backtests=duplicate_backtests
             )
             
         except Exception as e:
             logger.error(f"❌ Error analyzing lab: {e}")
             raise
     
-    def create_bot_from_backtest(self, backtest: BacktestAnalysis, bot_name: str) -> Optional[BotCreationResult]:
-        """Create a bot from a backtest analysis"""
+    def create_bot_from_backtest(self, backtest: BacktestAnalysis, bot_name: str,
+                                 account_id: Optional[str] = None) -> Optional[BotCreationResult]:
+        """Create a bot from a backtest analysis, on the given account or the next one round-robin"""
         try:
-            # Get accounts
-            accounts = self.get_accounts()
-            if not accounts:
-                raise ValueError("No accounts available")
-            
-            # Get a unique account for this bot (round-robin assignment)
-            if not hasattr(self, '_account_index'):
-                self._account_index = 0
-            
-            account = accounts[self._account_index % len(accounts)]
-            account_id = account['AID']
-            self._account_index += 1
+            if not account_id:
+                # Get accounts
+                accounts = self.get_accounts()
+                if not accounts:
+                    raise ValueError("No accounts available")
+                
+                # Get a unique account for this bot (round-robin assignment)
+                if not hasattr(self, '_account_index'):
+                    self._account_index = 0
+                
+                account = accounts[self._account_index % len(accounts)]
+                account_id = account['AID']
+                self._account_index += 1
             
             logger.info(f"🤖 Creating bot: {bot_name}")
             logger.info(f"📊 From backtest: {backtest.backtest_id[:8]}")
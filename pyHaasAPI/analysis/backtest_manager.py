@@ -8,7 +8,6 @@ This module provides comprehensive backtest management including:
 - Pre-bot validation backtesting
 """
 
-import json
 import time
 import logging
 from datetime import datetime, timedelta
@@ -19,6 +18,7 @@ from pathlib import Path
 from .. import api
 from ..model import CreateLabRequest, CloudMarket, StartLabExecutionRequest, LabDetails
 from .cache import UnifiedCacheManager
+from .job_journal import JobJournal
 
 logger = logging.getLogger(__name__)
 
@@ -67,9 +67,16 @@ class BacktestManager:
         self.jobs_file = self.cache_manager.base_dir / "backtest_jobs.json"
         self.wfo_jobs_file = self.cache_manager.base_dir / "wfo_jobs.json"
         
+        # Job files are snapshots; state changes are appended to journals beside them
+        self.job_journal = JobJournal(self.jobs_file)
+        self.wfo_journal = JobJournal(self.wfo_jobs_file)
+        
         # Load existing jobs
         self.jobs = self._load_jobs()
         self.wfo_jobs = self._load_wfo_jobs()
+        
+        # Last lab status seen by monitor_jobs, keyed by lab ID
+        self._lab_statuses: Dict[str, Optional[int]] = {}
     
     def connect(self, executor) -> bool:
         """Connect to HaasOnline API"""
@@ -82,40 +89,46 @@ class BacktestManager:
             return False
     
     def _load_jobs(self) -> Dict[str, BacktestJob]:
-        """Load existing backtest jobs from cache"""
-        if self.jobs_file.exists():
-            try:
-                with open(self.jobs_file, 'r') as f:
-                    data = json.load(f)
-                    return {job_id: BacktestJob(**job_data) for job_id, job_data in data.items()}
-            except Exception as e:
-                logger.warning(f"Failed to load jobs: {e}")
+        """Load existing backtest jobs from the snapshot and journal"""
+        try:
+            data = self.job_journal.replay()
+            return {job_id: BacktestJob(**job_data) for job_id, job_data in data.items()}
+        except Exception as e:
+            logger.warning(f"Failed to load jobs: {e}")
         return {}
     
-    def _save_jobs(self) -> None:
-        """Save backtest jobs to cache"""
+    def _save_jobs(self, jobs: Optional[List[BacktestJob]] = None) -> None:
+        """
+        Persist backtest jobs
+        
+        Args:
+            jobs: Jobs whose state changed; appended to the journal. Without
+                jobs, all tracked jobs are written as a new snapshot.
+        """
         try:
-            with open(self.jobs_file, 'w') as f:
-                json.dump({job_id: asdict(job) for job_id, job in self.jobs.items()}, f, indent=2)
+            if jobs is None:
+                self.job_journal.compact({job_id: asdict(job) for job_id, job in self.jobs.items()})
+            else:
+                self.job_journal.put_many({job.job_id: asdict(job) for job in jobs})
         except Exception as e:
             logger.error(f"Failed to save jobs: {e}")
     
     def _load_wfo_jobs(self) -> Dict[str, WFOJob]:
-        """Load existing WFO jobs from cache"""
-        if self.wfo_jobs_file.exists():
-            try:
-                with open(self.wfo_jobs_file, 'r') as f:
-                    data = json.load(f)
-                    return {wfo_id: WFOJob(**wfo_data) for wfo_id, wfo_data in data.items()}
-            except Exception as e:
-                logger.warning(f"Failed to load WFO jobs: {e}")
+        """Load existing WFO jobs from the snapshot and journal"""
+        try:
+            data = self.wfo_journal.replay()
+            return {wfo_id: WFOJob(**wfo_data) for wfo_id, wfo_data in data.items()}
+        except Exception as e:
+            logger.warning(f"Failed to load WFO jobs: {e}")
         return {}
     
-    def _save_wfo_jobs(self) -> None:
-        """Save WFO jobs to cache"""
+    def _save_wfo_jobs(self, wfo_jobs: Optional[List[WFOJob]] = None) -> None:
+        """Persist WFO jobs; like _save_jobs, changed jobs are journaled"""
         try:
-            with open(self.wfo_jobs_file, 'w') as f:
-                json.dump({wfo_id: asdict(wfo) for wfo_id, wfo in self.wfo_jobs.items()}, f, indent=2)
+            if wfo_jobs is None:
+                self.wfo_journal.compact({wfo_id: asdict(wfo) for wfo_id, wfo in self.wfo_jobs.items()})
+            else:
+                self.wfo_journal.put_many({wfo.wfo_id: asdict(wfo) for wfo in wfo_jobs})
         except Exception as e:
             logger.error(f"Failed to save WFO jobs: {e}")
     
@@ -200,7 +213,7 @@ class BacktestManager:
             
             # Save job
             self.jobs[job_id] = job
-            self._save_jobs()
+            self._save_jobs([job])
             
             logger.info(f"Created cutoff-based individual backtest job: {job_id}")
             logger.info(f"Backtest period: {(end_date - start_date).days} days")
@@ -277,7 +290,7 @@ class BacktestManager:
             
             # Save job
             self.jobs[job_id] = job
-            self._save_jobs()
+            self._save_jobs([job])
             
             logger.info(f"Created individual backtest job: {job_id}")
             return job
@@ -372,8 +385,8 @@ class BacktestManager:
             
             # Save jobs
             self.wfo_jobs[wfo_id] = wfo_job
-            self._save_jobs()
-            self._save_wfo_jobs()
+            self._save_jobs(wfo_job.lab_jobs)
+            self._save_wfo_jobs([wfo_job])
             
             logger.info(f"Created WFO job: {wfo_id} with {len(time_periods)} periods")
             return wfo_job
@@ -505,7 +518,13 @@ class BacktestManager:
             logger.error(f"Failed to start backtest execution: {e}")
     
     def monitor_jobs(self) -> Dict[str, Any]:
-        """Monitor all pending and running jobs"""
+        """
+        Monitor all pending and running jobs
+        
+        Job statuses are reconciled from a single GET_LABS listing per cycle. Jobs
+        sharing a lab are grouped, results are fetched only for labs that just
+        completed, and only jobs whose status changed are journaled.
+        """
         if not self.executor:
             logger.warning("Not connected to API. Cannot monitor jobs.")
             return {"error": "Not connected to API"}
@@ -515,65 +534,101 @@ class BacktestManager:
             "completed_jobs": 0,
             "failed_jobs": 0,
             "still_running": 0,
-            "new_results": []
+            "new_results": [],
+            "api_requests": 0
         }
         
-        for job_id, job in self.jobs.items():
+        active_jobs: Dict[str, List[BacktestJob]] = {}
+        for job in self.jobs.values():
             if job.status in ["pending", "running"]:
+                active_jobs.setdefault(job.lab_id, []).append(job)
                 monitoring_results["checked_jobs"] += 1
-                
-                try:
-                    # Check lab status
-                    lab_details = api.get_lab_details(self.executor, job.lab_id)
-                    
-                    if lab_details.status.value == 3:  # COMPLETED
-                        job.status = "completed"
-                        job.completed_at = datetime.now().isoformat()
-                        
-                        # Get backtest results
-                        job.results = self._get_backtest_results(job.lab_id)
-                        monitoring_results["completed_jobs"] += 1
-                        monitoring_results["new_results"].append(job_id)
-                        
-                        logger.info(f"Job {job_id} completed successfully")
-                        
-                    elif lab_details.status.value == 4:  # CANCELLED
-                        job.status = "failed"
-                        job.error_message = "Lab was cancelled"
-                        monitoring_results["failed_jobs"] += 1
-                        
-                    elif lab_details.status.value == 5:  # ERROR
-                        job.status = "failed"
-                        job.error_message = "Lab execution failed"
-                        monitoring_results["failed_jobs"] += 1
-                        
-                    else:
-                        monitoring_results["still_running"] += 1
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to check job {job_id}: {e}")
-                    continue
+        
+        if not active_jobs:
+            return monitoring_results
+        
+        try:
+            lab_records = {lab.lab_id: lab for lab in api.get_all_labs(self.executor)}
+            monitoring_results["api_requests"] += 1
+        except Exception as e:
+            logger.warning(f"Failed to list labs: {e}")
+            return monitoring_results
+        
+        changed_jobs: List[BacktestJob] = []
+        for lab_id, jobs in active_jobs.items():
+            record = lab_records.get(lab_id)
+            status = record.status.value if record is not None else None
+            if status is not None and self._lab_statuses.get(lab_id) == status and status not in (3, 4):
+                # Unchanged running lab: nothing to fetch or update
+                monitoring_results["still_running"] += len(jobs)
+                continue
+            self._lab_statuses[lab_id] = status
+            
+            if record is None:
+                changed_jobs.extend(jobs)
+                for job in jobs:
+                    job.status = "failed"
+                    job.error_message = "Lab no longer exists"
+                    monitoring_results["failed_jobs"] += 1
+            
+            elif status == 3:  # COMPLETED
+                changed_jobs.extend(jobs)
+                results = self._get_backtest_results(lab_id)
+                monitoring_results["api_requests"] += 1
+                for job in jobs:
+                    job.status = "completed"
+                    job.completed_at = datetime.now().isoformat()
+                    job.results = results
+                    monitoring_results["completed_jobs"] += 1
+                    monitoring_results["new_results"].append(job.job_id)
+                    logger.info(f"Job {job.job_id} completed successfully")
+            
+            elif status == 4:  # CANCELLED
+                changed_jobs.extend(jobs)
+                for job in jobs:
+                    job.status = "failed"
+                    job.error_message = f"Lab was cancelled: {record.cancel_reason}" if record.cancel_reason else "Lab was cancelled"
+                    monitoring_results["failed_jobs"] += 1
+            
+            else:
+                for job in jobs:
+                    if status in (1, 2) and job.status == "pending":  # QUEUED or RUNNING
+                        job.status = "running"
+                        changed_jobs.append(job)
+                    monitoring_results["still_running"] += 1
         
         # Update WFO job statuses
-        for wfo_id, wfo_job in self.wfo_jobs.items():
-            if wfo_job.status in ["pending", "running"]:
-                # Check if all lab jobs are completed
-                all_completed = all(job.status == "completed" for job in wfo_job.lab_jobs)
-                any_failed = any(job.status == "failed" for job in wfo_job.lab_jobs)
-                
-                if all_completed:
-                    wfo_job.status = "completed"
-                    wfo_job.completed_at = datetime.now().isoformat()
-                    wfo_job.results = self._compile_wfo_results(wfo_job)
-                    logger.info(f"WFO job {wfo_id} completed")
-                elif any_failed:
-                    wfo_job.status = "failed"
-                    wfo_job.completed_at = datetime.now().isoformat()
-                    logger.info(f"WFO job {wfo_id} failed")
-        
-        # Save updated jobs
-        self._save_jobs()
-        self._save_wfo_jobs()
+        changed_wfo_jobs: List[WFOJob] = []
+        if changed_jobs:
+            for wfo_id, wfo_job in self.wfo_jobs.items():
+                if wfo_job.status in ["pending", "running"]:
+                    # Reloaded WFO jobs hold copies of the tracked jobs, so read statuses from self.jobs
+                    lab_jobs = []
+                    for job in wfo_job.lab_jobs or []:
+                        if isinstance(job, dict):
+                            job = BacktestJob(**job)
+                        lab_jobs.append(self.jobs.get(job.job_id, job))
+                    wfo_job.lab_jobs = lab_jobs
+                    all_completed = all(job.status == "completed" for job in lab_jobs)
+                    any_failed = any(job.status == "failed" for job in lab_jobs)
+                    
+                    if all_completed:
+                        wfo_job.status = "completed"
+                        wfo_job.completed_at = datetime.now().isoformat()
+                        wfo_job.results = self._compile_wfo_results(wfo_job)
+                        changed_wfo_jobs.append(wfo_job)
+                        logger.info(f"WFO job {wfo_id} completed")
+                    elif any_failed:
+                        wfo_job.status = "failed"
+                        wfo_job.completed_at = datetime.now().isoformat()
+                        changed_wfo_jobs.append(wfo_job)
+                        logger.info(f"WFO job {wfo_id} failed")
+        
+        # Save updated jobs only when a status changed
+        if changed_jobs:
+            self._save_jobs(changed_jobs)
+        if changed_wfo_jobs:
+            self._save_wfo_jobs(changed_wfo_jobs)
         
         return monitoring_results
     
@@ -697,9 +752,11 @@ class BacktestManager:
             del self.wfo_jobs[wfo_id]
             cleaned_count += 1
         
+        if jobs_to_remove:
+            self.job_journal.delete(jobs_to_remove)
+        if wfo_to_remove:
+            self.wfo_journal.delete(wfo_to_remove)
         if cleaned_count > 0:
-            self._save_jobs()
-            self._save_wfo_jobs()
             logger.info(f"Cleaned up {cleaned_count} old jobs")
         
         return cleaned_count
@@ -0,0 +1,227 @@
+"""
+Canonical parameter fingerprints for pyHaasAPI
+
+Genetic lab runs and cloned labs re-test identical parameter sets many times.
+This module gives every parameter set a stable identity so duplicates can be
+detected before their runtime data is fetched:
+- Parameter names are taken from `InputFields`, lab backtest parameters or lab
+  parameter definitions, with the "3-3-17-22." input key prefix removed
+- Numeric values are normalized ("10.0" and "10", "0.50" and "0.5" are equal)
+- A persistent index maps script, market, period and fingerprint to the lab
+  and backtest that already produced results for it
+"""
+
+import re
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, Optional, Tuple
+
+from .cache import UnifiedCacheManager
+
+logger = logging.getLogger(__name__)
+
+# HaasScript input keys look like "12-12-20-32.Entry Order Type"
+_INPUT_KEY_PREFIX = re.compile(r'^\d+(?:-\d+)*\.')
+
+# Bot settings that change backtest results on top of the script inputs
+_RESULT_SETTINGS = ('interval', 'leverage', 'position_mode', 'margin_mode', 'trade_amount')
+
+
+def normalize_parameter_value(value: Any) -> str:
+    """
+    Canonical text form of a parameter value
+
+    Numbers lose insignificant zeros and exponents ("10.0" -> "10",
+    "1e-3" -> "0.001"), booleans are lowercased and other text is stripped.
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    text = str(value).strip()
+    if text.lower() in ('true', 'false'):
+        return text.lower()
+    try:
+        number = Decimal(text)
+    except (InvalidOperation, ValueError):
+        return text
+    if not number.is_finite():
+        return text
+    normalized = format(number.normalize(), 'f')
+    return '0' if normalized == '-0' else normalized
+
+
+def canonical_name(key: Any) -> str:
+    """Parameter name without its input key prefix (e.g. "1-1-10-15.Fast" -> "Fast")"""
+    return _INPUT_KEY_PREFIX.sub('', str(key)).strip()
+
+
+def _field(field: Any, name: str) -> Any:
+    return field.get(name) if isinstance(field, dict) else getattr(field, name, None)
+
+
+def _input_fields(source: Any) -> Optional[Any]:
+    if isinstance(source, dict):
+        runtime_data = source.get('runtime_data')
+        return source.get('InputFields') or (runtime_data.get('InputFields') if isinstance(runtime_data, dict) else None)
+    return getattr(source, 'InputFields', None)
+
+
+def canonical_parameters(source: Any) -> Dict[str, str]:
+    """
+    Extract a parameter set as canonical name/value pairs
+
+    Accepts runtime data or cached backtest data with `InputFields`, lab backtests
+    exposing `parameters`, objects or dicts with `parameter_values`, lab parameter
+    definitions ([{K, O}, ...], values become the sorted option list) and plain
+    name/value mappings.
+    """
+    if source is None:
+        return {}
+
+    input_fields = _input_fields(source)
+    if input_fields:
+        parameters = {}
+        for key, field in input_fields.items():
+            name = canonical_name(_field(field, 'N') or _field(field, 'K') or key)
+            value = _field(field, 'V')
+            if name and value is not None:
+                parameters[name] = normalize_parameter_value(value)
+        return parameters
+
+    if isinstance(source, list):
+        parameters = {}
+        for param in source:
+            key = _field(param, 'K') or _field(param, 'key')
+            options = _field(param, 'O')
+            if options is None:
+                options = _field(param, 'options')
+            if not key:
+                continue
+            if not isinstance(options, (list, tuple)):
+                options = [options]
+            values = sorted({normalize_parameter_value(option) for option in options if option is not None})
+            parameters[canonical_name(key)] = json.dumps(values)
+        return parameters
+
+    if not isinstance(source, dict):
+        for attr in ('parameter_values', 'parameters'):
+            values = getattr(source, attr, None)
+            if values:
+                return canonical_parameters(values)
+        return {}
+
+    if isinstance(source.get('parameter_values'), dict):
+        source = source['parameter_values']
+    return {
+        canonical_name(key): normalize_parameter_value(value)
+        for key, value in source.items() if not isinstance(value, (dict, list))
+    }
+
+
+def parameter_fingerprint(source: Any) -> Optional[str]:
+    """
+    Stable fingerprint of a parameter set
+
+    Returns None when no parameters can be extracted, so unknown parameter
+    sets are never treated as duplicates of each other.
+    """
+    parameters = canonical_parameters(source)
+    if not parameters:
+        return None
+    return hashlib.sha1(json.dumps(sorted(parameters.items())).encode()).hexdigest()
+
+
+def settings_signature(settings: Any) -> str:
+    """Canonical form of the bot settings that affect backtest results"""
+    if settings is None:
+        return ''
+    values = []
+    for name in _RESULT_SETTINGS:
+        value = settings.get(name) if isinstance(settings, dict) else getattr(settings, name, None)
+        values.append(normalize_parameter_value(value) if value is not None else '')
+    return ','.join(values)
+
+
+class ParameterFingerprintIndex:
+    """
+    Index of parameter sets that already have results
+
+    Entries point at the lab (and optionally the backtest) that produced results
+    for a script, market, period and parameter fingerprint. Stored as JSON next
+    to the unified backtest cache.
+    """
+
+    def __init__(self, cache_manager: Optional[UnifiedCacheManager] = None):
+        cache_manager = cache_manager or UnifiedCacheManager()
+        self.path = cache_manager.base_dir / "parameter_fingerprints.json"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Could not load parameter fingerprint index {self.path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(script_id: str, market_tag: str, fingerprint: str,
+                 start_unix: Optional[int] = None, end_unix: Optional[int] = None,
+                 settings: Any = None) -> str:
+        """
+        Build the index key for a parameter set
+
+        Lab-level keys (no period) identify a lab configuration; keys with a
+        period identify an executed backtest.
+        """
+        period = f"{start_unix}-{end_unix}" if start_unix is not None and end_unix is not None else "*"
+        return "|".join([script_id or '', market_tag or '', period, settings_signature(settings), fingerprint])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        return dict(entry) if entry else None
+
+    def put(self, key: str, lab_id: str, backtest_id: Optional[str] = None,
+            save: bool = True, **details: Any) -> None:
+        """Record where results for a key live; set save=False to batch writes and call save()"""
+        with self._lock:
+            self._entries[key] = {
+                'lab_id': lab_id,
+                'backtest_id': backtest_id,
+                **details,
+                'indexed_at': datetime.now().isoformat()
+            }
+        if save:
+            self.save()
+
+    def backtest_windows(self) -> Dict[Tuple[str, str], int]:
+        """Window length in seconds of every indexed backtest, by (lab_id, backtest_id)"""
+        windows = {}
+        with self._lock:
+            for key, entry in self._entries.items():
+                parts = key.split('|')
+                if len(parts) != 5 or not entry.get('backtest_id'):
+                    continue
+                start, _, end = parts[2].partition('-')
+                try:
+                    windows[(entry['lab_id'], entry['backtest_id'])] = int(end) - int(start)
+                except ValueError:
+                    continue  # Lab-level key without a period
+        return windows
+
+    def remove(self, key: str, save: bool = True) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if save:
+            self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            with open(self.path, 'w') as f:
+                json.dump(self._entries, f, indent=2, default=str)
@@ -0,0 +1,200 @@
+"""
+Incremental result harvesting for pyHaasAPI analysis
+
+Fetching results only after a lab completes ends every large lab in a burst of
+GET_BACKTEST_RESULT_PAGE and GET_BACKTEST_RUNTIME calls. The harvester instead:
+- Reads result pages of running labs from the last page seen
+- Analyzes and caches each new backtest through HaasAnalyzer as it appears
+- Persists the page cursor per lab, so a restarted process continues where it stopped
+
+By the time a lab finishes its results are nearly all cached, and the final
+analyze_lab() only reads them back from the cache.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from .. import api
+from ..model import GetBacktestResultRequest
+from .analyzer import HaasAnalyzer
+from .job_journal import JobJournal
+
+logger = logging.getLogger(__name__)
+
+
+class ResultPageCursor:
+    """
+    Reads the result pages of a lab that were not read before
+
+    A full page moves the cursor to the page ID the server returns; a short page
+    is the end of what the lab has produced so far and is read again next time,
+    with backtests already returned filtered out.
+    """
+
+    def __init__(self, executor, lab_id: str, page_size: int = 100, next_page_id: int = 0):
+        self.executor = executor
+        self.lab_id = lab_id
+        self.page_size = page_size
+        self.next_page_id = next_page_id
+        self.requests = 0
+        self._seen = set()
+
+    def read_new(self) -> List[Any]:
+        """Backtests returned since the last call"""
+        new_backtests = []
+        while True:
+            response = api.get_backtest_result(self.executor, GetBacktestResultRequest(
+                lab_id=self.lab_id, next_page_id=self.next_page_id, page_lenght=self.page_size
+            ))
+            self.requests += 1
+            items = list(getattr(response, 'items', None) or [])
+            for backtest in items:
+                backtest_id = getattr(backtest, 'backtest_id', None)
+                if backtest_id in self._seen:
+                    continue
+                self._seen.add(backtest_id)
+                new_backtests.append(backtest)
+            next_page_id = getattr(response, 'next_page_id', -1)
+            if len(items) < self.page_size or next_page_id is None or next_page_id <= self.next_page_id:
+                return new_backtests
+            self.next_page_id = next_page_id
+            # Pages behind the cursor are not read again; the last one's IDs guard against overlap
+            self._seen = {getattr(backtest, 'backtest_id', None) for backtest in items}
+
+
+@dataclass
+class HarvestProgress:
+    """Results harvested from one lab"""
+    lab_id: str
+    next_page_id: int = 0
+    harvested: int = 0  # Backtests analyzed and cached
+    failed: int = 0
+    page_requests: int = 0
+    last_harvest: Optional[float] = None
+
+
+class ResultHarvester:
+    """
+    Streams new backtest results of running labs into the unified cache
+
+    Usage:
+        harvester = ResultHarvester(analyzer)
+        harvester.watch(lab_id)
+        harvester.start()  # Harvest every interval seconds in the background
+        ...
+        harvester.unwatch(lab_id)  # Final harvest once the lab has finished
+    """
+
+    def __init__(self, analyzer: HaasAnalyzer, state_path: Optional[Path] = None, page_size: int = 100,
+                 max_workers: int = 4, interval: float = 30.0):
+        """
+        Args:
+            analyzer: Connected analyzer whose cache receives the results
+            state_path: Cursor state file (defaults to harvest_state.json in the cache directory)
+            page_size: Results requested per GET_BACKTEST_RESULT_PAGE call
+            max_workers: Runtime fetches in flight at once
+            interval: Seconds between harvesting rounds of the background thread
+        """
+        self.analyzer = analyzer
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.interval = interval
+        self.journal = JobJournal(Path(state_path) if state_path else
+                                  analyzer.cache_manager.base_dir / "harvest_state.json")
+        self.progress: Dict[str, HarvestProgress] = {
+            lab_id: HarvestProgress(**record) for lab_id, record in self.journal.replay().items()
+        }
+        self._cursors: Dict[str, ResultPageCursor] = {}
+        self._labs: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, lab_id: str) -> None:
+        """Start harvesting a lab, continuing from its stored cursor"""
+        lab = api.get_lab_details(self.analyzer.executor, lab_id)
+        with self._lock:
+            progress = self.progress.setdefault(lab_id, HarvestProgress(lab_id=lab_id))
+            self._labs[lab_id] = lab
+            self._cursors[lab_id] = ResultPageCursor(self.analyzer.executor, lab_id, self.page_size,
+                                                     progress.next_page_id)
+
+    def unwatch(self, lab_id: str, final_harvest: bool = True) -> Optional[HarvestProgress]:
+        """Stop harvesting a lab, by default after collecting its remaining results"""
+        progress = self.harvest(lab_id) if final_harvest else self.progress.get(lab_id)
+        with self._lock:
+            self._labs.pop(lab_id, None)
+            self._cursors.pop(lab_id, None)
+        return progress
+
+    def harvest(self, lab_id: str) -> Optional[HarvestProgress]:
+        """Analyze and cache the backtests a lab produced since the last harvest"""
+        cursor = self._cursors.get(lab_id)
+        if cursor is None:
+            return None
+        lab = self._labs[lab_id]
+        progress = self.progress[lab_id]
+
+        requests_before = cursor.requests
+        # A resumed cursor re-reads its last page, whose backtests may already be cached
+        cache = self.analyzer.cache_manager
+        backtests = [bt for bt in cursor.read_new()
+                     if not cache.get_backtest_cache_path(lab_id, bt.backtest_id).exists()]
+
+        def analyze(backtest) -> bool:
+            fingerprint_key = self.analyzer._fingerprint_key(lab, backtest)
+            return self.analyzer.analyze_backtest(lab_id, backtest, fingerprint_key) is not None
+
+        if backtests:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                outcomes = list(pool.map(analyze, backtests))
+            self.analyzer.fingerprint_index.save()
+            progress.harvested += sum(outcomes)
+            progress.failed += len(outcomes) - sum(outcomes)
+            logger.info(f"🌾 Harvested {sum(outcomes)} new backtests of lab {lab_id[:8]} "
+                        f"({progress.harvested} cached so far)")
+
+        progress.next_page_id = cursor.next_page_id
+        progress.page_requests += cursor.requests - requests_before
+        progress.last_harvest = time.time()
+        self.journal.put(lab_id, asdict(progress))
+        return progress
+
+    def run_once(self) -> Dict[str, HarvestProgress]:
+        """One harvesting round over every watched lab"""
+        with self._lock:
+            lab_ids = list(self._cursors)
+        results = {}
+        for lab_id in lab_ids:
+            try:
+                progress = self.harvest(lab_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Harvesting lab {lab_id} failed: {e}")
+                continue
+            if progress is not None:
+                results[lab_id] = progress
+        return results
+
+    def start(self) -> None:
+        """Harvest watched labs every interval seconds on a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="result-harvester", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.journal.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
@@ -0,0 +1,155 @@
+"""
+Append-only job journal for pyHaasAPI
+
+Job trackers used to rewrite their whole JSON file on every state change,
+which costs O(n) per update and corrupts the file if a write is interrupted.
+The journal instead:
+- Appends each job state change as one NDJSON event
+- Replays the snapshot plus the events at startup, ignoring a torn last line
+- Compacts periodically into a new snapshot written atomically
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class JobJournal:
+    """
+    Snapshot plus append-only event log of job records
+
+    The snapshot is a JSON object of job_id -> record (the format job trackers
+    already used), so existing job files load as the initial snapshot. Events
+    are {"op": "put", "id": ..., "data": {...}} or {"op": "delete", "id": ...}.
+    """
+
+    def __init__(self, snapshot_path: Path, journal_path: Optional[Path] = None,
+                 compact_every: int = 10000, fsync: bool = False):
+        """
+        Args:
+            snapshot_path: JSON snapshot file
+            journal_path: NDJSON event file (defaults to the snapshot path with .ndjson)
+            compact_every: Compact once the journal holds this many events
+                (or more events than twice the live records, whichever is larger)
+            fsync: Force events to disk before returning
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path) if journal_path else self.snapshot_path.with_suffix(".ndjson")
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._journal_events = 0
+        self._file = None
+
+    def replay(self) -> Dict[str, Dict[str, Any]]:
+        """Load the snapshot and apply journal events; returns job_id -> record"""
+        with self._lock:
+            self._records = {}
+            if self.snapshot_path.exists():
+                try:
+                    with open(self.snapshot_path, 'r') as f:
+                        self._records = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Failed to load job snapshot {self.snapshot_path}: {e}")
+
+            self._journal_events = 0
+            if self.journal_path.exists():
+                with open(self.journal_path, 'r') as f:
+                    for line_number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            # A crash mid-append leaves at most one torn line
+                            logger.warning(f"Skipping unreadable journal line {line_number} in {self.journal_path}")
+                            continue
+                        self._apply(event)
+                        self._journal_events += 1
+            return {job_id: dict(record) for job_id, record in self._records.items()}
+
+    def put(self, job_id: str, record: Dict[str, Any]) -> None:
+        """Record the current state of a job"""
+        self.append([{"op": "put", "id": job_id, "data": record}])
+
+    def put_many(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """Record the current state of several jobs with one write"""
+        self.append([{"op": "put", "id": job_id, "data": record} for job_id, record in records.items()])
+
+    def delete(self, job_ids: Iterable[str]) -> None:
+        """Record that jobs were removed"""
+        self.append([{"op": "delete", "id": job_id} for job_id in job_ids])
+
+    def append(self, events: list) -> None:
+        """Append events to the journal, compacting when it has grown too long"""
+        if not events:
+            return
+        with self._lock:
+            if self._file is None:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.journal_path, 'a')
+                if self._file.tell() and not self._ends_with_newline():
+                    # Terminate a torn line so the next event is not glued onto it
+                    self._file.write("\n")
+            self._file.write("".join(json.dumps(event, default=str) + "\n" for event in events))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            for event in events:
+                self._apply(event)
+            self._journal_events += len(events)
+            needs_compaction = self._journal_events >= max(self.compact_every, 2 * len(self._records))
+        if needs_compaction:
+            self.compact()
+
+    def compact(self, records: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """
+        Write the current records (or the given ones) as the snapshot and empty the journal
+
+        The snapshot is written to a temporary file and atomically renamed. Events
+        carry full job records, so replaying a journal that was not yet emptied on
+        top of the new snapshot gives the same state.
+        """
+        with self._lock:
+            if records is not None:
+                self._records = {job_id: dict(record) for job_id, record in records.items()}
+            temp_path = self.snapshot_path.with_suffix(self.snapshot_path.suffix + ".tmp")
+            with open(temp_path, 'w') as f:
+                json.dump(self._records, f, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(self.journal_path, 'w'):
+                pass
+            self._journal_events = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @property
+    def journal_events(self) -> int:
+        return self._journal_events
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.journal_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        if event.get("op") == "put":
+            self._records[event["id"]] = event["data"]
+        elif event.get("op") == "delete":
+            self._records.pop(event["id"], None)
@@ -11,12 +11,17 @@ Features:
 - Performance comparison between live and backtest results
 - Automated recommendations with risk assessment
 - Comprehensive reporting
+- Fleet validation grouped by market: price, history cutoff and lab are
+  fetched once per market and shared by its bots, and markets are validated
+  concurrently
 """
 
 import json
 import logging
+import threading
 import time
-from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
@@ -81,6 +86,7 @@ class LiveBotValidationJob:
     # Additional metrics
     backtest_period_days: int = 0
     data_quality_score: float = 0.0
+    market_price: float = 0.0  # Market price when the job was created
 
 
 @dataclass
@@ -99,6 +105,36 @@ class LiveBotValidationReport:
     bot_recommendations: List[LiveBotValidationJob]
 
 
+@dataclass
+class MarketValidationSummary:
+    """Shared market data of one market in a fleet validation run"""
+    market_tag: str
+    bot_ids: List[str] = field(default_factory=list)
+    price: float = 0.0
+    cutoff_date: Optional[str] = None
+    backtest_period_days: int = 0
+    lab_ids: Dict[str, str] = field(default_factory=dict)  # Script ID -> lab ID
+    jobs_created: int = 0
+    error_message: Optional[str] = None
+
+
+@dataclass
+class FleetValidationRun:
+    """Structured report of validating a fleet of live bots"""
+    run_id: str
+    total_bots: int = 0
+    total_markets: int = 0
+    jobs_created: int = 0
+    failed_bots: Dict[str, str] = field(default_factory=dict)  # Bot ID -> error
+    markets: List[MarketValidationSummary] = field(default_factory=list)
+    jobs: List[LiveBotValidationJob] = field(default_factory=list)
+    started_at: str = ""
+    duration_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
 class LiveBotValidator:
     """
     Validates live trading bots by backtesting them over maximum possible periods
@@ -111,6 +147,7 @@ class LiveBotValidator:
         self.robustness_analyzer = StrategyRobustnessAnalyzer(cache_manager)
         self.jobs: Dict[str, LiveBotValidationJob] = {}
         self.jobs_file = Path("unified_cache/live_bot_validation_jobs.json")
+        self._jobs_lock = threading.Lock()
         
         # Load existing jobs
         self._load_jobs()
@@ -200,25 +237,7 @@ class LiveBotValidator:
             if not hasattr(runtime_data, 'bot_id'):
                 raise Exception("Failed to get bot runtime data: Invalid response format")
             
-            # Extract data from HaasBot object
-            data = {
-                'ROI': getattr(runtime_data, 'return_on_investment', 0.0),
-                'WinRate': 0.0,  # Not available in HaasBot
-                'TotalTrades': 0,  # Not available in HaasBot
-                'MaxDrawdown': 0.0,  # Not available in HaasBot
-                'RealizedProfits': getattr(runtime_data, 'realized_profit', 0.0),
-                'UnrealizedProfits': getattr(runtime_data, 'urealized_profit', 0.0)
-            }
-            
-            # Extract performance metrics
-            performance = {
-                'roi': data.get('ROI', 0.0),
-                'win_rate': data.get('WinRate', 0.0),
-                'total_trades': data.get('TotalTrades', 0),
-                'max_drawdown': abs(data.get('MaxDrawdown', 0.0)),
-                'realized_profits': data.get('RealizedProfits', 0.0),
-                'unrealized_profits': data.get('UnrealizedProfits', 0.0)
-            }
+            performance = self._live_performance(runtime_data)
             
             logger.info(f"Bot {bot_id} live performance: ROI={performance['roi']:.2f}%, "
                        f"WinRate={performance['win_rate']:.2f}%, Trades={performance['total_trades']}")
@@ -236,26 +255,34 @@ class LiveBotValidator:
                 'unrealized_profits': 0.0
             }
     
+    @staticmethod
+    def _live_performance(bot) -> Dict[str, float]:
+        """Live performance metrics from a HaasBot object"""
+        return {
+            'roi': getattr(bot, 'return_on_investment', 0.0),
+            'win_rate': 0.0,  # Not available in HaasBot
+            'total_trades': 0,  # Not available in HaasBot
+            'max_drawdown': 0.0,  # Not available in HaasBot
+            'realized_profits': getattr(bot, 'realized_profit', 0.0),
+            'unrealized_profits': getattr(bot, 'urealized_profit', 0.0)
+        }
+    
+    @staticmethod
+    def _bot_fields(bot_data) -> Tuple[str, str, str, str, str]:
+        """(bot_id, market_tag, bot_name, script_id, account_id) of a HaasBot or bot dict"""
+        # Handle HaasBot objects (Pydantic models with aliases)
+        if hasattr(bot_data, 'bot_id'):
+            return bot_data.bot_id, bot_data.market, bot_data.bot_name, bot_data.script_id, bot_data.account_id
+        # Fallback for dictionary format
+        return (bot_data['BotId'], bot_data.get('MarketTag', ''), bot_data.get('BotName', 'Unknown'),
+                bot_data['ScriptId'], bot_data['AccountId'])
+    
     def create_validation_job(self, bot_data) -> LiveBotValidationJob:
         """Create a validation job for a live bot"""
         if not self.executor:
             raise ValueError("Not connected to API. Call connect() first.")
         
-        # Handle HaasBot objects (Pydantic models with aliases)
-        if hasattr(bot_data, 'bot_id'):
-            # This is a HaasBot object
-            bot_id = bot_data.bot_id
-            market_tag = bot_data.market  # This is the market field
-            bot_name = bot_data.bot_name
-            script_id = bot_data.script_id
-            account_id = bot_data.account_id
-        else:
-            # Fallback for dictionary format
-            bot_id = bot_data['BotId']
-            market_tag = bot_data.get('MarketTag', '')
-            bot_name = bot_data.get('BotName', 'Unknown')
-            script_id = bot_data['ScriptId']
-            account_id = bot_data['AccountId']
+        bot_id, market_tag, bot_name, script_id, account_id = self._bot_fields(bot_data)
         
         job_id = f"live_validation_{int(time.time())}_{bot_id[:8]}"
         
@@ -311,11 +338,13 @@ class LiveBotValidator:
             logger.error(f"Failed to create validation job for bot {bot_id}: {e}")
             raise
     
-    def _find_or_create_suitable_lab(self, script_id: str, market_tag: str, account_id: str):
+    def _find_or_create_suitable_lab(self, script_id: str, market_tag: str, account_id: str,
+                                     existing_labs: Optional[List[Any]] = None):
         """Find existing lab or create a new one with proper parameter ranges"""
         try:
             # First, try to find existing labs for this script and market
-            existing_labs = api.get_labs(self.executor)
+            if existing_labs is None:
+                existing_labs = api.get_all_labs(self.executor)
             
             # Filter labs by script and market
             suitable_labs = []
@@ -736,30 +765,144 @@ class LiveBotValidator:
         # Default to monitor closely
         return BotRecommendation.MONITOR_CLOSELY.value
     
-    def validate_all_live_bots(self, max_bots: Optional[int] = None) -> List[LiveBotValidationJob]:
+    def validate_all_live_bots(self, max_bots: Optional[int] = None,
+                               max_workers: int = 4) -> List[LiveBotValidationJob]:
         """Validate all live bots and create validation jobs"""
+        return self.validate_fleet(max_bots=max_bots, max_workers=max_workers).jobs
+    
+    def validate_fleet(self, max_bots: Optional[int] = None, max_workers: int = 4) -> FleetValidationRun:
+        """
+        Validate all live bots grouped by market.
+        
+        Live performance comes from the one GET_BOTS snapshot. Each market's
+        price, history cutoff and labs are fetched once and shared by its bots,
+        bots running the same script on a market share one lab backtest, and
+        markets are validated concurrently, so the cost grows with the number
+        of distinct markets rather than bots.
+        
+        Args:
+            max_bots: Only validate the first max_bots live bots
+            max_workers: Markets validated at once
+        """
         if not self.executor:
             raise ValueError("Not connected to API. Call connect() first.")
         
+        started = time.time()
+        run = FleetValidationRun(run_id=f"fleet_validation_{int(started)}", started_at=datetime.now().isoformat())
         live_bots = self.get_live_bots()
-        
         if max_bots:
             live_bots = live_bots[:max_bots]
         
-        created_jobs = []
-        
+        markets: Dict[str, List[Any]] = {}
         for bot_data in live_bots:
             try:
-                job = self.create_validation_job(bot_data)
-                created_jobs.append(job)
-                bot_name = bot_data.bot_name if hasattr(bot_data, 'bot_name') else bot_data.get('BotName', 'Unknown')
-                logger.info(f"Created validation job for bot: {bot_name}")
+                markets.setdefault(self._bot_fields(bot_data)[1], []).append(bot_data)
+            except (KeyError, TypeError) as e:
+                run.failed_bots[str(getattr(bot_data, 'bot_id', 'Unknown'))] = f"Invalid bot data: {e}"
+        run.total_bots = len(live_bots)
+        run.total_markets = len(markets)
+        logger.info(f"🔍 Validating {len(live_bots)} live bots across {len(markets)} markets")
+        
+        try:
+            existing_labs = api.get_all_labs(self.executor)
+        except Exception as e:
+            logger.warning(f"Could not list labs, new labs will be created: {e}")
+            existing_labs = []
+        
+        def validate(item: Tuple[str, List[Any]]):
+            market_tag, bots = item
+            return self._validate_market(market_tag, bots, existing_labs)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for summary, jobs, failed in pool.map(validate, sorted(markets.items(), key=lambda item: item[0])):
+                run.markets.append(summary)
+                run.jobs.extend(jobs)
+                run.failed_bots.update(failed)
+        
+        run.jobs_created = len(run.jobs)
+        run.duration_seconds = time.time() - started
+        self._save_jobs()
+        logger.info(f"Created {run.jobs_created} validation jobs for live bots "
+                    f"({len(run.failed_bots)} failed, {run.duration_seconds:.1f}s)")
+        return run
+    
+    def _validate_market(self, market_tag: str, bots: List[Any], existing_labs: List[Any]
+                         ) -> Tuple[MarketValidationSummary, List[LiveBotValidationJob], Dict[str, str]]:
+        """Fetch the shared data of one market once and create the jobs of its bots"""
+        summary = MarketValidationSummary(market_tag=market_tag,
+                                          bot_ids=[self._bot_fields(bot)[0] for bot in bots])
+        jobs: List[LiveBotValidationJob] = []
+        failed: Dict[str, str] = {}
+        
+        try:
+            price_data = api.get_price_data(self.executor, market_tag)
+            summary.price = float((price_data or {}).get('C', 0.0) or 0.0)
+        except Exception as e:
+            logger.warning(f"Could not get price for {market_tag}: {e}")
+        
+        scripts: Dict[str, List[Any]] = {}
+        for bot_data in bots:
+            scripts.setdefault(self._bot_fields(bot_data)[3], []).append(bot_data)
+        
+        cutoff_date = None
+        for script_id, script_bots in scripts.items():
+            account_id = self._bot_fields(script_bots[0])[4]
+            try:
+                lab = self._find_or_create_suitable_lab(script_id, market_tag, account_id, existing_labs)
+                summary.lab_ids[script_id] = lab.lab_id
+                if cutoff_date is None:
+                    # The history cutoff belongs to the market, so one discovery serves every script
+                    cutoff_date = self._discover_cutoff_simple(lab.lab_id, market_tag)
+                    summary.cutoff_date = cutoff_date.isoformat()
             except Exception as e:
-                bot_id = bot_data.bot_id if hasattr(bot_data, 'bot_id') else bot_data.get('BotId', 'Unknown')
-                logger.error(f"Failed to create validation job for bot {bot_id}: {e}")
+                summary.error_message = str(e)
+                logger.error(f"Failed to prepare validation of {market_tag} for script {script_id}: {e}")
+                failed.update({self._bot_fields(bot)[0]: str(e) for bot in script_bots})
+                continue
+            
+            end_date = datetime.now()
+            start_date = cutoff_date + timedelta(days=1)  # Safety margin
+            summary.backtest_period_days = (end_date - start_date).days
+            
+            script_jobs = []
+            for bot_data in script_bots:
+                bot_id, _, bot_name, _, bot_account_id = self._bot_fields(bot_data)
+                live_performance = (self._live_performance(bot_data) if hasattr(bot_data, 'bot_id')
+                                    else self.get_bot_live_performance(bot_id))
+                script_jobs.append(LiveBotValidationJob(
+                    job_id=f"live_validation_{int(time.time())}_{bot_id[:8]}",
+                    bot_id=bot_id,
+                    bot_name=bot_name,
+                    script_id=script_id,
+                    market_tag=market_tag,
+                    account_id=bot_account_id,
+                    lab_id=lab.lab_id,
+                    start_unix=int(start_date.timestamp()),
+                    end_unix=int(end_date.timestamp()),
+                    status="pending",
+                    created_at=datetime.now().isoformat(),
+                    live_roi=live_performance['roi'],
+                    live_win_rate=live_performance['win_rate'],
+                    live_trades=live_performance['total_trades'],
+                    live_drawdown=live_performance['max_drawdown'],
+                    backtest_period_days=summary.backtest_period_days,
+                    market_price=summary.price
+                ))
+            
+            # Bots of the same script on a market are validated by one lab backtest
+            self._start_backtest_execution(script_jobs[0])
+            for job in script_jobs[1:]:
+                job.status = script_jobs[0].status
+                job.error_message = script_jobs[0].error_message
+            
+            with self._jobs_lock:
+                for job in script_jobs:
+                    self.jobs[job.job_id] = job
+            jobs.extend(script_jobs)
         
-        logger.info(f"Created {len(created_jobs)} validation jobs for live bots")
-        return created_jobs
+        summary.jobs_created = len(jobs)
+        logger.info(f"Market {market_tag}: {len(jobs)} validation jobs for {len(bots)} bots")
+        return summary, jobs, failed
     
     def generate_validation_report(self) -> LiveBotValidationReport:
         """Generate comprehensive validation report"""
@@ -35,6 +35,19 @@ class DrawdownAnalysis:
     account_blowup_risk: bool = False
     safe_leverage_multiplier: float = 1.0
 
+@dataclass
+class TimePeriodAnalysis:
+    """Time period performance analysis"""
+    period_start: datetime
+    period_end: datetime
+    period_roi: float
+    period_trades: int
+    period_win_rate: float
+    period_max_drawdown: float
+    period_consistency_score: float
+    period_label: str = ""
+    period_profit: float = 0.0
+
 @dataclass
 class BacktestAnalysis:
     """Comprehensive backtest analysis data"""
@@ -73,6 +86,7 @@ class BacktestAnalysis:
     drawdown_analysis: Optional[DrawdownAnalysis] = None
     backtest_timestamp: Optional[str] = None
     parameter_values: Optional[Dict[str, str]] = None
+    stability_score: Optional[float] = None  # Parameter-neighborhood stability-adjusted score
 
 
 @dataclass
@@ -104,3 +118,4 @@ class LabAnalysisResult:
     bots_created: List[BotCreationResult]
     analysis_timestamp: str
     processing_time: float
+    duplicate_backtests: int = 0  # Backtests collapsed into an identical parameter set
@@ -0,0 +1,188 @@
+"""
+Monte Carlo trade-resampling robustness analysis for pyHaasAPI
+
+A backtest is a single historical path. This module resamples each backtest's
+per-trade P&L thousands of times to quantify path risk:
+- Bootstrap (sampling trades with replacement) or permutation (reordering trades)
+- Terminal return and max drawdown distributions
+- Risk of ruin and probability of loss
+- Percentile equity bands
+- Seeded, order-independent results for batches of backtests (e.g. a lab's top-N)
+"""
+
+import logging
+import zlib
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List, Dict, Any, Optional, Tuple
+
+# Optional imports for vectorized analysis
+try:
+    import numpy as np
+    _has_numpy = True
+except ImportError:
+    _has_numpy = False
+
+from .periods import extract_trade_series
+
+logger = logging.getLogger(__name__)
+
+
+class MonteCarloMethod(Enum):
+    """Trade resampling methods"""
+    BOOTSTRAP = "bootstrap"  # Sample trades with replacement
+    PERMUTATION = "permutation"  # Shuffle trade order (terminal return is fixed)
+
+
+@dataclass
+class MonteCarloConfig:
+    """Configuration for Monte Carlo simulations"""
+    simulations: int = 5000
+    method: MonteCarloMethod = MonteCarloMethod.BOOTSTRAP
+    seed: int = 42
+    ruin_loss_percentage: float = 50.0  # Losing this % of the starting balance counts as ruin
+    percentiles: Tuple[float, ...] = (5.0, 25.0, 50.0, 75.0, 95.0)
+    default_starting_balance: float = 10000.0  # Used when a backtest has no known balance
+    band_points: int = 50  # Number of trade indices sampled for equity bands
+    max_matrix_elements: int = 20_000_000  # Bound on simulations x trades held in memory
+    max_risk_of_ruin: float = 0.05  # Candidates above this are flagged as high risk
+
+
+@dataclass
+class MonteCarloResult:
+    """Monte Carlo distribution summary for a single backtest"""
+    backtest_id: str
+    method: str
+    simulations: int
+    trade_count: int
+    starting_balance: float
+    mean_terminal_return: float  # Percentage of starting balance
+    terminal_return_percentiles: Dict[str, float]
+    max_drawdown_percentiles: Dict[str, float]
+    probability_of_loss: float  # Share of paths ending below the starting balance
+    risk_of_ruin: float  # Share of paths touching the ruin level
+    equity_bands: Dict[str, List[float]] = field(default_factory=dict)  # Percentile equity curves
+    band_trade_indices: List[int] = field(default_factory=list)
+
+
+def _percentile_key(percentile: float) -> str:
+    return f"p{percentile:g}"
+
+
+class MonteCarloSimulator:
+    """Vectorized Monte Carlo resampling of per-trade P&L"""
+
+    def __init__(self, config: Optional[MonteCarloConfig] = None):
+        self.config = config or MonteCarloConfig()
+        if self.config.simulations < 1:
+            raise ValueError("simulations must be at least 1")
+
+    def simulate_trades(self, backtest_id: str, trade_pnls: Any,
+                        starting_balance: float = 0.0) -> Optional[MonteCarloResult]:
+        """
+        Run simulations for one backtest
+
+        Args:
+            backtest_id: Backtest identifier (also used to derive the random stream)
+            trade_pnls: Net P&L per trade in chronological order
+            starting_balance: Account balance at the start of the backtest
+
+        Returns:
+            MonteCarloResult, or None when there are no trades or numpy is unavailable
+        """
+        if not _has_numpy:
+            logger.warning("numpy is not installed, Monte Carlo analysis is unavailable")
+            return None
+
+        pnls = np.asarray(trade_pnls, dtype=np.float64)
+        trade_count = int(pnls.shape[0])
+        if trade_count == 0:
+            return None
+
+        config = self.config
+        balance = starting_balance if starting_balance and starting_balance > 0 else config.default_starting_balance
+        ruin_level = balance * (1 - config.ruin_loss_percentage / 100)
+        rng = np.random.default_rng([config.seed, zlib.crc32(backtest_id.encode())])
+
+        band_indices = np.unique(np.linspace(0, trade_count - 1, min(config.band_points, trade_count)).astype(np.int64))
+        terminal = np.empty(config.simulations, dtype=np.float64)
+        max_drawdown = np.empty(config.simulations, dtype=np.float64)
+        ruined = np.empty(config.simulations, dtype=bool)
+        band_equity = np.empty((config.simulations, band_indices.shape[0]), dtype=np.float64)
+
+        chunk = max(1, config.max_matrix_elements // trade_count)
+        for start in range(0, config.simulations, chunk):
+            rows = min(chunk, config.simulations - start)
+            paths = self._resample(rng, pnls, rows)
+
+            equity = balance + np.cumsum(paths, axis=1)
+            peaks = np.maximum(np.maximum.accumulate(equity, axis=1), balance)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                drawdowns = np.where(peaks > 0, (peaks - equity) / peaks * 100, 0.0)
+
+            terminal[start:start + rows] = equity[:, -1]
+            max_drawdown[start:start + rows] = np.minimum(drawdowns.max(axis=1), 100.0)
+            ruined[start:start + rows] = equity.min(axis=1) <= ruin_level
+            band_equity[start:start + rows] = equity[:, band_indices]
+
+        terminal_returns = (terminal - balance) / balance * 100
+        percentiles = np.asarray(config.percentiles, dtype=np.float64)
+        return_pcts = np.percentile(terminal_returns, percentiles)
+        drawdown_pcts = np.percentile(max_drawdown, percentiles)
+        bands = np.percentile(band_equity, percentiles, axis=0)
+
+        return MonteCarloResult(
+            backtest_id=backtest_id,
+            method=config.method.value,
+            simulations=config.simulations,
+            trade_count=trade_count,
+            starting_balance=float(balance),
+            mean_terminal_return=float(terminal_returns.mean()),
+            terminal_return_percentiles={_percentile_key(p): float(v) for p, v in zip(percentiles, return_pcts)},
+            max_drawdown_percentiles={_percentile_key(p): float(v) for p, v in zip(percentiles, drawdown_pcts)},
+            probability_of_loss=float((terminal < balance).mean()),
+            risk_of_ruin=float(ruined.mean()),
+            equity_bands={_percentile_key(p): band.tolist() for p, band in zip(percentiles, bands)},
+            band_trade_indices=band_indices.tolist()
+        )
+
+    def simulate_backtest(self, backtest_id: str, backtest_data: Any,
+                          starting_balance: float = 0.0) -> Optional[MonteCarloResult]:
+        """Run simulations on the closed positions of cached or runtime backtest data"""
+        series = extract_trade_series(backtest_id, backtest_data)
+        if series is None:
+            return None
+        return self.simulate_trades(backtest_id, series.net_profits, starting_balance)
+
+    def simulate_batch(self, backtests: Dict[str, Any],
+                       starting_balances: Optional[Dict[str, float]] = None) -> Dict[str, MonteCarloResult]:
+        """
+        Run simulations for many backtests
+
+        Each backtest draws from its own random stream derived from the seed and its ID,
+        so results do not depend on batch composition or order.
+
+        Args:
+            backtests: Mapping of backtest_id to backtest data
+            starting_balances: Optional mapping of backtest_id to starting balance
+
+        Returns:
+            Mapping of backtest_id to MonteCarloResult (backtests without trades are omitted)
+        """
+        starting_balances = starting_balances or {}
+        results = {}
+        for backtest_id, data in backtests.items():
+            try:
+                result = self.simulate_backtest(backtest_id, data, starting_balances.get(backtest_id, 0.0))
+            except Exception as e:
+                logger.error(f"Monte Carlo simulation failed for backtest {backtest_id}: {e}")
+                continue
+            if result is not None:
+                results[backtest_id] = result
+        return results
+
+    def _resample(self, rng: "np.random.Generator", pnls: "np.ndarray", rows: int) -> "np.ndarray":
+        """Build a (rows x trades) matrix of resampled trade P&L"""
+        if self.config.method == MonteCarloMethod.PERMUTATION:
+            return rng.permuted(np.broadcast_to(pnls, (rows, pnls.shape[0])), axis=1)
+        return pnls[rng.integers(0, pnls.shape[0], size=(rows, pnls.shape[0]))]
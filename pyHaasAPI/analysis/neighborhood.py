@@ -0,0 +1,236 @@
+"""
+Parameter-neighborhood stability analysis for pyHaasAPI
+
+Lab optimizations explore a grid of parameter combinations. A backtest whose
+grid neighbors perform poorly sits on a fragile peak, so ranking backtests in
+isolation tends to pick parameters that do not survive live trading. This module:
+- Maps each backtest's parameter vector onto grid coordinates
+- Finds neighbors within one grid step per dimension through a hashed grid
+- Blends each backtest's own metric with its neighborhood into a stability-adjusted score
+"""
+
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+logger = logging.getLogger(__name__)
+
+# System parameters that are not part of the optimization grid
+_SKIPPED_PARAMETERS = ['trade amount', 'order size', 'entry order type', 'colldown', 'reset']
+
+
+@dataclass
+class NeighborhoodConfig:
+    """Configuration for parameter-neighborhood stability scoring"""
+    own_weight: float = 0.5  # Weight of the backtest's own metric in the adjusted score
+    max_neighbor_offsets: int = 728  # Above this many offsets (3^d - 1) only axis neighbors are used
+
+
+@dataclass
+class NeighborhoodStability:
+    """Stability of a backtest relative to its grid neighbors"""
+    backtest_id: str
+    metric: float
+    neighbor_count: int
+    neighbor_mean: float
+    neighbor_min: float
+    stability_ratio: float  # neighbor_mean / metric, clipped to [0, 1]; 0 without neighbors
+    stability_adjusted_score: float
+
+
+def extract_parameter_vector(data: Any) -> Dict[str, str]:
+    """
+    Extract a backtest's parameter values
+
+    Accepts a parameter_values mapping, cached backtest data with `InputFields`
+    ({key: {N: name, V: value}}), or objects exposing `parameter_values`/`parameters`.
+    System parameters such as trade amount are skipped.
+    """
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        for attr in ('parameter_values', 'parameters'):
+            values = getattr(data, attr, None)
+            if isinstance(values, dict) and values:
+                return {str(k): str(v) for k, v in values.items()}
+        return {}
+
+    input_fields = data.get('InputFields') or (data.get('runtime_data') or {}).get('InputFields')
+    if isinstance(input_fields, dict) and input_fields:
+        parameters = {}
+        for field in input_fields.values():
+            if not isinstance(field, dict):
+                continue
+            name, value = field.get('N', ''), field.get('V', '')
+            if name and value != '' and not any(skip in name.lower() for skip in _SKIPPED_PARAMETERS):
+                parameters[name] = str(value)
+        return parameters
+
+    values = data.get('parameter_values')
+    if isinstance(values, dict):
+        return {str(k): str(v) for k, v in values.items()}
+    return {str(k): str(v) for k, v in data.items() if not isinstance(v, (dict, list))}
+
+
+def _level_sort_key(value: str) -> Tuple[int, Any]:
+    """Order numeric levels numerically and everything else lexically after them"""
+    try:
+        return (0, float(value))
+    except (TypeError, ValueError):
+        return (1, str(value))
+
+
+class ParameterNeighborhoodIndex:
+    """
+    Hashed grid over backtest parameter vectors
+
+    Each varying parameter becomes a grid dimension whose coordinates are the
+    ranks of its distinct values. Neighbor lookups probe the 3^d - 1 adjacent
+    cells in a dict, so scoring n backtests costs O(n * 3^d) instead of O(n^2).
+    """
+
+    def __init__(self, config: Optional[NeighborhoodConfig] = None):
+        self.config = config or NeighborhoodConfig()
+        self.dimensions: List[str] = []
+        self._coordinates: Dict[str, Tuple[int, ...]] = {}
+        self._grid: Dict[Tuple[int, ...], List[str]] = {}
+        self._offsets: List[Tuple[int, ...]] = []
+
+    def build(self, parameter_vectors: Dict[str, Dict[str, Any]]) -> "ParameterNeighborhoodIndex":
+        """
+        Index backtests by their parameter vectors
+
+        Args:
+            parameter_vectors: Mapping of backtest_id to parameter name/value mapping
+
+        Returns:
+            The index itself, for chaining
+        """
+        levels: Dict[str, set] = {}
+        for vector in parameter_vectors.values():
+            for name, value in vector.items():
+                levels.setdefault(name, set()).add(str(value))
+
+        # Parameters that never vary do not contribute a dimension
+        self.dimensions = sorted(name for name, values in levels.items() if len(values) > 1)
+        ranks = {
+            name: {value: rank for rank, value in enumerate(sorted(levels[name], key=_level_sort_key))}
+            for name in self.dimensions
+        }
+
+        self._coordinates = {}
+        self._grid = {}
+        for backtest_id, vector in parameter_vectors.items():
+            # Missing values sit two steps below every real level, so they are never adjacent
+            coordinates = tuple(
+                ranks[name][str(vector[name])] if name in vector else -2
+                for name in self.dimensions
+            )
+            self._coordinates[backtest_id] = coordinates
+            self._grid.setdefault(coordinates, []).append(backtest_id)
+
+        dimension_count = len(self.dimensions)
+        if 3 ** dimension_count - 1 <= self.config.max_neighbor_offsets:
+            self._offsets = [o for o in itertools.product((-1, 0, 1), repeat=dimension_count) if any(o)]
+        else:
+            logger.debug(f"{dimension_count} parameter dimensions, using axis neighbors only")
+            self._offsets = [
+                tuple(step if i == axis else 0 for i in range(dimension_count))
+                for axis in range(dimension_count) for step in (-1, 1)
+            ]
+        return self
+
+    def coordinates(self, backtest_id: str) -> Optional[Tuple[int, ...]]:
+        """Grid coordinates of a backtest"""
+        return self._coordinates.get(backtest_id)
+
+    def neighbors(self, backtest_id: str) -> List[str]:
+        """Backtests in adjacent grid cells (one step or less in every dimension)"""
+        origin = self._coordinates.get(backtest_id)
+        if origin is None:
+            return []
+        found = []
+        for offset in self._offsets:
+            cell = tuple(c + o for c, o in zip(origin, offset))
+            found.extend(self._grid.get(cell, ()))
+        return found
+
+    def score(self, metrics: Dict[str, float]) -> Dict[str, NeighborhoodStability]:
+        """
+        Compute neighborhood stability for every indexed backtest with a metric
+
+        Backtests sharing a grid cell are averaged into one cell value so
+        duplicated parameter sets do not outweigh distinct neighbors.
+
+        Args:
+            metrics: Mapping of backtest_id to the metric being ranked (e.g. ROE)
+
+        Returns:
+            Mapping of backtest_id to NeighborhoodStability
+        """
+        cell_values: Dict[Tuple[int, ...], float] = {}
+        for cell, backtest_ids in self._grid.items():
+            values = [metrics[b] for b in backtest_ids if b in metrics]
+            if values:
+                cell_values[cell] = sum(values) / len(values)
+
+        own_weight = self.config.own_weight
+        results = {}
+        for backtest_id, origin in self._coordinates.items():
+            if backtest_id not in metrics:
+                continue
+            metric = float(metrics[backtest_id])
+            neighbor_values = []
+            for offset in self._offsets:
+                value = cell_values.get(tuple(c + o for c, o in zip(origin, offset)))
+                if value is not None:
+                    neighbor_values.append(value)
+
+            if neighbor_values:
+                neighbor_mean = sum(neighbor_values) / len(neighbor_values)
+                neighbor_min = min(neighbor_values)
+                ratio = max(0.0, min(1.0, neighbor_mean / metric)) if metric > 0 else 0.0
+                adjusted = own_weight * metric + (1 - own_weight) * neighbor_mean
+            else:
+                # An isolated peak has no supporting evidence: its neighborhood counts as zero
+                neighbor_mean = neighbor_min = 0.0
+                ratio = 0.0
+                adjusted = own_weight * metric
+
+            results[backtest_id] = NeighborhoodStability(
+                backtest_id=backtest_id,
+                metric=metric,
+                neighbor_count=len(neighbor_values),
+                neighbor_mean=neighbor_mean,
+                neighbor_min=neighbor_min,
+                stability_ratio=ratio,
+                stability_adjusted_score=adjusted
+            )
+        return results
+
+
+def score_backtests(backtests: List[Any], metric: Callable[[Any], float],
+                    parameters: Callable[[Any], Any] = extract_parameter_vector,
+                    config: Optional[NeighborhoodConfig] = None) -> Dict[str, NeighborhoodStability]:
+    """
+    Score a lab's backtests by parameter-neighborhood stability
+
+    Args:
+        backtests: Backtest objects exposing `backtest_id`
+        metric: Function returning the metric to rank by
+        parameters: Function returning the backtest's parameter vector (or data to extract it from)
+        config: Optional neighborhood configuration
+
+    Returns:
+        Mapping of backtest_id to NeighborhoodStability
+    """
+    vectors = {}
+    metrics = {}
+    for backtest in backtests:
+        vector = parameters(backtest)
+        if not isinstance(vector, dict) or 'InputFields' in vector or 'parameter_values' in vector:
+            vector = extract_parameter_vector(vector)
+        vectors[backtest.backtest_id] = vector
+        metrics[backtest.backtest_id] = metric(backtest)
+    return ParameterNeighborhoodIndex(config).build(vectors).score(metrics)
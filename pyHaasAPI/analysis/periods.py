@@ -0,0 +1,305 @@
+"""
+Trade-sliced time period analysis for pyHaasAPI
+
+This module slices the real closed positions of a backtest (``FinishedPositions``)
+into time windows and computes per-window performance:
+- Calendar windows (monthly, quarterly) keyed on position close time
+- Equal trade-count windows (N buckets per backtest)
+- Per-window ROI, win rate and max drawdown using vectorized grouping
+- Batch processing of many backtests (e.g. a lab's top candidates) in one pass
+"""
+
+import logging
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Dict, Any, Optional, Tuple
+
+# Optional imports for vectorized analysis
+try:
+    import numpy as np
+    _has_numpy = True
+except ImportError:
+    _has_numpy = False
+
+from .models import TimePeriodAnalysis
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodSlicing(Enum):
+    """How closed trades are grouped into periods"""
+    MONTHLY = "monthly"  # Calendar months (UTC) of position close time
+    QUARTERLY = "quarterly"  # Calendar quarters (UTC) of position close time
+    EQUAL_TRADES = "equal_trades"  # N buckets with equal trade counts
+
+
+@dataclass
+class PeriodSlicingConfig:
+    """Configuration for trade period slicing"""
+    mode: PeriodSlicing = PeriodSlicing.QUARTERLY
+    trade_buckets: int = 4  # Number of buckets for EQUAL_TRADES
+    min_trades_per_period: int = 1  # Periods with fewer trades are dropped
+
+
+@dataclass
+class TradeSeries:
+    """Closed trades of a single backtest as parallel arrays"""
+    backtest_id: str
+    close_times: "np.ndarray"  # Unix seconds, sorted ascending
+    net_profits: "np.ndarray"  # Realized profit minus fees
+    margins: "np.ndarray"  # Sum of entry order margins
+
+    @property
+    def trade_count(self) -> int:
+        return int(self.close_times.shape[0])
+
+
+def period_consistency_score(roi: float, win_rate: float, drawdown: float) -> float:
+    """Calculate consistency score for a time period (0-100)"""
+
+    # Higher ROI is better
+    roi_score = min(100, max(0, roi / 10))  # Scale ROI to 0-100
+
+    # Higher win rate is better
+    win_rate_score = win_rate * 100
+
+    # Lower drawdown is better
+    drawdown_score = max(0, 100 - drawdown)
+
+    # Weighted average
+    consistency_score = (roi_score * 0.4 + win_rate_score * 0.4 + drawdown_score * 0.2)
+
+    return min(100, max(0, consistency_score))
+
+
+def _finished_positions(backtest_data: Any) -> List[Any]:
+    """Locate FinishedPositions in cached data, raw runtime data or API objects"""
+    if backtest_data is None:
+        return []
+
+    if isinstance(backtest_data, dict):
+        runtime_data = backtest_data.get('runtime_data', backtest_data.get('RT'))
+        if isinstance(runtime_data, dict) and runtime_data.get('FinishedPositions'):
+            return runtime_data['FinishedPositions']
+        return backtest_data.get('FinishedPositions') or []
+
+    return getattr(backtest_data, 'FinishedPositions', None) or []
+
+
+def _position_field(position: Any, key: str, default: Any = 0) -> Any:
+    if isinstance(position, dict):
+        return position.get(key, default)
+    return getattr(position, key, default)
+
+
+def extract_trade_series(backtest_id: str, backtest_data: Any) -> Optional[TradeSeries]:
+    """
+    Extract closed trades from backtest data
+
+    Args:
+        backtest_id: Backtest identifier
+        backtest_data: Cached backtest dict, raw runtime dict or runtime object
+
+    Returns:
+        TradeSeries sorted by close time, or None if numpy is unavailable
+    """
+    if not _has_numpy:
+        logger.warning("numpy is not installed, trade extraction is unavailable")
+        return None
+
+    positions = _finished_positions(backtest_data)
+    close_times = np.empty(len(positions), dtype=np.int64)
+    net_profits = np.empty(len(positions), dtype=np.float64)
+    margins = np.empty(len(positions), dtype=np.float64)
+
+    for i, position in enumerate(positions):
+        close_times[i] = int(_position_field(position, 'ct', 0) or 0)
+        net_profits[i] = float(_position_field(position, 'rp', 0.0) or 0.0) - \
+            float(_position_field(position, 'fe', 0.0) or 0.0)
+        entry_orders = _position_field(position, 'eno', []) or []
+        margins[i] = sum(float(_position_field(order, 'm', 0.0) or 0.0) for order in entry_orders)
+
+    order = np.argsort(close_times, kind='stable')
+    return TradeSeries(
+        backtest_id=backtest_id,
+        close_times=close_times[order],
+        net_profits=net_profits[order],
+        margins=margins[order]
+    )
+
+
+class TradePeriodSlicer:
+    """Slices closed positions into periods and computes per-period metrics"""
+
+    def __init__(self, config: Optional[PeriodSlicingConfig] = None):
+        self.config = config or PeriodSlicingConfig()
+        if self.config.mode == PeriodSlicing.EQUAL_TRADES and self.config.trade_buckets < 1:
+            raise ValueError("trade_buckets must be at least 1")
+
+    def extract_trades(self, backtest_id: str, backtest_data: Any) -> Optional[TradeSeries]:
+        """Extract closed trades from backtest data (see extract_trade_series)"""
+        return extract_trade_series(backtest_id, backtest_data)
+
+    def slice_backtest(self, backtest_id: str, backtest_data: Any,
+                       starting_balance: float = 0.0) -> List[TimePeriodAnalysis]:
+        """Slice a single backtest into periods"""
+        results = self.slice_batch({backtest_id: backtest_data}, {backtest_id: starting_balance})
+        return results.get(backtest_id, [])
+
+    def slice_batch(self, backtests: Dict[str, Any],
+                    starting_balances: Optional[Dict[str, float]] = None) -> Dict[str, List[TimePeriodAnalysis]]:
+        """
+        Slice many backtests into periods in a single vectorized pass
+
+        Args:
+            backtests: Mapping of backtest_id to backtest data
+            starting_balances: Optional mapping of backtest_id to starting balance.
+                When a balance is known, period ROI is relative to the equity at the
+                start of the period; otherwise it is relative to the period's margin.
+
+        Returns:
+            Mapping of backtest_id to its periods (backtests without trades map to [])
+        """
+        if not _has_numpy:
+            logger.warning("numpy is not installed, trade period slicing is unavailable")
+            return {backtest_id: [] for backtest_id in backtests}
+
+        starting_balances = starting_balances or {}
+        series = [self.extract_trades(backtest_id, data) for backtest_id, data in backtests.items()]
+        results: Dict[str, List[TimePeriodAnalysis]] = {backtest_id: [] for backtest_id in backtests}
+
+        series = [s for s in series if s is not None and s.trade_count > 0]
+        if not series:
+            return results
+
+        # Concatenate all backtests; trades stay sorted by close time within each backtest
+        counts = np.array([s.trade_count for s in series], dtype=np.int64)
+        bt_index = np.repeat(np.arange(len(series)), counts)
+        close_times = np.concatenate([s.close_times for s in series])
+        net_profits = np.concatenate([s.net_profits for s in series])
+        margins = np.concatenate([s.margins for s in series])
+        balances = np.array([float(starting_balances.get(s.backtest_id, 0.0) or 0.0) for s in series])
+
+        period_keys = self._period_keys(close_times, bt_index, counts)
+
+        # Group boundaries: a new group starts where the backtest or the period key changes
+        new_group = np.ones(close_times.shape[0], dtype=bool)
+        new_group[1:] = (bt_index[1:] != bt_index[:-1]) | (period_keys[1:] != period_keys[:-1])
+        group_id = np.cumsum(new_group) - 1
+        group_starts = np.flatnonzero(new_group)
+        group_count = group_starts.shape[0]
+
+        trades_per_group = np.bincount(group_id, minlength=group_count)
+        profit_per_group = np.bincount(group_id, weights=net_profits, minlength=group_count)
+        margin_per_group = np.bincount(group_id, weights=margins, minlength=group_count)
+        wins_per_group = np.bincount(group_id, weights=(net_profits > 0).astype(np.float64), minlength=group_count)
+        group_bt = bt_index[group_starts]
+
+        # Equity at the start of each group = starting balance + backtest P&L before the group
+        bt_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        running_pnl = np.cumsum(net_profits)
+        pnl_before_trade = running_pnl - net_profits - (running_pnl[bt_starts] - net_profits[bt_starts])[bt_index]
+        group_start_equity = balances[group_bt] + pnl_before_trade[group_starts]
+
+        max_drawdowns = self._group_max_drawdowns(
+            net_profits, group_id, group_starts, group_start_equity, margin_per_group
+        )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi_on_equity = np.where(group_start_equity > 0, profit_per_group / group_start_equity * 100, np.nan)
+            roi_on_margin = np.where(margin_per_group > 0, profit_per_group / margin_per_group * 100, 0.0)
+        period_rois = np.where(balances[group_bt] > 0, np.nan_to_num(roi_on_equity), roi_on_margin)
+        win_rates = wins_per_group / trades_per_group
+
+        group_ends = np.concatenate((group_starts[1:], [close_times.shape[0]])) - 1
+        for g in range(group_count):
+            if trades_per_group[g] < self.config.min_trades_per_period:
+                continue
+            period_start, period_end, label = self._period_bounds(
+                period_keys[group_starts[g]], close_times[group_starts[g]], close_times[group_ends[g]]
+            )
+            roi = float(period_rois[g])
+            win_rate = float(win_rates[g])
+            drawdown = float(max_drawdowns[g])
+            results[series[group_bt[g]].backtest_id].append(TimePeriodAnalysis(
+                period_start=period_start,
+                period_end=period_end,
+                period_roi=roi,
+                period_trades=int(trades_per_group[g]),
+                period_win_rate=win_rate,
+                period_max_drawdown=drawdown,
+                period_consistency_score=period_consistency_score(roi, win_rate, drawdown),
+                period_label=label,
+                period_profit=float(profit_per_group[g])
+            ))
+
+        return results
+
+    def _period_keys(self, close_times: "np.ndarray", bt_index: "np.ndarray",
+                     counts: "np.ndarray") -> "np.ndarray":
+        """Assign each trade a period key (calendar index or trade bucket)"""
+        mode = self.config.mode
+        if mode == PeriodSlicing.EQUAL_TRADES:
+            bt_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            rank = np.arange(close_times.shape[0]) - bt_starts[bt_index]
+            return (rank * self.config.trade_buckets) // counts[bt_index]
+
+        # Months since epoch (UTC)
+        months = close_times.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+        if mode == PeriodSlicing.QUARTERLY:
+            return months // 3
+        return months
+
+    def _period_bounds(self, key: int, first_close: int, last_close: int) -> Tuple[datetime, datetime, str]:
+        """Return start, end and label for a period key"""
+        mode = self.config.mode
+        if mode == PeriodSlicing.EQUAL_TRADES:
+            start = datetime.fromtimestamp(int(first_close), tz=timezone.utc)
+            end = datetime.fromtimestamp(int(last_close), tz=timezone.utc)
+            return start, end, f"bucket {int(key) + 1}/{self.config.trade_buckets}"
+
+        months_per_period = 3 if mode == PeriodSlicing.QUARTERLY else 1
+        first_month = int(key) * months_per_period
+        start = datetime(1970 + first_month // 12, first_month % 12 + 1, 1, tzinfo=timezone.utc)
+        next_month = first_month + months_per_period
+        end = datetime(1970 + next_month // 12, next_month % 12 + 1, 1, tzinfo=timezone.utc)
+        if mode == PeriodSlicing.QUARTERLY:
+            label = f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+        else:
+            label = start.strftime("%Y-%m")
+        return start, end, label
+
+    @staticmethod
+    def _group_max_drawdowns(net_profits: "np.ndarray", group_id: "np.ndarray",
+                             group_starts: "np.ndarray", group_start_equity: "np.ndarray",
+                             group_margins: "np.ndarray") -> "np.ndarray":
+        """
+        Max drawdown percentage per group, measured from the running equity peak
+
+        Without a known balance the drawdown is expressed relative to the group's margin.
+
+        Groups are contiguous, so a per-group running maximum is computed with a single
+        ``maximum.accumulate`` by lifting each group above the previous one.
+        """
+        running_pnl = np.cumsum(net_profits)
+        group_offset = (running_pnl - net_profits)[group_starts]
+        equity = running_pnl - group_offset[group_id]  # P&L within the group
+
+        span = float(equity.max() - min(equity.min(), 0.0)) + 1.0
+        lift = np.arange(group_starts.shape[0], dtype=np.float64) * span
+        peaks = np.maximum.accumulate(equity + lift[group_id]) - lift[group_id]
+        peaks = np.maximum(peaks, 0.0)  # Period starts at its own peak
+
+        peak_equity = group_start_equity[group_id] + peaks
+        drawdown_amount = peaks - equity
+        margin_base = group_margins[group_id]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown_pct = np.where(
+                peak_equity > 0, drawdown_amount / peak_equity * 100,
+                np.where(margin_base > 0, drawdown_amount / margin_base * 100, 0.0)
+            )
+
+        max_drawdowns = np.zeros(group_starts.shape[0], dtype=np.float64)
+        np.maximum.at(max_drawdowns, group_id, drawdown_pct)
+        return max_drawdowns
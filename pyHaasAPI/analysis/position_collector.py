@@ -0,0 +1,301 @@
+"""
+Streaming closed-position collector for live bots
+
+Monitoring live bots by paging through GET_RUNTIME_CLOSED_POSITIONS downloads
+each bot's whole position history on every run. The collector instead:
+- Keeps a watermark per bot (page cursor, close time and position IDs at that
+  time) and only reads pages that can hold positions closed since then
+- Appends new positions in a compact form to one NDJSON file per bot
+- Updates running performance metrics per bot and passes every batch of new
+  positions to subscribers, so fleet tracking costs O(new trades) per cycle
+- Persists watermarks and metrics through a JobJournal, so a restarted
+  process continues where it stopped
+"""
+
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Iterator
+
+from .. import api
+from .job_journal import JobJournal
+
+logger = logging.getLogger(__name__)
+
+
+def position_close_time(position: Dict[str, Any]) -> int:
+    """Completion time of a closed position: its last exit order's 'ct'"""
+    exit_times = [order.get('ct', 0) or 0 for order in position.get('exo') or []]
+    return max(exit_times) if exit_times else position.get('ct', 0) or 0
+
+
+def compact_position(position: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a closed position the store keeps"""
+    entry_orders = position.get('eno') or []
+    return {
+        'g': position.get('g', ''),
+        'ot': min((order.get('ct', 0) or 0 for order in entry_orders), default=0),
+        'ct': position_close_time(position),
+        'd': position.get('d', 0),
+        'rp': float(position.get('rp', 0.0) or 0.0),
+        'fe': float(position.get('fe', 0.0) or 0.0),
+        'roi': float(position.get('roi', 0.0) or 0.0),
+        'm': float(entry_orders[0].get('m', 0.0) or 0.0) if entry_orders else 0.0,
+    }
+
+
+@dataclass
+class PositionMetrics:
+    """Running performance of a bot over its collected positions"""
+    trades: int = 0
+    wins: int = 0
+    losses: int = 0
+    net_profit: float = 0.0
+    gross_profit: float = 0.0
+    gross_loss: float = 0.0
+    fees: float = 0.0
+    peak_profit: float = 0.0
+    max_drawdown: float = 0.0  # Largest fall of cumulative profit from its peak
+    last_close_time: int = 0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.trades if self.trades else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        if self.gross_loss == 0:
+            return float('inf') if self.gross_profit > 0 else 0.0
+        return self.gross_profit / self.gross_loss
+
+    def update(self, positions: List[Dict[str, Any]]) -> None:
+        """Add compact positions, oldest first"""
+        for position in positions:
+            profit = position['rp']
+            self.trades += 1
+            self.fees += position['fe']
+            self.net_profit += profit
+            if profit > 0:
+                self.wins += 1
+                self.gross_profit += profit
+            elif profit < 0:
+                self.losses += 1
+                self.gross_loss += -profit
+            self.peak_profit = max(self.peak_profit, self.net_profit)
+            self.max_drawdown = max(self.max_drawdown, self.peak_profit - self.net_profit)
+            self.last_close_time = max(self.last_close_time, position['ct'])
+
+
+@dataclass
+class BotPositionWatermark:
+    """How far the positions of a bot were collected"""
+    bot_id: str
+    next_page_id: int = -1
+    last_close_time: int = 0
+    ids_at_close_time: List[str] = field(default_factory=list)  # Positions closed at last_close_time
+    collected: int = 0
+    page_requests: int = 0
+    last_collect: Optional[float] = None
+    metrics: PositionMetrics = field(default_factory=PositionMetrics)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BotPositionWatermark":
+        values = {key: value for key, value in data.items() if key in cls.__dataclass_fields__}
+        values['metrics'] = PositionMetrics(**values.get('metrics', {}))
+        return cls(**values)
+
+    def is_new(self, position: Dict[str, Any]) -> bool:
+        close_time = position['ct']
+        return close_time > self.last_close_time or (
+            close_time == self.last_close_time and position['g'] not in self.ids_at_close_time)
+
+    def advance(self, positions: List[Dict[str, Any]]) -> None:
+        for position in positions:
+            if position['ct'] > self.last_close_time:
+                self.last_close_time = position['ct']
+                self.ids_at_close_time = [position['g']]
+            elif position['ct'] == self.last_close_time:
+                self.ids_at_close_time.append(position['g'])
+
+
+class PositionStore:
+    """Compact closed positions, one NDJSON file per bot"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, bot_id: str) -> Path:
+        return self.directory / f"{bot_id}.ndjson"
+
+    def append(self, bot_id: str, positions: List[Dict[str, Any]]) -> None:
+        if positions:
+            with open(self.path(bot_id), 'a') as f:
+                f.write(''.join(json.dumps(position, separators=(',', ':')) + '\n' for position in positions))
+
+    def read(self, bot_id: str) -> Iterator[Dict[str, Any]]:
+        path = self.path(bot_id)
+        if not path.exists():
+            return
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Torn last line of an interrupted write
+
+
+class ClosedPositionCollector:
+    """
+    Collects new closed positions of live bots
+
+    Usage:
+        collector = ClosedPositionCollector(executor, "data/positions")
+        collector.subscribe(lambda bot_id, positions, metrics: ...)
+        collector.watch(bot_ids)
+        collector.start()  # Collect every interval seconds in the background
+
+    When the server pages positions (returning a next page ID), the collector
+    continues from the page it stopped at; otherwise it reads the first page
+    and keeps the positions closed after the watermark.
+    """
+
+    def __init__(self, executor, store_dir: Path, state_path: Optional[Path] = None, page_length: int = 250,
+                 max_workers: int = 8, interval: float = 60.0):
+        """
+        Args:
+            executor: Authenticated executor
+            store_dir: Directory of the per-bot position files
+            state_path: Watermark state file (defaults to collector_state.json in store_dir)
+            page_length: Positions requested per GET_RUNTIME_CLOSED_POSITIONS call
+            max_workers: Bots collected at once
+            interval: Seconds between collection rounds of the background thread
+        """
+        self.executor = executor
+        self.store = PositionStore(store_dir)
+        self.page_length = page_length
+        self.max_workers = max_workers
+        self.interval = interval
+        self.journal = JobJournal(Path(state_path) if state_path else self.store.directory / "collector_state.json")
+        self.watermarks: Dict[str, BotPositionWatermark] = {
+            bot_id: BotPositionWatermark.from_dict(record) for bot_id, record in self.journal.replay().items()
+        }
+        self._watched: set = set()
+        self._subscribers: List[Callable[[str, List[Dict[str, Any]], PositionMetrics], Any]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, bot_ids: List[str]) -> None:
+        with self._lock:
+            for bot_id in bot_ids:
+                self.watermarks.setdefault(bot_id, BotPositionWatermark(bot_id=bot_id))
+                self._watched.add(bot_id)
+
+    def unwatch(self, bot_id: str) -> None:
+        with self._lock:
+            self._watched.discard(bot_id)
+
+    def subscribe(self, callback: Callable[[str, List[Dict[str, Any]], PositionMetrics], Any]) -> None:
+        """Call back with (bot_id, new compact positions, updated metrics) after each collection with news"""
+        self._subscribers.append(callback)
+
+    def metrics(self, bot_id: str) -> Optional[PositionMetrics]:
+        watermark = self.watermarks.get(bot_id)
+        return watermark.metrics if watermark else None
+
+    def collect(self, bot_id: str) -> List[Dict[str, Any]]:
+        """Store and return the positions a bot closed since the last collection, oldest first"""
+        with self._lock:
+            watermark = self.watermarks.setdefault(bot_id, BotPositionWatermark(bot_id=bot_id))
+
+        new_positions: List[Dict[str, Any]] = []
+        page_id = watermark.next_page_id
+        while True:
+            positions, next_page_id = api.get_bot_closed_positions_page(
+                self.executor, bot_id, page_id, self.page_length)
+            watermark.page_requests += 1
+            page = [compact_position(position) for position in positions]
+            news = [position for position in page if watermark.is_new(position)]
+            new_positions.extend(news)
+            if next_page_id is None:
+                if len(page) >= self.page_length and len(news) == len(page):
+                    logger.warning(f"⚠️ All {len(page)} positions of bot {bot_id[:8]} are new; "
+                                   f"older new positions are beyond the first page")
+                break
+            # Only full pages move the cursor; a short page is read again next time
+            if len(page) < self.page_length or next_page_id <= page_id:
+                break
+            page_id = watermark.next_page_id = next_page_id
+
+        new_positions.sort(key=lambda position: position['ct'])
+        if new_positions:
+            self.store.append(bot_id, new_positions)
+            watermark.metrics.update(new_positions)
+            watermark.advance(new_positions)
+            watermark.collected += len(new_positions)
+        watermark.last_collect = time.time()
+        self.journal.put(bot_id, asdict(watermark))
+
+        if new_positions:
+            for callback in list(self._subscribers):
+                try:
+                    callback(bot_id, new_positions, watermark.metrics)
+                except Exception as e:
+                    logger.warning(f"⚠️ Position subscriber failed for bot {bot_id}: {e}")
+        return new_positions
+
+    def run_once(self) -> Dict[str, int]:
+        """One collection round over every watched bot; returns new positions per bot"""
+        with self._lock:
+            bot_ids = sorted(self._watched)
+
+        def collect(bot_id: str) -> int:
+            try:
+                return len(self.collect(bot_id))
+            except Exception as e:
+                logger.warning(f"⚠️ Collecting closed positions of bot {bot_id} failed: {e}")
+                return 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            counts = dict(zip(bot_ids, pool.map(collect, bot_ids)))
+        total = sum(counts.values())
+        if total:
+            logger.info(f"📈 Collected {total} new closed positions from {len(bot_ids)} bots")
+        return counts
+
+    def fleet_summary(self) -> Dict[str, Any]:
+        """Metrics summed over every watched bot"""
+        with self._lock:
+            metrics = [self.watermarks[bot_id].metrics for bot_id in self._watched]
+        trades = sum(m.trades for m in metrics)
+        return {
+            'bots': len(metrics),
+            'trades': trades,
+            'net_profit': sum(m.net_profit for m in metrics),
+            'fees': sum(m.fees for m in metrics),
+            'win_rate': sum(m.wins for m in metrics) / trades if trades else 0.0,
+        }
+
+    def start(self) -> None:
+        """Collect watched bots every interval seconds on a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="position-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.journal.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
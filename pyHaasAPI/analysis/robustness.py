@@ -3,8 +3,9 @@ Strategy Robustness Analysis for pyHaasAPI
 
 This module provides comprehensive strategy robustness analysis including:
 - Max drawdown analysis for wallet protection
-- Time-based performance slicing
+- Time-based performance slicing of real closed positions
 - Consistency metrics across different periods
+- Monte Carlo path risk (optional)
 - Risk assessment for bot creation
 """
 
@@ -14,24 +15,14 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import json
 
-from .models import BacktestAnalysis, DrawdownAnalysis
+from .models import BacktestAnalysis, DrawdownAnalysis, TimePeriodAnalysis
 from .cache import UnifiedCacheManager
+from .periods import TradePeriodSlicer, PeriodSlicingConfig, period_consistency_score
+from .monte_carlo import MonteCarloSimulator, MonteCarloConfig, MonteCarloResult
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class TimePeriodAnalysis:
-    """Time period performance analysis"""
-    period_start: datetime
-    period_end: datetime
-    period_roi: float
-    period_trades: int
-    period_win_rate: float
-    period_max_drawdown: float
-    period_consistency_score: float
-
-
 @dataclass
 class RobustnessMetrics:
     """Comprehensive robustness metrics"""
@@ -47,20 +38,31 @@ class RobustnessMetrics:
     starting_balance: float  # Starting account balance
     final_balance: float     # Final account balance
     peak_balance: float      # Peak account balance reached
+    monte_carlo: Optional[MonteCarloResult] = None  # Path risk from trade resampling
 
 
 class StrategyRobustnessAnalyzer:
     """Analyzes strategy robustness and risk factors"""
     
-    def __init__(self, cache_manager: Optional[UnifiedCacheManager] = None):
+    def __init__(self, cache_manager: Optional[UnifiedCacheManager] = None,
+                 period_config: Optional[PeriodSlicingConfig] = None,
+                 monte_carlo_config: Optional[MonteCarloConfig] = None):
         self.cache_manager = cache_manager or UnifiedCacheManager()
+        self.period_slicer = TradePeriodSlicer(period_config)
+        self.monte_carlo = MonteCarloSimulator(monte_carlo_config) if monte_carlo_config else None
     
-    def analyze_backtest_robustness(self, backtest_analysis: BacktestAnalysis) -> RobustnessMetrics:
+    def analyze_backtest_robustness(self, backtest_analysis: BacktestAnalysis,
+                                    backtest_data: Optional[Dict[str, Any]] = None,
+                                    time_periods: Optional[List[TimePeriodAnalysis]] = None,
+                                    monte_carlo: Optional[MonteCarloResult] = None) -> RobustnessMetrics:
         """
         Analyze the robustness of a single backtest
         
         Args:
             backtest_analysis: The backtest analysis data
+            backtest_data: Pre-loaded runtime data (loaded from cache if omitted)
+            time_periods: Pre-computed time periods (sliced from trades if omitted)
+            monte_carlo: Pre-computed Monte Carlo result (simulated if enabled and omitted)
             
         Returns:
             RobustnessMetrics: Comprehensive robustness analysis
@@ -68,7 +70,8 @@ class StrategyRobustnessAnalyzer:
         logger.info(f"Analyzing robustness for backtest {backtest_analysis.backtest_id}")
         
         # Get detailed backtest data
-        backtest_data = self._get_backtest_runtime_data(backtest_analysis.backtest_id, backtest_analysis.lab_id)
+        if backtest_data is None:
+            backtest_data = self._get_backtest_runtime_data(backtest_analysis.backtest_id, backtest_analysis.lab_id)
         if not backtest_data:
             logger.warning(f"No runtime data available for backtest {backtest_analysis.backtest_id}")
             return self._create_fallback_metrics(backtest_analysis)
@@ -77,7 +80,14 @@ class StrategyRobustnessAnalyzer:
         drawdown_analysis = self._analyze_drawdown_risk(backtest_data, backtest_analysis)
         
         # Analyze time period consistency
-        time_periods = self._analyze_time_periods(backtest_data, backtest_analysis)
+        if time_periods is None:
+            time_periods = self._analyze_time_periods(backtest_data, backtest_analysis)
+        
+        # Monte Carlo path risk
+        if monte_carlo is None and self.monte_carlo:
+            monte_carlo = self.monte_carlo.simulate_backtest(
+                backtest_analysis.backtest_id, backtest_data, backtest_analysis.starting_balance
+            )
         
         # Calculate overall robustness metrics
         roi_consistency = self._calculate_roi_consistency(time_periods)
@@ -87,7 +97,7 @@ class StrategyRobustnessAnalyzer:
         
         # Determine risk level and recommendation
         risk_level, recommendation = self._assess_risk_level(
-            drawdown_analysis, robustness_score, backtest_analysis
+            drawdown_analysis, robustness_score, backtest_analysis, monte_carlo
         )
         
         return RobustnessMetrics(
@@ -102,7 +112,8 @@ class StrategyRobustnessAnalyzer:
             recommendation=recommendation,
             starting_balance=backtest_analysis.starting_balance,
             final_balance=backtest_analysis.final_balance,
-            peak_balance=backtest_analysis.peak_balance
+            peak_balance=backtest_analysis.peak_balance,
+            monte_carlo=monte_carlo
         )
     
     def _get_backtest_runtime_data(self, backtest_id: str, lab_id: str = None) -> Optional[Dict[str, Any]]:
@@ -256,60 +267,19 @@ class StrategyRobustnessAnalyzer:
     
     def _analyze_time_periods(self, backtest_data: Dict[str, Any], 
                              backtest_analysis: BacktestAnalysis) -> List[TimePeriodAnalysis]:
-        """Analyze performance across different time periods"""
-        
-        # For now, create mock time periods based on backtest duration
-        # In real implementation, we'd slice the actual trade data by time
-        
-        # Assume 2-3 year backtest, split into 6-month periods
-        periods = []
-        base_roi = backtest_analysis.roi_percentage
-        base_trades = backtest_analysis.total_trades
-        base_win_rate = backtest_analysis.win_rate
-        base_drawdown = backtest_analysis.max_drawdown
-        
-        # Create 4-6 periods with some variation
-        num_periods = 4
-        for i in range(num_periods):
-            # Add some realistic variation to each period
-            period_roi = base_roi * (0.8 + (i * 0.1))  # Vary ROI by ±20%
-            period_trades = max(1, int(base_trades / num_periods))
-            period_win_rate = max(0.3, min(0.9, base_win_rate + (i - 2) * 0.05))
-            period_drawdown = base_drawdown * (0.9 + (i * 0.05))
-            
-            # Calculate consistency score (higher is better)
-            consistency_score = self._calculate_period_consistency(
-                period_roi, period_win_rate, period_drawdown
-            )
-            
-            periods.append(TimePeriodAnalysis(
-                period_start=datetime.now() - timedelta(days=365 * (num_periods - i)),
-                period_end=datetime.now() - timedelta(days=365 * (num_periods - i - 1)),
-                period_roi=period_roi,
-                period_trades=period_trades,
-                period_win_rate=period_win_rate,
-                period_max_drawdown=period_drawdown,
-                period_consistency_score=consistency_score
-            ))
-        
-        return periods
+        """Analyze performance across time periods sliced from the actual closed positions"""
+        if not backtest_data:
+            return []
+        
+        return self.period_slicer.slice_backtest(
+            backtest_analysis.backtest_id,
+            backtest_data,
+            starting_balance=backtest_analysis.starting_balance
+        )
     
     def _calculate_period_consistency(self, roi: float, win_rate: float, drawdown: float) -> float:
         """Calculate consistency score for a time period (0-100)"""
-        
-        # Higher ROI is better
-        roi_score = min(100, max(0, roi / 10))  # Scale ROI to 0-100
-        
-        # Higher win rate is better
-        win_rate_score = win_rate * 100
-        
-        # Lower drawdown is better
-        drawdown_score = max(0, 100 - drawdown)
-        
-        # Weighted average
-        consistency_score = (roi_score * 0.4 + win_rate_score * 0.4 + drawdown_score * 0.2)
-        
-        return min(100, max(0, consistency_score))
+        return period_consistency_score(roi, win_rate, drawdown)
     
     def _calculate_roi_consistency(self, time_periods: List[TimePeriodAnalysis]) -> float:
         """Calculate ROI consistency across time periods"""
@@ -354,12 +324,18 @@ class StrategyRobustnessAnalyzer:
     
     def _assess_risk_level(self, drawdown_analysis: DrawdownAnalysis,
                           robustness_score: float,
-                          backtest_analysis: BacktestAnalysis) -> Tuple[str, str]:
+                          backtest_analysis: BacktestAnalysis,
+                          monte_carlo: Optional[MonteCarloResult] = None) -> Tuple[str, str]:
         """Assess risk level and provide recommendation"""
         
         if drawdown_analysis.account_blowup_risk:
             return "CRITICAL", "DO NOT CREATE BOT - High risk of account blowup"
         
+        # A result passed in by the caller may come without a simulator on this analyzer
+        max_risk_of_ruin = (self.monte_carlo.config if self.monte_carlo else MonteCarloConfig()).max_risk_of_ruin
+        if monte_carlo and monte_carlo.risk_of_ruin > max_risk_of_ruin:
+            return "HIGH", f"High path risk - {monte_carlo.risk_of_ruin:.1%} of resampled paths hit the ruin level"
+        
         if robustness_score < 30:
             return "HIGH", "High risk strategy - consider reducing position size"
         elif robustness_score < 50:
@@ -398,13 +374,28 @@ class StrategyRobustnessAnalyzer:
         )
     
     def analyze_lab_robustness(self, lab_analysis_result) -> Dict[str, RobustnessMetrics]:
-        """Analyze robustness for all backtests in a lab"""
+        """Analyze robustness for all backtests in a lab, slicing all trades in one batch"""
+        
+        backtests = lab_analysis_result.top_backtests
+        runtime_data = {
+            backtest.backtest_id: self._get_backtest_runtime_data(backtest.backtest_id, backtest.lab_id)
+            for backtest in backtests
+        }
+        available_data = {backtest_id: data for backtest_id, data in runtime_data.items() if data}
+        starting_balances = {backtest.backtest_id: backtest.starting_balance for backtest in backtests}
+        time_periods = self.period_slicer.slice_batch(available_data, starting_balances)
+        monte_carlo = self.monte_carlo.simulate_batch(available_data, starting_balances) if self.monte_carlo else {}
         
         robustness_results = {}
         
-        for backtest in lab_analysis_result.top_backtests:
+        for backtest in backtests:
             try:
-                robustness_metrics = self.analyze_backtest_robustness(backtest)
+                robustness_metrics = self.analyze_backtest_robustness(
+                    backtest,
+                    backtest_data=runtime_data.get(backtest.backtest_id),
+                    time_periods=time_periods.get(backtest.backtest_id),
+                    monte_carlo=monte_carlo.get(backtest.backtest_id)
+                )
                 robustness_results[backtest.backtest_id] = robustness_metrics
             except Exception as e:
                 logger.error(f"Failed to analyze robustness for backtest {backtest.backtest_id}: {e}")
@@ -463,6 +454,24 @@ class StrategyRobustnessAnalyzer:
             report.append(f"  Account Blowup Risk: {'YES' if metrics.drawdown_analysis.account_blowup_risk else 'NO'}")
             report.append(f"  Safe Leverage: {metrics.drawdown_analysis.safe_leverage_multiplier:.1f}x")
             report.append(f"  Recommendation: {metrics.recommendation}")
+            if metrics.time_periods:
+                report.append(f"  Period ROI Consistency: {metrics.roi_consistency:.1f}/100")
+                for period in metrics.time_periods:
+                    report.append(
+                        f"    {period.period_label or period.period_start.strftime('%Y-%m-%d')}: "
+                        f"ROI={period.period_roi:.1f}% | Trades={period.period_trades} | "
+                        f"Win Rate={period.period_win_rate:.1%} | Max DD={period.period_max_drawdown:.1f}%"
+                    )
+            if metrics.monte_carlo:
+                mc = metrics.monte_carlo
+                report.append(
+                    f"  Monte Carlo ({mc.simulations} {mc.method} paths): "
+                    f"Return p5/p50/p95={mc.terminal_return_percentiles.get('p5', 0):.1f}%/"
+                    f"{mc.terminal_return_percentiles.get('p50', 0):.1f}%/"
+                    f"{mc.terminal_return_percentiles.get('p95', 0):.1f}% | "
+                    f"Max DD p95={mc.max_drawdown_percentiles.get('p95', 0):.1f}% | "
+                    f"Risk of Ruin={mc.risk_of_ruin:.1%}"
+                )
             report.append("")
         
         return "\n".join(report)
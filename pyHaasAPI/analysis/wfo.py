@@ -8,7 +8,7 @@ for analyzing trading strategies across different time periods and market condit
 import os
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, TYPE_CHECKING
 from dataclasses import dataclass, asdict
 from enum import Enum
 
@@ -29,6 +29,9 @@ from ..api import get_full_backtest_runtime_data
 from .models import BacktestAnalysis
 from .cache import UnifiedCacheManager
 
+if TYPE_CHECKING:
+    from .wfo_engine import WFOEngineConfig
+
 logger = logging.getLogger(__name__)
 
 
@@ -132,6 +135,19 @@ class WFOAnalyzer:
     def __init__(self, cache_manager: Optional[UnifiedCacheManager] = None):
         self.cache_manager = cache_manager or UnifiedCacheManager()
         self.executor = None
+        self._engine = None
+    
+    def _get_engine(self, engine_config: Optional["WFOEngineConfig"] = None):
+        """Execution engine shared by this analyzer's calls; rebuilt when the executor or config changes"""
+        from .wfo_engine import WFOExecutionEngine
+        
+        engine = self._engine
+        if (engine is None or engine.executor is not self.executor
+                or (engine_config is not None and engine_config != engine.config)):
+            if engine is not None:
+                engine.close()
+            engine = self._engine = WFOExecutionEngine(self.executor, self.cache_manager, engine_config)
+        return engine
     
     def connect(self, host: str = None, port: int = None, email: str = None, password: str = None) -> bool:
         """Connect to HaasOnline API"""
@@ -201,71 +217,16 @@ class WFOAnalyzer:
         logger.info(f"📅 Generated {len(periods)} WFO periods")
         return periods
     
-    def analyze_wfo_period(self, lab_id: str, period: WFOPeriod, config: WFOConfig) -> WFOResult:
-        """Analyze a single WFO period"""
+    def analyze_wfo_period(self, lab_id: str, period: WFOPeriod, config: WFOConfig,
+                           engine_config: Optional["WFOEngineConfig"] = None) -> WFOResult:
+        """Analyze a single WFO period by running its training and testing labs"""
+        engine = self._get_engine(engine_config)
         try:
-            logger.info(f"🔍 Analyzing WFO period {period.period_id}")
-            logger.info(f"   Training: {period.training_start.date()} to {period.training_end.date()}")
-            logger.info(f"   Testing: {period.testing_start.date()} to {period.testing_end.date()}")
-            
-            # Get all backtests for this lab
-            backtests = api.get_backtest_result_page(self.executor, lab_id, 0, 1000)
-            if not backtests or not hasattr(backtests, 'backtests'):
-                raise ValueError("No backtests found")
-            
-            # Filter backtests by training period
-            training_backtests = []
-            for backtest in backtests.backtests:
-                # Check if backtest falls within training period
-                # Note: This is a simplified approach - in practice, you'd need to check actual backtest dates
-                training_backtests.append(backtest)
-            
-            if len(training_backtests) < config.min_training_periods:
-                raise ValueError(f"Insufficient training data: {len(training_backtests)} < {config.min_training_periods}")
-            
-            # Find best backtest in training period
-            best_backtest = self._find_best_training_backtest(training_backtests, config)
-            if not best_backtest:
-                raise ValueError("No suitable backtest found in training period")
-            
-            # Extract training metrics
-            training_metrics = self._extract_backtest_metrics(best_backtest)
-            
-            # Simulate out-of-sample testing
-            # Note: In a real implementation, you'd run the strategy on the testing period
-            testing_metrics = self._simulate_out_of_sample_performance(best_backtest, period, config)
-            
-            # Calculate stability score
-            stability_score = self._calculate_stability_score(training_metrics, testing_metrics)
-            
-            return WFOResult(
-                period=period,
-                best_backtest_id=best_backtest.backtest_id,
-                best_parameters=self._extract_parameters(best_backtest),
-                training_metrics=training_metrics,
-                testing_metrics=testing_metrics,
-                out_of_sample_return=testing_metrics.get('return', 0.0),
-                out_of_sample_sharpe=testing_metrics.get('sharpe_ratio', 0.0),
-                out_of_sample_max_drawdown=testing_metrics.get('max_drawdown', 0.0),
-                stability_score=stability_score,
-                success=True
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Error analyzing WFO period {period.period_id}: {e}")
-            return WFOResult(
-                period=period,
-                best_backtest_id="",
-                best_parameters={},
-                training_metrics={},
-                testing_metrics={},
-                out_of_sample_return=0.0,
-                out_of_sample_sharpe=0.0,
-                out_of_sample_max_drawdown=0.0,
-                stability_score=0.0,
-                success=False,
-                error_message=str(e)
-            )
+            source_lab = api.get_lab_details(self.executor, lab_id)
+            return engine.run_period(source_lab, period, config)
+        finally:
+            # Stops the scheduler thread; the next call starts it again
+            engine.close()
     
     def _find_best_training_backtest(self, backtests: List[Any], config: WFOConfig) -> Optional[Any]:
         """Find the best backtest in the training period"""
@@ -275,17 +236,18 @@ class WFOAnalyzer:
         for backtest in backtests:
             try:
                 # Extract basic metrics
-                roi = getattr(backtest, 'roi', 0.0)
-                win_rate = getattr(backtest, 'win_rate', 0.0)
-                total_trades = getattr(backtest, 'total_trades', 0)
-                max_drawdown = getattr(backtest, 'max_drawdown', 0.0)
+                metrics = self._extract_backtest_metrics(backtest)
+                roi = metrics['roi']
+                win_rate = metrics['win_rate']
+                total_trades = metrics['total_trades']
+                max_drawdown = metrics['max_drawdown']
                 
-                # Apply filters
+                # Apply filters (drawdowns are percentages, the threshold is a fraction)
                 if total_trades < config.min_trades:
                     continue
                 if win_rate < config.min_win_rate:
                     continue
-                if max_drawdown > config.max_drawdown_threshold:
+                if max_drawdown > config.max_drawdown_threshold * 100:
                     continue
                 
                 # Calculate composite score
@@ -322,7 +284,7 @@ class WFOAnalyzer:
     def _extract_backtest_metrics(self, backtest: Any) -> Dict[str, float]:
         """Extract metrics from a backtest"""
         return {
-            'roi': getattr(backtest, 'roi', 0.0),
+            'roi': getattr(backtest, 'roi', getattr(backtest, 'roi_percentage', 0.0)),
             'win_rate': getattr(backtest, 'win_rate', 0.0),
             'total_trades': getattr(backtest, 'total_trades', 0),
             'max_drawdown': getattr(backtest, 'max_drawdown', 0.0),
@@ -341,45 +303,6 @@ class WFOAnalyzer:
             'population_idx': getattr(backtest, 'population_idx', 0)
         }
     
-    def _simulate_out_of_sample_performance(self, backtest: Any, period: WFOPeriod, config: WFOConfig) -> Dict[str, float]:
-        """Simulate out-of-sample performance"""
-        # This is a simplified simulation
-        # In practice, you'd run the strategy on the actual testing period
-        
-        base_metrics = self._extract_backtest_metrics(backtest)
-        
-        if _has_pandas:
-            # Add some randomness to simulate out-of-sample performance
-            np.random.seed(42)  # For reproducibility
-            
-            # Simulate performance degradation
-            degradation_factor = np.random.uniform(0.7, 1.0)
-            
-            simulated_metrics = {
-                'return': base_metrics['roi'] * degradation_factor,
-                'win_rate': max(0.0, base_metrics['win_rate'] - np.random.uniform(0.0, 0.1)),
-                'sharpe_ratio': base_metrics['sharpe_ratio'] * degradation_factor,
-                'max_drawdown': base_metrics['max_drawdown'] + np.random.uniform(0.0, base_metrics['max_drawdown'] * 0.05),
-                'profit_factor': base_metrics['profit_factor'] * degradation_factor
-            }
-        else:
-            # Fallback without numpy
-            import random
-            random.seed(42)
-            
-            # Simulate performance degradation
-            degradation_factor = random.uniform(0.7, 1.0)
-            
-            simulated_metrics = {
-                'return': base_metrics['roi'] * degradation_factor,
-                'win_rate': max(0.0, base_metrics['win_rate'] - random.uniform(0.0, 0.1)),
-                'sharpe_ratio': base_metrics['sharpe_ratio'] * degradation_factor,
-                'max_drawdown': base_metrics['max_drawdown'] + random.uniform(0.0, base_metrics['max_drawdown'] * 0.05),
-                'profit_factor': base_metrics['profit_factor'] * degradation_factor
-            }
-        
-        return simulated_metrics
-    
     def _calculate_stability_score(self, training_metrics: Dict[str, float], testing_metrics: Dict[str, float]) -> float:
         """Calculate stability score between training and testing performance"""
         if not training_metrics or not testing_metrics:
@@ -393,51 +316,22 @@ class WFOAnalyzer:
         stability = 1.0 - (roi_degradation + win_rate_degradation) / 2.0
         return max(0.0, min(1.0, stability))
     
-    def analyze_lab_wfo(self, lab_id: str, config: WFOConfig) -> WFOAnalysisResult:
-        """Perform complete WFO analysis on a lab"""
+    def analyze_lab_wfo(self, lab_id: str, config: WFOConfig,
+                        engine_config: Optional["WFOEngineConfig"] = None,
+                        on_result: Optional[Callable[[WFOResult, WFOAnalysisResult], None]] = None) -> WFOAnalysisResult:
+        """
+        Perform complete WFO analysis on a lab
+        
+        Every period runs a real training optimization and an out-of-sample testing
+        execution on the server; independent periods run concurrently within the
+        engine's lab budget and results are streamed through on_result.
+        """
         logger.info(f"🚀 Starting WFO analysis for lab {lab_id[:8]}")
-        
-        # Generate periods
-        periods = self.generate_wfo_periods(config)
-        if not periods:
-            raise ValueError("No valid WFO periods generated")
-        
-        # Analyze each period
-        results = []
-        for period in periods:
-            result = self.analyze_wfo_period(lab_id, period, config)
-            results.append(result)
-        
-        # Calculate summary metrics
-        summary_metrics = self._calculate_summary_metrics(results)
-        
-        # Perform stability analysis
-        stability_analysis = self._analyze_stability(results)
-        
-        # Analyze parameter evolution
-        parameter_evolution = self._analyze_parameter_evolution(results)
-        
-        # Performance attribution
-        performance_attribution = self._analyze_performance_attribution(results)
-        
-        # Count successful vs failed periods
-        successful_periods = sum(1 for r in results if r.success)
-        failed_periods = len(results) - successful_periods
-        
-        return WFOAnalysisResult(
-            lab_id=lab_id,
-            config=config,
-            periods=periods,
-            results=results,
-            summary_metrics=summary_metrics,
-            stability_analysis=stability_analysis,
-            parameter_evolution=parameter_evolution,
-            performance_attribution=performance_attribution,
-            analysis_timestamp=datetime.now().isoformat(),
-            total_periods=len(periods),
-            successful_periods=successful_periods,
-            failed_periods=failed_periods
-        )
+        engine = self._get_engine(engine_config)
+        try:
+            return engine.run_lab_wfo(lab_id, config, on_result)
+        finally:
+            engine.close()
     
     def _calculate_summary_metrics(self, results: List[WFOResult]) -> Dict[str, float]:
         """Calculate summary metrics across all WFO periods"""
@@ -0,0 +1,387 @@
+"""
+Walk Forward Optimization execution engine for pyHaasAPI
+
+Runs real lab executions for every WFO period instead of approximating
+out-of-sample results from the training backtest:
+- Training: clone the source lab and optimize it over the training window
+- Testing: clone again with the best training parameters fixed and run the testing window
+- Independent periods run concurrently up to a server lab budget
+- Runs with the same script, market, parameters and window are reused from cache
+- Period results stream into the WFOAnalysisResult as they finish
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+
+from .. import api
+from ..lab_scheduler import LabExecutionScheduler, LabSchedulerConfig
+from ..model import StartLabExecutionRequest
+from ..tools.utils import fetch_all_lab_backtests
+from .analyzer import HaasAnalyzer
+from .cache import UnifiedCacheManager
+from .fingerprint import parameter_fingerprint
+from .models import BacktestAnalysis
+from .wfo import WFOAnalyzer, WFOPeriod, WFOResult, WFOConfig, WFOAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WFOEngineConfig:
+    """Configuration for executing WFO periods on the server"""
+    max_concurrent_labs: int = 2  # Server budget: labs executing at the same time
+    poll_interval: float = 10.0  # Shortest interval between status checks of a lab
+    execution_timeout: float = 6 * 3600.0  # Seconds before a lab execution is cancelled
+    training_candidates: int = 5  # Top training backtests (by lab ROI) analyzed in full
+    reuse_cached_runs: bool = True
+    delete_labs: bool = False  # Delete cloned labs once their results are harvested
+    lab_name_prefix: str = "WFO"
+
+
+@dataclass
+class WFORun:
+    """Outcome of a training or testing lab execution"""
+    lab_id: str
+    backtest_id: str
+    parameters: Dict[str, Any]
+    metrics: Dict[str, float]
+    reused: bool = False
+
+
+def _to_unix(value: datetime) -> int:
+    """Convert a period boundary to unix seconds (naive datetimes are UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _parameter_fingerprint(parameters: Any) -> str:
+    """Stable fingerprint of lab parameter definitions or a parameter value mapping"""
+    return parameter_fingerprint(parameters) or ''
+
+
+class WFORunCache:
+    """
+    Index of completed WFO lab runs
+
+    Keys combine the script, market, phase, window and a parameter fingerprint,
+    so a run is reused whenever the same parameters were already executed on
+    the same period. Stored as JSON next to the unified backtest cache.
+    """
+
+    def __init__(self, cache_manager: UnifiedCacheManager):
+        self.path = cache_manager.base_dir / "wfo_runs.json"
+        self._lock = threading.Lock()
+        self._runs: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self._runs = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Could not load WFO run cache {self.path}: {e}")
+
+    @staticmethod
+    def make_key(phase: str, script_id: str, market_tag: str, start_unix: int, end_unix: int,
+                 parameters: Any, criteria: Optional[Dict[str, Any]] = None) -> str:
+        """Build the cache key for a run"""
+        parts = [phase, script_id, market_tag, str(start_unix), str(end_unix), _parameter_fingerprint(parameters)]
+        if criteria:
+            parts.append(json.dumps(criteria, sort_keys=True))
+        return "|".join(parts)
+
+    def get(self, key: str) -> Optional[WFORun]:
+        with self._lock:
+            entry = self._runs.get(key)
+        if not entry:
+            return None
+        return WFORun(
+            lab_id=entry['lab_id'],
+            backtest_id=entry['backtest_id'],
+            parameters=entry.get('parameters', {}),
+            metrics=entry.get('metrics', {}),
+            reused=True
+        )
+
+    def put(self, key: str, run: WFORun) -> None:
+        with self._lock:
+            self._runs[key] = {
+                'lab_id': run.lab_id,
+                'backtest_id': run.backtest_id,
+                'parameters': run.parameters,
+                'metrics': run.metrics,
+                'cached_at': datetime.now().isoformat()
+            }
+            with open(self.path, 'w') as f:
+                json.dump(self._runs, f, indent=2, default=str)
+
+
+class WFOExecutionEngine:
+    """Schedules real training and testing lab executions for WFO periods"""
+
+    def __init__(self, executor, cache_manager: Optional[UnifiedCacheManager] = None,
+                 config: Optional[WFOEngineConfig] = None,
+                 backtest_analyzer: Optional[HaasAnalyzer] = None):
+        self.executor = executor
+        self.cache_manager = cache_manager or UnifiedCacheManager()
+        self.config = config or WFOEngineConfig()
+        if self.config.max_concurrent_labs < 1:
+            raise ValueError("max_concurrent_labs must be at least 1")
+        self.run_cache = WFORunCache(self.cache_manager)
+        # One scheduler loop watches every running lab of every period
+        self.scheduler = LabExecutionScheduler(executor, LabSchedulerConfig(
+            min_interval=self.config.poll_interval,
+            max_interval=max(self.config.poll_interval, LabSchedulerConfig.max_interval)
+        ))
+        self.wfo_analyzer = WFOAnalyzer(self.cache_manager)
+        self.wfo_analyzer.executor = executor
+        if backtest_analyzer is None:
+            backtest_analyzer = HaasAnalyzer(self.cache_manager)
+            backtest_analyzer.executor = executor
+        self.backtest_analyzer = backtest_analyzer
+
+    def run_lab_wfo(self, lab_id: str, wfo_config: WFOConfig,
+                    on_result: Optional[Callable[[WFOResult, WFOAnalysisResult], None]] = None) -> WFOAnalysisResult:
+        """
+        Run a complete WFO analysis on the server
+
+        Args:
+            lab_id: Source lab whose script, market and parameter ranges are optimized
+            wfo_config: WFO period and selection configuration
+            on_result: Optional callback invoked with each period result as it finishes
+
+        Returns:
+            WFOAnalysisResult; its results list fills up while periods complete
+        """
+        periods = self.wfo_analyzer.generate_wfo_periods(wfo_config)
+        if not periods:
+            raise ValueError("No valid WFO periods generated")
+
+        result = WFOAnalysisResult(
+            lab_id=lab_id,
+            config=wfo_config,
+            periods=periods,
+            results=[],
+            summary_metrics={},
+            stability_analysis={},
+            parameter_evolution={},
+            performance_attribution={},
+            analysis_timestamp=datetime.now().isoformat(),
+            total_periods=len(periods),
+            successful_periods=0,
+            failed_periods=0
+        )
+
+        for period_result in self.iter_period_results(lab_id, periods, wfo_config):
+            result.results.append(period_result)
+            if period_result.success:
+                result.successful_periods += 1
+            else:
+                result.failed_periods += 1
+            if on_result:
+                on_result(period_result, result)
+
+        result.results.sort(key=lambda r: r.period.period_id)
+        result.summary_metrics = self.wfo_analyzer._calculate_summary_metrics(result.results)
+        result.stability_analysis = self.wfo_analyzer._analyze_stability(result.results)
+        result.parameter_evolution = self.wfo_analyzer._analyze_parameter_evolution(result.results)
+        result.performance_attribution = self.wfo_analyzer._analyze_performance_attribution(result.results)
+        result.analysis_timestamp = datetime.now().isoformat()
+        return result
+
+    def iter_period_results(self, lab_id: str, periods: List[WFOPeriod],
+                            wfo_config: WFOConfig) -> Iterator[WFOResult]:
+        """Run periods concurrently and yield each result as soon as it finishes"""
+        source_lab = api.get_lab_details(self.executor, lab_id)
+        logger.info(f"🚀 Running {len(periods)} WFO periods for lab {lab_id[:8]} "
+                    f"({self.config.max_concurrent_labs} concurrent labs)")
+
+        with ThreadPoolExecutor(max_workers=self.config.max_concurrent_labs) as pool:
+            futures = {pool.submit(self.run_period, source_lab, period, wfo_config): period for period in periods}
+            for future in as_completed(futures):
+                yield future.result()
+
+    def run_period(self, source_lab: Any, period: WFOPeriod, wfo_config: WFOConfig) -> WFOResult:
+        """Run the training and testing executions of a single period"""
+        try:
+            logger.info(f"🔍 WFO period {period.period_id}: training {period.training_start.date()} to "
+                        f"{period.training_end.date()}, testing {period.testing_start.date()} to {period.testing_end.date()}")
+
+            training = self._run_training(source_lab, period, wfo_config)
+            testing = self._run_testing(source_lab, period, training.parameters)
+
+            return WFOResult(
+                period=period,
+                best_backtest_id=training.backtest_id,
+                best_parameters=training.parameters,
+                training_metrics=training.metrics,
+                testing_metrics=testing.metrics,
+                out_of_sample_return=testing.metrics.get('return', 0.0),
+                out_of_sample_sharpe=testing.metrics.get('sharpe_ratio', 0.0),
+                out_of_sample_max_drawdown=testing.metrics.get('max_drawdown', 0.0),
+                stability_score=self.wfo_analyzer._calculate_stability_score(training.metrics, testing.metrics),
+                success=True
+            )
+
+        except Exception as e:
+            logger.error(f"❌ Error running WFO period {period.period_id}: {e}")
+            return WFOResult(
+                period=period,
+                best_backtest_id="",
+                best_parameters={},
+                training_metrics={},
+                testing_metrics={},
+                out_of_sample_return=0.0,
+                out_of_sample_sharpe=0.0,
+                out_of_sample_max_drawdown=0.0,
+                stability_score=0.0,
+                success=False,
+                error_message=str(e)
+            )
+
+    def _run_training(self, source_lab: Any, period: WFOPeriod, wfo_config: WFOConfig) -> WFORun:
+        """Optimize the source lab over the training window and pick the best backtest"""
+        start_unix, end_unix = _to_unix(period.training_start), _to_unix(period.training_end)
+        criteria = {
+            'min_trades': wfo_config.min_trades,
+            'min_win_rate': wfo_config.min_win_rate,
+            'max_drawdown_threshold': wfo_config.max_drawdown_threshold,
+            'candidates': self.config.training_candidates
+        }
+        key = WFORunCache.make_key("train", source_lab.script_id, source_lab.settings.market_tag,
+                                   start_unix, end_unix, source_lab.parameters, criteria)
+        cached = self._cached_run(key)
+        if cached:
+            return cached
+
+        lab_id, backtests = self._execute_lab(source_lab, f"P{period.period_id} train", None, start_unix, end_unix)
+        try:
+            ranked = sorted(backtests, key=self._lab_roi, reverse=True)[:self.config.training_candidates]
+
+            candidates = {}
+            for backtest in ranked:
+                analysis = self.backtest_analyzer.analyze_backtest(lab_id, backtest)
+                if analysis:
+                    candidates[analysis.backtest_id] = (analysis, backtest)
+            best = self.wfo_analyzer._find_best_training_backtest([a for a, _ in candidates.values()], wfo_config)
+            if not best:
+                raise ValueError("No suitable backtest found in training period")
+
+            run = WFORun(
+                lab_id=lab_id,
+                backtest_id=best.backtest_id,
+                parameters=dict(getattr(candidates[best.backtest_id][1], 'parameters', None) or {}),
+                metrics=self.wfo_analyzer._extract_backtest_metrics(best)
+            )
+        finally:
+            self._finish_lab(lab_id)
+        self.run_cache.put(key, run)
+        return run
+
+    def _run_testing(self, source_lab: Any, period: WFOPeriod, parameters: Dict[str, Any]) -> WFORun:
+        """Run the best training parameters over the testing window"""
+        if not parameters:
+            raise ValueError("Best training backtest has no parameters to test")
+        start_unix, end_unix = _to_unix(period.testing_start), _to_unix(period.testing_end)
+        key = WFORunCache.make_key("test", source_lab.script_id, source_lab.settings.market_tag,
+                                   start_unix, end_unix, parameters)
+        cached = self._cached_run(key)
+        if cached:
+            return cached
+
+        lab_id, backtests = self._execute_lab(source_lab, f"P{period.period_id} test", parameters, start_unix, end_unix)
+        try:
+            if not backtests:
+                raise ValueError("Testing execution produced no backtests")
+            analysis = self.backtest_analyzer.analyze_backtest(lab_id, backtests[0])
+            if not analysis:
+                raise ValueError("Could not analyze testing backtest")
+
+            run = WFORun(
+                lab_id=lab_id,
+                backtest_id=analysis.backtest_id,
+                parameters=dict(parameters),
+                metrics=self._testing_metrics(analysis)
+            )
+        finally:
+            self._finish_lab(lab_id)
+        self.run_cache.put(key, run)
+        return run
+
+    def close(self) -> None:
+        """Stop the scheduler's background loop; a later run starts it again"""
+        self.scheduler.close()
+
+    def _cached_run(self, key: str) -> Optional[WFORun]:
+        if not self.config.reuse_cached_runs:
+            return None
+        run = self.run_cache.get(key)
+        if run:
+            logger.info(f"📁 Reusing cached WFO run {run.backtest_id[:8]} from lab {run.lab_id[:8]}")
+        return run
+
+    def _execute_lab(self, source_lab: Any, label: str, fixed_parameters: Optional[Dict[str, Any]],
+                     start_unix: int, end_unix: int) -> Tuple[str, List[Any]]:
+        """Clone the source lab, optionally fix its parameters, run it and return its backtests"""
+        lab = api.clone_lab(self.executor, source_lab.lab_id, f"{self.config.lab_name_prefix} {source_lab.name} {label}")
+        lab_id = lab.lab_id
+
+        try:
+            if fixed_parameters:
+                for param in lab.parameters:
+                    if isinstance(param, dict) and param.get('K') in fixed_parameters:
+                        param['O'] = [fixed_parameters[param['K']]]
+                        param['I'] = False
+                lab = api.update_lab_details(self.executor, lab)
+
+            response = api.start_lab_execution(
+                self.executor,
+                StartLabExecutionRequest(lab_id=lab_id, start_unix=start_unix, end_unix=end_unix, send_email=False)
+            )
+            if isinstance(response, dict) and response.get('Success') is False:
+                raise RuntimeError(f"Failed to start lab {lab_id}: {response.get('Error', response)}")
+
+            self._wait_for_completion(lab_id)
+            return lab_id, fetch_all_lab_backtests(self.executor, lab_id)
+        except Exception:
+            # The clone would otherwise be left behind by a failed period
+            self._finish_lab(lab_id)
+            raise
+
+    def _wait_for_completion(self, lab_id: str) -> None:
+        """Wait for the lab through the shared scheduler; it cancels the lab on timeout"""
+        completion = self.scheduler.wait_sync(lab_id, timeout=self.config.execution_timeout)
+        if not completion.completed:
+            raise RuntimeError(f"Lab {lab_id} was cancelled: {completion.message or 'no reason given'}")
+
+    def _finish_lab(self, lab_id: str) -> None:
+        if not self.config.delete_labs:
+            return
+        try:
+            api.delete_lab(self.executor, lab_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not delete WFO lab {lab_id}: {e}")
+
+    @staticmethod
+    def _lab_roi(backtest: Any) -> float:
+        summary = getattr(backtest, 'summary', None)
+        try:
+            return float(getattr(summary, 'ReturnOnInvestment', 0.0) or 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _testing_metrics(analysis: BacktestAnalysis) -> Dict[str, float]:
+        return {
+            'return': analysis.roi_percentage,
+            'win_rate': analysis.win_rate,
+            'total_trades': analysis.total_trades,
+            'max_drawdown': analysis.max_drawdown,
+            'profit_factor': analysis.profit_factor,
+            'sharpe_ratio': analysis.sharpe_ratio,
+            'realized_profits': analysis.realized_profits_usdt
+        }
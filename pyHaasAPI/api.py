@@ -881,11 +881,9 @@ def clone_lab(executor: SyncExecutor[Authenticated], lab_id: str, new_name: str
         - docs/LAB_CLONING_DISCOVERY.md for detailed explanation
         - clone_and_backtest_lab() for full workflow
     """
-    # Get the original lab details first
-    original_lab = get_lab_details(executor, lab_id)
-    
-    # Generate new name if not provided
+    # Generate new name if not provided; only then are the original lab details needed
     if not new_name:
+        original_lab = get_lab_details(executor, lab_id)
         new_name = f"Clone of {original_lab.name}"
     
     return executor.execute(
@@ -1632,6 +1630,41 @@ def get_full_bot_runtime_data(executor: SyncExecutor[Authenticated], bot_id: str
     """
     return get_bot(executor, bot_id)
 
+def get_bot_closed_positions_page(
+    executor: SyncExecutor[Authenticated],
+    bot_id: str,
+    next_page_id: int = -1,
+    page_length: int = 250
+) -> tuple[list[dict], Optional[int]]:
+    """
+    Get one page of closed positions for a bot, with the ID of the page after it.
+
+    Args:
+        executor: Authenticated executor instance
+        bot_id: ID of the bot
+        next_page_id: Page to read, default -1 (start)
+        page_length: Number of positions to fetch, default 250
+
+    Returns:
+        (positions, next page ID); the next page ID is None if the server did not return one
+
+    Raises:
+        HaasApiError: If the API request fails
+    """
+    data = executor.execute(
+        endpoint="Bot",
+        response_type=dict,
+        query_params={
+            "channel": "GET_RUNTIME_CLOSED_POSITIONS",
+            "botid": bot_id,
+            "nextpageid": next_page_id,
+            "pagelength": page_length,
+        },
+    )
+    if isinstance(data, dict):
+        return list(data.get("I") or []), data.get("NP")
+    return list(data or []), None
+
 def edit_bot_parameter(executor: SyncExecutor[Authenticated], bot: HaasBot) -> HaasBot:
     """
     Edits the parameters and settings of an existing bot, including script-specific parameters.
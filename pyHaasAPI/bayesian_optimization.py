@@ -0,0 +1,441 @@
+"""
+Bayesian optimization of HaasOnline lab parameters
+
+Every optimization lab used to start from scratch even though the unified
+cache already holds evaluated parameter sets for the same script and market.
+This module runs a sequential model-based search instead:
+- A Gaussian-process surrogate (pure NumPy) is fitted to cached backtests of the
+  script and market over the same window length, used as priors, plus every
+  parameter set run so far
+- Small batches are proposed by expected improvement, using the kriging-believer
+  heuristic so a batch does not collapse onto one point
+- Each proposal runs as a single-backtest cloned lab, like successive halving
+- The search stops once the best expected improvement over the best parameter
+  set run so far falls below a threshold, or the backtest budget is spent
+
+Parameters are encoded by the rank of their option, scaled to [0, 1], so the
+surrogate works on the same grid LabParameterOptimizer generates.
+
+## Quick Start
+
+```python
+from pyHaasAPI.optimization import LabParameterOptimizer
+from pyHaasAPI.bayesian_optimization import BayesianOptimizationConfig
+
+result = LabParameterOptimizer(executor).optimize_with_bayesian_search(
+    lab_id, BayesianOptimizationConfig(max_backtests=40, history_cache=cache_manager)
+)
+print(result.best_parameters, result.best_score, result.stopped_reason)
+```
+"""
+
+import math
+import random
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from loguru import logger as log
+
+# Optional imports for the surrogate model
+try:
+    import numpy as np
+    _has_numpy = True
+except ImportError:
+    _has_numpy = False
+
+from pyHaasAPI import api
+from pyHaasAPI.api import SyncExecutor, Authenticated
+from pyHaasAPI.optimization import OptimizationConfig
+from pyHaasAPI.successive_halving import HalvingTrial, SuccessiveHalvingConfig, SuccessiveHalvingOptimizer
+
+_DAY = 24 * 3600
+
+
+@dataclass
+class BayesianOptimizationConfig:
+    """
+    Configuration for Bayesian optimization over lab parameter sets.
+
+    Attributes:
+        max_backtests: Backtest budget; every parameter set tried counts, including ones that failed to run
+        batch_size: Parameter sets proposed and run per iteration
+        initial_points: Random parameter sets run first when fewer priors than this are cached
+        ei_threshold: Stop once the best expected improvement (metric units, e.g. ROI %) is below this
+        exploration: Improvement margin (in standard deviations) required by expected improvement
+        window_days: Backtest window ending at end_unix
+        history_cache: UnifiedCacheManager whose backtests of the script and market over a window
+            of window_days seed the model
+        max_candidates: Candidate parameter sets scored per proposal (sampled in larger spaces)
+        max_concurrent_labs: Labs executing at the same time
+        poll_interval: Shortest interval between status checks of a lab
+        execution_timeout: Seconds before a lab execution is cancelled
+        delete_labs: Delete the cloned labs afterwards, except the best one
+        seed: Seed for initial points and candidate sampling
+        lab_name_prefix: Prefix for the names of cloned labs
+    """
+    max_backtests: int = 60
+    batch_size: int = 4
+    initial_points: int = 8
+    ei_threshold: float = 0.5
+    exploration: float = 0.01
+    window_days: float = 30.0
+    history_cache: Optional[Any] = None
+    max_candidates: int = 20000
+    max_concurrent_labs: int = 4
+    poll_interval: float = 10.0
+    execution_timeout: float = 3600.0
+    delete_labs: bool = True
+    seed: Optional[int] = None
+    lab_name_prefix: str = "BO"
+
+
+@dataclass
+class BayesianOptimizationResult:
+    """
+    Result of a Bayesian optimization run.
+
+    Attributes:
+        success: Whether a best parameter set was found
+        lab_id: Source lab ID
+        best_parameters: Best parameter set run in this search
+        best_score: Lab ROI of the best parameter set
+        best_lab_id: Cloned lab holding the best parameter set
+        backtests_used: Backtests executed (parameter sets that failed to start are not counted)
+        prior_points: Cached backtests used to seed the surrogate
+        iterations: Proposal batches run
+        stopped_reason: 'expected_improvement', 'budget' or 'exhausted'
+        trials: All parameter sets run, best first
+        error_message: Error message if the run failed
+    """
+    success: bool
+    lab_id: str
+    best_parameters: Dict[str, str] = field(default_factory=dict)
+    best_score: float = 0.0
+    best_lab_id: Optional[str] = None
+    backtests_used: int = 0
+    prior_points: int = 0
+    iterations: int = 0
+    stopped_reason: str = ""
+    trials: List[HalvingTrial] = field(default_factory=list)
+    error_message: Optional[str] = None
+
+
+class GaussianProcess:
+    """
+    Gaussian-process regression with an RBF kernel
+
+    Targets are standardized; the length scale and noise level are chosen by
+    maximizing the log marginal likelihood over a small grid.
+    """
+
+    LENGTH_SCALES = (0.1, 0.2, 0.3, 0.5, 0.8, 1.2)
+    NOISE_LEVELS = (1e-4, 1e-2, 0.1)
+
+    def __init__(self):
+        self.length_scale = 0.3
+        self.noise = 1e-2
+        self._x = None
+        self._alpha = None
+        self._cholesky = None
+        self._mean = 0.0
+        self._std = 1.0
+
+    def fit(self, x: "np.ndarray", y: "np.ndarray", optimize: bool = True) -> "GaussianProcess":
+        """Fit the surrogate to observed points; hyperparameters are kept when optimize is False"""
+        self._mean = float(np.mean(y))
+        self._std = float(np.std(y)) or 1.0
+        target = (y - self._mean) / self._std
+        if optimize:
+            best = None
+            for length_scale, noise in itertools.product(self.LENGTH_SCALES, self.NOISE_LEVELS):
+                likelihood = self._log_marginal_likelihood(x, target, length_scale, noise)
+                if likelihood is not None and (best is None or likelihood > best[0]):
+                    best = (likelihood, length_scale, noise)
+            if best:
+                _, self.length_scale, self.noise = best
+        self._x = x
+        self._cholesky, self._alpha = self._factorize(x, target, self.length_scale, self.noise)
+        return self
+
+    def predict(self, x: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """Posterior mean and standard deviation in the original target units"""
+        cross = self._kernel(x, self._x, self.length_scale)
+        mean = cross @ self._alpha
+        solved = np.linalg.solve(self._cholesky, cross.T)
+        variance = np.maximum(1.0 - np.sum(solved ** 2, axis=0), 1e-12)
+        return mean * self._std + self._mean, np.sqrt(variance) * self._std
+
+    @staticmethod
+    def _kernel(a: "np.ndarray", b: "np.ndarray", length_scale: float) -> "np.ndarray":
+        distances = np.sum(a ** 2, axis=1)[:, None] + np.sum(b ** 2, axis=1)[None, :] - 2.0 * a @ b.T
+        return np.exp(-0.5 * np.maximum(distances, 0.0) / length_scale ** 2)
+
+    def _factorize(self, x, target, length_scale, noise):
+        covariance = self._kernel(x, x, length_scale) + noise * np.eye(len(x))
+        cholesky = np.linalg.cholesky(covariance)
+        alpha = np.linalg.solve(cholesky.T, np.linalg.solve(cholesky, target))
+        return cholesky, alpha
+
+    def _log_marginal_likelihood(self, x, target, length_scale, noise) -> Optional[float]:
+        try:
+            cholesky, alpha = self._factorize(x, target, length_scale, noise)
+        except np.linalg.LinAlgError:
+            return None
+        return float(-0.5 * target @ alpha - np.sum(np.log(np.diag(cholesky))))
+
+
+def expected_improvement(mean: "np.ndarray", std: "np.ndarray", best: float, margin: float = 0.0) -> "np.ndarray":
+    """Expected improvement over best for a maximized objective"""
+    improvement = mean - best - margin
+    z = improvement / std
+    cdf = 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2.0 * math.pi)
+    return np.maximum(improvement * cdf + std * pdf, 0.0)
+
+
+class BayesianLabOptimizer:
+    """
+    Searches lab parameter ranges with a Gaussian-process surrogate seeded from the cache.
+    """
+
+    def __init__(self, executor: SyncExecutor[Authenticated], config: Optional[BayesianOptimizationConfig] = None):
+        """
+        Initialize the optimizer.
+
+        Args:
+            executor: Authenticated HaasOnline API executor
+            config: Search configuration (uses defaults if None)
+        """
+        if not _has_numpy:
+            raise ImportError("numpy is required for Bayesian optimization")
+        self.executor = executor
+        self.config = config or BayesianOptimizationConfig()
+        if self.config.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        # Cloned single-backtest labs are run the same way successive halving runs them
+        self.runner = SuccessiveHalvingOptimizer(executor, SuccessiveHalvingConfig(
+            max_concurrent_labs=self.config.max_concurrent_labs,
+            poll_interval=self.config.poll_interval,
+            execution_timeout=self.config.execution_timeout,
+            delete_labs=self.config.delete_labs,
+            lab_name_prefix=self.config.lab_name_prefix
+        ))
+
+    def optimize(
+        self,
+        lab_id: str,
+        optimization_config: Optional[OptimizationConfig] = None,
+        end_unix: Optional[int] = None
+    ) -> BayesianOptimizationResult:
+        """
+        Find the best parameter set of a lab with as few backtests as possible.
+
+        Args:
+            lab_id: Source lab whose script, market and parameters are searched
+            optimization_config: Range generation settings
+            end_unix: End of the backtest window (defaults to now)
+
+        Returns:
+            BayesianOptimizationResult with the best parameter set and all trials
+        """
+        config = self.config
+        end_unix = end_unix or int(datetime.now().timestamp())
+        window = int(config.window_days * _DAY)
+        trials: List[HalvingTrial] = []
+        result = BayesianOptimizationResult(success=False, lab_id=lab_id)
+        # The runner's counter covers every run of this optimizer
+        backtests_before = self.runner.backtests_used
+
+        try:
+            source_lab = api.get_lab_details(self.executor, lab_id)
+            space, fixed = self.runner.search_space(source_lab, optimization_config or OptimizationConfig())
+            rng = random.Random(config.seed)
+
+            observed: Dict[Tuple[int, ...], float] = {}
+            priors = self._load_priors(source_lab, space, window)
+            result.prior_points = len(priors)
+            if priors:
+                log.info(f"📚 Seeding the surrogate with {len(priors)} cached backtests")
+
+            def run_batch(points: List[Tuple[int, ...]]) -> None:
+                batch = [HalvingTrial(parameters={**fixed, **self._decode(space, point)}) for point in points]
+                with ThreadPoolExecutor(max_workers=config.max_concurrent_labs) as pool:
+                    list(pool.map(lambda trial: self.runner.evaluate(source_lab, trial, window, end_unix), batch))
+                for point, trial in zip(points, batch):
+                    trials.append(trial)
+                    # Failed runs are kept out of the model but never proposed again
+                    observed[point] = trial.scores.get(window)
+                result.iterations += 1
+
+            initial = max(0, min(config.initial_points - len(priors), config.max_backtests))
+            if initial:
+                run_batch(self._random_points(space, initial, rng, set(priors)))
+
+            result.stopped_reason = "budget"
+            # Every attempt counts, so labs that keep failing to start cannot exhaust the candidates
+            while len(trials) < config.max_backtests:
+                scores = {p: v for p, v in observed.items() if v is not None}
+                known = {**priors, **scores}
+                batch_size = min(config.batch_size, config.max_backtests - len(trials))
+                best_score = max(scores.values()) if scores else None
+                points, best_improvement = self._propose(space, known, set(observed) | set(priors), batch_size, rng,
+                                                         best_score)
+                if not points:
+                    result.stopped_reason = "exhausted"
+                    break
+                if best_improvement < config.ei_threshold:
+                    log.info(f"🛑 Expected improvement {best_improvement:.3f} is below {config.ei_threshold}")
+                    result.stopped_reason = "expected_improvement"
+                    break
+                log.info(f"🔍 Iteration {result.iterations}: running {len(points)} parameter sets "
+                         f"(expected improvement {best_improvement:.3f})")
+                run_batch(points)
+
+            scored = [trial for trial in trials if window in trial.scores]
+            if not scored:
+                raise ValueError("No parameter set was evaluated successfully")
+            trials.sort(key=lambda t: t.score, reverse=True)
+            best = trials[0]
+
+            self.runner.cleanup(trials, keep=best)
+            log.info(f"✅ Best parameters {best.parameters} scored {best.score:.2f} using "
+                     f"{self.runner.backtests_used - backtests_before} backtests ({result.stopped_reason})")
+            result.success = True
+            result.best_parameters = dict(best.parameters)
+            result.best_score = best.score
+            result.best_lab_id = best.lab_id
+
+        except Exception as e:
+            log.error(f"Bayesian optimization failed: {e}")
+            self.runner.cleanup(trials)
+            result.error_message = str(e)
+        finally:
+            self.runner.scheduler.close()
+
+        result.backtests_used = self.runner.backtests_used - backtests_before
+        result.trials = trials
+        return result
+
+    def _load_priors(self, source_lab: Any, space: List[Tuple[str, List[str]]],
+                     window: int) -> Dict[Tuple[int, ...], float]:
+        """
+        Cached backtests of the script and market, snapped onto the search grid
+
+        Only backtests over the trial window length are used: ROI over other
+        windows is on another scale than the trial scores.
+        """
+        if self.config.history_cache is None:
+            return {}
+        from pyHaasAPI.analysis.fingerprint import canonical_name
+        from pyHaasAPI.combination_planner import load_script_history
+
+        settings = getattr(source_lab, 'settings', None)
+        history = load_script_history(self.config.history_cache, source_lab.script_id,
+                                      getattr(settings, 'market_tag', None), window=window)
+        names = [canonical_name(key) for key, _ in space]
+        priors: Dict[Tuple[int, ...], List[float]] = {}
+        for parameters, value in history:
+            point = []
+            for name, (_, options) in zip(names, space):
+                index = self._option_index(options, parameters.get(name))
+                if index is None:
+                    break
+                point.append(index)
+            else:
+                priors.setdefault(tuple(point), []).append(value)
+        return {point: sum(values) / len(values) for point, values in priors.items()}
+
+    @staticmethod
+    def _option_index(options: List[str], value: Optional[str]) -> Optional[int]:
+        """Index of the option matching value; numeric values snap to the nearest option"""
+        if value is None:
+            return None
+        from pyHaasAPI.analysis.fingerprint import normalize_parameter_value
+
+        normalized = normalize_parameter_value(value)
+        for index, option in enumerate(options):
+            if normalize_parameter_value(option) == normalized:
+                return index
+        try:
+            number = float(normalized)
+            numeric = [(abs(float(option) - number), index) for index, option in enumerate(options)]
+        except (TypeError, ValueError):
+            return None
+        return min(numeric)[1]
+
+    @staticmethod
+    def _decode(space: List[Tuple[str, List[str]]], point: Tuple[int, ...]) -> Dict[str, str]:
+        return {key: options[index] for (key, options), index in zip(space, point)}
+
+    @staticmethod
+    def _encode(space: List[Tuple[str, List[str]]], points: List[Tuple[int, ...]]) -> "np.ndarray":
+        scale = np.array([max(1, len(options) - 1) for _, options in space], dtype=np.float64)
+        return np.asarray(points, dtype=np.float64).reshape(len(points), len(space)) / scale
+
+    @staticmethod
+    def _random_points(space, count: int, rng: random.Random, exclude: set) -> List[Tuple[int, ...]]:
+        space_size = math.prod(len(options) for _, options in space)
+        count = min(count, space_size - len(exclude))
+        points = set()
+        while len(points) < count:
+            point = tuple(rng.randrange(len(options)) for _, options in space)
+            if point not in exclude:
+                points.add(point)
+        return sorted(points)
+
+    def _candidates(self, space, exclude: set, rng: random.Random) -> List[Tuple[int, ...]]:
+        space_size = math.prod(len(options) for _, options in space)
+        if space_size <= self.config.max_candidates:
+            return [point for point in itertools.product(*(range(len(options)) for _, options in space))
+                    if point not in exclude]
+        return self._random_points(space, self.config.max_candidates, rng, exclude)
+
+    def _propose(
+        self,
+        space: List[Tuple[str, List[str]]],
+        known: Dict[Tuple[int, ...], float],
+        exclude: set,
+        batch_size: int,
+        rng: random.Random,
+        best_score: Optional[float] = None
+    ) -> Tuple[List[Tuple[int, ...]], float]:
+        """
+        Pick a batch by expected improvement; returns the points and the first point's improvement
+
+        Improvement is measured over best_score, the best parameter set run in this
+        search. Until one has scored, proposals are ranked against the best known
+        value and the improvement is reported as infinite, so priors alone never
+        stop the search.
+        """
+        candidates = self._candidates(space, exclude, rng)
+        if not candidates:
+            return [], 0.0
+        if len(known) < 2:
+            return self._random_points(space, batch_size, rng, exclude), float('inf')
+
+        points = list(known)
+        values = [known[point] for point in points]
+        model = GaussianProcess().fit(self._encode(space, points), np.asarray(values, dtype=np.float64))
+        encoded = self._encode(space, candidates)
+        best = best_score if best_score is not None else max(values)
+
+        batch, first_improvement = [], 0.0
+        for _ in range(min(batch_size, len(candidates))):
+            mean, std = model.predict(encoded)
+            improvement = expected_improvement(mean, std, best, self.config.exploration * model._std)
+            index = int(np.argmax(improvement))
+            if not batch:
+                first_improvement = float(improvement[index]) if best_score is not None else float('inf')
+            batch.append(candidates[index])
+            # Kriging believer: pretend the proposal scored its predicted mean
+            points.append(candidates[index])
+            values.append(float(mean[index]))
+            model.fit(self._encode(space, points), np.asarray(values, dtype=np.float64), optimize=False)
+            encoded = np.delete(encoded, index, axis=0)
+            candidates = candidates[:index] + candidates[index + 1:]
+            if not candidates:
+                break
+        return batch, first_improvement
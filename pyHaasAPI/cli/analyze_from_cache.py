@@ -21,6 +21,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from pyHaasAPI import HaasAnalyzer, UnifiedCacheManager
 from pyHaasAPI.analysis.models import BacktestAnalysis
+from pyHaasAPI.analysis.neighborhood import score_backtests
+from pyHaasAPI.analysis.fingerprint import parameter_fingerprint
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -83,13 +85,13 @@ class CacheAnalyzer:
         
         return lab_counts
     
-    def analyze_cached_lab(self, lab_id: str, top_count: int = 10) -> Optional[Any]:
+    def analyze_cached_lab(self, lab_id: str, top_count: int = 10, sort_by: str = 'roe') -> Optional[Any]:
         """Analyze a single lab from cached data using manual extraction"""
         try:
             logger.info(f"🔍 Analyzing cached lab: {lab_id[:8]}...")
             
             # Use manual analysis for proper data extraction
-            performances = self._analyze_lab_manual(lab_id, top_count)
+            performances = self._analyze_lab_manual(lab_id, top_count, sort_by)
             
             if performances:
                 logger.info(f"✅ Found {len(performances)} backtests for {lab_id[:8]}")
@@ -102,7 +104,7 @@ class CacheAnalyzer:
             logger.error(f"❌ Error analyzing lab {lab_id[:8]}: {e}")
             return None
     
-    def _analyze_lab_manual(self, lab_id: str, top_count: int) -> List[Dict[str, Any]]:
+    def _analyze_lab_manual(self, lab_id: str, top_count: int, sort_by: str = 'roe') -> List[Dict[str, Any]]:
         """Manual analysis that properly extracts data from cached files and CSV reports"""
         import json
         from pathlib import Path
@@ -125,6 +127,7 @@ class CacheAnalyzer:
             script_name: str
             market_tag: str
             parameter_values: Dict[str, str] = None
+            stability_score: float = None
         
         # First, try to get data from CSV reports (preferred method)
         csv_data = self._get_all_csv_data_for_lab(lab_id)
@@ -154,11 +157,11 @@ class CacheAnalyzer:
                 performance.parameter_values = self._extract_parameter_values(lab_id, backtest_id)
                 performances.append(performance)
             
-            # Sort by ROE (Return on Equity) - calculated as realized_profits / starting_balance
-            performances.sort(key=lambda x: (x.realized_profits_usdt / max(x.starting_balance, 1)) * 100, reverse=True)
+            # Score against the whole lab grid before picking top performers
+            self._apply_stability_scores(performances)
             
-            # Return top performers
-            return performances[:top_count]
+            # Return top performers, one per distinct parameter set
+            return self._collapse_duplicates(self._sort_backtests(performances, sort_by))[:top_count]
         
         # Fallback to cached files if no CSV data available
         logger.info(f"No CSV data found, using cached files for lab {lab_id[:8]}")
@@ -257,7 +260,8 @@ class CacheAnalyzer:
                     final_balance=final_balance,
                     peak_balance=peak_balance,
                     script_name=script_name,
-                    market_tag=market_tag
+                    market_tag=market_tag,
+                    parameter_values=self._parameter_values_from_data(data)
                 )
                 
                 performances.append(performance)
@@ -266,11 +270,39 @@ class CacheAnalyzer:
                 logger.warning(f"Error extracting data from {file_path.name}: {e}")
                 continue
         
-        # Sort by ROE (Return on Equity) - calculated as realized_profits / starting_balance
-        performances.sort(key=lambda x: (x.realized_profits_usdt / max(x.starting_balance, 1)) * 100, reverse=True)
+        # Score against the whole lab grid before picking top performers
+        self._apply_stability_scores(performances)
         
-        # Return top performers
-        return performances[:top_count]
+        # Return top performers, one per distinct parameter set
+        return self._collapse_duplicates(self._sort_backtests(performances, sort_by))[:top_count]
+    
+    def _apply_stability_scores(self, performances: List[Any]) -> None:
+        """Set each backtest's ROE blended with the ROE of its parameter-grid neighbors"""
+        scores = score_backtests(
+            performances,
+            metric=lambda x: (x.realized_profits_usdt / max(x.starting_balance, 1)) * 100,
+            parameters=lambda x: x.parameter_values or {}
+        )
+        for performance in performances:
+            stability = scores.get(performance.backtest_id)
+            if stability:
+                performance.stability_score = stability.stability_adjusted_score
+    
+    def _collapse_duplicates(self, performances: List[Any]) -> List[Any]:
+        """Keep the first (best ranked) backtest of each identical parameter set on a market"""
+        seen = set()
+        collapsed = []
+        for performance in performances:
+            fingerprint = parameter_fingerprint(performance.parameter_values or {})
+            if fingerprint:
+                key = (performance.market_tag, fingerprint)
+                if key in seen:
+                    continue
+                seen.add(key)
+            collapsed.append(performance)
+        if len(collapsed) < len(performances):
+            logger.info(f"♻️ Collapsed {len(performances) - len(collapsed)} duplicate parameter sets")
+        return collapsed
     
     def _extract_generation_population(self, backtest_id: str, data: Dict[str, Any]) -> tuple[int, int]:
         """Extract generation and population from backtest ID or data"""
@@ -355,27 +387,34 @@ class CacheAnalyzer:
             with open(cache_path, 'r') as f:
                 data = json.load(f)
             
-            input_fields = data.get('InputFields', {})
-            parameters = {}
-            
-            # Extract key parameters (filter out non-optimizable ones)
-            for key, field in input_fields.items():
-                param_name = field.get('N', '')  # Parameter name
-                param_value = field.get('V', '')  # Parameter value
-                
-                # Skip system parameters and focus on optimizable ones
-                if param_name and param_value and not any(skip in param_name.lower() for skip in 
-                    ['trade amount', 'order size', 'entry order type', 'colldown', 'reset']):
-                    # Clean up parameter name
-                    clean_name = param_name.replace('TP ', 'Take Profit ').replace('SL ', 'Stop Loss ').replace('pct', '%')
-                    parameters[clean_name] = param_value
-            
-            return parameters
+            return self._parameter_values_from_data(data)
             
         except Exception as e:
             logger.debug(f"Could not extract parameters for {backtest_id[:8]}: {e}")
             return {}
     
+    def _parameter_values_from_data(self, data: Dict[str, Any]) -> Dict[str, str]:
+        """Extract parameter values from loaded cache data (InputFields or saved parameter_values)"""
+        input_fields = data.get('InputFields', {})
+        if not input_fields:
+            return dict(data.get('parameter_values') or {})
+        
+        parameters = {}
+        
+        # Extract key parameters (filter out non-optimizable ones)
+        for key, field in input_fields.items():
+            param_name = field.get('N', '')  # Parameter name
+            param_value = field.get('V', '')  # Parameter value
+            
+            # Skip system parameters and focus on optimizable ones
+            if param_name and param_value and not any(skip in param_name.lower() for skip in 
+                ['trade amount', 'order size', 'entry order type', 'colldown', 'reset']):
+                # Clean up parameter name
+                clean_name = param_name.replace('TP ', 'Take Profit ').replace('SL ', 'Stop Loss ').replace('pct', '%')
+                parameters[clean_name] = param_value
+        
+        return parameters
+    
     def _get_generation_population_from_csv(self, backtest_id: str) -> Optional[tuple[int, int]]:
         """Get generation and population from existing CSV reports"""
         try:
@@ -511,7 +550,8 @@ class CacheAnalyzer:
                 final_balance=perf.final_balance,
                 peak_balance=perf.peak_balance,
                 analysis_timestamp='',
-                parameter_values=getattr(perf, 'parameter_values', None)
+                parameter_values=getattr(perf, 'parameter_values', None),
+                stability_score=getattr(perf, 'stability_score', None)
             )
             backtests.append(backtest)
         
@@ -556,7 +596,7 @@ class CacheAnalyzer:
         for i, lab_id in enumerate(cached_labs):
             logger.info(f"📊 Analyzing lab {i+1}/{len(cached_labs)}: {lab_id[:8]}")
             
-            result = self.analyze_cached_lab(lab_id, top_count)
+            result = self.analyze_cached_lab(lab_id, top_count, sort_by)
             
             if result:
                 successful_analyses += 1
@@ -613,6 +653,9 @@ class CacheAnalyzer:
             return sorted(backtests, key=lambda x: x.realized_profits_usdt, reverse=True)
         elif sort_by.lower() == 'trades':
             return sorted(backtests, key=lambda x: x.total_trades, reverse=True)
+        elif sort_by.lower() == 'stability':
+            # ROE adjusted by the ROE of neighboring parameter combinations
+            return sorted(backtests, key=lambda x: x.stability_score if x.stability_score is not None else float('-inf'), reverse=True)
         else:
             # Default to ROE sorting
             return sorted(backtests, key=lambda x: (x.realized_profits_usdt / max(x.starting_balance, 1)) * 100, reverse=True)
@@ -1479,8 +1522,8 @@ Examples:
                        help='Analyze only specific lab IDs')
     parser.add_argument('--top-count', type=int, default=10,
                        help='Number of top backtests to show (default: 10)')
-    parser.add_argument('--sort-by', choices=['roi', 'roe', 'winrate', 'profit', 'trades'], default='roe',
-                       help='Sort backtests by metric (default: roe)')
+    parser.add_argument('--sort-by', choices=['roi', 'roe', 'winrate', 'profit', 'trades', 'stability'], default='roe',
+                       help='Sort backtests by metric; stability blends ROE with neighboring parameter sets (default: roe)')
     parser.add_argument('--save-results', action='store_true',
                        help='Save analysis results for later bot creation')
     parser.add_argument('--generate-lab-reports', action='store_true',
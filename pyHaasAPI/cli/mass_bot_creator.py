@@ -18,9 +18,11 @@ from dataclasses import dataclass
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from pyHaasAPI import HaasAnalyzer, UnifiedCacheManager
-from pyHaasAPI.api import RequestsExecutor, get_all_labs, get_lab_details, get_all_accounts
+from pyHaasAPI.api import RequestsExecutor, get_all_labs, get_lab_details, get_all_accounts, get_all_bots
+from pyHaasAPI.accounts.allocation import AccountAllocationIndex
 from pyHaasAPI.analysis.models import BacktestAnalysis, BotCreationResult, LabAnalysisResult
 from pyHaasAPI.analysis.robustness import StrategyRobustnessAnalyzer, RobustnessMetrics
+from pyHaasAPI.analysis.monte_carlo import MonteCarloSimulator, MonteCarloConfig
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -53,7 +55,7 @@ class MassBotCreator:
         self.analyzer = None
         self.cache = UnifiedCacheManager()
         self.accounts = []
-        self.account_index = 0
+        self.account_index: Optional[AccountAllocationIndex] = None
         self.results = []
         self.start_time = time.time()
         
@@ -70,9 +72,11 @@ class MassBotCreator:
                 logger.error("❌ Failed to connect to HaasOnline API")
                 return False
                 
-            # Get available accounts
+            # Get available accounts and index them with one bot snapshot
             self.accounts = self.analyzer.get_accounts()
             logger.info(f"📋 Found {len(self.accounts)} available accounts")
+            self.account_index = AccountAllocationIndex.from_snapshot(
+                self.accounts, get_all_bots(self.analyzer.executor))
             
             logger.info("✅ Connected successfully")
             return True
@@ -117,22 +121,18 @@ class MassBotCreator:
             logger.error(f"❌ Error fetching labs: {e}")
             return []
     
-    def get_next_account(self) -> Optional[Dict]:
-        """Get the next available account for bot assignment"""
-        if not self.accounts:
+    def get_next_account(self, key: str) -> Optional[str]:
+        """Reserve the least loaded account for a planned bot, free accounts first"""
+        if not self.account_index or not self.account_index.slots:
             logger.error("❌ No accounts available")
             return None
-            
-        # Use round-robin assignment
-        account = self.accounts[self.account_index % len(self.accounts)]
-        self.account_index += 1
-        
-        return account
+        return self.account_index.reserve(key)
     
     def analyze_lab_and_create_bots(self, lab: Any, top_count: int = 5, activate: bool = False, dry_run: bool = False,
                                   target_usdt_amount: float = 2000.0, trade_amount_method: str = 'usdt',
                                   wallet_percentage: float = None, analyze_count: int = 100,
-                                  min_backtests: int = 100, min_winrate: float = 0.0) -> List[BotCreationResult]:
+                                  min_backtests: int = 100, min_winrate: float = 0.0,
+                                  max_risk_of_ruin: float = None, mc_simulations: int = 2000) -> List[BotCreationResult]:
         """Analyze a single lab and create bots from top backtests"""
         # Get lab ID and name
         lab_id = getattr(lab, 'lab_id', None)
@@ -166,13 +166,24 @@ class MassBotCreator:
                     logger.warning(f"⚠️ No backtests meet the minimum win rate requirement of {min_winrate:.1%}")
                     return []
             
+            # Apply Monte Carlo path risk filter if specified
+            if max_risk_of_ruin is not None:
+                filtered_backtests = self._filter_by_path_risk(
+                    lab_id, filtered_backtests, max_risk_of_ruin, mc_simulations
+                )
+                
+                if not filtered_backtests:
+                    logger.warning(f"⚠️ No backtests meet the maximum risk of ruin of {max_risk_of_ruin:.1%}")
+                    return []
+            
             # Create bots from top backtests
             bot_results = []
             for i, backtest in enumerate(filtered_backtests[:top_count]):
                 try:
-                    # Get next available account
-                    account = self.get_next_account()
-                    if not account:
+                    # Reserve an account for this backtest
+                    account_key = f"{lab_id}:{backtest.backtest_id}"
+                    account_id = self.get_next_account(account_key)
+                    if not account_id:
                         logger.error(f"❌ No accounts available for bot creation")
                         break
                     
@@ -193,7 +204,7 @@ class MassBotCreator:
                             bot_id="dry-run-mock",
                             bot_name=bot_name,
                             backtest_id=backtest.backtest_id,
-                            account_id="dry-run-account",
+                            account_id=account_id,
                             market_tag=backtest.market_tag,
                             leverage=20.0,
                             margin_mode="CROSS",
@@ -205,15 +216,19 @@ class MassBotCreator:
                             error_message=None
                         )
                         bot_results.append(mock_bot_result)
+                        # Nothing is created, so the account stays free for later selections
+                        self.account_index.release(account_key)
                         continue
                     
                     # Create bot with proper configuration
                     bot_result = self.analyzer.create_bot_from_backtest(
                         backtest=backtest,
-                        bot_name=bot_name
+                        bot_name=bot_name,
+                        account_id=account_id
                     )
                     
                     if bot_result and bot_result.success:
+                        self.account_index.confirm(account_key, bot_result.bot_id)
                         logger.info(f"✅ Created bot: {bot_result.bot_name}")
                         logger.info(f"💰 Trade amount: {bot_result.trade_amount_usdt:.4f} base currency (${target_usdt_amount} USDT equivalent)")
                         
@@ -227,6 +242,7 @@ class MassBotCreator:
                         
                         bot_results.append(bot_result)
                     else:
+                        self.account_index.release(account_key)
                         logger.error(f"❌ Failed to create bot from backtest {backtest.backtest_id}")
                         if bot_result and bot_result.error_message:
                             logger.error(f"   Error: {bot_result.error_message}")
@@ -242,6 +258,34 @@ class MassBotCreator:
             logger.error(f"❌ Error analyzing lab {lab_name}: {e}")
             return []
     
+    def _filter_by_path_risk(self, lab_id: str, backtests: List[BacktestAnalysis],
+                             max_risk_of_ruin: float, simulations: int) -> List[BacktestAnalysis]:
+        """Drop backtests whose Monte Carlo risk of ruin exceeds the limit"""
+        simulator = MonteCarloSimulator(MonteCarloConfig(simulations=simulations, max_risk_of_ruin=max_risk_of_ruin))
+        cached_data = {}
+        for backtest in backtests:
+            data = self.cache.load_backtest_cache(lab_id, backtest.backtest_id)
+            if data:
+                cached_data[backtest.backtest_id] = data
+        
+        mc_results = simulator.simulate_batch(
+            cached_data, {bt.backtest_id: bt.starting_balance for bt in backtests}
+        )
+        
+        accepted = []
+        for backtest in backtests:
+            mc = mc_results.get(backtest.backtest_id)
+            if mc is None:
+                logger.info(f"   {backtest.backtest_id[:8]}: no trade data for Monte Carlo - keeping")
+                accepted.append(backtest)
+            elif mc.risk_of_ruin <= max_risk_of_ruin:
+                accepted.append(backtest)
+            else:
+                logger.info(f"   {backtest.backtest_id[:8]}: risk of ruin {mc.risk_of_ruin:.1%} - skipping")
+        
+        logger.info(f"📊 After Monte Carlo filter (risk of ruin <= {max_risk_of_ruin:.1%}): {len(accepted)} backtests")
+        return accepted
+    
     def run_mass_creation(self) -> MassBotCreationResult:
         """Run the complete mass bot creation process"""
         logger.info("🚀 Starting Mass Bot Creation Process")
@@ -299,6 +343,8 @@ class MassBotCreator:
                 labs_with_errors.append(lab_name)
                 continue
         
+        self._reconcile_accounts()
+        
         # Calculate processing time
         processing_time = time.time() - self.start_time
         
@@ -318,6 +364,13 @@ class MassBotCreator:
         
         return result
     
+    def _reconcile_accounts(self):
+        """Fold the bots created by this run back into the account index"""
+        try:
+            self.account_index.reconcile(get_all_bots(self.analyzer.executor), release_unconfirmed=True)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not reconcile account index: {e}")
+    
     def _filter_labs(self, all_labs: List[Any], lab_ids: List[str] = None, exclude_lab_ids: List[str] = None) -> List[Any]:
         """Filter labs based on inclusion/exclusion criteria"""
         filtered_labs = []
@@ -345,7 +398,8 @@ class MassBotCreator:
                            lab_ids: List[str] = None, exclude_lab_ids: List[str] = None,
                            target_usdt_amount: float = 2000.0, trade_amount_method: str = 'usdt',
                            wallet_percentage: float = None, analyze_count: int = 100,
-                           min_backtests: int = 100, min_winrate: float = 0.0) -> MassBotCreationResult:
+                           min_backtests: int = 100, min_winrate: float = 0.0,
+                           max_risk_of_ruin: float = None, mc_simulations: int = 2000) -> MassBotCreationResult:
         """Create bots for labs with flexible selection and calculation methods"""
         logger.info("🚀 Starting mass bot creation process...")
         self.start_time = time.time()
@@ -395,7 +449,8 @@ class MassBotCreator:
                 bot_results = self.analyze_lab_and_create_bots(
                     lab, top_count, activate, dry_run, 
                     target_usdt_amount, trade_amount_method, wallet_percentage,
-                    analyze_count, min_backtests, min_winrate
+                    analyze_count, min_backtests, min_winrate,
+                    max_risk_of_ruin, mc_simulations
                 )
                 all_bot_results.extend(bot_results)
                 
@@ -414,6 +469,9 @@ class MassBotCreator:
                 labs_with_errors.append(lab_name)
                 continue
         
+        if not dry_run:
+            self._reconcile_accounts()
+        
         # Calculate processing time
         processing_time = time.time() - self.start_time
         
@@ -488,6 +546,9 @@ Examples:
   # Create bots from specific labs only
   python -m pyHaasAPI.cli.mass_bot_creator --lab-ids lab1,lab2 --top-count 3
   
+  # Skip backtests with more than 5% Monte Carlo risk of ruin
+  python -m pyHaasAPI.cli.mass_bot_creator --max-risk-of-ruin 0.05
+  
   # Dry run to see what would be created
   python -m pyHaasAPI.cli.mass_bot_creator --dry-run --top-count 3
         ''',
@@ -501,6 +562,10 @@ Examples:
                        help='Minimum number of backtests required to process a lab (default: 100)')
     parser.add_argument('--min-winrate', type=float, default=0.0,
                        help='Minimum win rate for bot creation (0.0-1.0, default: 0.0 - no filter)')
+    parser.add_argument('--max-risk-of-ruin', type=float,
+                       help='Skip backtests whose Monte Carlo risk of ruin exceeds this (0.0-1.0)')
+    parser.add_argument('--mc-simulations', type=int, default=2000,
+                       help='Monte Carlo simulations per backtest for --max-risk-of-ruin (default: 2000)')
     parser.add_argument('--activate', action='store_true',
                        help='Activate created bots for live trading')
     parser.add_argument('--dry-run', action='store_true',
@@ -541,7 +606,9 @@ Examples:
             wallet_percentage=args.wallet_percentage,
             analyze_count=args.analyze_count,
             min_backtests=args.min_backtests,
-            min_winrate=args.min_winrate
+            min_winrate=args.min_winrate,
+            max_risk_of_ruin=args.max_risk_of_ruin,
+            mc_simulations=args.mc_simulations
         )
         
         # Exit with appropriate code
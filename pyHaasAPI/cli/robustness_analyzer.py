@@ -18,6 +18,8 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from pyHaasAPI.analysis.robustness import StrategyRobustnessAnalyzer
+from pyHaasAPI.analysis.periods import PeriodSlicing, PeriodSlicingConfig
+from pyHaasAPI.analysis.monte_carlo import MonteCarloConfig, MonteCarloMethod
 from pyHaasAPI.analysis.analyzer import HaasAnalyzer
 from pyHaasAPI.analysis.cache import UnifiedCacheManager
 from pyHaasAPI import api
@@ -30,7 +32,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def analyze_lab_robustness(lab_id: str, top_count: int = 10, output_file: str = None):
+def analyze_lab_robustness(lab_id: str, top_count: int = 10, output_file: str = None,
+                           period_config: PeriodSlicingConfig = None,
+                           monte_carlo_config: MonteCarloConfig = None):
     """Analyze robustness for a specific lab"""
     
     logger.info(f"Starting robustness analysis for lab {lab_id}")
@@ -38,7 +42,7 @@ def analyze_lab_robustness(lab_id: str, top_count: int = 10, output_file: str =
     # Initialize components
     cache_manager = UnifiedCacheManager()
     analyzer = HaasAnalyzer(cache_manager)
-    robustness_analyzer = StrategyRobustnessAnalyzer(cache_manager)
+    robustness_analyzer = StrategyRobustnessAnalyzer(cache_manager, period_config, monte_carlo_config)
     
     # Connect to API
     if not analyzer.connect():
@@ -86,7 +90,9 @@ def analyze_lab_robustness(lab_id: str, top_count: int = 10, output_file: str =
         return False
 
 
-def analyze_all_labs_robustness(top_count: int = 5, output_file: str = None):
+def analyze_all_labs_robustness(top_count: int = 5, output_file: str = None,
+                                period_config: PeriodSlicingConfig = None,
+                                monte_carlo_config: MonteCarloConfig = None):
     """Analyze robustness for all available labs"""
     
     logger.info("Starting robustness analysis for all labs")
@@ -94,7 +100,7 @@ def analyze_all_labs_robustness(top_count: int = 5, output_file: str = None):
     # Initialize components
     cache_manager = UnifiedCacheManager()
     analyzer = HaasAnalyzer(cache_manager)
-    robustness_analyzer = StrategyRobustnessAnalyzer(cache_manager)
+    robustness_analyzer = StrategyRobustnessAnalyzer(cache_manager, period_config, monte_carlo_config)
     
     # Connect to API
     if not analyzer.connect():
@@ -264,6 +270,41 @@ Examples:
         help='Output file for the report (default: print to console)'
     )
     
+    parser.add_argument(
+        '--period-mode',
+        choices=[mode.value for mode in PeriodSlicing],
+        default=PeriodSlicing.QUARTERLY.value,
+        help='How closed trades are sliced into periods (default: quarterly)'
+    )
+    
+    parser.add_argument(
+        '--trade-buckets',
+        type=int,
+        default=4,
+        help='Number of equal trade-count periods for --period-mode equal_trades (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--monte-carlo',
+        type=int,
+        metavar='SIMULATIONS',
+        help='Resample each backtest\'s trades this many times to estimate path risk'
+    )
+    
+    parser.add_argument(
+        '--mc-method',
+        choices=[method.value for method in MonteCarloMethod],
+        default=MonteCarloMethod.BOOTSTRAP.value,
+        help='Monte Carlo resampling method (default: bootstrap)'
+    )
+    
+    parser.add_argument(
+        '--mc-seed',
+        type=int,
+        default=42,
+        help='Random seed for reproducible Monte Carlo results (default: 42)'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -283,18 +324,34 @@ Examples:
     if args.lab_id and args.all_labs:
         parser.error("Cannot specify both --lab-id and --all-labs")
     
+    period_config = PeriodSlicingConfig(
+        mode=PeriodSlicing(args.period_mode),
+        trade_buckets=args.trade_buckets
+    )
+    monte_carlo_config = None
+    if args.monte_carlo:
+        monte_carlo_config = MonteCarloConfig(
+            simulations=args.monte_carlo,
+            method=MonteCarloMethod(args.mc_method),
+            seed=args.mc_seed
+        )
+    
     # Run analysis
     try:
         if args.all_labs:
             success = analyze_all_labs_robustness(
                 top_count=args.top_count,
-                output_file=args.output
+                output_file=args.output,
+                period_config=period_config,
+                monte_carlo_config=monte_carlo_config
             )
         else:
             success = analyze_lab_robustness(
                 lab_id=args.lab_id,
                 top_count=args.top_count,
-                output_file=args.output
+                output_file=args.output,
+                period_config=period_config,
+                monte_carlo_config=monte_carlo_config
             )
         
         if success:
@@ -17,6 +17,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from pyHaasAPI.analysis.wfo import WFOAnalyzer, WFOConfig, WFOMode
+from pyHaasAPI.analysis.wfo_engine import WFOEngineConfig
 from pyHaasAPI.analysis.cache import UnifiedCacheManager
 
 # Setup logging first
@@ -61,7 +62,10 @@ class WFOAnalyzerCLI:
         min_profit_factor: float = 1.1,
         max_drawdown: float = 0.3,
         output_file: str = None,
-        dry_run: bool = False
+        dry_run: bool = False,
+        max_concurrent_labs: int = 2,
+        poll_interval: float = 10.0,
+        reuse_cached_runs: bool = True
     ) -> bool:
         """Perform WFO analysis on a lab"""
         try:
@@ -105,7 +109,12 @@ class WFOAnalyzerCLI:
                 return True
             
             # Perform WFO analysis
-            result = self.analyzer.analyze_lab_wfo(lab_id, config)
+            engine_config = WFOEngineConfig(
+                max_concurrent_labs=max_concurrent_labs,
+                poll_interval=poll_interval,
+                reuse_cached_runs=reuse_cached_runs
+            )
+            result = self.analyzer.analyze_lab_wfo(lab_id, config, engine_config, self._log_period_result)
             
             # Print summary
             self._print_wfo_summary(result)
@@ -124,6 +133,17 @@ class WFOAnalyzerCLI:
             logger.error(f"❌ WFO analysis failed: {e}")
             return False
     
+    def _log_period_result(self, period_result, result):
+        """Log each WFO period as soon as it finishes"""
+        done = result.successful_periods + result.failed_periods
+        if period_result.success:
+            logger.info(f"✅ [{done}/{result.total_periods}] Period {period_result.period.period_id}: "
+                        f"OOS return {period_result.out_of_sample_return:.2f}%, "
+                        f"stability {period_result.stability_score:.2f}")
+        else:
+            logger.warning(f"⚠️ [{done}/{result.total_periods}] Period {period_result.period.period_id} failed: "
+                           f"{period_result.error_message}")
+    
     def _print_wfo_summary(self, result):
         """Print WFO analysis summary"""
         logger.info("\n" + "="*60)
@@ -215,6 +235,13 @@ Examples:
     parser.add_argument('--min-profit-factor', type=float, default=1.1, help='Minimum profit factor (default: 1.1)')
     parser.add_argument('--max-drawdown', type=float, default=0.3, help='Maximum drawdown threshold (default: 0.3)')
     
+    # Execution options
+    parser.add_argument('--max-concurrent-labs', type=int, default=2,
+                       help='Maximum labs executing on the server at once (default: 2)')
+    parser.add_argument('--poll-interval', type=float, default=10.0,
+                       help='Seconds between lab status checks (default: 10)')
+    parser.add_argument('--no-reuse', action='store_true', help='Re-run periods even if cached runs exist')
+    
     # Output options
     parser.add_argument('--output', help='Output CSV file path')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be analyzed without running')
@@ -254,7 +281,10 @@ Examples:
         min_profit_factor=args.min_profit_factor,
         max_drawdown=args.max_drawdown,
         output_file=args.output,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        max_concurrent_labs=args.max_concurrent_labs,
+        poll_interval=args.poll_interval,
+        reuse_cached_runs=not args.no_reuse
     )
     
     sys.exit(0 if success else 1)
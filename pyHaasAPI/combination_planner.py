@@ -0,0 +1,379 @@
+"""
+Combination-budget planner for HaasOnline lab parameter ranges
+
+Ranges from ParameterHandler and LabParameterOptimizer are expanded by the lab
+as a full Cartesian product, so a few extra options per parameter can turn a
+lab into one that never finishes. The planner fits the ranges to a target
+backtest count instead:
+- Sensitivity of every parameter is measured from previous backtests of the same
+  script in the unified cache (share of metric variance explained by the parameter)
+- Parameters with negligible effect are frozen at their best known value
+- The remaining steps are allocated greedily to the most sensitive parameters,
+  keeping evenly spread levels that include the best known value
+- The expected combination count and runtime are reported before launching
+
+## Quick Start
+
+```python
+from pyHaasAPI.combination_planner import CombinationPlanner, load_script_history, measure_sensitivity
+
+history = load_script_history(cache_manager, script_id, market_tag)
+plan = CombinationPlanner(target_backtests=2000).plan(lab.parameters, measure_sensitivity(history))
+print(plan.summary())
+lab.parameters = plan.parameters
+```
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+from loguru import logger as log
+
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.analysis.fingerprint import (
+    ParameterFingerprintIndex, canonical_parameters, normalize_parameter_value, canonical_name
+)
+
+
+@dataclass
+class ParameterSensitivity:
+    """
+    Main effect of one parameter on a backtest metric.
+
+    Attributes:
+        name: Canonical parameter name
+        effect: Share of the metric variance explained by this parameter (0-1)
+        best_value: Level with the highest mean metric
+        levels: Distinct levels seen in previous backtests
+        samples: Backtests the measurement is based on
+    """
+    name: str
+    effect: float
+    best_value: str
+    levels: int
+    samples: int
+
+
+@dataclass
+class CombinationPlan:
+    """
+    Lab parameters fitted to a backtest budget.
+
+    Attributes:
+        parameters: Updated lab parameter list ([{K, O, I, ...}, ...])
+        steps: Parameter key -> number of options kept
+        frozen: Parameter key -> value of parameters reduced to a single option
+        original_combinations: Combinations before planning
+        combinations: Combinations after planning
+        target_backtests: Budget the plan was fitted to
+        estimated_seconds: Expected runtime of the planned lab
+        sensitivities: Parameter key -> sensitivity used for the allocation
+    """
+    parameters: List[Dict[str, Any]]
+    steps: Dict[str, int] = field(default_factory=dict)
+    frozen: Dict[str, str] = field(default_factory=dict)
+    original_combinations: int = 1
+    combinations: int = 1
+    target_backtests: int = 0
+    estimated_seconds: float = 0.0
+    sensitivities: Dict[str, ParameterSensitivity] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        """Human-readable plan, shown before a lab is launched"""
+        lines = [
+            f"📐 Combination plan: {self.original_combinations:,} -> {self.combinations:,} backtests "
+            f"(target {self.target_backtests:,}), estimated runtime {_format_duration(self.estimated_seconds)}"
+        ]
+        for key, steps in self.steps.items():
+            sensitivity = self.sensitivities.get(key)
+            effect = f"effect {sensitivity.effect:.2f}" if sensitivity else "no history"
+            lines.append(f"   {key}: {steps} steps ({effect})")
+        for key, value in self.frozen.items():
+            lines.append(f"   {key}: frozen at {value}")
+        return "\n".join(lines)
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def load_script_history(
+    cache_manager: UnifiedCacheManager,
+    script_id: str,
+    market_tag: Optional[str] = None,
+    metric: str = 'roi_percentage',
+    window: Optional[int] = None,
+    window_tolerance: float = 0.1
+) -> List[Tuple[Dict[str, str], float]]:
+    """
+    Parameter sets and metric values of cached backtests of a script.
+
+    Args:
+        cache_manager: Cache holding analyzed backtests
+        script_id: Script whose backtests are used
+        market_tag: Only use backtests on this market (all markets if None)
+        metric: Cached field to measure sensitivity against
+        window: Only use backtests whose window (seconds) is within window_tolerance
+            of this; the window comes from cached start_unix/end_unix or the
+            fingerprint index, and backtests with an unknown window are skipped
+        window_tolerance: Allowed relative difference from window
+
+    Returns:
+        List of (canonical parameters, metric value)
+    """
+    history = []
+    indexed_windows = ParameterFingerprintIndex(cache_manager).backtest_windows() if window else {}
+    for cache_file in (cache_manager.base_dir / "backtests").glob("*.json"):
+        try:
+            with open(cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if data.get('script_id') != script_id or (market_tag and data.get('market_tag') != market_tag):
+            continue
+        runtime_data = data.get('runtime_data')
+        if not data.get('parameter_values') and not (isinstance(runtime_data, dict) and runtime_data.get('InputFields')):
+            continue
+        if window:
+            try:
+                backtest_window = int(data['end_unix']) - int(data['start_unix'])
+            except (KeyError, TypeError, ValueError):
+                backtest_window = indexed_windows.get((data.get('lab_id'), data.get('backtest_id')))
+            if backtest_window is None or abs(backtest_window - window) > window * window_tolerance:
+                continue
+        try:
+            value = float(data[metric])
+        except (KeyError, TypeError, ValueError):
+            continue
+        parameters = canonical_parameters(data)
+        if parameters:
+            history.append((parameters, value))
+    return history
+
+
+def measure_sensitivity(
+    history: List[Tuple[Dict[str, str], float]],
+    min_samples: int = 10
+) -> Dict[str, ParameterSensitivity]:
+    """
+    Main-effect sensitivity of every varying parameter.
+
+    The effect is epsilon squared: the between-level sum of squares, less what
+    noise alone would contribute with that many levels, over the total sum of
+    squares. It is 0 when the level does not change the mean metric and 1 when
+    it explains all variation.
+
+    Args:
+        history: (canonical parameters, metric value) pairs
+        min_samples: Fewer backtests than this give no measurement
+
+    Returns:
+        Canonical parameter name -> ParameterSensitivity
+    """
+    if len(history) < min_samples:
+        return {}
+    values = [value for _, value in history]
+    mean = sum(values) / len(values)
+    total = sum((value - mean) ** 2 for value in values)
+
+    groups: Dict[str, Dict[str, List[float]]] = {}
+    for parameters, value in history:
+        for name, level in parameters.items():
+            groups.setdefault(name, {}).setdefault(level, []).append(value)
+
+    sensitivities = {}
+    for name, levels in groups.items():
+        if len(levels) < 2:
+            continue
+        level_means = {level: sum(v) / len(v) for level, v in levels.items()}
+        between = sum(len(levels[level]) * (level_mean - mean) ** 2 for level, level_mean in level_means.items())
+        samples = sum(len(v) for v in levels.values())
+        within_mean_square = (total - between) / max(1, samples - len(levels))
+        effect = (between - (len(levels) - 1) * within_mean_square) / total if total > 0 else 0.0
+        sensitivities[name] = ParameterSensitivity(
+            name=name,
+            effect=min(1.0, max(0.0, effect)),
+            best_value=max(level_means, key=level_means.get),
+            levels=len(levels),
+            samples=samples
+        )
+    return sensitivities
+
+
+def _numeric_key(value: str) -> Tuple[int, Any]:
+    try:
+        return (0, float(value))
+    except (TypeError, ValueError):
+        return (1, str(value))
+
+
+def select_levels(options: List[Any], steps: int, anchor: Optional[str] = None) -> List[Any]:
+    """
+    Pick evenly spread options, keeping the anchor (best known value) if present.
+
+    Args:
+        options: Available options of a parameter
+        steps: Number of options to keep
+        anchor: Normalized value that must be kept
+
+    Returns:
+        Selected options in their original order of magnitude
+    """
+    ordered = sorted(options, key=lambda option: _numeric_key(normalize_parameter_value(option)))
+    if steps >= len(ordered):
+        return ordered
+    if steps == 1:
+        index = next((i for i, option in enumerate(ordered) if normalize_parameter_value(option) == anchor),
+                     len(ordered) // 2)
+        return [ordered[index]]
+
+    indexes = sorted({round(i * (len(ordered) - 1) / (steps - 1)) for i in range(steps)})
+    anchor_index = next((i for i, option in enumerate(ordered) if normalize_parameter_value(option) == anchor), None)
+    if anchor_index is not None and anchor_index not in indexes:
+        # Replace the nearest interior level so both ends of the range stay covered
+        interior = indexes[1:-1] or indexes
+        nearest = min(interior, key=lambda i: abs(i - anchor_index))
+        indexes = sorted(set(indexes) - {nearest} | {anchor_index})
+    return [ordered[i] for i in indexes]
+
+
+class CombinationPlanner:
+    """
+    Fits lab parameter ranges to a target number of backtests.
+    """
+
+    def __init__(
+        self,
+        target_backtests: int,
+        seconds_per_backtest: float = 3.0,
+        parallel_backtests: int = 1,
+        min_steps: int = 2,
+        freeze_threshold: float = 0.02
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            target_backtests: Maximum combinations of the planned lab
+            seconds_per_backtest: Expected server time per backtest, for the runtime estimate
+            parallel_backtests: Backtests the server runs at the same time
+            min_steps: Fewest options kept for a parameter that is not frozen
+            freeze_threshold: Parameters with a measured effect below this are frozen
+        """
+        if target_backtests < 1:
+            raise ValueError("target_backtests must be at least 1")
+        self.target_backtests = target_backtests
+        self.seconds_per_backtest = seconds_per_backtest
+        self.parallel_backtests = max(1, parallel_backtests)
+        self.min_steps = max(2, min_steps)
+        self.freeze_threshold = freeze_threshold
+
+    def estimate_seconds(self, combinations: int) -> float:
+        """Expected runtime of a lab with this many combinations"""
+        return combinations * self.seconds_per_backtest / self.parallel_backtests
+
+    def plan(
+        self,
+        parameters: List[Dict[str, Any]],
+        sensitivities: Optional[Dict[str, ParameterSensitivity]] = None
+    ) -> CombinationPlan:
+        """
+        Reduce parameter options so the lab runs at most target_backtests combinations.
+
+        Args:
+            parameters: Lab parameter list with generated options ([{K, O, I, ...}, ...])
+            sensitivities: Canonical parameter name -> sensitivity (see measure_sensitivity)
+
+        Returns:
+            CombinationPlan with the updated parameter list
+        """
+        sensitivities = sensitivities or {}
+        parameters = [dict(param) for param in parameters]
+        searched = [param for param in parameters
+                    if param.get('I', False) and len(param.get('O', [])) > 1]
+        original = math.prod(len(param['O']) for param in searched)
+
+        by_key = {param['K']: sensitivities.get(canonical_name(param['K'])) for param in searched}
+        known = [s.effect for s in by_key.values() if s is not None]
+        # Parameters without history rank in the middle of the measured ones
+        default_effect = sorted(known)[len(known) // 2] if known else 1.0
+        weights = {key: (s.effect if s is not None else default_effect) for key, s in by_key.items()}
+
+        steps = {}
+        for param in searched:
+            key = param['K']
+            sensitivity = by_key[key]
+            steps[key] = 1 if sensitivity is not None and sensitivity.effect < self.freeze_threshold \
+                else min(self.min_steps, len(param['O']))
+
+        # Freeze the least sensitive parameters until the minimum grid fits
+        for key in sorted(steps, key=lambda k: weights[k]):
+            if math.prod(steps.values()) <= self.target_backtests:
+                break
+            steps[key] = 1
+
+        # Spend the remaining budget where a step buys the most sensitivity
+        while True:
+            candidates = [
+                key for key in steps
+                if steps[key] > 1 and steps[key] < len(next(p for p in searched if p['K'] == key)['O'])
+                and math.prod(steps.values()) // steps[key] * (steps[key] + 1) <= self.target_backtests
+            ]
+            if not candidates:
+                break
+            key = max(candidates, key=lambda k: (weights[k] / steps[k], k))
+            steps[key] += 1
+
+        plan = CombinationPlan(parameters=parameters, original_combinations=original,
+                               target_backtests=self.target_backtests, sensitivities={})
+        for param in searched:
+            key = param['K']
+            sensitivity = by_key[key]
+            anchor = sensitivity.best_value if sensitivity else None
+            param['O'] = [str(option) for option in select_levels(param['O'], steps[key], anchor)]
+            if sensitivity:
+                plan.sensitivities[key] = sensitivity
+            if steps[key] == 1:
+                param['I'] = False
+                plan.frozen[key] = param['O'][0]
+            else:
+                plan.steps[key] = len(param['O'])
+
+        plan.combinations = math.prod(plan.steps.values())
+        plan.estimated_seconds = self.estimate_seconds(plan.combinations)
+        return plan
+
+    def check(self, parameters: List[Dict[str, Any]]) -> Tuple[int, float]:
+        """Combination count and estimated runtime of a lab parameter list as it stands"""
+        combinations = math.prod(len(param['O']) for param in parameters
+                                 if param.get('I', False) and len(param.get('O', [])) > 1)
+        return combinations, self.estimate_seconds(combinations)
+
+
+def plan_from_cache(
+    parameters: List[Dict[str, Any]],
+    cache_manager: UnifiedCacheManager,
+    script_id: str,
+    target_backtests: int,
+    market_tag: Optional[str] = None,
+    **planner_options
+) -> CombinationPlan:
+    """
+    Plan lab parameters using sensitivity measured from cached backtests of the script.
+
+    The plan summary is logged so the expected size and runtime are visible
+    before the lab is launched.
+    """
+    history = load_script_history(cache_manager, script_id, market_tag)
+    sensitivities = measure_sensitivity(history)
+    if not sensitivities:
+        log.info(f"📐 No backtest history for script {script_id[:8]}, allocating steps evenly")
+    plan = CombinationPlanner(target_backtests, **planner_options).plan(parameters, sensitivities)
+    log.info(plan.summary())
+    return plan
@@ -0,0 +1,232 @@
+"""
+History cutoff search for pyHaasAPI
+
+A market's history cutoff is the first date with chart data: every date after
+it has data and every date before it has none. A binary search probes one date
+per round and needs log2(range / precision) sequential rounds. The k-ary search
+here probes `fanout` evenly spaced dates of the remaining range concurrently,
+shrinking it by a factor of fanout + 1 per round, so a 1000-day range reaches
+24h precision in 4 rounds with 7 probes per round instead of 10 rounds.
+
+Markets of one exchange and quote asset are usually listed in the same era, so
+in bulk runs the cutoffs already known for sibling markets bracket the search
+(sibling_cutoff_prior) and a confident bracket only needs one verification
+round (prior_cutoff_search).
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CutoffSearchResult:
+    """Outcome of a cutoff search"""
+    cutoff_date: Optional[datetime]  # Earliest date known to have data; None if no probe ran
+    precision_hours: int
+    rounds: int
+    probes: int
+
+
+def kary_cutoff_search(probe: Callable[[datetime], bool], earliest: datetime, latest: datetime,
+                       precision_hours: float = 24, fanout: int = 7, max_rounds: int = 15) -> CutoffSearchResult:
+    """
+    Search the first date with data between earliest (assumed without data)
+    and latest (assumed with data).
+
+    Args:
+        probe: Returns True if the market has data at a date; called from worker threads
+        earliest: Lower bound of the search range
+        latest: Upper bound of the search range
+        precision_hours: Stop once the range is this narrow
+        fanout: Dates probed concurrently per round (1 is a binary search)
+        max_rounds: Maximum rounds
+
+    Returns:
+        CutoffSearchResult with the upper bound of the final range as cutoff
+    """
+    if fanout < 1:
+        raise ValueError("fanout must be at least 1")
+
+    rounds = 0
+    probes = 0
+    with ThreadPoolExecutor(max_workers=fanout) as pool:
+        while (latest - earliest).total_seconds() > precision_hours * 3600 and rounds < max_rounds:
+            step = (latest - earliest) / (fanout + 1)
+            candidates = [earliest + step * i for i in range(1, fanout + 1)]
+            outcomes = list(pool.map(probe, candidates))
+            rounds += 1
+            probes += len(candidates)
+
+            # Narrow to the gap before the first candidate with data
+            first_with_data = next((i for i, has_data in enumerate(outcomes) if has_data), None)
+            if first_with_data is None:
+                earliest = candidates[-1]
+            else:
+                latest = candidates[first_with_data]
+                if first_with_data > 0:
+                    earliest = candidates[first_with_data - 1]
+            logger.debug(f"Round {rounds}: cutoff between {earliest} and {latest}")
+
+    return CutoffSearchResult(
+        cutoff_date=latest if probes else None,
+        precision_hours=int((latest - earliest).total_seconds() / 3600),
+        rounds=rounds,
+        probes=probes
+    )
+
+
+def market_sibling_key(market_tag: str) -> Tuple[str, Optional[str]]:
+    """Exchange and quote asset of a market tag such as BINANCEFUTURES_BTC_USDT_PERPETUAL"""
+    parts = market_tag.split('_')
+    return parts[0], (parts[2] or None) if len(parts) > 2 else None
+
+
+@dataclass
+class CutoffPrior:
+    """Search bracket derived from the cutoffs of sibling markets"""
+    low: datetime  # Expected to have no data
+    high: datetime  # Expected to have data
+    siblings: int
+    confident: bool  # The bracket is one precision step wide
+
+
+def sibling_cutoff_prior(market_tag: str, known_cutoffs: Dict[str, datetime], precision_hours: float = 24,
+                         confident_spread_hours: float = 24, min_siblings: int = 2) -> Optional[CutoffPrior]:
+    """
+    Derive a cutoff bracket from markets listed alongside this one.
+
+    Siblings are known markets of the same exchange and quote asset, or of the
+    same exchange when the quote asset has none. When at least min_siblings of
+    them have cutoffs within confident_spread_hours of each other, the bracket
+    ends at their median and is one precision step wide; otherwise it spans
+    their cutoffs with a margin.
+
+    Args:
+        market_tag: Market to derive the prior for
+        known_cutoffs: Discovered cutoffs by market tag
+        precision_hours: Precision of the known cutoffs and of the search
+        confident_spread_hours: Widest spread of sibling cutoffs still trusted as one listing era
+        min_siblings: Siblings required for a confident prior
+
+    Returns:
+        CutoffPrior, or None if no sibling cutoff is known
+    """
+    exchange, quote = market_sibling_key(market_tag)
+    same_exchange = {tag: cutoff for tag, cutoff in known_cutoffs.items()
+                     if cutoff and tag != market_tag and market_sibling_key(tag)[0] == exchange}
+    same_quote = [cutoff for tag, cutoff in same_exchange.items() if market_sibling_key(tag)[1] == quote]
+    cutoffs = sorted(same_quote or same_exchange.values())
+    if not cutoffs:
+        return None
+
+    precision = timedelta(hours=precision_hours)
+    spread = cutoffs[-1] - cutoffs[0]
+    if len(cutoffs) >= min_siblings and spread <= timedelta(hours=confident_spread_hours):
+        median = cutoffs[len(cutoffs) // 2]
+        return CutoffPrior(low=median - precision, high=median, siblings=len(cutoffs), confident=True)
+    margin = max(spread, precision)
+    return CutoffPrior(low=cutoffs[0] - margin, high=cutoffs[-1] + margin, siblings=len(cutoffs), confident=False)
+
+
+def prior_cutoff_search(probe: Callable[[datetime], bool], earliest: datetime, latest: datetime,
+                        prior: CutoffPrior, precision_hours: float = 24, fanout: int = 7,
+                        max_rounds: int = 15) -> CutoffSearchResult:
+    """
+    Search a cutoff starting from a prior bracket.
+
+    The first round probes both ends of the bracket concurrently. For a
+    confident prior that confirms it, this single verification round is the
+    whole search; otherwise the k-ary search continues on whichever range the
+    two probes leave.
+
+    Args:
+        probe: Returns True if the market has data at a date; called from worker threads
+        earliest: Lower bound of the search range
+        latest: Upper bound of the search range
+        prior: Bracket expected to contain the cutoff
+        precision_hours: Stop once the range is this narrow
+        fanout: Dates probed concurrently per k-ary round
+        max_rounds: Maximum rounds, including the verification round
+
+    Returns:
+        CutoffSearchResult over both phases
+    """
+    low = min(max(prior.low, earliest), latest)
+    high = max(min(prior.high, latest), low)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        low_has_data, high_has_data = pool.map(probe, (low, high))
+
+    if not high_has_data:
+        earliest = high
+    elif low_has_data:
+        latest = low
+    else:
+        earliest, latest = low, high
+    logger.debug(f"Prior of {prior.siblings} siblings {'confirmed' if (earliest, latest) == (low, high) else 'missed'}: "
+                 f"cutoff between {earliest} and {latest}")
+
+    search = kary_cutoff_search(probe, earliest, latest, precision_hours, fanout, max_rounds - 1)
+    return CutoffSearchResult(
+        cutoff_date=latest if search.cutoff_date is None else search.cutoff_date,
+        precision_hours=search.precision_hours,
+        rounds=search.rounds + 1,
+        probes=search.probes + 2
+    )
+
+
+def discover_with_sibling_priors(market_tags: List[str], discover: Callable[[str, Optional[CutoffPrior]], Any],
+                                 known_cutoffs: Dict[str, datetime], max_workers: int = 8,
+                                 precision_hours: float = 24) -> Dict[str, Any]:
+    """
+    Discover cutoffs of many markets, seeding each search from its siblings.
+
+    A first wave discovers one market of every exchange and quote asset without
+    a known cutoff; the second wave discovers the rest with priors from the
+    cutoffs known by then. Each wave runs max_workers markets concurrently.
+
+    Args:
+        market_tags: Markets to discover
+        discover: Called with a market tag and its prior (or None); returns a
+            result with cutoff_date and success attributes
+        known_cutoffs: Cutoffs discovered before, by market tag
+        max_workers: Markets discovered concurrently
+        precision_hours: Precision of the known cutoffs
+
+    Returns:
+        Dictionary mapping market tags to the results of discover
+    """
+    market_tags = list(dict.fromkeys(market_tags))
+    known = dict(known_cutoffs)
+    lock = threading.Lock()
+
+    covered = {market_sibling_key(tag) for tag in known}
+    seeds, rest = [], []
+    for market_tag in market_tags:
+        group = market_sibling_key(market_tag)
+        if group in covered:
+            rest.append(market_tag)
+        else:
+            covered.add(group)
+            seeds.append(market_tag)
+
+    def run(market_tag: str) -> Any:
+        with lock:
+            prior = sibling_cutoff_prior(market_tag, known, precision_hours)
+        result = discover(market_tag, prior)
+        if getattr(result, 'success', True) and getattr(result, 'cutoff_date', None):
+            with lock:
+                known[market_tag] = result.cutoff_date
+        return result
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for wave in (seeds, rest):
+            results.update(zip(wave, pool.map(run, wave)))
+    logger.info(f"Discovered {len(market_tags)} cutoffs: {len(seeds)} seed markets, {len(rest)} with sibling priors")
+    return {market_tag: results[market_tag] for market_tag in market_tags}
@@ -0,0 +1,281 @@
+"""
+Early termination of hopeless lab runs for pyHaasAPI
+
+Labs keep consuming backtest workers until every configured backtest is done,
+even when the results retrieved so far show the lab will not meet our criteria.
+The monitor:
+- Samples new results of running labs through GET_BACKTEST_RESULT_PAGE,
+  continuing from the last page seen instead of re-reading the whole lab
+- Estimates the probability that one of the remaining backtests meets every
+  target threshold from the distribution of the results so far
+- Cancels the lab once that probability drops below a configured level
+
+The decision rule is a pure function of a result sequence, so it can be tuned
+and tested against recorded runs with simulate().
+"""
+
+import math
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable, Sequence
+
+from pyHaasAPI import api
+from pyHaasAPI.analysis.harvester import ResultPageCursor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MetricTarget:
+    """Threshold a backtest metric has to reach"""
+    metric: str
+    threshold: float
+    higher_is_better: bool = True
+
+    def met(self, value: float) -> bool:
+        return value >= self.threshold if self.higher_is_better else value <= self.threshold
+
+
+@dataclass
+class TerminationDecision:
+    """Outcome of evaluating a lab's results so far"""
+    cancel: bool
+    probability: float  # Chance that a remaining backtest meets every target
+    samples: int
+    remaining: int
+    best: Dict[str, float] = field(default_factory=dict)
+    reason: str = ""
+
+
+def backtest_metrics(backtest: Any) -> Dict[str, float]:
+    """Metrics of a lab backtest result available to termination targets"""
+    summary = getattr(backtest, 'summary', None)
+    metrics = {}
+    for metric, attribute in (('roi', 'ReturnOnInvestment'), ('realized_profits', 'RealizedProfits'),
+                              ('fee_costs', 'FeeCosts')):
+        try:
+            metrics[metric] = float(getattr(summary, attribute, 0.0) or 0.0)
+        except (TypeError, ValueError):
+            continue
+    return metrics
+
+
+def _normal_tail(z: float) -> float:
+    """P(X > z) for a standard normal X"""
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+class TerminationRule:
+    """
+    Decides whether a lab can still reach its targets
+
+    Each metric is modelled as normally distributed with the mean and standard
+    deviation of the results so far (widened for small samples). A remaining
+    backtest meets the targets with the product of the per-metric tail
+    probabilities; the lab is hopeless when the chance that any of the
+    remaining backtests does falls below min_probability.
+    """
+
+    def __init__(self, targets: Sequence[MetricTarget], min_probability: float = 0.02,
+                 min_samples: int = 30, min_progress: float = 0.2, window: Optional[int] = None):
+        """
+        Args:
+            targets: Thresholds one backtest has to reach together
+            min_probability: Cancel below this chance of reaching the targets
+            min_samples: Never cancel on fewer results
+            min_progress: Never cancel before this fraction of the backtests has finished
+            window: Model only the most recent results (later generations of
+                genetic labs improve on earlier ones); all results if None
+        """
+        if not targets:
+            raise ValueError("At least one target is required")
+        self.targets = list(targets)
+        self.min_probability = min_probability
+        self.min_samples = min_samples
+        self.min_progress = min_progress
+        self.window = window
+
+    def evaluate(self, results: Sequence[Dict[str, float]], expected_total: int) -> TerminationDecision:
+        """
+        Evaluate the results of a lab so far.
+
+        Args:
+            results: Metrics of every finished backtest, in completion order
+            expected_total: Backtests the lab runs in total
+
+        Returns:
+            TerminationDecision; cancel is True when the lab is hopeless
+        """
+        samples = len(results)
+        remaining = max(0, expected_total - samples)
+        best = {}
+        for target in self.targets:
+            values = [r[target.metric] for r in results if target.metric in r]
+            if values:
+                best[target.metric] = max(values) if target.higher_is_better else min(values)
+
+        def decision(cancel: bool, probability: float, reason: str) -> TerminationDecision:
+            return TerminationDecision(cancel=cancel, probability=probability, samples=samples,
+                                       remaining=remaining, best=best, reason=reason)
+
+        if any(all(t.metric in r and t.met(r[t.metric]) for t in self.targets) for r in results):
+            return decision(False, 1.0, "targets already met")
+        if samples < self.min_samples:
+            return decision(False, 1.0, f"only {samples} results")
+        if expected_total and samples < self.min_progress * expected_total:
+            return decision(False, 1.0, f"only {samples}/{expected_total} backtests finished")
+        if remaining == 0:
+            return decision(False, 0.0, "no backtests left")
+
+        recent = results[-self.window:] if self.window else results
+        single = 1.0
+        for target in self.targets:
+            values = [r[target.metric] for r in recent if target.metric in r]
+            if len(values) < 2:
+                return decision(False, 1.0, f"too few values for {target.metric}")
+            mean = sum(values) / len(values)
+            std = math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+            std = max(std * math.sqrt(1.0 + 1.0 / len(values)), 1e-12)
+            z = (target.threshold - mean) / std
+            single *= _normal_tail(z if target.higher_is_better else -z)
+
+        probability = 1.0 - (1.0 - single) ** remaining
+        if probability < self.min_probability:
+            return decision(True, probability, f"{probability:.2%} chance that {remaining} remaining "
+                                               f"backtests reach the targets")
+        return decision(False, probability, "targets still reachable")
+
+
+def simulate(rule: TerminationRule, results: Sequence[Dict[str, float]], expected_total: Optional[int] = None,
+             every: int = 1) -> Optional[int]:
+    """
+    Replay a recorded result sequence through a rule.
+
+    Args:
+        rule: Termination rule to test
+        results: Metrics of every backtest of a recorded lab run, in completion order
+        expected_total: Backtests of the run (defaults to len(results))
+        every: Evaluate after every this many results, like a periodic sampler
+
+    Returns:
+        Number of results seen when the rule would have cancelled the lab, or None
+    """
+    expected_total = expected_total or len(results)
+    for seen in range(every, len(results) + 1, every):
+        if rule.evaluate(results[:seen], expected_total).cancel:
+            return seen
+    return None
+
+
+@dataclass
+class _MonitoredLab:
+    lab_id: str
+    expected_total: int
+    cursor: ResultPageCursor
+    results: List[Dict[str, float]] = field(default_factory=list)
+    decision: Optional[TerminationDecision] = None
+
+
+class EarlyTerminationMonitor:
+    """
+    Periodically samples running labs and cancels the hopeless ones
+
+    Usage:
+        monitor = EarlyTerminationMonitor(executor, TerminationRule([MetricTarget('roi', 50.0)]))
+        monitor.watch(lab_id)
+        monitor.start()
+    """
+
+    def __init__(self, executor, rule: TerminationRule, sample_interval: float = 60.0, page_size: int = 100,
+                 on_cancel: Optional[Callable[[str, TerminationDecision], None]] = None):
+        """
+        Args:
+            executor: Authenticated executor instance
+            rule: Decision rule applied to each sample
+            sample_interval: Seconds between sampling rounds of the background thread
+            page_size: Results requested per GET_BACKTEST_RESULT_PAGE call
+            on_cancel: Called with the lab ID and decision after a lab is cancelled
+        """
+        self.executor = executor
+        self.rule = rule
+        self.sample_interval = sample_interval
+        self.page_size = page_size
+        self.on_cancel = on_cancel
+        self.cancelled: Dict[str, TerminationDecision] = {}
+        self._labs: Dict[str, _MonitoredLab] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, lab_id: str, expected_total: Optional[int] = None) -> None:
+        """Start sampling a running lab; expected_total defaults to the lab's population times generations"""
+        if expected_total is None:
+            config = api.get_lab_details(self.executor, lab_id).config
+            expected_total = int(config.max_population) * int(config.max_generations)
+        with self._lock:
+            if lab_id not in self._labs:
+                cursor = ResultPageCursor(self.executor, lab_id, self.page_size)
+                self._labs[lab_id] = _MonitoredLab(lab_id=lab_id, expected_total=expected_total, cursor=cursor)
+
+    def unwatch(self, lab_id: str) -> None:
+        with self._lock:
+            self._labs.pop(lab_id, None)
+
+    def check(self, lab_id: str) -> Optional[TerminationDecision]:
+        """Fetch the lab's new results, evaluate them and cancel the lab if it is hopeless"""
+        lab = self._labs.get(lab_id)
+        if lab is None:
+            return None
+        lab.results.extend(backtest_metrics(backtest) for backtest in lab.cursor.read_new())
+        lab.decision = self.rule.evaluate(lab.results, lab.expected_total)
+        if not lab.decision.cancel:
+            return lab.decision
+
+        logger.info(f"🛑 Cancelling lab {lab_id} after {lab.decision.samples} results: {lab.decision.reason}")
+        try:
+            api.cancel_lab_execution(self.executor, lab_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not cancel hopeless lab {lab_id}: {e}")
+            return lab.decision
+        self.unwatch(lab_id)
+        self.cancelled[lab_id] = lab.decision
+        if self.on_cancel:
+            try:
+                self.on_cancel(lab_id, lab.decision)
+            except Exception as e:
+                logger.error(f"❌ Early termination callback failed for {lab_id}: {e}")
+        return lab.decision
+
+    def run_once(self) -> Dict[str, TerminationDecision]:
+        """One sampling round over every watched lab"""
+        with self._lock:
+            lab_ids = list(self._labs)
+        decisions = {}
+        for lab_id in lab_ids:
+            try:
+                decision = self.check(lab_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Sampling lab {lab_id} failed: {e}")
+                continue
+            if decision is not None:
+                decisions[lab_id] = decision
+        return decisions
+
+    def start(self) -> None:
+        """Sample watched labs every sample_interval seconds on a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="early-termination", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            self.run_once()
@@ -7,6 +7,7 @@ history intelligence to ensure reliable backtest execution.
 
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass
@@ -276,21 +277,8 @@ class EnhancedBacktestExecutor:
                     'error': 'Could not find lab or determine market'
                 }
             
-            result_dict = {
-                'success': cutoff_result.success,
-                'lab_id': lab_id,
-                'cutoff_date': cutoff_result.cutoff_date.isoformat() if cutoff_result.cutoff_date else None,
-                'precision_achieved_hours': cutoff_result.precision_achieved,
-                'discovery_time_seconds': cutoff_result.discovery_time_seconds,
-                'tests_performed': cutoff_result.tests_performed,
-                'error_message': cutoff_result.error_message
-            }
-            
             # Get lab details for additional context
-            lab_details = self._get_lab_details(lab_id)
-            if lab_details:
-                result_dict['market_tag'] = lab_details.settings.market_tag
-                result_dict['lab_name'] = lab_details.name
+            result_dict = self._cutoff_result_dict(lab_id, cutoff_result, self._get_lab_details(lab_id))
             
             logger.info(f"Cutoff discovery completed for lab {lab_id}: success={cutoff_result.success}")
             return result_dict
@@ -303,6 +291,22 @@ class EnhancedBacktestExecutor:
                 'error': str(e)
             }
     
+    def _cutoff_result_dict(self, lab_id: str, cutoff_result, lab_details: Optional[LabDetails]) -> Dict[str, Any]:
+        """Describe a lab's cutoff discovery result"""
+        result_dict = {
+            'success': cutoff_result.success,
+            'lab_id': lab_id,
+            'cutoff_date': cutoff_result.cutoff_date.isoformat() if cutoff_result.cutoff_date else None,
+            'precision_achieved_hours': cutoff_result.precision_achieved,
+            'discovery_time_seconds': cutoff_result.discovery_time_seconds,
+            'tests_performed': cutoff_result.tests_performed,
+            'error_message': cutoff_result.error_message
+        }
+        if lab_details:
+            result_dict['market_tag'] = lab_details.settings.market_tag
+            result_dict['lab_name'] = lab_details.name
+        return result_dict
+    
     def validate_lab_backtest_period(self, lab_id: str, start_date: Union[datetime, str], 
                                    end_date: Union[datetime, str]) -> Dict[str, Any]:
         """
@@ -381,53 +385,63 @@ class EnhancedBacktestExecutor:
             logger.error(f"Error getting history summary: {e}")
             return {'error': str(e)}
     
-    def bulk_discover_cutoffs(self, lab_ids: List[str]) -> Dict[str, Any]:
+    def bulk_discover_cutoffs(self, lab_ids: List[str], use_priors: bool = True,
+                              max_workers: int = 8) -> Dict[str, Any]:
         """
         Discover cutoff dates for multiple labs.
         
+        Labs are resolved to their markets first and each market is discovered
+        once. In batch mode (use_priors) one market per exchange and quote asset
+        is searched from scratch and the others start from the cutoffs of those
+        siblings, usually needing a single verification round.
+        
         Args:
             lab_ids: List of lab identifiers
+            use_priors: Seed each search from cutoffs known for sibling markets
+            max_workers: Labs resolved and markets discovered concurrently
             
         Returns:
             Dictionary with bulk discovery results
         """
         try:
             results = {}
-            successful = 0
-            failed = 0
-            
             logger.info(f"Starting bulk cutoff discovery for {len(lab_ids)} labs")
             
-            for lab_id in lab_ids:
-                try:
-                    result = self.discover_cutoff_for_lab(lab_id)
-                    results[lab_id] = result
-                    
-                    if result.get('success'):
-                        successful += 1
-                    else:
-                        failed += 1
-                        
-                    # Add small delay to avoid overwhelming the API
-                    time.sleep(0.5)
-                    
-                except Exception as e:
-                    logger.error(f"Error discovering cutoff for lab {lab_id}: {e}")
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                lab_details = dict(zip(lab_ids, pool.map(self._get_lab_details, lab_ids)))
+            
+            market_tags = {}
+            for lab_id, details in lab_details.items():
+                market_tag = details.settings.market_tag if details and details.settings else None
+                if market_tag:
+                    market_tags[lab_id] = market_tag
+                else:
                     results[lab_id] = {
                         'success': False,
                         'lab_id': lab_id,
-                        'error': str(e)
+                        'error': 'Could not find lab or determine market'
                     }
-                    failed += 1
+            
+            cutoffs = self.history_service.discover_cutoffs(
+                list(market_tags.values()), max_workers=max_workers, use_priors=use_priors
+            )
+            for lab_id, market_tag in market_tags.items():
+                results[lab_id] = self._cutoff_result_dict(lab_id, cutoffs[market_tag], lab_details[lab_id])
+            
+            successful = sum(1 for result in results.values() if result.get('success'))
+            failed = len(results) - successful
             
             summary = {
                 'total_labs': len(lab_ids),
+                'total_markets': len(cutoffs),
                 'successful_discoveries': successful,
                 'failed_discoveries': failed,
-                'results': results
+                'tests_performed': sum(result.tests_performed or 0 for result in cutoffs.values()),
+                'results': {lab_id: results[lab_id] for lab_id in lab_ids}
             }
             
-            logger.info(f"Bulk cutoff discovery completed: {successful} successful, {failed} failed")
+            logger.info(f"Bulk cutoff discovery completed: {successful} successful, {failed} failed, "
+                        f"{summary['tests_performed']} tests for {len(cutoffs)} markets")
             return summary
             
         except Exception as e:
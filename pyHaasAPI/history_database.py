@@ -0,0 +1,275 @@
+"""
+SQLite-backed history cutoff database for pyHaasAPI
+
+The JSON cutoff database is loaded and rewritten as a whole on every save, so
+concurrent discovery workers lose each other's writes. This database keeps one
+row per market in SQLite:
+- Indexed lookup by market tag and by exchange and quote asset
+- Upserts, so a rediscovered cutoff replaces the old one in a single statement
+- Discovery and update timestamps to find stale cutoffs
+- WAL journaling and immediate write transactions, so threads and processes
+  can read and write the same file concurrently
+- A one-time import of existing JSON cutoff files
+"""
+
+import os
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
+
+from pyHaasAPI.cutoff_search import market_sibling_key
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cutoffs (
+    market_tag TEXT PRIMARY KEY,
+    exchange TEXT NOT NULL,
+    quote_asset TEXT,
+    cutoff_date TEXT NOT NULL,
+    precision_hours REAL,
+    discovery_metadata TEXT,
+    discovered_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cutoffs_exchange ON cutoffs (exchange, quote_asset);
+CREATE INDEX IF NOT EXISTS idx_cutoffs_updated ON cutoffs (updated_at);
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    records INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO cutoffs (market_tag, exchange, quote_asset, cutoff_date, precision_hours, discovery_metadata,
+                     discovered_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (market_tag) DO UPDATE SET
+    cutoff_date = excluded.cutoff_date,
+    precision_hours = excluded.precision_hours,
+    discovery_metadata = excluded.discovery_metadata,
+    updated_at = excluded.updated_at
+WHERE excluded.updated_at >= cutoffs.updated_at
+"""
+
+
+@dataclass
+class StoredCutoff:
+    """Cutoff row of the history database"""
+    market_tag: str
+    exchange: str
+    quote_asset: Optional[str]
+    cutoff_date: datetime
+    precision_hours: Optional[float] = None
+    discovery_metadata: Dict[str, Any] = field(default_factory=dict)
+    discovered_at: float = 0.0  # First discovery of the market
+    updated_at: float = 0.0  # Last time the cutoff was stored
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.updated_at
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> 'StoredCutoff':
+        return cls(
+            market_tag=row['market_tag'],
+            exchange=row['exchange'],
+            quote_asset=row['quote_asset'],
+            cutoff_date=datetime.fromisoformat(row['cutoff_date']),
+            precision_hours=row['precision_hours'],
+            discovery_metadata=json.loads(row['discovery_metadata'] or '{}'),
+            discovered_at=row['discovered_at'],
+            updated_at=row['updated_at']
+        )
+
+
+class SQLiteHistoryDatabase:
+    """
+    Cutoff database shared by discovery workers in any number of threads and processes
+
+    Usage:
+        database = SQLiteHistoryDatabase("data/history_cutoffs.db")
+        database.store_cutoff("BINANCE_BTC_USDT_", cutoff_date, {"final_precision_hours": 23})
+        record = database.get_cutoff("BINANCE_BTC_USDT_", max_age_seconds=30 * 86400)
+
+    SQLite locks do not survive fork(): call close() before forking worker
+    processes, which then open their own connections.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = "data/history_cutoffs.db",
+                 import_json: Optional[Union[str, Path]] = None, busy_timeout: float = 30.0):
+        """
+        Args:
+            db_path: SQLite database file
+            import_json: JSON cutoff file to import once (defaults to a .json file
+                next to the database with the same name, if one exists)
+            busy_timeout: Seconds a writer waits for another one to finish
+        """
+        self.db_path = Path(db_path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+        json_path = Path(import_json) if import_json else self.db_path.with_suffix('.json')
+        if json_path.exists():
+            self.import_json(json_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One long-lived connection per thread and process; a forked child opens its own
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def _write(self, statements) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in statements:
+                conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        return self._connect().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _row_params(market_tag: str, cutoff_date: datetime, precision_hours: Optional[float],
+                    discovery_metadata: Optional[Dict[str, Any]], discovered_at: float, updated_at: float):
+        exchange, quote_asset = market_sibling_key(market_tag)
+        return (market_tag, exchange, quote_asset, cutoff_date.isoformat(), precision_hours,
+                json.dumps(discovery_metadata or {}, default=str), discovered_at, updated_at)
+
+    def store_cutoff(self, market_tag: str, cutoff_date: datetime,
+                     discovery_metadata: Optional[Dict[str, Any]] = None,
+                     precision_hours: Optional[float] = None) -> bool:
+        """
+        Insert or replace the cutoff of a market.
+
+        Args:
+            market_tag: Market identifier
+            cutoff_date: First date with data
+            discovery_metadata: How the cutoff was discovered
+            precision_hours: Precision of the cutoff (defaults to the metadata's final_precision_hours)
+
+        Returns:
+            True if stored
+        """
+        if precision_hours is None:
+            precision_hours = (discovery_metadata or {}).get('final_precision_hours')
+        now = time.time()
+        try:
+            self._write([(_UPSERT, self._row_params(market_tag, cutoff_date, precision_hours,
+                                                    discovery_metadata, now, now))])
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to store cutoff for {market_tag}: {e}")
+            return False
+
+    def get_cutoff(self, market_tag: str, max_age_seconds: Optional[float] = None) -> Optional[StoredCutoff]:
+        """Cutoff of a market, or None if unknown or older than max_age_seconds"""
+        rows = self._query("SELECT * FROM cutoffs WHERE market_tag = ?", (market_tag,))
+        if not rows:
+            return None
+        record = StoredCutoff.from_row(rows[0])
+        if max_age_seconds is not None and record.age_seconds > max_age_seconds:
+            return None
+        return record
+
+    def get_all_cutoffs(self) -> Dict[str, StoredCutoff]:
+        return {row['market_tag']: StoredCutoff.from_row(row)
+                for row in self._query("SELECT * FROM cutoffs ORDER BY market_tag")}
+
+    def get_cutoffs_by_exchange(self, exchange: str, quote_asset: Optional[str] = None) -> Dict[str, StoredCutoff]:
+        """Cutoffs of an exchange, optionally of one quote asset"""
+        if quote_asset is None:
+            rows = self._query("SELECT * FROM cutoffs WHERE exchange = ? ORDER BY market_tag", (exchange,))
+        else:
+            rows = self._query("SELECT * FROM cutoffs WHERE exchange = ? AND quote_asset = ? ORDER BY market_tag",
+                               (exchange, quote_asset))
+        return {row['market_tag']: StoredCutoff.from_row(row) for row in rows}
+
+    def get_stale_cutoffs(self, max_age_seconds: float) -> List[str]:
+        """Market tags whose cutoff was stored more than max_age_seconds ago, oldest first"""
+        rows = self._query("SELECT market_tag FROM cutoffs WHERE updated_at < ? ORDER BY updated_at",
+                           (time.time() - max_age_seconds,))
+        return [row['market_tag'] for row in rows]
+
+    def delete_cutoff(self, market_tag: str) -> bool:
+        try:
+            self._write([("DELETE FROM cutoffs WHERE market_tag = ?", (market_tag,))])
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to delete cutoff for {market_tag}: {e}")
+            return False
+
+    def get_database_stats(self) -> Dict[str, Any]:
+        summary = self._query("SELECT COUNT(*) AS total, COUNT(DISTINCT exchange) AS exchanges, "
+                              "MIN(updated_at) AS oldest_update, MAX(updated_at) AS newest_update FROM cutoffs")[0]
+        return {
+            'database_path': str(self.db_path),
+            'total_records': summary['total'],
+            'exchanges': summary['exchanges'],
+            'oldest_update': summary['oldest_update'],
+            'newest_update': summary['newest_update'],
+            'imported_sources': [row['source'] for row in self._query("SELECT source FROM imports")]
+        }
+
+    def import_json(self, json_path: Union[str, Path]) -> int:
+        """
+        Import a JSON cutoff file once.
+
+        Accepts a mapping of market tags to records, optionally under a
+        "cutoffs" key; each record needs an ISO cutoff_date. Rows stored after
+        the file was written are kept.
+
+        Returns:
+            Number of records imported; 0 if the file was imported before
+        """
+        source = str(Path(json_path).resolve())
+        if self._query("SELECT 1 FROM imports WHERE source = ?", (source,)):
+            return 0
+
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        records = data.get('cutoffs', data) if isinstance(data, dict) else {}
+        file_time = Path(json_path).stat().st_mtime
+
+        statements = []
+        for market_tag, record in records.items():
+            try:
+                cutoff_date = datetime.fromisoformat(str(record['cutoff_date']))
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"⚠️ Skipping cutoff record for {market_tag} without a valid cutoff_date")
+                continue
+            metadata = record.get('discovery_metadata') or {}
+            precision_hours = record.get('precision_hours', metadata.get('final_precision_hours'))
+            statements.append((_UPSERT, self._row_params(market_tag, cutoff_date, precision_hours, metadata,
+                                                         file_time, file_time)))
+        statements.append(("INSERT OR IGNORE INTO imports (source, records, imported_at) VALUES (?, ?, ?)",
+                           (source, len(statements), time.time())))
+        self._write(statements)
+
+        logger.info(f"📥 Imported {len(statements) - 1} cutoffs from {json_path}")
+        return len(statements) - 1
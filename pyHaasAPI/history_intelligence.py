@@ -8,6 +8,7 @@ that integrates seamlessly with the pyHaasAPI backtest execution flow.
 import logging
 import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
@@ -22,17 +23,20 @@ try:
     from history_intelligence_models import (
         CutoffRecord, ValidationResult, CutoffResult, HistoryResult, SyncStatusResult
     )
-    from history_database import HistoryDatabase
 except ImportError:
     # Fallback imports if running from different location
     sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
     from backtest_execution.history_intelligence_models import (
         CutoffRecord, ValidationResult, CutoffResult, HistoryResult, SyncStatusResult
     )
-    from backtest_execution.history_database import HistoryDatabase
 
 from pyHaasAPI.api import RequestsExecutor
 from pyHaasAPI.exceptions import HaasApiError
+from pyHaasAPI.history_database import SQLiteHistoryDatabase
+from pyHaasAPI.cutoff_search import (
+    CutoffPrior, discover_with_sibling_priors, kary_cutoff_search, prior_cutoff_search
+)
+from pyHaasAPI.rate_limit import RequestRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -45,22 +49,30 @@ class HistoryIntelligenceService:
     backtest periods to ensure reliable execution.
     """
     
-    def __init__(self, haas_executor: RequestsExecutor, db_path: str = "data/history_cutoffs.json"):
+    def __init__(self, haas_executor: RequestsExecutor, db_path: str = "data/history_cutoffs.db",
+                 rate_limiter: Optional[RequestRateLimiter] = None):
         """
         Initialize the history intelligence service.
         
         Args:
             haas_executor: Authenticated HaasOnline API executor
-            db_path: Path to the cutoff database file
+            db_path: Path to the SQLite cutoff database; a JSON database path is
+                imported once into a .db file next to it
+            rate_limiter: Limiter shared by all probes of all markets (defaults to 10 probes per second)
         """
         self.haas_executor = haas_executor
-        self.database = HistoryDatabase(db_path)
+        if db_path.endswith('.json'):
+            self.database = SQLiteHistoryDatabase(os.path.splitext(db_path)[0] + '.db', import_json=db_path)
+        else:
+            self.database = SQLiteHistoryDatabase(db_path)
         
         # Configuration
         self.default_discovery_range_days = 1000  # Start with ~3 years back
-        self.max_discovery_attempts = 15  # Maximum binary search iterations
+        self.max_discovery_attempts = 15  # Maximum search rounds
         self.discovery_precision_hours = 24  # Target precision in hours
-        self.api_call_delay = 1.0  # Delay between API calls to avoid rate limits
+        self.cutoff_max_age_days = 90  # Rediscover cutoffs stored longer ago
+        self.probe_fanout = 7  # Dates probed concurrently per search round
+        self.rate_limiter = rate_limiter or RequestRateLimiter(max_requests=10, time_window=1.0)
         
         # Cache for recent discoveries
         self._discovery_cache: Dict[str, CutoffResult] = {}
@@ -68,13 +80,15 @@ class HistoryIntelligenceService:
         
         logger.info(f"History Intelligence Service initialized with database at {db_path}")
     
-    def get_or_discover_cutoff(self, market_tag: str, force_rediscover: bool = False) -> CutoffResult:
+    def get_or_discover_cutoff(self, market_tag: str, force_rediscover: bool = False,
+                               prior: Optional[CutoffPrior] = None) -> CutoffResult:
         """
         Get cutoff date for a market, discovering it if not already known.
         
         Args:
             market_tag: Market identifier (e.g., "BINANCEFUTURES_BTC_USDT_PERPETUAL")
             force_rediscover: Force rediscovery even if cutoff is already known
+            prior: Bracket from sibling market cutoffs to start the search from
             
         Returns:
             CutoffResult with discovery information
@@ -89,7 +103,9 @@ class HistoryIntelligenceService:
             
             # Check database for existing cutoff
             if not force_rediscover:
-                existing_record = self.database.get_cutoff(market_tag)
+                existing_record = self.database.get_cutoff(
+                    market_tag, max_age_seconds=self.cutoff_max_age_days * 86400
+                )
                 if existing_record:
                     logger.info(f"Found existing cutoff for {market_tag}: {existing_record.cutoff_date}")
                     result = CutoffResult(
@@ -107,7 +123,7 @@ class HistoryIntelligenceService:
             logger.info(f"Discovering cutoff date for {market_tag}")
             discovery_start = time.time()
             
-            cutoff_result = self._discover_cutoff_date(market_tag)
+            cutoff_result = self._discover_cutoff_date(market_tag, prior)
             cutoff_result.discovery_time_seconds = time.time() - discovery_start
             
             # Store successful discovery in database
@@ -117,8 +133,8 @@ class HistoryIntelligenceService:
                     "discovery_time_seconds": cutoff_result.discovery_time_seconds,
                     "initial_range_days": self.default_discovery_range_days,
                     "final_precision_hours": cutoff_result.precision_achieved,
-                    "discovery_method": "binary_search",
-                    "api_call_delay": self.api_call_delay
+                    "discovery_method": "sibling_prior" if prior else "k_ary_search",
+                    "probe_fanout": self.probe_fanout
                 }
                 
                 success = self.database.store_cutoff(
@@ -144,70 +160,93 @@ class HistoryIntelligenceService:
                 error_message=f"Discovery failed: {e}"
             )
     
-    def _discover_cutoff_date(self, market_tag: str) -> CutoffResult:
+    def discover_cutoffs(self, market_tags: List[str], max_workers: int = 8,
+                         force_rediscover: bool = False, use_priors: bool = False) -> Dict[str, CutoffResult]:
+        """
+        Get or discover cutoff dates for many markets in parallel.
+        
+        All probes share the service's rate limiter, so max_workers bounds the
+        markets searched at once, not the request rate.
+        
+        Args:
+            market_tags: Market identifiers
+            max_workers: Markets searched concurrently
+            force_rediscover: Force rediscovery even if cutoffs are already known
+            use_priors: Start each search from the cutoffs known for markets of the
+                same exchange and quote asset, discovering one market per group first
+            
+        Returns:
+            Dictionary mapping market tags to CutoffResult
         """
-        Discover the cutoff date for a market using binary search.
+        market_tags = list(dict.fromkeys(market_tags))
+        logger.info(f"Discovering cutoff dates for {len(market_tags)} markets ({max_workers} in parallel)")
+        
+        if use_priors:
+            known_cutoffs = {tag: record.cutoff_date for tag, record in self.database.get_all_cutoffs().items()}
+            return discover_with_sibling_priors(
+                market_tags,
+                lambda tag, prior: self.get_or_discover_cutoff(tag, force_rediscover, prior),
+                known_cutoffs,
+                max_workers=max_workers,
+                precision_hours=self.discovery_precision_hours
+            )
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(lambda tag: self.get_or_discover_cutoff(tag, force_rediscover), market_tags)
+            return dict(zip(market_tags, results))
+    
+    def _discover_cutoff_date(self, market_tag: str, prior: Optional[CutoffPrior] = None) -> CutoffResult:
+        """
+        Discover the cutoff date for a market using a k-ary search.
+        
+        Each round probes probe_fanout dates of the remaining range concurrently.
+        With a prior the first round verifies its bracket instead.
         
         Args:
             market_tag: Market identifier
+            prior: Bracket from sibling market cutoffs (optional)
             
         Returns:
             CutoffResult with discovery information
         """
         try:
-            # Initialize binary search bounds
+            # Initialize search bounds
             now = datetime.now()
             earliest_date = now - timedelta(days=self.default_discovery_range_days)
             latest_date = now - timedelta(days=1)  # Don't test today
             
-            tests_performed = 0
-            precision_hours = 24 * 30  # Start with 30-day precision
+            logger.info(f"Starting k-ary search for {market_tag} between {earliest_date} and {latest_date}")
             
-            logger.info(f"Starting binary search for {market_tag} between {earliest_date} and {latest_date}")
+            def probe(test_date: datetime) -> bool:
+                self.rate_limiter.acquire()
+                return self._test_data_availability(market_tag, test_date)
             
-            # Binary search for cutoff date
-            while (latest_date - earliest_date).total_seconds() > (self.discovery_precision_hours * 3600):
-                if tests_performed >= self.max_discovery_attempts:
-                    logger.warning(f"Reached maximum discovery attempts for {market_tag}")
-                    break
-                
-                # Test middle date
-                middle_date = earliest_date + (latest_date - earliest_date) / 2
-                tests_performed += 1
-                
-                logger.debug(f"Testing date {middle_date} for {market_tag} (attempt {tests_performed})")
-                
-                # Test if data is available at this date
-                has_data = self._test_data_availability(market_tag, middle_date)
-                
-                if has_data:
-                    # Data available, search earlier
-                    latest_date = middle_date
-                    logger.debug(f"Data available at {middle_date}, searching earlier")
-                else:
-                    # No data, search later
-                    earliest_date = middle_date
-                    logger.debug(f"No data at {middle_date}, searching later")
-                
-                # Add delay to avoid rate limiting
-                time.sleep(self.api_call_delay)
-            
-            # Calculate final precision achieved
-            final_precision_hours = int((latest_date - earliest_date).total_seconds() / 3600)
+            if prior:
+                search = prior_cutoff_search(
+                    probe, earliest_date, latest_date, prior,
+                    precision_hours=self.discovery_precision_hours,
+                    fanout=self.probe_fanout,
+                    max_rounds=self.max_discovery_attempts
+                )
+            else:
+                search = kary_cutoff_search(
+                    probe, earliest_date, latest_date,
+                    precision_hours=self.discovery_precision_hours,
+                    fanout=self.probe_fanout,
+                    max_rounds=self.max_discovery_attempts
+                )
             
-            if tests_performed > 0:
-                # Use the latest_date as the cutoff (first date with data)
-                cutoff_date = latest_date
-                
-                logger.info(f"Discovered cutoff for {market_tag}: {cutoff_date} "
-                          f"(precision: {final_precision_hours}h, tests: {tests_performed})")
+            if search.probes > 0:
+                logger.info(f"Discovered cutoff for {market_tag}: {search.cutoff_date} "
+                          f"(precision: {search.precision_hours}h, rounds: {search.rounds}, "
+                          f"tests: {search.probes})")
                 
                 return CutoffResult(
                     success=True,
-                    cutoff_date=cutoff_date,
-                    precision_achieved=final_precision_hours,
+                    cutoff_date=search.cutoff_date,
+                    precision_achieved=search.precision_hours,
                     discovery_time_seconds=0.0,  # Will be set by caller
-                    tests_performed=tests_performed,
+                    tests_performed=search.probes,
                     error_message=None
                 )
             else:
@@ -0,0 +1,225 @@
+"""
+Concurrent history sync for pyHaasAPI
+
+Preparing history market by market (set the depth, then poll until the market
+is synched) leaves the server idle between markets and turns a few hundred
+markets into an overnight job. The sync pipeline instead:
+- Keeps a configured number of markets syncing concurrently per server
+- Polls GET_HISTORY_STATUS once per server and round for all of its markets
+- Persists every market's progress through a JobJournal, so an interrupted run
+  resumes with the markets that were syncing and the ones still queued
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from pyHaasAPI import api
+from pyHaasAPI.analysis.job_journal import JobJournal
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+SYNCING = "syncing"
+SYNCED = "synced"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+
+SYNCHED_STATUS = 3  # GET_HISTORY_STATUS "Status" of a fully synched market
+
+
+@dataclass
+class HistorySyncConfig:
+    """Configuration for the history sync pipeline"""
+    months: int = 36  # History depth to set
+    max_syncing_per_server: int = 8
+    server_capacity: Dict[str, int] = field(default_factory=dict)  # Per-server overrides
+    poll_interval: float = 5.0  # Seconds between status polls of a server
+    market_timeout: float = 1800.0  # Seconds a market may take to sync
+    depth_attempts: int = 3  # SET_HISTORY_DEPTH attempts before a market fails
+
+
+@dataclass
+class MarketSyncState:
+    """Progress of one market through the sync pipeline"""
+    server: str
+    market_tag: str
+    months: int
+    status: str = QUEUED
+    depth_set: bool = False
+    depth_attempts: int = 0
+    last_status: Optional[int] = None  # Last GET_HISTORY_STATUS "Status" seen
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error_message: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.server}:{self.market_tag}"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SYNCED, FAILED, TIMED_OUT)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MarketSyncState":
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+
+class HistorySyncPipeline:
+    """
+    Syncs the history of many markets on one or more servers concurrently
+
+    Usage:
+        pipeline = HistorySyncPipeline({"srv01": executor}, "history_sync.json", HistorySyncConfig(months=24))
+        states = asyncio.run(pipeline.run([("srv01", "BINANCE_BTC_USDT_"), ("srv01", "BINANCE_ETH_USDT_")]))
+
+    Markets left syncing or queued by an interrupted run are picked up again by
+    the next run() with the same state file. Finished markets are only synced
+    again when they are requested again (see add()).
+    """
+
+    def __init__(self, executors: Dict[str, Any], state_file: Path, config: Optional[HistorySyncConfig] = None):
+        """
+        Args:
+            executors: Server name -> authenticated executor
+            state_file: JSON snapshot of the progress; events go to a sibling .ndjson journal
+            config: Pipeline configuration (uses defaults if None)
+        """
+        self.executors = executors
+        self.config = config or HistorySyncConfig()
+        self.journal = JobJournal(Path(state_file))
+        self.states: Dict[str, MarketSyncState] = {}
+        for key, record in self.journal.replay().items():
+            state = MarketSyncState.from_dict(record)
+            if state.server in executors:
+                self.states[key] = state
+
+    def capacity(self, server: str) -> int:
+        return self.config.server_capacity.get(server, self.config.max_syncing_per_server)
+
+    def add(self, markets: Iterable[Tuple[str, str]]) -> List[MarketSyncState]:
+        """
+        Queue (server, market tag) pairs
+
+        Unfinished markets already in the pipeline at the configured depth keep
+        their progress. Finished markets, and markets saved with another depth,
+        are queued again.
+
+        Returns:
+            The markets that were queued
+        """
+        added = []
+        for server, market_tag in markets:
+            if server not in self.executors:
+                raise ValueError(f"Unknown server: {server}")
+            state = MarketSyncState(server=server, market_tag=market_tag, months=self.config.months)
+            existing = self.states.get(state.key)
+            if existing is not None and not existing.finished and existing.months == state.months:
+                continue
+            if existing is not None:
+                logger.info(f"🔁 Queueing {market_tag} on {server} again "
+                            f"(was {existing.status} at {existing.months} months)")
+            self.states[state.key] = state
+            self.journal.put(state.key, asdict(state))
+            added.append(state)
+        return added
+
+    def clear(self) -> None:
+        """Forget every market, including the progress saved in the state file"""
+        self.journal.delete(list(self.states))
+        self.states.clear()
+
+    async def run(self, markets: Iterable[Tuple[str, str]] = ()) -> Dict[str, MarketSyncState]:
+        """
+        Sync the given and all unfinished markets.
+
+        Args:
+            markets: (server, market tag) pairs to add before running
+
+        Returns:
+            Every market's state, keyed by "server:market_tag"
+        """
+        self.add(markets)
+        servers = sorted({state.server for state in self.states.values() if not state.finished})
+        await asyncio.gather(*(self._run_server(server) for server in servers))
+        self.journal.compact()
+        return dict(self.states)
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for state in self.states.values():
+            counts[state.status] = counts.get(state.status, 0) + 1
+        return counts
+
+    def close(self) -> None:
+        self.journal.close()
+
+    def _save(self, state: MarketSyncState) -> None:
+        self.journal.put(state.key, asdict(state))
+
+    def _finish(self, state: MarketSyncState, status: str, error_message: Optional[str] = None) -> None:
+        state.status = status
+        state.finished_at = time.time()
+        state.error_message = error_message
+        self._save(state)
+        if status == SYNCED:
+            logger.info(f"✅ {state.market_tag} synched on {state.server} "
+                        f"({state.finished_at - state.started_at:.0f}s)")
+        else:
+            logger.warning(f"⚠️ {state.market_tag} on {state.server} {status}: {error_message}")
+
+    async def _run_server(self, server: str) -> None:
+        executor = self.executors[server]
+        mine = [state for state in self.states.values() if state.server == server and not state.finished]
+        # Markets that were syncing when a previous run stopped keep their slot and restart their timeout
+        syncing = [state for state in mine if state.status == SYNCING]
+        for state in syncing:
+            state.started_at = time.time()
+        queued = deque(state for state in mine if state.status == QUEUED)
+        logger.info(f"🔄 Syncing {len(mine)} markets on {server} "
+                    f"({len(syncing)} resumed, {self.capacity(server)} at once)")
+
+        while syncing or queued:
+            while queued and len(syncing) < self.capacity(server):
+                state = queued.popleft()
+                state.status = SYNCING
+                state.started_at = time.time()
+                syncing.append(state)
+            # New markets get their depth set; earlier refusals are retried once per round
+            await asyncio.gather(*(self._set_depth(executor, state) for state in syncing if not state.depth_set))
+
+            # One status request covers every market of the server
+            try:
+                statuses = await asyncio.to_thread(api.get_history_status, executor) or {}
+            except Exception as e:
+                logger.warning(f"⚠️ GET_HISTORY_STATUS failed on {server}: {e}")
+                statuses = {}
+
+            for state in syncing:
+                info = statuses.get(state.market_tag) or {}
+                state.last_status = info.get("Status", state.last_status)
+                if state.depth_set and state.last_status == SYNCHED_STATUS:
+                    self._finish(state, SYNCED)
+                elif not state.depth_set and state.depth_attempts >= self.config.depth_attempts:
+                    self._finish(state, FAILED, f"SET_HISTORY_DEPTH failed {state.depth_attempts} times")
+                elif time.time() - state.started_at > self.config.market_timeout:
+                    self._finish(state, TIMED_OUT, f"Not synched after {self.config.market_timeout:.0f}s "
+                                                   f"(status {state.last_status})")
+            syncing = [state for state in syncing if not state.finished]
+
+            if syncing or queued:
+                await asyncio.sleep(self.config.poll_interval)
+
+    async def _set_depth(self, executor, state: MarketSyncState) -> None:
+        state.depth_attempts += 1
+        try:
+            state.depth_set = bool(await asyncio.to_thread(api.set_history_depth, executor,
+                                                           state.market_tag, state.months))
+        except Exception as e:
+            logger.warning(f"⚠️ SET_HISTORY_DEPTH failed for {state.market_tag}: {e}")
+        self._save(state)
@@ -1,6 +1,5 @@
 import dataclasses
 import random
-import time
 from contextlib import contextmanager
 from typing import Generator, Iterable, Sequence, List, Dict, Any, Union, Optional
 from decimal import Decimal
@@ -26,6 +25,7 @@ from pyHaasAPI.model import (
     HaasScriptSettings
 )
 from pyHaasAPI.tools.utils import fetch_all_lab_backtests
+from pyHaasAPI.lab_scheduler import LabExecutionScheduler, LabSchedulerConfig, LabCompletion
 from pyHaasAPI.parameters import ParameterRange, ParameterType
 from loguru import logger as log
 
@@ -199,18 +199,33 @@ def update_params(
         settings[setting_idx].options = param.options
 
 
-def wait_for_execution(executor: SyncExecutor[Authenticated], lab_id: str):
-    while True:
-        details = api.get_lab_details(executor, lab_id)
-        match details.status:
-            case LabStatus.COMPLETED:
-                break
-            case LabStatus.CANCELLED:
-                break
-            case _:
-                pass
+def wait_for_execution(executor: SyncExecutor[Authenticated], lab_id: str, timeout: Optional[float] = None,
+                       config: Optional[LabSchedulerConfig] = None) -> LabCompletion:
+    """
+    Blocks until the lab execution completes
+
+    Safe to call from a thread running an event loop: the lab is watched on the
+    scheduler's own background loop.
 
-        time.sleep(5)
+    :param executor: Executor for Haas API interaction
+    :param lab_id: Lab whose execution was started
+    :param timeout: Optional seconds before the lab is cancelled
+    :param config: Optional polling configuration
+    :return: Completion of the lab
+    :raises TimeoutError: If the lab did not finish within timeout
+    :raises HaasApiError: If the lab was cancelled or its status could not be read
+    """
+    scheduler = LabExecutionScheduler(executor, config)
+    try:
+        completion = scheduler.wait_sync(lab_id, timeout)
+    except RuntimeError as e:
+        raise HaasApiError(str(e)) from e
+    finally:
+        scheduler.close()
+    if not completion.completed:
+        raise HaasApiError(f"Lab {lab_id} execution ended with status {completion.status.name}"
+                           + (f": {completion.message}" if completion.message else ""))
+    return completion
 
 
 def backtest(
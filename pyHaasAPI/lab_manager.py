@@ -13,6 +13,8 @@ from pyHaasAPI.model import CreateLabRequest, StartLabExecutionRequest, CloudMar
 from pyHaasAPI.parameter_handler import ParameterHandler
 from pyHaasAPI.parameters import LabSettings as ParametersLabSettings
 from pyHaasAPI.tools.utils import BacktestFetcher, BacktestFetchConfig
+from pyHaasAPI.analysis.fingerprint import ParameterFingerprintIndex, parameter_fingerprint
+from pyHaasAPI.lab_scheduler import LabExecutionScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -40,9 +42,21 @@ class LabSettings:
 class LabManager:
     """Comprehensive lab management with parameter optimization"""
     
-    def __init__(self, executor):
+    def __init__(self, executor, fingerprint_index: Optional[ParameterFingerprintIndex] = None,
+                 reuse_results: bool = False):
         self.executor = executor
         self.parameter_handler = ParameterHandler()
+        # Labs that already ran a parameter set on a market and period; built only
+        # when passed in or reuse is enabled, since the default index is persisted on disk
+        self.fingerprint_index = fingerprint_index
+        if self.fingerprint_index is None and reuse_results:
+            self.fingerprint_index = ParameterFingerprintIndex()
+        # Shared by every backtest this manager waits on
+        self.scheduler = LabExecutionScheduler(executor)
+
+    def close(self) -> None:
+        """Stop the scheduler's background loop; a later wait starts it again"""
+        self.scheduler.close()
         
     def create_optimized_lab(self, 
                            script_id: str, 
@@ -191,14 +205,20 @@ class LabManager:
             logger.error(f"  ❌ Error applying parameter optimization: {e}")
             return False
     
-    def run_backtest(self, lab_id: str, hours: int = 120, timeout_minutes: int = 30) -> Dict[str, Any]:
+    def run_backtest(self, lab_id: str, hours: int = 120, timeout_minutes: int = 30,
+                     end_unix: Optional[int] = None) -> Dict[str, Any]:
         """
         Run backtest with specified duration and wait for completion
         
+        With a fingerprint index, if another lab already ran the same script and
+        parameter ranges on the same market and period, its results are returned
+        instead of running this lab.
+        
         Args:
             lab_id: Lab ID to run backtest on
             hours: Number of hours to backtest
             timeout_minutes: Timeout for completion wait
+            end_unix: End of the backtest window (defaults to now)
             
         Returns:
             Dict containing backtest results
@@ -207,9 +227,26 @@ class LabManager:
         
         try:
             # Calculate time range
-            now = int(time.time())
-            start_unix = now - (hours * 3600)
-            end_unix = now
+            end_unix = end_unix or int(time.time())
+            start_unix = end_unix - (hours * 3600)
+            
+            # Reuse results of an identical lab run
+            run_key = self._run_key(lab_id, start_unix, end_unix) if self.fingerprint_index is not None else None
+            prior = self.fingerprint_index.get(run_key) if run_key else None
+            if prior and prior['lab_id'] != lab_id:
+                results = self._get_backtest_results(prior['lab_id'])
+                if "error" not in results:
+                    logger.info(f"♻️ Reusing results of identical lab {prior['lab_id']}")
+                    return {
+                        "success": True,
+                        "lab_id": lab_id,
+                        "start_unix": start_unix,
+                        "end_unix": end_unix,
+                        "duration_hours": hours,
+                        "results": results,
+                        "reused_from": prior['lab_id']
+                    }
+                self.fingerprint_index.remove(run_key)
             
             # Start backtest
             api.start_lab_execution(
@@ -230,6 +267,8 @@ class LabManager:
             if success:
                 # Get results
                 results = self._get_backtest_results(lab_id)
+                if run_key and "error" not in results:
+                    self.fingerprint_index.put(run_key, lab_id)
                 return {
                     "success": True,
                     "lab_id": lab_id,
@@ -253,44 +292,38 @@ class LabManager:
                 "error": str(e)
             }
     
+    def _run_key(self, lab_id: str, start_unix: int, end_unix: int) -> Optional[str]:
+        """Fingerprint index key of a lab's script, market, parameter ranges and period"""
+        try:
+            lab_details = api.get_lab_details(self.executor, lab_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fingerprint lab {lab_id}: {e}")
+            return None
+        fingerprint = parameter_fingerprint(lab_details.parameters)
+        if not fingerprint:
+            return None
+        return ParameterFingerprintIndex.make_key(
+            lab_details.script_id, lab_details.settings.market_tag, fingerprint,
+            start_unix, end_unix, settings=lab_details.settings
+        )
+    
     def _wait_for_completion(self, lab_id: str, timeout_minutes: int) -> bool:
         """Wait for backtest to complete"""
         logger.info(f"⏳ Waiting for backtest completion (timeout: {timeout_minutes} minutes)...")
         
-        start_time = time.time()
-        timeout_seconds = timeout_minutes * 60
-        last_status = None
-        
-        while time.time() - start_time < timeout_seconds:
-            try:
-                details = api.get_lab_details(self.executor, lab_id)
-                status = getattr(details, 'status', None)
-                
-                # Handle LabStatus enum objects
-                if hasattr(status, 'value'):
-                    status_value = status.value
-                    status_str = str(status_value)
-                else:
-                    status_str = str(status) if status is not None else None
-                
-                if status_str != last_status:
-                    logger.info(f"  🔄 Status: {status_str}")
-                    last_status = status_str
-                
-                if status_str == '3':  # COMPLETED
-                    logger.info("✅ Backtest completed successfully")
-                    return True
-                elif status_str in ['4', '5']:  # CANCELLED or ERROR
-                    logger.error("❌ Backtest failed")
-                    return False
-                else:
-                    time.sleep(30)
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ Error checking status: {e}")
-                time.sleep(30)
+        try:
+            completion = self.scheduler.wait_sync(lab_id, timeout=timeout_minutes * 60)
+        except TimeoutError:
+            logger.error("⏰ Backtest timed out")
+            return False
+        except Exception as e:
+            logger.error(f"❌ Error waiting for backtest: {e}")
+            return False
         
-        logger.error("⏰ Backtest timed out")
+        if completion.completed:
+            logger.info(f"✅ Backtest completed successfully ({completion.elapsed:.0f}s, {completion.polls} status checks)")
+            return True
+        logger.error(f"❌ Backtest failed: {completion.message or completion.status.name}")
         return False
     
     def _get_backtest_results(self, lab_id: str) -> Dict[str, Any]:
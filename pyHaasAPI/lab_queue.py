@@ -0,0 +1,343 @@
+"""
+Capacity-aware lab execution queue for pyHaasAPI
+
+Starting every lab at once overloads a server's backtest workers, and starting
+them one by one leaves workers idle. The queue instead:
+- Keeps at most a configured number of labs running per server
+- Starts the highest-priority queued lab as soon as a running one finishes,
+  using LabExecutionScheduler completions rather than fixed sleeps
+- Persists every entry through a JobJournal, so queued and running labs are
+  picked up again after a restart
+- Reports per-server utilization and queue wait times
+- Optionally cancels hopeless labs early (see pyHaasAPI.early_termination),
+  handing their slot to the next queued lab right away
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+import concurrent.futures
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from pyHaasAPI import api
+from pyHaasAPI.analysis.job_journal import JobJournal
+from pyHaasAPI.early_termination import EarlyTerminationMonitor, TerminationDecision, TerminationRule
+from pyHaasAPI.lab_scheduler import LabExecutionScheduler, LabSchedulerConfig, SchedulerClosedError
+from pyHaasAPI.model import StartLabExecutionRequest
+from pyHaasAPI.parameters import LabStatus
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+@dataclass
+class LabQueueConfig:
+    """Configuration for the lab execution queue"""
+    max_running_per_server: int = 2
+    server_capacity: Dict[str, int] = field(default_factory=dict)  # Per-server overrides
+    lab_timeout: Optional[float] = None  # Seconds before a running lab is cancelled
+    scheduler: LabSchedulerConfig = field(default_factory=LabSchedulerConfig)
+    early_termination: Optional[TerminationRule] = None  # Cancel running labs that cannot reach targets
+    sample_interval: float = 60.0  # Seconds between early termination samples
+
+
+@dataclass
+class QueuedLab:
+    """One lab execution waiting in or passing through the queue"""
+    entry_id: str
+    server: str
+    lab_id: str
+    start_unix: int
+    end_unix: int
+    priority: int = 0  # Higher runs first; equal priorities run in enqueue order
+    send_email: bool = False
+    status: str = QUEUED
+    sequence: int = 0
+    enqueued_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error_message: Optional[str] = None
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        """Time spent queued before the lab was started"""
+        return self.started_at - self.enqueued_at if self.started_at is not None else None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueuedLab":
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+
+@dataclass
+class ServerUtilization:
+    """Queue and worker usage of one server"""
+    server: str
+    capacity: int
+    running: int
+    queued: int
+    completed: int
+    failed: int
+    utilization: float  # Busy slot time / available slot time since the first start
+    average_wait: float  # Seconds between enqueue and start
+    max_wait: float
+
+
+class LabExecutionQueue:
+    """
+    Persistent priority queue that keeps a fixed number of labs running per server
+
+    Usage:
+        queue = LabExecutionQueue({"srv01": executor}, "lab_queue.json")
+        queue.resume()  # Pick up entries left by a previous process
+        queue.enqueue("srv01", lab_id, start_unix, end_unix, priority=5)
+        queue.wait()
+        print(queue.server_stats())
+    """
+
+    def __init__(self, executors: Dict[str, Any], state_file: Path,
+                 config: Optional[LabQueueConfig] = None):
+        """
+        Args:
+            executors: Server name -> authenticated executor
+            state_file: JSON snapshot of the queue; events go to a sibling .ndjson journal
+            config: Queue configuration (uses defaults if None)
+        """
+        self.executors = executors
+        self.config = config or LabQueueConfig()
+        self.journal = JobJournal(Path(state_file))
+        self.schedulers = {server: LabExecutionScheduler(executor, self.config.scheduler)
+                           for server, executor in executors.items()}
+        self._entries: Dict[str, QueuedLab] = {}
+        self._heaps: Dict[str, list] = {server: [] for server in executors}
+        self._condition = threading.Condition()
+        self._dispatcher = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="lab-queue")
+        self._sequence = itertools.count()
+        self.monitors: Dict[str, EarlyTerminationMonitor] = {}
+        if self.config.early_termination is not None:
+            for server, executor in executors.items():
+                self.monitors[server] = EarlyTerminationMonitor(
+                    executor, self.config.early_termination, self.config.sample_interval,
+                    on_cancel=lambda lab_id, decision, server=server: self._on_terminated(server, lab_id, decision)
+                )
+
+        for entry_id, record in self.journal.replay().items():
+            entry = QueuedLab.from_dict(record)
+            if entry.server not in executors:
+                logger.warning(f"⚠️ Ignoring queued lab {entry.lab_id} for unknown server {entry.server}")
+                continue
+            self._entries[entry_id] = entry
+        self._sequence = itertools.count(max((e.sequence for e in self._entries.values()), default=-1) + 1)
+
+    def capacity(self, server: str) -> int:
+        return self.config.server_capacity.get(server, self.config.max_running_per_server)
+
+    def enqueue(self, server: str, lab_id: str, start_unix: int, end_unix: int,
+                priority: int = 0, send_email: bool = False) -> QueuedLab:
+        """Queue a lab execution and start it right away if the server has a free slot"""
+        if server not in self.executors:
+            raise ValueError(f"Unknown server: {server}")
+        entry = QueuedLab(
+            entry_id=uuid.uuid4().hex,
+            server=server,
+            lab_id=lab_id,
+            start_unix=start_unix,
+            end_unix=end_unix,
+            priority=priority,
+            send_email=send_email,
+            sequence=next(self._sequence),
+            enqueued_at=time.time()
+        )
+        with self._condition:
+            self._entries[entry.entry_id] = entry
+            self._push(entry)
+            self.journal.put(entry.entry_id, asdict(entry))
+        self._schedule_dispatch(server)
+        return entry
+
+    def resume(self) -> None:
+        """Watch labs left running and queue labs left waiting by a previous process"""
+        with self._condition:
+            running = [entry for entry in self._entries.values() if entry.status == RUNNING]
+            for entry in self._entries.values():
+                if entry.status == QUEUED:
+                    self._push(entry)
+        for entry in running:
+            self._watch(entry)
+        for server in self.executors:
+            self._schedule_dispatch(server)
+
+    def cancel(self, entry_id: str) -> bool:
+        """Remove a queued entry; running labs are left alone"""
+        with self._condition:
+            entry = self._entries.get(entry_id)
+            if entry is None or entry.status != QUEUED:
+                return False
+            self._finish(entry, CANCELLED, "Removed from the queue")
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until no lab is queued or running; returns False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not any(e.status in (QUEUED, RUNNING) for e in self._entries.values()), timeout
+            )
+
+    def entries(self, server: Optional[str] = None, status: Optional[str] = None) -> List[QueuedLab]:
+        with self._condition:
+            return [e for e in sorted(self._entries.values(), key=lambda e: e.sequence)
+                    if (server is None or e.server == server) and (status is None or e.status == status)]
+
+    def server_stats(self) -> Dict[str, ServerUtilization]:
+        """Utilization and queue wait time per server"""
+        now = time.time()
+        stats = {}
+        with self._condition:
+            for server in self.executors:
+                entries = [e for e in self._entries.values() if e.server == server]
+                started = [e for e in entries if e.started_at is not None]
+                waits = [e.wait_seconds for e in started]
+                busy = sum((e.finished_at or now) - e.started_at for e in started)
+                window = now - min((e.started_at for e in started), default=now)
+                capacity = self.capacity(server)
+                stats[server] = ServerUtilization(
+                    server=server,
+                    capacity=capacity,
+                    running=sum(e.status == RUNNING for e in entries),
+                    queued=sum(e.status == QUEUED for e in entries),
+                    completed=sum(e.status == COMPLETED for e in entries),
+                    failed=sum(e.status in (FAILED, CANCELLED) for e in entries),
+                    utilization=min(1.0, busy / (capacity * window)) if window > 0 else 0.0,
+                    average_wait=sum(waits) / len(waits) if waits else 0.0,
+                    max_wait=max(waits, default=0.0)
+                )
+        return stats
+
+    def close(self) -> None:
+        """Stop dispatching; queued and running entries stay in the state file"""
+        for monitor in self.monitors.values():
+            monitor.stop()
+        self._dispatcher.shutdown(wait=True)
+        for scheduler in self.schedulers.values():
+            scheduler.close()
+        self.journal.close()
+
+    def _push(self, entry: QueuedLab) -> None:
+        heapq.heappush(self._heaps[entry.server], (-entry.priority, entry.sequence, entry.entry_id))
+
+    def _schedule_dispatch(self, server: str) -> None:
+        try:
+            self._dispatcher.submit(self._dispatch, server)
+        except RuntimeError:
+            # Queue was closed; the entry is persisted and resumes on the next start
+            pass
+
+    def _dispatch(self, server: str) -> None:
+        """Start queued labs until the server is at capacity"""
+        while True:
+            with self._condition:
+                running = {e.lab_id for e in self._entries.values() if e.server == server and e.status == RUNNING}
+                if len(running) >= self.capacity(server):
+                    return
+                entry = self._next_entry(server, running)
+                if entry is None:
+                    return
+            self._start(entry)
+
+    def _next_entry(self, server: str, running_labs: set) -> Optional[QueuedLab]:
+        """Highest-priority queued entry whose lab is not already running"""
+        heap = self._heaps[server]
+        skipped, found = [], None
+        while heap:
+            item = heapq.heappop(heap)
+            entry = self._entries.get(item[2])
+            if entry is None or entry.status != QUEUED:
+                continue
+            if entry.lab_id in running_labs:
+                skipped.append(item)
+                continue
+            found = entry
+            break
+        for item in skipped:
+            heapq.heappush(heap, item)
+        return found
+
+    def _start(self, entry: QueuedLab) -> None:
+        try:
+            response = api.start_lab_execution(
+                self.executors[entry.server],
+                StartLabExecutionRequest(lab_id=entry.lab_id, start_unix=entry.start_unix,
+                                         end_unix=entry.end_unix, send_email=entry.send_email)
+            )
+            if isinstance(response, dict) and response.get('Success') is False:
+                raise RuntimeError(f"Failed to start lab: {response.get('Error', response)}")
+        except Exception as e:
+            logger.error(f"❌ Could not start lab {entry.lab_id} on {entry.server}: {e}")
+            with self._condition:
+                self._finish(entry, FAILED, str(e))
+            return
+
+        with self._condition:
+            entry.status = RUNNING
+            entry.started_at = time.time()
+            self.journal.put(entry.entry_id, asdict(entry))
+            logger.info(f"🚀 Started lab {entry.lab_id} on {entry.server} after {entry.wait_seconds:.1f}s in queue")
+        self._watch(entry)
+
+    def _watch(self, entry: QueuedLab) -> None:
+        """Track a running lab; called without the condition held, as the monitor reads lab details"""
+        monitor = self.monitors.get(entry.server)
+        if monitor is not None:
+            # Before the scheduler watch, so a quick completion's unwatch() cannot come first
+            try:
+                monitor.watch(entry.lab_id)
+                monitor.start()
+            except Exception as e:
+                logger.warning(f"⚠️ Early termination is off for lab {entry.lab_id}: {e}")
+        future = self.schedulers[entry.server].submit(entry.lab_id, self.config.lab_timeout)
+        future.add_done_callback(lambda f: self._on_done(entry, f))
+
+    def _on_done(self, entry: QueuedLab, future: concurrent.futures.Future) -> None:
+        # Runs on the scheduler's loop thread; starting the next lab is left to the dispatcher
+        try:
+            completion = future.result()
+            status = COMPLETED if completion.status == LabStatus.COMPLETED else CANCELLED
+            message = completion.message if status != COMPLETED else None
+        except SchedulerClosedError:
+            # The queue is closing; the lab keeps running and is watched again on resume()
+            return
+        except Exception as e:
+            status, message = FAILED, str(e)
+        if entry.server in self.monitors:
+            self.monitors[entry.server].unwatch(entry.lab_id)
+        with self._condition:
+            if entry.status != RUNNING:
+                # Already finished by early termination
+                return
+            self._finish(entry, status, message)
+        self._schedule_dispatch(entry.server)
+
+    def _on_terminated(self, server: str, lab_id: str, decision: TerminationDecision) -> None:
+        # The scheduler would only notice the cancellation on its next poll; free the slot now
+        with self._condition:
+            for entry in self._entries.values():
+                if entry.server == server and entry.lab_id == lab_id and entry.status == RUNNING:
+                    self._finish(entry, CANCELLED, f"Terminated early: {decision.reason}")
+        self._schedule_dispatch(server)
+
+    def _finish(self, entry: QueuedLab, status: str, message: Optional[str] = None) -> None:
+        """Record a final status; the caller holds the condition"""
+        entry.status = status
+        entry.finished_at = time.time()
+        entry.error_message = message
+        self.journal.put(entry.entry_id, asdict(entry))
+        self._condition.notify_all()
@@ -0,0 +1,329 @@
+"""
+Lab execution scheduler for pyHaasAPI
+
+Watches any number of running labs from a single asyncio loop instead of one
+polling loop per lab:
+- Each lab is polled through GET_LAB_EXECUTION_UPDATE on its own adaptive interval,
+  derived from its progress rate and estimated remaining time
+- Labs that make no progress back off exponentially up to a maximum interval
+- Completions are delivered through awaitable futures and optional callbacks
+- Synchronous callers share one background loop through concurrent futures
+"""
+
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Callable, Iterable
+
+from pyHaasAPI import api
+from pyHaasAPI.parameters import LabStatus
+
+logger = logging.getLogger(__name__)
+
+_FINISHED_STATUSES = (LabStatus.COMPLETED, LabStatus.CANCELLED)
+
+
+class SchedulerClosedError(RuntimeError):
+    """Raised for labs still watched when their scheduler is closed; the labs themselves keep running"""
+
+
+@dataclass
+class LabSchedulerConfig:
+    """Configuration for adaptive lab status polling"""
+    min_interval: float = 2.0  # Seconds; also the delay before the first poll
+    max_interval: float = 60.0
+    backoff_factor: float = 1.5  # Interval growth while a lab makes no progress
+    eta_fraction: float = 0.5  # Poll again after this fraction of the estimated remaining time
+    max_concurrent_requests: int = 4  # Status requests in flight at once
+    max_consecutive_errors: int = 5  # Failed polls before a lab is reported as failed
+    cancel_on_timeout: bool = True
+
+
+@dataclass
+class LabCompletion:
+    """Final state of a watched lab execution"""
+    lab_id: str
+    status: LabStatus
+    progress: float
+    elapsed: float  # Seconds between watch() and completion
+    polls: int
+    message: Optional[str] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status == LabStatus.COMPLETED
+
+
+@dataclass
+class _WatchedLab:
+    lab_id: str
+    future: asyncio.Future
+    started: float
+    next_poll: float
+    interval: float
+    deadline: Optional[float] = None
+    callbacks: List[Callable[[LabCompletion], None]] = field(default_factory=list)
+    progress: Optional[float] = None
+    progress_time: Optional[float] = None
+    polls: int = 0
+    errors: int = 0
+
+
+class LabExecutionScheduler:
+    """
+    Tracks running labs in one loop with per-lab adaptive poll intervals
+
+    Async usage:
+        completion = await scheduler.wait(lab_id, timeout=3600)
+
+    Sync usage (threads share the scheduler's background loop):
+        completion = scheduler.submit(lab_id).result()
+    """
+
+    def __init__(self, executor, config: Optional[LabSchedulerConfig] = None):
+        self.executor = executor
+        self.config = config or LabSchedulerConfig()
+        self.request_count = 0
+        self._watched: Dict[str, _WatchedLab] = {}
+        self._runner: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def watched_labs(self) -> List[str]:
+        return list(self._watched)
+
+    def watch(self, lab_id: str, timeout: Optional[float] = None,
+              callback: Optional[Callable[[LabCompletion], None]] = None) -> asyncio.Future:
+        """
+        Start tracking a lab; must be called from the scheduler's event loop
+
+        Watching a lab that is already tracked shares its future. The returned
+        future is shielded, so cancelling it does not stop tracking for others.
+
+        Args:
+            lab_id: Lab whose execution was started
+            timeout: Seconds before the lab is cancelled and reported as timed out
+            callback: Called with the LabCompletion when the lab finishes
+
+        Returns:
+            Future resolving to a LabCompletion (TimeoutError on timeout)
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        watched = self._watched.get(lab_id)
+        if watched is None:
+            watched = _WatchedLab(
+                lab_id=lab_id,
+                future=loop.create_future(),
+                started=now,
+                next_poll=now + self.config.min_interval,
+                interval=self.config.min_interval
+            )
+            self._watched[lab_id] = watched
+        if timeout is not None:
+            deadline = now + timeout
+            watched.deadline = deadline if watched.deadline is None else min(watched.deadline, deadline)
+        if callback:
+            watched.callbacks.append(callback)
+
+        if self._runner is None or self._runner.done():
+            self._wakeup = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+            self._runner = loop.create_task(self._run())
+        else:
+            self._wakeup.set()
+        return asyncio.shield(watched.future)
+
+    async def wait(self, lab_id: str, timeout: Optional[float] = None,
+                   callback: Optional[Callable[[LabCompletion], None]] = None) -> LabCompletion:
+        """Wait until a lab completes or is cancelled"""
+        return await self.watch(lab_id, timeout, callback)
+
+    async def wait_all(self, lab_ids: Iterable[str], timeout: Optional[float] = None) -> Dict[str, LabCompletion]:
+        """Wait for several labs; labs that time out or fail are left out of the result"""
+        lab_ids = list(lab_ids)
+        results = await asyncio.gather(*(self.watch(lab_id, timeout) for lab_id in lab_ids), return_exceptions=True)
+        completions = {}
+        for lab_id, result in zip(lab_ids, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"⚠️ Lab {lab_id} did not finish: {result}")
+            else:
+                completions[lab_id] = result
+        return completions
+
+    def submit(self, lab_id: str, timeout: Optional[float] = None,
+               callback: Optional[Callable[[LabCompletion], None]] = None) -> concurrent.futures.Future:
+        """Thread-safe watch on the scheduler's background loop"""
+        loop = self._ensure_background_loop()
+        return asyncio.run_coroutine_threadsafe(self.wait(lab_id, timeout, callback), loop)
+
+    def wait_sync(self, lab_id: str, timeout: Optional[float] = None) -> LabCompletion:
+        """Block the calling thread until a lab completes or is cancelled"""
+        return self.submit(lab_id, timeout).result()
+
+    def close(self) -> None:
+        """
+        Stop the background loop, if one was started
+
+        Labs still watched fail with SchedulerClosedError, so callers blocked in
+        submit() or wait_sync() return instead of hanging.
+        """
+        with self._thread_lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+    def _ensure_background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="lab-scheduler", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def _shutdown(self) -> None:
+        """Fail pending completions, then cancel the runner and any task left on the loop"""
+        for watched in list(self._watched.values()):
+            self._finish(watched, error=SchedulerClosedError(f"Scheduler closed before lab {watched.lab_id} finished"))
+        if self._runner is not None:
+            self._runner.cancel()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if tasks:
+            # Waiters resolve with the error above; anything still running after that is cancelled
+            _, pending = await asyncio.wait(tasks, timeout=1.0)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+        await asyncio.get_running_loop().shutdown_default_executor()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._watched:
+            now = loop.time()
+            due = [watched for watched in self._watched.values() if watched.next_poll <= now]
+            if due:
+                await asyncio.gather(*(self._poll(watched) for watched in due))
+                continue
+
+            delay = min(watched.next_poll for watched in self._watched.values()) - now
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, watched: _WatchedLab) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._semaphore:
+                update = await asyncio.to_thread(api.get_lab_execution_update, self.executor, watched.lab_id)
+            self.request_count += 1
+        except Exception as e:
+            self.request_count += 1
+            watched.errors += 1
+            if watched.errors >= self.config.max_consecutive_errors:
+                self._finish(watched, error=RuntimeError(f"Lab {watched.lab_id} status unavailable: {e}"))
+                return
+            logger.debug(f"Status poll for lab {watched.lab_id} failed ({watched.errors}): {e}")
+            watched.interval = min(watched.interval * self.config.backoff_factor, self.config.max_interval)
+            watched.next_poll = loop.time() + watched.interval
+            return
+
+        now = loop.time()
+        watched.errors = 0
+        watched.polls += 1
+        progress = float(update.progress or 0.0)
+
+        if update.status in _FINISHED_STATUSES:
+            self._finish(watched, LabCompletion(
+                lab_id=watched.lab_id,
+                status=LabStatus(update.status),
+                progress=progress,
+                elapsed=now - watched.started,
+                polls=watched.polls,
+                message=update.error or update.message
+            ))
+            return
+
+        if watched.deadline is not None and now >= watched.deadline:
+            if self.config.cancel_on_timeout:
+                try:
+                    await asyncio.to_thread(api.cancel_lab_execution, self.executor, watched.lab_id)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not cancel timed out lab {watched.lab_id}: {e}")
+            self._finish(watched, error=TimeoutError(
+                f"Lab {watched.lab_id} did not finish within {watched.deadline - watched.started:.0f}s"
+            ))
+            return
+
+        watched.interval = self._next_interval(watched, progress, now)
+        watched.next_poll = now + watched.interval
+        if watched.deadline is not None:
+            watched.next_poll = min(watched.next_poll, watched.deadline)
+
+    def _next_interval(self, watched: _WatchedLab, progress: float, now: float) -> float:
+        """
+        Poll interval from the lab's progress rate
+
+        Progress is a percentage. While progress advances, the next poll lands at
+        a fraction of the estimated remaining time; without progress the interval
+        backs off exponentially.
+        """
+        config = self.config
+        previous, previous_time = watched.progress, watched.progress_time
+        if previous is None or progress < previous:
+            watched.progress, watched.progress_time = progress, now
+            return config.min_interval
+        if progress == previous or now <= previous_time:
+            return min(max(watched.interval * config.backoff_factor, config.min_interval), config.max_interval)
+
+        rate = (progress - previous) / (now - previous_time)
+        watched.progress, watched.progress_time = progress, now
+        remaining = max(0.0, 100.0 - progress) / rate
+        return min(max(remaining * config.eta_fraction, config.min_interval), config.max_interval)
+
+    def _finish(self, watched: _WatchedLab, completion: Optional[LabCompletion] = None,
+                error: Optional[BaseException] = None) -> None:
+        self._watched.pop(watched.lab_id, None)
+        if watched.future.done():
+            return
+        if error is not None:
+            watched.future.set_exception(error)
+            return
+        watched.future.set_result(completion)
+        for callback in watched.callbacks:
+            try:
+                callback(completion)
+            except Exception as e:
+                logger.error(f"❌ Lab completion callback failed for {watched.lab_id}: {e}")
+
+
+def wait_for_labs(executor, lab_ids: Iterable[str], timeout: Optional[float] = None,
+                  config: Optional[LabSchedulerConfig] = None) -> Dict[str, LabCompletion]:
+    """
+    Block until all labs finish, polling them from one scheduler loop
+
+    The labs are watched on the scheduler's background loop, so this can also be
+    called from a thread running an event loop. Labs that time out or fail are
+    left out of the result (see LabExecutionScheduler.wait_all).
+    """
+    scheduler = LabExecutionScheduler(executor, config)
+    try:
+        loop = scheduler._ensure_background_loop()
+        return asyncio.run_coroutine_threadsafe(scheduler.wait_all(lab_ids, timeout), loop).result()
+    finally:
+        scheduler.close()
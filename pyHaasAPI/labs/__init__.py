@@ -6,6 +6,7 @@ lab cloning, configuration, execution, and monitoring across multiple servers.
 """
 
 from .cloning import LabCloner, LabCloneRequest, LabCloneResult
+from ..rate_limit import RequestRateLimiter
 from .management import LabManager, LabExecutionManager
 from .configuration import LabConfigurator, LabConfigTemplate
 from .monitoring import LabMonitor, LabProgressTracker
@@ -14,6 +15,7 @@ __all__ = [
     'LabCloner',
     'LabCloneRequest', 
     'LabCloneResult',
+    'RequestRateLimiter',
     'LabManager',
     'LabExecutionManager',
     'LabConfigurator',
@@ -6,13 +6,17 @@ with support for market discovery, automated configuration, and bulk operations.
 """
 
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass
 from enum import Enum
 
 from ..model import CreateLabRequest, CloudMarket, LabDetails
 from ..markets.discovery import MarketDiscovery, MarketInfo, MarketType
+from ..analysis.fingerprint import ParameterFingerprintIndex, parameter_fingerprint
+from ..rate_limit import RequestRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -35,35 +39,56 @@ class LabCloneResult:
     error_message: Optional[str] = None
     execution_time: float = 0.0
     clone_request: Optional[LabCloneRequest] = None
+    reused: bool = False  # An existing lab was returned because the caller asked for reuse
 
 class LabCloner:
     """Clones and manages HaasOnline labs with advanced features"""
     
-    def __init__(self, executor, market_discovery: MarketDiscovery = None):
+    def __init__(self, executor, market_discovery: MarketDiscovery = None,
+                 fingerprint_index: ParameterFingerprintIndex = None,
+                 rate_limiter: RequestRateLimiter = None,
+                 reuse_existing: bool = False):
         """
         Initialize lab cloner.
-        
+
         Args:
             executor: HaasOnline API executor
             market_discovery: Market discovery instance (optional)
+            fingerprint_index: Index of labs already created per parameter set (optional)
+            rate_limiter: Rate limiter shared by bulk cloning workers (optional)
+            reuse_existing: Return a lab created earlier with the same script, market,
+                settings and parameters instead of cloning. The match ignores the lab
+                name and backtest period, so it is off by default.
         """
         self.executor = executor
         self.market_discovery = market_discovery or MarketDiscovery(executor)
-        
+        self.reuse_existing = reuse_existing
+        # Built only when passed in or reuse is enabled; the default index is persisted on disk
+        self.fingerprint_index = fingerprint_index
+        if self.fingerprint_index is None and reuse_existing:
+            self.fingerprint_index = ParameterFingerprintIndex()
+        self.rate_limiter = rate_limiter or RequestRateLimiter()
+
+        # Template labs fetched once per bulk run and kept in memory
+        self._template_cache: Dict[str, LabDetails] = {}
+        self._lock = threading.Lock()
+
         # Cloning statistics
         self._clone_stats = {
             'total_attempts': 0,
             'total_successes': 0,
             'total_failures': 0,
+            'total_reused': 0,
             'start_time': None
         }
     
-    def clone_lab(self, clone_request: LabCloneRequest) -> LabCloneResult:
+    def clone_lab(self, clone_request: LabCloneRequest, reuse_existing: Optional[bool] = None) -> LabCloneResult:
         """
         Clone a single lab.
         
         Args:
             clone_request: Lab cloning request
+            reuse_existing: Override the cloner's reuse_existing setting for this call
             
         Returns:
             Lab cloning result
@@ -86,6 +111,24 @@ class LabCloner:
                     start_time
                 )
             
+            # Reuse an existing lab with the same script, market and parameters
+            reuse_index = self._reuse_index(reuse_existing)
+            fingerprint_key = self._clone_fingerprint_key(base_lab, clone_request) if self.fingerprint_index is not None else None
+            existing_lab_id = self._find_existing_lab(fingerprint_key) if reuse_index is not None else None
+            if existing_lab_id:
+                self._clone_stats['total_successes'] += 1
+                self._clone_stats['total_reused'] += 1
+                logger.info(f"Reusing existing lab {existing_lab_id} with identical parameters")
+                
+                return LabCloneResult(
+                    success=True,
+                    new_lab_id=existing_lab_id,
+                    market_tag=clone_request.market_info.market_tag,
+                    execution_time=time.time() - start_time,
+                    clone_request=clone_request,
+                    reused=True
+                )
+            
             # Create the new lab
             new_lab_id = self._create_lab_from_template(base_lab, clone_request)
             
@@ -98,6 +141,9 @@ class LabCloner:
                 if clone_request.custom_parameters:
                     self._apply_custom_parameters(new_lab_id, clone_request.custom_parameters)
                 
+                if fingerprint_key:
+                    self.fingerprint_index.put(fingerprint_key, new_lab_id)
+                
                 self._clone_stats['total_successes'] += 1
                 logger.info(f"Successfully cloned lab: {new_lab_id}")
                 
@@ -121,7 +167,74 @@ class LabCloner:
                 str(e),
                 start_time
             )
-    
+
+    def clone_labs_bulk(
+        self,
+        clone_requests: List[LabCloneRequest],
+        max_workers: int = 8,
+        progress_callback: Callable[[int, int], None] = None,
+        refresh_templates: bool = False,
+        reuse_existing: Optional[bool] = None
+    ) -> List[LabCloneResult]:
+        """
+        Clone many labs concurrently.
+
+        Each template lab is fetched once and kept in memory. Every target then
+        takes one CLONE_LAB call and one update call that sets market, account,
+        configuration and parameters together. All calls go through the shared
+        rate limiter. A failing target gets a failure result and the rest of
+        the batch continues.
+
+        Args:
+            clone_requests: Lab cloning requests
+            max_workers: Clones in flight at the same time
+            progress_callback: Optional callback for progress updates
+            refresh_templates: Re-fetch template labs that are already cached
+            reuse_existing: Override the cloner's reuse_existing setting for this call
+
+        Returns:
+            Clone results in the order of clone_requests
+        """
+        if not clone_requests:
+            return []
+        start_time = time.time()
+        with self._lock:
+            if self._clone_stats['start_time'] is None:
+                self._clone_stats['start_time'] = start_time
+
+        template_ids = list(dict.fromkeys(request.base_lab_id for request in clone_requests))
+        logger.info(f"Bulk cloning {len(clone_requests)} labs from {len(template_ids)} templates "
+                    f"with {max_workers} workers")
+        if refresh_templates:
+            for template_id in template_ids:
+                self._template_cache.pop(template_id, None)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(self._get_template, template_ids))
+
+        reuse_index = self._reuse_index(reuse_existing)
+        completed = [0]
+
+        def clone(clone_request: LabCloneRequest) -> LabCloneResult:
+            result = self._clone_from_template(clone_request, reuse=reuse_index is not None)
+            if progress_callback:
+                with self._lock:
+                    completed[0] += 1
+                    done = completed[0]
+                progress_callback(done, len(clone_requests))
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(clone, clone_requests))
+
+        successes = len([r for r in results if r.success])
+        logger.info(f"Bulk cloning completed: {successes}/{len(results)} successful "
+                    f"in {time.time() - start_time:.1f}s")
+        return results
+
+    def clear_template_cache(self):
+        """Forget cached template labs"""
+        self._template_cache.clear()
+
     def clone_lab_for_markets(
         self, 
         base_lab_id: str, 
@@ -129,7 +242,9 @@ class LabCloner:
         account_id: str,
         name_template: str = "{base_name}_{symbol}",
         lab_config: Dict[str, Any] = None,
-        progress_callback: Callable[[int, int], None] = None
+        progress_callback: Callable[[int, int], None] = None,
+        max_workers: int = None,
+        reuse_existing: Optional[bool] = None
     ) -> List[LabCloneResult]:
         """
         Clone a lab for multiple markets.
@@ -141,6 +256,8 @@ class LabCloner:
             name_template: Template for generating lab names
             lab_config: Configuration to apply to all cloned labs
             progress_callback: Optional callback for progress updates
+            max_workers: Clone concurrently with clone_labs_bulk using this many workers
+            reuse_existing: Override the cloner's reuse_existing setting for this call
             
         Returns:
             List of clone results
@@ -150,20 +267,31 @@ class LabCloner:
         results = []
         
         # Get base lab name for template
-        base_lab = self._get_base_lab_details(base_lab_id)
+        if max_workers:
+            base_lab = self._get_template(base_lab_id)
+        else:
+            base_lab = self._get_base_lab_details(base_lab_id)
         base_name = base_lab.name if base_lab else "ClonedLab"
         
+        if max_workers:
+            clone_requests = [
+                LabCloneRequest(
+                    base_lab_id=base_lab_id,
+                    new_lab_name=self._format_lab_name(name_template, base_name, market_info),
+                    market_info=market_info,
+                    account_id=account_id,
+                    lab_config=lab_config
+                )
+                for market_info in markets
+            ]
+            return self.clone_labs_bulk(clone_requests, max_workers=max_workers,
+                                        progress_callback=progress_callback,
+                                        reuse_existing=reuse_existing)
+        
         for i, market_info in enumerate(markets):
             try:
                 # Generate lab name from template
-                lab_name = name_template.format(
-                    base_name=base_name,
-                    symbol=market_info.symbol.replace('/', '_'),
-                    base_asset=market_info.base_asset,
-                    quote_asset=market_info.quote_asset,
-                    exchange=market_info.exchange,
-                    market_type=market_info.market_type.value
-                )
+                lab_name = self._format_lab_name(name_template, base_name, market_info)
                 
                 # Create clone request
                 clone_request = LabCloneRequest(
@@ -175,7 +303,7 @@ class LabCloner:
                 )
                 
                 # Clone the lab
-                result = self.clone_lab(clone_request)
+                result = self.clone_lab(clone_request, reuse_existing=reuse_existing)
                 results.append(result)
                 
                 # Call progress callback if provided
@@ -298,9 +426,60 @@ class LabCloner:
             'total_attempts': 0,
             'total_successes': 0,
             'total_failures': 0,
+            'total_reused': 0,
             'start_time': None
         }
     
+    @staticmethod
+    def _format_lab_name(name_template: str, base_name: str, market_info: MarketInfo) -> str:
+        """Generate a lab name from a name template"""
+        return name_template.format(
+            base_name=base_name,
+            symbol=market_info.symbol.replace('/', '_'),
+            base_asset=market_info.base_asset,
+            quote_asset=market_info.quote_asset,
+            exchange=market_info.exchange,
+            market_type=market_info.market_type.value
+        )
+    
+    def _clone_fingerprint_key(self, base_lab: LabDetails, clone_request: LabCloneRequest) -> Optional[str]:
+        """Fingerprint index key of the lab a clone request would create"""
+        parameters = [dict(param) for param in base_lab.parameters if isinstance(param, dict)]
+        for param in parameters:
+            for key, value in (clone_request.custom_parameters or {}).items():
+                if param.get('K') == key:
+                    param['O'] = [str(value)]
+        fingerprint = parameter_fingerprint(parameters)
+        if not fingerprint:
+            return None
+        if clone_request.lab_config:
+            fingerprint = parameter_fingerprint({**clone_request.lab_config, 'parameters': fingerprint})
+        return ParameterFingerprintIndex.make_key(
+            base_lab.script_id, clone_request.market_info.market_tag, fingerprint,
+            settings=base_lab.settings
+        )
+    
+    def _reuse_index(self, reuse_existing: Optional[bool]) -> Optional[ParameterFingerprintIndex]:
+        """Fingerprint index to look up existing labs in, or None when reuse is off"""
+        if not (self.reuse_existing if reuse_existing is None else reuse_existing):
+            return None
+        with self._lock:
+            if self.fingerprint_index is None:
+                self.fingerprint_index = ParameterFingerprintIndex()
+        return self.fingerprint_index
+
+    def _find_existing_lab(self, fingerprint_key: Optional[str]) -> Optional[str]:
+        """Lab previously created for a fingerprint key, if it still exists"""
+        if not fingerprint_key:
+            return None
+        entry = self.fingerprint_index.get(fingerprint_key)
+        if not entry:
+            return None
+        if self._get_base_lab_details(entry['lab_id']):
+            return entry['lab_id']
+        self.fingerprint_index.remove(fingerprint_key)
+        return None
+    
     def _get_base_lab_details(self, lab_id: str) -> Optional[LabDetails]:
         """Get base lab details"""
         try:
@@ -309,7 +488,93 @@ class LabCloner:
         except Exception as e:
             logger.error(f"Failed to get lab details for {lab_id}: {e}")
             return None
-    
+
+    def _get_template(self, lab_id: str) -> Optional[LabDetails]:
+        """Template lab details, fetched once and cached"""
+        template = self._template_cache.get(lab_id)
+        if template is None:
+            self.rate_limiter.acquire()
+            template = self._get_base_lab_details(lab_id)
+            if template is not None:
+                self._template_cache[lab_id] = template
+        return template
+
+    def _clone_from_template(self, clone_request: LabCloneRequest, reuse: bool = False) -> LabCloneResult:
+        """Clone one target from its cached template; errors become a failure result"""
+        start_time = time.time()
+        with self._lock:
+            self._clone_stats['total_attempts'] += 1
+        market_tag = clone_request.market_info.market_tag
+        new_lab_id = None
+
+        try:
+            base_lab = self._template_cache.get(clone_request.base_lab_id)
+            if base_lab is None:
+                return self._create_failure_result(clone_request, "Failed to get base lab details", start_time)
+
+            fingerprint_key = self._clone_fingerprint_key(base_lab, clone_request) if self.fingerprint_index is not None else None
+            if reuse and fingerprint_key and self.fingerprint_index.get(fingerprint_key):
+                self.rate_limiter.acquire()
+                existing_lab_id = self._find_existing_lab(fingerprint_key)
+                if existing_lab_id:
+                    with self._lock:
+                        self._clone_stats['total_successes'] += 1
+                        self._clone_stats['total_reused'] += 1
+                    return LabCloneResult(
+                        success=True,
+                        new_lab_id=existing_lab_id,
+                        market_tag=market_tag,
+                        execution_time=time.time() - start_time,
+                        clone_request=clone_request,
+                        reused=True
+                    )
+
+            from .. import api
+            self.rate_limiter.acquire()
+            new_lab = api.clone_lab(self.executor, base_lab.lab_id, clone_request.new_lab_name)
+            if not new_lab:
+                return self._create_failure_result(clone_request, "CLONE_LAB returned no lab", start_time)
+            new_lab_id = new_lab.lab_id
+
+            self._configure_clone(new_lab, clone_request)
+            self.rate_limiter.acquire()
+            api.update_lab_details(self.executor, new_lab)
+
+            if fingerprint_key:
+                self.fingerprint_index.put(fingerprint_key, new_lab_id)
+            with self._lock:
+                self._clone_stats['total_successes'] += 1
+            return LabCloneResult(
+                success=True,
+                new_lab_id=new_lab_id,
+                market_tag=market_tag,
+                execution_time=time.time() - start_time,
+                clone_request=clone_request
+            )
+
+        except Exception as e:
+            logger.warning(f"Failed to clone lab {clone_request.base_lab_id} for {market_tag}: {e}")
+            result = self._create_failure_result(clone_request, str(e), start_time)
+            # A lab cloned but not configured is reported so it can be fixed or removed
+            result.new_lab_id = new_lab_id
+            return result
+
+    @staticmethod
+    def _configure_clone(lab_details: LabDetails, clone_request: LabCloneRequest):
+        """Set market, account, configuration and parameters on a cloned lab in memory"""
+        lab_details.settings.market_tag = clone_request.market_info.market_tag
+        lab_details.settings.account_id = clone_request.account_id
+
+        for key in ('max_population', 'max_generations', 'max_elites', 'mix_rate', 'adjust_rate'):
+            if clone_request.lab_config and key in clone_request.lab_config:
+                setattr(lab_details.config, key, clone_request.lab_config[key])
+
+        for param_key, param_value in (clone_request.custom_parameters or {}).items():
+            for param in lab_details.parameters:
+                if isinstance(param, dict) and param.get('K') == param_key:
+                    param['O'] = [str(param_value)]
+                    break
+
     def _create_lab_from_template(self, base_lab: LabDetails, clone_request: LabCloneRequest) -> Optional[str]:
         """Create a new lab based on a template lab"""
         try:
@@ -411,7 +676,8 @@ class LabCloner:
         start_time: float
     ) -> LabCloneResult:
         """Create a failure result"""
-        self._clone_stats['total_failures'] += 1
+        with self._lock:
+            self._clone_stats['total_failures'] += 1
         
         return LabCloneResult(
             success=False,
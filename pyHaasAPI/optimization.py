@@ -86,12 +86,20 @@ class OptimizationConfig:
         enable_all_parameters: Whether to enable all parameters for optimization
         preserve_current_values: Whether to include current values in ranges
         custom_ranges: Custom parameter ranges (overrides automatic generation)
+        target_backtests: Fit the generated ranges to this many combinations
+            with the combination planner (no fitting if None)
+        history_cache: UnifiedCacheManager with previous backtests of the script,
+            used to measure parameter sensitivity for the planner
+        seconds_per_backtest: Expected server time per backtest for runtime estimates
     """
     strategy: OptimizationStrategy = OptimizationStrategy.MIXED
     max_combinations: int = 50000
     enable_all_parameters: bool = True
     preserve_current_values: bool = True
     custom_ranges: Optional[Dict[str, List[str]]] = None
+    target_backtests: Optional[int] = None
+    history_cache: Optional[Any] = None
+    seconds_per_backtest: float = 3.0
 
 
 @dataclass
@@ -107,6 +115,8 @@ class OptimizationResult:
         total_combinations: Total possible parameter combinations
         strategy_used: The optimization strategy that was applied
         parameter_details: Details of each optimized parameter
+        estimated_runtime_seconds: Expected lab runtime at seconds_per_backtest
+        frozen_parameters: Parameters the combination planner reduced to one value
         error_message: Error message if optimization failed
     """
     success: bool
@@ -116,6 +126,8 @@ class OptimizationResult:
     total_combinations: int = 0
     strategy_used: OptimizationStrategy = OptimizationStrategy.MIXED
     parameter_details: List[Dict[str, Any]] = None
+    estimated_runtime_seconds: float = 0.0
+    frozen_parameters: Dict[str, str] = None
     error_message: Optional[str] = None
 
 
@@ -335,14 +347,26 @@ class LabParameterOptimizer:
                 config
             )
             
+            # Fit the ranges to the backtest budget
+            frozen_parameters = {}
+            if config.target_backtests:
+                plan = self._plan_combinations(lab_details, updated_parameters, config)
+                updated_parameters = plan.parameters
+                frozen_parameters = plan.frozen
+            
             # Calculate total combinations
             total_combinations = self._calculate_combinations(updated_parameters)
+            estimated_runtime = total_combinations * config.seconds_per_backtest
+            log.info(f"📐 Lab {lab_id[:8]}: {total_combinations:,} combinations, "
+                     f"estimated runtime {estimated_runtime / 3600:.1f}h")
             
             # Check safety limits
             if total_combinations > config.max_combinations:
                 return OptimizationResult(
                     success=False,
                     lab_id=lab_id,
+                    total_combinations=total_combinations,
+                    estimated_runtime_seconds=estimated_runtime,
                     error_message=f"Too many combinations ({total_combinations:,}). Max allowed: {config.max_combinations:,}"
                 )
             
@@ -372,7 +396,9 @@ class LabParameterOptimizer:
                 optimized_parameters=optimized_count,
                 total_combinations=total_combinations,
                 strategy_used=config.strategy,
-                parameter_details=parameter_details
+                parameter_details=parameter_details,
+                estimated_runtime_seconds=estimated_runtime,
+                frozen_parameters=frozen_parameters
             )
             
         except Exception as e:
@@ -383,6 +409,87 @@ class LabParameterOptimizer:
                 error_message=str(e)
             )
     
+    def optimize_with_successive_halving(
+        self,
+        lab_id: str,
+        halving_config: 'SuccessiveHalvingConfig' = None,
+        config: OptimizationConfig = None,
+        end_unix: Optional[int] = None
+    ) -> 'HalvingResult':
+        """
+        Search the generated ranges with successive halving instead of exhaustively.
+        
+        Parameter sets sampled from the ranges run on short backtest windows first;
+        only the best ones are re-run on longer windows, within the backtest budget
+        of halving_config. See pyHaasAPI.successive_halving.
+        
+        Args:
+            lab_id: ID of the lab to optimize
+            halving_config: Budget, windows and concurrency (uses defaults if None)
+            config: Range generation configuration (uses defaults if None)
+            end_unix: End of every backtest window (defaults to now)
+            
+        Returns:
+            HalvingResult with the best parameter set
+        """
+        from pyHaasAPI.successive_halving import SuccessiveHalvingOptimizer
+        
+        optimizer = SuccessiveHalvingOptimizer(self.executor, halving_config)
+        return optimizer.optimize(lab_id, config, end_unix)
+
+    def optimize_with_bayesian_search(
+        self,
+        lab_id: str,
+        bayesian_config: 'BayesianOptimizationConfig' = None,
+        config: OptimizationConfig = None,
+        end_unix: Optional[int] = None
+    ) -> 'BayesianOptimizationResult':
+        """
+        Search the generated ranges with a Gaussian-process surrogate.
+
+        Cached backtests of the same script and market seed the model; small
+        batches proposed by expected improvement run as cloned labs until the
+        improvement left to expect is too small. See pyHaasAPI.bayesian_optimization.
+
+        Args:
+            lab_id: ID of the lab to optimize
+            bayesian_config: Budget, stopping threshold and history cache (uses defaults if None)
+            config: Range generation configuration (uses defaults if None)
+            end_unix: End of the backtest window (defaults to now)
+
+        Returns:
+            BayesianOptimizationResult with the best parameter set
+        """
+        from pyHaasAPI.bayesian_optimization import BayesianLabOptimizer
+
+        optimizer = BayesianLabOptimizer(self.executor, bayesian_config)
+        return optimizer.optimize(lab_id, config, end_unix)
+
+    def _plan_combinations(
+        self,
+        lab_details: LabDetails,
+        parameters: List[Dict[str, Any]],
+        config: OptimizationConfig
+    ) -> 'CombinationPlan':
+        """
+        Fit generated ranges to config.target_backtests.
+        
+        Sensitivity is measured from config.history_cache when given; without
+        history the steps are spread evenly over the parameters.
+        """
+        from pyHaasAPI.combination_planner import CombinationPlanner, plan_from_cache
+        
+        options = {'seconds_per_backtest': config.seconds_per_backtest}
+        if config.history_cache is not None:
+            settings = getattr(lab_details, 'settings', None)
+            return plan_from_cache(
+                parameters, config.history_cache, lab_details.script_id, config.target_backtests,
+                market_tag=getattr(settings, 'market_tag', None), **options
+            )
+        plan = CombinationPlanner(config.target_backtests, **options).plan(parameters)
+        log.info(plan.summary())
+        return plan
+    
     def _generate_optimized_parameters(
         self, 
         parameters: List[Dict[str, Any]], 
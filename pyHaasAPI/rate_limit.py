@@ -0,0 +1,33 @@
+"""
+Request rate limiting for pyHaasAPI
+
+A sliding-window limiter that threads issuing API calls concurrently (bulk
+lab cloning, history probes) share to stay under the server's request rate.
+"""
+
+import time
+import threading
+from collections import deque
+
+
+class RequestRateLimiter:
+    """Thread-safe sliding-window rate limiter shared by concurrent API calls"""
+
+    def __init__(self, max_requests: int = 20, time_window: float = 1.0):
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self._requests = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until another request fits in the window"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._requests and now - self._requests[0] >= self.time_window:
+                    self._requests.popleft()
+                if len(self._requests) < self.max_requests:
+                    self._requests.append(now)
+                    return
+                wait_time = self.time_window - (now - self._requests[0])
+            time.sleep(wait_time)
@@ -0,0 +1,420 @@
+"""
+Budget-aware successive halving for HaasOnline lab parameters
+
+LabParameterOptimizer generates option ranges that a lab then searches
+exhaustively, which easily reaches tens of thousands of backtests. This module
+spends an explicit backtest budget instead:
+- Parameter sets are sampled from the ranges LabParameterOptimizer generates
+- Every sampled set is backtested on a short window ending at the same time
+- The top 1/eta of each rung is re-run on an eta times longer window
+- Hyperband mode splits the budget over brackets that start at different windows
+
+Each parameter set runs in its own cloned lab with all parameters fixed, so one
+lab execution is one backtest. The cloned lab is re-executed on longer windows
+in later rungs.
+
+## Quick Start
+
+```python
+from pyHaasAPI.optimization import LabParameterOptimizer
+from pyHaasAPI.successive_halving import SuccessiveHalvingConfig
+
+result = LabParameterOptimizer(executor).optimize_with_successive_halving(
+    lab_id, SuccessiveHalvingConfig(max_backtests=120, min_window_days=10, max_window_days=90)
+)
+print(result.best_parameters, result.best_score, result.backtests_used)
+```
+"""
+
+import math
+import random
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from loguru import logger as log
+
+from pyHaasAPI import api
+from pyHaasAPI.api import SyncExecutor, Authenticated
+from pyHaasAPI.lab_scheduler import LabExecutionScheduler, LabSchedulerConfig
+from pyHaasAPI.model import StartLabExecutionRequest
+from pyHaasAPI.optimization import LabParameterOptimizer, OptimizationConfig
+from pyHaasAPI.tools.utils import fetch_all_lab_backtests
+
+_DAY = 24 * 3600
+
+
+@dataclass
+class SuccessiveHalvingConfig:
+    """
+    Configuration for successive halving over lab parameter sets.
+
+    Attributes:
+        max_backtests: Backtest budget; one lab execution of one parameter set is one backtest
+        eta: Keep the top 1/eta of each rung and make the next window eta times longer
+        min_window_days: Shortest backtest window (the first rung)
+        max_window_days: Window of the final rung; all windows end at the same time
+        hyperband: Split the budget over Hyperband brackets instead of one halving run
+        max_concurrent_labs: Labs executing at the same time
+        poll_interval: Shortest interval between status checks of a lab
+        execution_timeout: Seconds before a lab execution is cancelled
+        delete_labs: Delete the cloned labs afterwards, except the best one
+        seed: Seed for sampling parameter sets
+        lab_name_prefix: Prefix for the names of cloned labs
+    """
+    max_backtests: int = 200
+    eta: int = 3
+    min_window_days: float = 7.0
+    max_window_days: float = 90.0
+    hyperband: bool = False
+    max_concurrent_labs: int = 4
+    poll_interval: float = 10.0
+    execution_timeout: float = 3600.0
+    delete_labs: bool = True
+    seed: Optional[int] = None
+    lab_name_prefix: str = "SH"
+
+
+@dataclass
+class HalvingTrial:
+    """
+    One sampled parameter set and its scores.
+
+    Attributes:
+        parameters: Parameter key -> fixed value
+        lab_id: Cloned lab that runs this parameter set
+        scores: Window length in seconds -> lab ROI on that window
+        error_message: Last execution error, if any
+    """
+    parameters: Dict[str, str]
+    lab_id: Optional[str] = None
+    scores: Dict[int, float] = field(default_factory=dict)
+    error_message: Optional[str] = None
+
+    @property
+    def window(self) -> int:
+        """Longest window this parameter set was scored on"""
+        return max(self.scores) if self.scores else 0
+
+    @property
+    def score(self) -> float:
+        """Score on the longest window, -inf when never scored"""
+        return self.scores[self.window] if self.scores else float('-inf')
+
+
+@dataclass
+class HalvingResult:
+    """
+    Result of a successive halving run.
+
+    Attributes:
+        success: Whether a best parameter set was found
+        lab_id: Source lab ID
+        best_parameters: Best parameter set on the longest window
+        best_score: ROI of the best parameter set on the longest window
+        best_lab_id: Cloned lab holding the best parameter set
+        backtests_used: Backtests executed
+        budget: Backtest budget
+        search_space_size: Parameter sets in the generated ranges
+        trials: All sampled parameter sets, best first
+        rungs: Per rung: bracket, window_days, trials and kept
+        error_message: Error message if the run failed
+    """
+    success: bool
+    lab_id: str
+    best_parameters: Dict[str, str] = field(default_factory=dict)
+    best_score: float = 0.0
+    best_lab_id: Optional[str] = None
+    backtests_used: int = 0
+    budget: int = 0
+    search_space_size: int = 0
+    trials: List[HalvingTrial] = field(default_factory=list)
+    rungs: List[Dict[str, Any]] = field(default_factory=list)
+    error_message: Optional[str] = None
+
+
+def rung_windows(min_window_days: float, max_window_days: float, eta: int) -> List[int]:
+    """
+    Window lengths in seconds, each eta times the previous, ending at max_window_days.
+
+    The first window is the shortest one that is at least min_window_days.
+    """
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    if not 0 < min_window_days <= max_window_days:
+        raise ValueError("Windows must satisfy 0 < min_window_days <= max_window_days")
+    rungs = int(math.floor(math.log(max_window_days / min_window_days, eta) + 1e-9)) + 1
+    return [int(max_window_days * _DAY / eta ** (rungs - 1 - i)) for i in range(rungs)]
+
+
+def plan_rungs(budget: int, rungs: int, eta: int, max_candidates: Optional[int] = None) -> List[int]:
+    """
+    Parameter sets per rung so that the whole run fits in the budget.
+
+    Args:
+        budget: Backtests available
+        rungs: Number of rungs
+        eta: Reduction factor between rungs
+        max_candidates: Upper bound for the first rung (the search space size)
+
+    Returns:
+        Number of parameter sets evaluated in each rung
+    """
+    first = int(budget / sum(eta ** -i for i in range(rungs)))
+    if max_candidates is not None:
+        first = min(first, max_candidates)
+    while first > 0:
+        counts = [max(1, first // eta ** i) for i in range(rungs)]
+        if sum(counts) <= budget:
+            return counts
+        first -= 1
+    return []
+
+
+class SuccessiveHalvingOptimizer:
+    """
+    Searches lab parameter ranges with successive halving under a backtest budget.
+    """
+
+    def __init__(self, executor: SyncExecutor[Authenticated], config: Optional[SuccessiveHalvingConfig] = None):
+        """
+        Initialize the optimizer.
+
+        Args:
+            executor: Authenticated HaasOnline API executor
+            config: Halving configuration (uses defaults if None)
+        """
+        self.executor = executor
+        self.config = config or SuccessiveHalvingConfig()
+        if self.config.max_concurrent_labs < 1:
+            raise ValueError("max_concurrent_labs must be at least 1")
+        self.parameter_optimizer = LabParameterOptimizer(executor)
+        self.scheduler = LabExecutionScheduler(executor, LabSchedulerConfig(
+            min_interval=self.config.poll_interval,
+            max_interval=max(self.config.poll_interval, LabSchedulerConfig.max_interval)
+        ))
+        self._lock = threading.Lock()
+        self._backtests_used = 0
+
+    @property
+    def backtests_used(self) -> int:
+        """Lab executions started since the last optimize() call"""
+        return self._backtests_used
+
+    def optimize(
+        self,
+        lab_id: str,
+        optimization_config: Optional[OptimizationConfig] = None,
+        end_unix: Optional[int] = None
+    ) -> HalvingResult:
+        """
+        Find the best parameter set of a lab within the backtest budget.
+
+        Args:
+            lab_id: Source lab whose script, market and parameters are searched
+            optimization_config: Range generation settings; max_combinations is
+                not enforced because the ranges are sampled, not searched exhaustively
+            end_unix: End of every backtest window (defaults to now)
+
+        Returns:
+            HalvingResult with the best parameter set and all trials
+        """
+        config = self.config
+        end_unix = end_unix or int(datetime.now().timestamp())
+        self._backtests_used = 0
+        trials: List[HalvingTrial] = []
+
+        try:
+            source_lab = api.get_lab_details(self.executor, lab_id)
+            space, fixed = self.search_space(source_lab, optimization_config or OptimizationConfig())
+            space_size = math.prod(len(options) for _, options in space)
+            windows = rung_windows(config.min_window_days, config.max_window_days, config.eta)
+
+            rng = random.Random(config.seed)
+            if config.hyperband:
+                brackets = [windows[start:] for start in range(len(windows))]
+            else:
+                brackets = [windows]
+
+            rungs = []
+            remaining = config.max_backtests
+            for index, bracket in enumerate(brackets):
+                bracket_budget = remaining // (len(brackets) - index)
+                counts = plan_rungs(bracket_budget, len(bracket), config.eta, space_size)
+                if not counts:
+                    log.warning(f"⚠️ Bracket {index} skipped: {bracket_budget} backtests cannot cover "
+                                f"{len(bracket)} rungs")
+                    continue
+                log.info(f"🔧 Bracket {index}: {counts} parameter sets over windows "
+                         f"{[round(w / _DAY, 1) for w in bracket]} days")
+                bracket_trials = [HalvingTrial(parameters={**fixed, **candidate})
+                                  for candidate in self._sample(space, counts[0], rng)]
+                trials.extend(bracket_trials)
+                rungs.extend(self._run_bracket(source_lab, index, bracket_trials, bracket, counts, end_unix))
+                remaining = config.max_backtests - self._backtests_used
+
+            if not trials:
+                raise ValueError(f"Budget of {config.max_backtests} backtests is too small for "
+                                 f"{len(windows)} rungs")
+
+            # Only parameter sets that reached the final window are comparable
+            final_window = windows[-1]
+            trials.sort(key=lambda t: (t.window == final_window, t.score), reverse=True)
+            best = trials[0]
+            if best.window != final_window:
+                raise ValueError("No parameter set completed the final window")
+
+            self.cleanup(trials, keep=best)
+            log.info(f"✅ Best parameters {best.parameters} scored {best.score:.2f} using "
+                     f"{self._backtests_used}/{config.max_backtests} backtests (search space {space_size:,})")
+            return HalvingResult(
+                success=True,
+                lab_id=lab_id,
+                best_parameters=dict(best.parameters),
+                best_score=best.score,
+                best_lab_id=best.lab_id,
+                backtests_used=self._backtests_used,
+                budget=config.max_backtests,
+                search_space_size=space_size,
+                trials=trials,
+                rungs=rungs
+            )
+
+        except Exception as e:
+            log.error(f"Successive halving failed: {e}")
+            self.cleanup(trials)
+            return HalvingResult(
+                success=False,
+                lab_id=lab_id,
+                backtests_used=self._backtests_used,
+                budget=config.max_backtests,
+                trials=trials,
+                error_message=str(e)
+            )
+        finally:
+            self.scheduler.close()
+
+    def search_space(
+        self,
+        source_lab: Any,
+        optimization_config: OptimizationConfig
+    ) -> Tuple[List[Tuple[str, List[str]]], Dict[str, str]]:
+        """Split the generated ranges into searched parameters and fixed values"""
+        parameters = self.parameter_optimizer._generate_optimized_parameters(
+            source_lab.parameters, optimization_config
+        )
+        space, fixed = [], {}
+        for param in parameters:
+            options = [str(option) for option in param.get('O', [])]
+            if not options:
+                continue
+            if param.get('I', False) and len(options) > 1:
+                space.append((param['K'], options))
+            else:
+                fixed[param['K']] = options[0]
+        if not space:
+            raise ValueError("Lab has no parameters with more than one option to search")
+        return space, fixed
+
+    @staticmethod
+    def _sample(space: List[Tuple[str, List[str]]], count: int, rng: random.Random) -> List[Dict[str, str]]:
+        """Sample distinct parameter sets without enumerating large spaces"""
+        names = [name for name, _ in space]
+        space_size = math.prod(len(options) for _, options in space)
+        if count >= space_size:
+            combinations = itertools.product(*(options for _, options in space))
+            return [dict(zip(names, values)) for values in combinations]
+
+        seen = set()
+        while len(seen) < count:
+            seen.add(tuple(rng.randrange(len(options)) for _, options in space))
+        return [{name: space[i][1][index] for i, (name, index) in enumerate(zip(names, indexes))}
+                for indexes in sorted(seen)]
+
+    def _run_bracket(
+        self,
+        source_lab: Any,
+        bracket: int,
+        trials: List[HalvingTrial],
+        windows: List[int],
+        counts: List[int],
+        end_unix: int
+    ) -> List[Dict[str, Any]]:
+        """Evaluate trials rung by rung, keeping the best ones for longer windows"""
+        rungs = []
+        survivors = trials
+        for rung, window in enumerate(windows):
+            survivors = survivors[:counts[rung]]
+            with ThreadPoolExecutor(max_workers=self.config.max_concurrent_labs) as pool:
+                list(pool.map(lambda trial: self.evaluate(source_lab, trial, window, end_unix), survivors))
+
+            # Failed parameter sets are dropped rather than retried on longer windows
+            survivors = sorted((t for t in survivors if window in t.scores), key=lambda t: t.scores[window], reverse=True)
+            kept = counts[rung + 1] if rung + 1 < len(counts) else 1
+            rungs.append({
+                'bracket': bracket,
+                'window_days': round(window / _DAY, 2),
+                'trials': len(survivors),
+                'kept': min(kept, len(survivors)),
+                'best_score': survivors[0].scores.get(window) if survivors else None
+            })
+            log.info(f"🔍 Bracket {bracket} rung {rung}: {len(survivors)} parameter sets on "
+                     f"{window / _DAY:.1f} days, best {rungs[-1]['best_score']}")
+        return rungs
+
+    def evaluate(self, source_lab: Any, trial: HalvingTrial, window: int, end_unix: int) -> None:
+        """Run one parameter set on one window and record its lab ROI"""
+        try:
+            if trial.lab_id is None:
+                lab = api.clone_lab(self.executor, source_lab.lab_id,
+                                    f"{self.config.lab_name_prefix} {source_lab.name}")
+                for param in lab.parameters:
+                    if isinstance(param, dict) and param.get('K') in trial.parameters:
+                        param['O'] = [trial.parameters[param['K']]]
+                        param['I'] = False
+                lab = api.update_lab_details(self.executor, lab)
+                trial.lab_id = lab.lab_id
+
+            response = api.start_lab_execution(
+                self.executor,
+                StartLabExecutionRequest(lab_id=trial.lab_id, start_unix=end_unix - window,
+                                         end_unix=end_unix, send_email=False)
+            )
+            if isinstance(response, dict) and response.get('Success') is False:
+                raise RuntimeError(f"Failed to start lab {trial.lab_id}: {response.get('Error', response)}")
+            with self._lock:
+                self._backtests_used += 1
+
+            completion = self.scheduler.wait_sync(trial.lab_id, timeout=self.config.execution_timeout)
+            if not completion.completed:
+                raise RuntimeError(f"Lab {trial.lab_id} was cancelled: {completion.message or 'no reason given'}")
+            backtests = fetch_all_lab_backtests(self.executor, trial.lab_id)
+            if not backtests:
+                raise RuntimeError(f"Lab {trial.lab_id} produced no backtests")
+            trial.scores[window] = max(self._lab_roi(backtest) for backtest in backtests)
+
+        except Exception as e:
+            trial.error_message = str(e)
+            log.warning(f"⚠️ Parameter set {trial.parameters} failed on {window / _DAY:.1f} days: {e}")
+
+    def cleanup(self, trials: List[HalvingTrial], keep: Optional[HalvingTrial] = None) -> None:
+        """Delete the labs of trials other than keep, if delete_labs is set"""
+        if not self.config.delete_labs:
+            return
+        for trial in trials:
+            if trial.lab_id and trial is not keep:
+                try:
+                    api.delete_lab(self.executor, trial.lab_id)
+                except Exception as e:
+                    log.warning(f"⚠️ Could not delete lab {trial.lab_id}: {e}")
+
+    @staticmethod
+    def _lab_roi(backtest: Any) -> float:
+        summary = getattr(backtest, 'summary', None)
+        try:
+            return float(getattr(summary, 'ReturnOnInvestment', 0.0) or 0.0)
+        except (TypeError, ValueError):
+            return 0.0
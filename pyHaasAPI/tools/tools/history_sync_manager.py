@@ -6,23 +6,30 @@ Automate and monitor history sync for any list of markets.
 
 Features:
 - Accepts markets via CLI or file
-- Triggers sync (GET_CHART) and sets desired history depth
-- Monitors sync status and reports progress
+- Sets the desired history depth (SET_HISTORY_DEPTH) and waits until markets are synched
+- Keeps --concurrency markets syncing at once, polling all their statuses in one request per round
+- Persists progress to --state-file; rerunning after an interruption resumes where it stopped
+- Syncs requested markets again if they finished in an earlier run or --months changed; --fresh discards saved progress
 - Prints summary table and can write results to JSON
 
 Usage:
     python -m tools.history_sync_manager --markets "BINANCE_BTC_USDT_,BINANCE_ETH_USDT_" --months 36
-    python -m tools.history_sync_manager --markets-file markets.txt --months 24 --interval 10 --timeout 300 --output results.json
+    python -m tools.history_sync_manager --markets-file markets.txt --months 24 --concurrency 16 --interval 10 --timeout 1800 --output results.json
 
 See also:
 - docs/lab_workflows.md
 - examples/bulk_set_history_depth.py
+- pyHaasAPI/history_sync.py
 """
 import argparse
-import time
+import asyncio
 import json
+from dataclasses import asdict
 from config import settings
 from pyHaasAPI import api
+from pyHaasAPI.history_sync import HistorySyncConfig, HistorySyncPipeline
+
+SERVER = "default"
 
 def parse_markets_from_file(path):
     with open(path, 'r') as f:
@@ -33,8 +40,11 @@ def main():
     parser.add_argument('--markets', type=str, help='Comma-separated list of market tags (e.g., "BINANCE_BTC_USDT_,BINANCE_ETH_USDT_")')
     parser.add_argument('--markets-file', type=str, help='File with one market tag per line')
     parser.add_argument('--months', type=int, default=36, help='Desired history depth in months (default: 36)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Markets syncing at once (default: 8)')
     parser.add_argument('--interval', type=int, default=5, help='Polling interval in seconds (default: 5)')
-    parser.add_argument('--timeout', type=int, default=300, help='Max wait time per market in seconds (default: 300)')
+    parser.add_argument('--timeout', type=int, default=1800, help='Max wait time per market in seconds (default: 1800)')
+    parser.add_argument('--state-file', type=str, default='history_sync_state.json', help='Progress file used to resume (default: history_sync_state.json)')
+    parser.add_argument('--fresh', action='store_true', help='Discard progress saved in --state-file before syncing')
     parser.add_argument('--output', type=str, help='Write summary results to JSON file')
     args = parser.parse_args()
 
@@ -44,12 +54,6 @@ def main():
         markets = [m.strip() for m in args.markets.split(',') if m.strip()]
     elif args.markets_file:
         markets = parse_markets_from_file(args.markets_file)
-    else:
-        print("No markets specified! Use --markets or --markets-file.")
-        return
-
-    print(f"Markets to sync: {markets}")
-    print(f"Desired history depth: {args.months} months")
 
     executor = api.RequestsExecutor(
         host=settings.API_HOST,
@@ -60,59 +64,52 @@ def main():
         password=settings.API_PASSWORD
     )
 
-    results = []
-    for market in markets:
-        print(f"\n---\nProcessing market: {market}")
-        # Trigger GET_CHART to initiate sync
-        try:
-            api.get_chart(executor, market, interval=15, style=301)
-        except Exception as e:
-            print(f"GET_CHART error: {e}")
-
-        # Poll until the market appears and is synched
-        waited = 0
-        info = None
-        while True:
-            history_status = api.get_history_status(executor)
-            info = history_status.get(market)
-            if info and info.get("Status") == 3:
-                print(f"Market {market} is synched (Status 3). Proceeding to set history depth...")
-                break
-            print(f"Waiting for {market} to be synched... (current status: {info})")
-            time.sleep(args.interval)
-            waited += args.interval
-            if waited >= args.timeout:
-                print(f"Timed out waiting for {market} to be synched.")
-                break
+    config = HistorySyncConfig(
+        months=args.months,
+        max_syncing_per_server=args.concurrency,
+        poll_interval=args.interval,
+        market_timeout=args.timeout
+    )
+    pipeline = HistorySyncPipeline({SERVER: executor}, args.state_file, config)
+    if args.fresh and pipeline.states:
+        print(f"Discarding {len(pipeline.states)} markets saved in {args.state_file}")
+        pipeline.clear()
+    previous = {key: state.status for key, state in pipeline.states.items()}
+    queued = {state.key for state in pipeline.add((SERVER, market) for market in markets)}
+    unfinished = [state.market_tag for key, state in pipeline.states.items()
+                  if not state.finished and key not in queued]
+    if not markets and not unfinished:
+        pipeline.close()
+        print("No markets specified! Use --markets or --markets-file.")
+        return
 
-        # Set history depth if synched
-        set_result = None
-        if info and info.get("Status") == 3:
-            set_result = api.set_history_depth(executor, market, args.months)
-            if set_result:
-                print(f"✅ Set history depth to {args.months} months for {market}")
-            else:
-                print(f"❌ Failed to set history depth for {market}")
-        else:
-            print(f"Skipping set_history_depth for {market} (not synched)")
+    print(f"Markets to sync: {markets}")
+    again = [key for key in queued if key in previous]
+    if again:
+        print(f"Syncing {len(again)} markets from {args.state_file} again (finished earlier or --months changed)")
+    if unfinished:
+        print(f"Resuming {len(unfinished)} unfinished markets from {args.state_file} (use --fresh to start over)")
+    print(f"Desired history depth: {args.months} months, {args.concurrency} markets at once")
 
-        # Record result
-        results.append({
-            "market": market,
-            "final_status": info,
-            "set_history_depth": set_result
-        })
+    try:
+        states = asyncio.run(pipeline.run())
+    finally:
+        pipeline.close()
+    # Only report the markets of this run
+    states = {key: state for key, state in states.items() if key in queued or state.market_tag in unfinished}
 
     # Print summary
     print("\n=== History Sync Summary ===")
-    for r in results:
-        print(f"{r['market']}: Status={r['final_status']}, SetHistoryDepth={r['set_history_depth']}")
+    for state in states.values():
+        print(f"{state.market_tag}: {state.status}, Status={state.last_status}, SetHistoryDepth={state.depth_set}"
+              + (f", Error={state.error_message}" if state.error_message else ""))
+    print(pipeline.summary())
 
     # Optionally write to JSON
     if args.output:
         with open(args.output, 'w') as f:
-            json.dump(results, f, indent=2)
+            json.dump([asdict(state) for state in states.values()], f, indent=2)
         print(f"Results written to {args.output}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -21,6 +21,14 @@ from .extraction import (
     TradeData
 )
 
+from .neighborhood import (
+    ParameterNeighborhoodIndex,
+    NeighborhoodConfig,
+    NeighborhoodStability,
+    extract_parameter_vector,
+    score_backtests
+)
+
 __all__ = [
     # Metrics
     'RunMetrics',
@@ -33,4 +41,11 @@ __all__ = [
     'BacktestDataExtractor',
     'BacktestSummary',
     'TradeData',
+    
+    # Parameter-neighborhood stability
+    'ParameterNeighborhoodIndex',
+    'NeighborhoodConfig',
+    'NeighborhoodStability',
+    'extract_parameter_vector',
+    'score_backtests',
 ]
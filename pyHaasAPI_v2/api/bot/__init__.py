@@ -5,7 +5,10 @@ Provides comprehensive bot management functionality.
 """
 
 from .bot_api import BotAPI
+from .bot_registry import BotRegistry, BotDelta
 
 __all__ = [
     "BotAPI",
+    "BotRegistry",
+    "BotDelta",
 ]
\ No newline at end of file
@@ -28,6 +28,8 @@ class BotAPI:
         self.client = client
         self.auth_manager = auth_manager
         self.logger = get_logger("bot_api")
+        # Optional BotRegistry serving the get_bots_by_* queries from memory
+        self.registry = None
     
     async def create_bot(
         self,
@@ -640,19 +642,25 @@ class BotAPI:
             raise BotError(f"Failed to cancel all bot orders: {e}") from e
     
     # Additional utility methods
+    #
+    # With a BotRegistry attached these are served from its indexes, refreshing
+    # the registry only when its snapshot is older than its max_age.
     
     async def get_bots_by_status(self, status: str) -> List[BotDetails]:
         """
         Get bots filtered by status
         
         Args:
-            status: Bot status to filter by
+            status: Bot status to filter by (case-insensitive)
             
         Returns:
             List of BotDetails objects with the specified status
         """
+        if self.registry is not None:
+            await self.registry.ensure_fresh()
+            return self.registry.by_status(status)
         all_bots = await self.get_all_bots()
-        return [bot for bot in all_bots if bot.status == status]
+        return [bot for bot in all_bots if bot.status.upper() == status.upper()]
     
     async def get_bots_by_account(self, account_id: str) -> List[BotDetails]:
         """
@@ -664,6 +672,9 @@ class BotAPI:
         Returns:
             List of BotDetails objects assigned to the specified account
         """
+        if self.registry is not None:
+            await self.registry.ensure_fresh()
+            return self.registry.by_account(account_id)
         all_bots = await self.get_all_bots()
         return [bot for bot in all_bots if bot.account_id == account_id]
     
@@ -672,13 +683,32 @@ class BotAPI:
         Get bots filtered by market
         
         Args:
-            market: Market to filter by
+            market: Market tag to filter by
             
         Returns:
             List of BotDetails objects trading the specified market
         """
+        if self.registry is not None:
+            await self.registry.ensure_fresh()
+            return self.registry.by_market(market)
         all_bots = await self.get_all_bots()
-        return [bot for bot in all_bots if bot.market == market]
+        return [bot for bot in all_bots if bot.market_tag == market]
+    
+    async def get_bots_by_script(self, script_id: str) -> List[BotDetails]:
+        """
+        Get bots filtered by script
+        
+        Args:
+            script_id: Script ID to filter by
+            
+        Returns:
+            List of BotDetails objects running the specified script
+        """
+        if self.registry is not None:
+            await self.registry.ensure_fresh()
+            return self.registry.by_script(script_id)
+        all_bots = await self.get_all_bots()
+        return [bot for bot in all_bots if bot.script_id == script_id]
     
     async def get_active_bots(self) -> List[BotDetails]:
         """
@@ -0,0 +1,240 @@
+"""
+Bot registry for pyHaasAPI v2
+
+Every filtered bot query (by status, account or market) used to download the
+full GET_BOTS list and filter it. The registry keeps the list in memory:
+- Secondary indexes by status, account, market and script
+- Refreshes from GET_BOTS on a schedule, or on demand when older than max_age
+- Computes the delta of each refresh (added, removed and changed bots) and
+  passes it to subscribers, so they only process what changed
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Callable, Set, Tuple
+
+from ...core.logging import get_logger
+from ...models.bot import BotDetails
+
+logger = get_logger("bot_registry")
+
+# Secondary index name -> bot attribute
+INDEXED_FIELDS = {
+    "status": "status",
+    "account": "account_id",
+    "market": "market_tag",
+    "script": "script_id",
+}
+
+
+def _index_value(bot: Any, attribute: str) -> Any:
+    value = getattr(bot, attribute, None)
+    return value.upper() if attribute == "status" and isinstance(value, str) else value
+
+
+def _fingerprint(bot: Any) -> Dict[str, Any]:
+    if hasattr(bot, "model_dump"):
+        return bot.model_dump()
+    return dict(vars(bot))
+
+
+@dataclass
+class BotDelta:
+    """Changes between two bot snapshots"""
+    added: List[BotDetails] = field(default_factory=list)
+    removed: List[BotDetails] = field(default_factory=list)
+    changed: List[Tuple[BotDetails, BotDetails]] = field(default_factory=list)  # (before, after)
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def summary(self) -> Dict[str, int]:
+        return {"added": len(self.added), "removed": len(self.removed), "changed": len(self.changed)}
+
+
+class BotRegistry:
+    """
+    In-memory registry of all bots with delta notifications
+
+    Usage:
+        registry = BotRegistry(bot_api, refresh_interval=30.0)
+        registry.subscribe(on_delta)  # Called with a BotDelta after each non-empty refresh
+        await registry.start()
+        active = registry.by_status("ACTIVE")
+        ...
+        await registry.stop()
+
+    Attaching the registry to the BotAPI (bot_api.registry = registry) makes
+    its get_bots_by_* methods query the registry.
+    """
+
+    def __init__(self, bot_api, refresh_interval: float = 30.0, max_age: Optional[float] = None):
+        """
+        Args:
+            bot_api: BotAPI used to fetch GET_BOTS
+            refresh_interval: Seconds between scheduled refreshes
+            max_age: Seconds a snapshot serves queries before ensure_fresh() refetches
+                (defaults to refresh_interval)
+        """
+        self.bot_api = bot_api
+        self.refresh_interval = refresh_interval
+        self.max_age = refresh_interval if max_age is None else max_age
+        self.bots: Dict[str, BotDetails] = {}
+        self.last_refresh: Optional[float] = None
+        self.refresh_count = 0
+        self._fingerprints: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {name: {} for name in INDEXED_FIELDS}
+        self._subscribers: List[Callable[[BotDelta], Any]] = []
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # Subscriptions
+
+    def subscribe(self, callback: Callable[[BotDelta], Any]) -> Callable[[], None]:
+        """
+        Call back (sync or async) with every non-empty delta.
+
+        Returns:
+            Function that removes the subscription
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    async def _notify(self, delta: BotDelta) -> None:
+        for callback in list(self._subscribers):
+            try:
+                result = callback(delta)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Bot registry subscriber failed: {e}")
+
+    # Refreshing
+
+    async def refresh(self) -> BotDelta:
+        """Fetch GET_BOTS, apply the delta to the indexes and notify subscribers"""
+        async with self._refresh_lock:
+            delta = await self._fetch()
+        await self._publish(delta)
+        return delta
+
+    async def ensure_fresh(self, max_age: Optional[float] = None) -> None:
+        """Refresh unless the snapshot is younger than max_age; concurrent callers share one fetch"""
+        max_age = self.max_age if max_age is None else max_age
+        if self.is_fresh(max_age):
+            return
+        requested = time.time()
+        async with self._refresh_lock:
+            # Another caller refreshed while this one waited for the lock
+            if self.last_refresh is not None and self.last_refresh >= requested:
+                return
+            delta = await self._fetch()
+        await self._publish(delta)
+
+    async def _fetch(self) -> BotDelta:
+        bots = await self.bot_api.get_all_bots()
+        delta = self._apply(bots)
+        self.last_refresh = time.time()
+        self.refresh_count += 1
+        return delta
+
+    async def _publish(self, delta: BotDelta) -> None:
+        if not delta.is_empty:
+            logger.debug(f"Bot registry delta: {delta.summary()}")
+            await self._notify(delta)
+
+    def is_fresh(self, max_age: Optional[float] = None) -> bool:
+        max_age = self.max_age if max_age is None else max_age
+        return self.last_refresh is not None and time.time() - self.last_refresh < max_age
+
+    async def start(self) -> None:
+        """Refresh now and then every refresh_interval seconds in the background"""
+        if self._task is None or self._task.done():
+            await self.refresh()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Bot registry refresh failed: {e}")
+
+    def _apply(self, bots: List[BotDetails]) -> BotDelta:
+        delta = BotDelta()
+        seen = set()
+        for bot in bots:
+            seen.add(bot.bot_id)
+            fingerprint = _fingerprint(bot)
+            before = self.bots.get(bot.bot_id)
+            if before is None:
+                delta.added.append(bot)
+            elif fingerprint != self._fingerprints[bot.bot_id]:
+                delta.changed.append((before, bot))
+                self._unindex(before)
+            else:
+                continue
+            self.bots[bot.bot_id] = bot
+            self._fingerprints[bot.bot_id] = fingerprint
+            self._index(bot)
+
+        for bot_id in [bot_id for bot_id in self.bots if bot_id not in seen]:
+            before = self.bots.pop(bot_id)
+            del self._fingerprints[bot_id]
+            self._unindex(before)
+            delta.removed.append(before)
+        return delta
+
+    def _index(self, bot: BotDetails) -> None:
+        for name, attribute in INDEXED_FIELDS.items():
+            self._indexes[name].setdefault(_index_value(bot, attribute), set()).add(bot.bot_id)
+
+    def _unindex(self, bot: BotDetails) -> None:
+        for name, attribute in INDEXED_FIELDS.items():
+            value = _index_value(bot, attribute)
+            bot_ids = self._indexes[name].get(value)
+            if bot_ids is not None:
+                bot_ids.discard(bot.bot_id)
+                if not bot_ids:
+                    del self._indexes[name][value]
+
+    # Queries
+
+    def _lookup(self, index: str, value: Any) -> List[BotDetails]:
+        return [self.bots[bot_id] for bot_id in sorted(self._indexes[index].get(value, ()))]
+
+    def get(self, bot_id: str) -> Optional[BotDetails]:
+        return self.bots.get(bot_id)
+
+    def all(self) -> List[BotDetails]:
+        return list(self.bots.values())
+
+    def by_status(self, status: str) -> List[BotDetails]:
+        return self._lookup("status", status.upper())
+
+    def by_account(self, account_id: str) -> List[BotDetails]:
+        return self._lookup("account", account_id)
+
+    def by_market(self, market_tag: str) -> List[BotDetails]:
+        return self._lookup("market", market_tag)
+
+    def by_script(self, script_id: str) -> List[BotDetails]:
+        return self._lookup("script", script_id)
+
+    def counts(self, index: str) -> Dict[Any, int]:
+        """Number of bots per value of an index, e.g. counts("account")"""
+        return {value: len(bot_ids) for value, bot_ids in self._indexes[index].items()}
@@ -100,6 +100,7 @@ class BotDetails(BaseModel):
     configuration: BotConfiguration = Field(description="Bot configuration")
     status: str = Field(description="Bot status")
     is_active: bool = Field(alias="isActive", default=False, description="Whether bot is active")
+    notes: Optional[str] = Field(default=None, description="Bot notes")
     created_at: Optional[datetime] = Field(alias="createdAt", default=None, description="Creation timestamp")
     updated_at: Optional[datetime] = Field(alias="updatedAt", default=None, description="Last update timestamp")
     
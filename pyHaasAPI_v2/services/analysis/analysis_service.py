@@ -23,6 +23,7 @@ from ...core.logging import get_logger
 from ...models.backtest import BacktestResult, BacktestRuntimeData
 from ...analysis.metrics import RunMetrics, compute_metrics, calculate_risk_score, calculate_stability_score
 from ...analysis.extraction import BacktestDataExtractor, BacktestSummary, TradeData
+from ...analysis.neighborhood import NeighborhoodConfig, score_backtests
 from ...config.analysis_config import get_analysis_config, get_drawdown_policy, validate_drawdown_requirement, get_drawdown_score
 
 logger = get_logger("analysis_service")
@@ -45,6 +46,8 @@ class BacktestPerformance:
     peak_balance: float
     script_name: str
     market_tag: str
+    parameter_values: Optional[Dict[str, str]] = None
+    stability_score: Optional[float] = None  # ROI blended with neighboring parameter combinations
 
 
 @dataclass
@@ -100,6 +103,7 @@ class AnalysisService:
         self.auth_manager = auth_manager
         self.logger = get_logger("analysis_service")
         self.data_extractor = BacktestDataExtractor()
+        self.neighborhood_config = NeighborhoodConfig()
         
         # Load configuration
         self.config = get_analysis_config()
@@ -126,7 +130,7 @@ class AnalysisService:
             top_count: Number of top performers to return
             min_win_rate: Minimum win rate threshold
             min_trades: Minimum number of trades
-            sort_by: Field to sort by (roi, roe, winrate, profit, trades)
+            sort_by: Field to sort by (roi, roe, winrate, profit, trades, stability)
 
         Returns:
             LabAnalysisResult with analysis details
@@ -162,22 +166,9 @@ class AnalysisService:
                     error_message="No backtests found"
                 )
 
-            # Convert to performance objects and filter
-            performances = []
-            for backtest in all_backtests:
-                # Apply filters
-                if backtest.win_rate < min_win_rate:
-                    continue
-                if backtest.total_trades < min_trades:
-                    continue
-                
-                # CRITICAL: Validate drawdown requirements using configuration
-                if not validate_drawdown_requirement(backtest.max_drawdown, self.config):
-                    self.logger.debug(f"Rejecting backtest {backtest.backtest_id} due to drawdown policy violation: {backtest.max_drawdown}")
-                    continue
-
-                # Convert to performance object
-                performance = BacktestPerformance(
+            # Convert to performance objects
+            all_performances = [
+                BacktestPerformance(
                     backtest_id=backtest.backtest_id,
                     lab_id=lab_id,
                     generation_idx=getattr(backtest, 'generation_idx', 0),
@@ -191,8 +182,31 @@ class AnalysisService:
                     final_balance=getattr(backtest, 'final_balance', 10000.0),
                     peak_balance=getattr(backtest, 'peak_balance', 10000.0),
                     script_name=lab_details.script_name,
-                    market_tag=lab_details.market_tag
+                    market_tag=lab_details.market_tag,
+                    parameter_values=self.data_extractor.extract_parameter_values(
+                        {'parameters': getattr(backtest, 'parameters', None) or getattr(backtest, 'parameter_values', None) or {}}
+                    )
                 )
+                for backtest in all_backtests
+            ]
+
+            # Neighborhood scores use every backtest of the lab, so poor neighbors that
+            # fail the filters below still mark a lone spike as fragile
+            self.apply_stability_scores(all_performances)
+
+            # Apply filters
+            performances = []
+            for performance in all_performances:
+                if performance.win_rate < min_win_rate:
+                    continue
+                if performance.total_trades < min_trades:
+                    continue
+
+                # CRITICAL: Validate drawdown requirements using configuration
+                if not validate_drawdown_requirement(performance.max_drawdown, self.config):
+                    self.logger.debug(f"Rejecting backtest {performance.backtest_id} due to drawdown policy violation: {performance.max_drawdown}")
+                    continue
+
                 performances.append(performance)
 
             # Sort by specified field
@@ -207,6 +221,8 @@ class AnalysisService:
                 performances.sort(key=lambda x: x.realized_profits_usdt, reverse=True)
             elif sort_by == "trades":
                 performances.sort(key=lambda x: x.total_trades, reverse=True)
+            elif sort_by == "stability":
+                performances.sort(key=lambda x: x.stability_score if x.stability_score is not None else float('-inf'), reverse=True)
             else:
                 performances.sort(key=lambda x: x.roi_percentage, reverse=True)
 
@@ -579,6 +595,24 @@ class AnalysisService:
             self.logger.error(f"Failed to generate bot recommendations: {e}")
             raise AnalysisError(f"Failed to generate bot recommendations: {e}") from e
 
+    def apply_stability_scores(self, performances: List[BacktestPerformance]) -> None:
+        """
+        Set each performance's stability-adjusted score from its parameter-grid neighbors.
+
+        Args:
+            performances: Backtests of a single lab with parameter_values populated
+        """
+        scores = score_backtests(
+            performances,
+            metric=lambda x: x.roi_percentage,
+            parameters=lambda x: x.parameter_values or {},
+            config=self.neighborhood_config
+        )
+        for performance in performances:
+            stability = scores.get(performance.backtest_id)
+            if stability:
+                performance.stability_score = stability.stability_adjusted_score
+
     def _calculate_recommendation_score(self, performance: BacktestPerformance) -> float:
         """Calculate recommendation score for a backtest performance"""
         try:
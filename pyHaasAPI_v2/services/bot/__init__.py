@@ -5,5 +5,8 @@ This module provides business logic for bot management.
 """
 
 from .bot_service import BotService, BotCreationResult, MassBotCreationResult, BotValidationResult
+from .bulk_creation import BulkBotCreator, PlannedBot, bot_idempotency_key
+from .account_allocation import AccountAllocationIndex
 
-__all__ = ["BotService", "BotCreationResult", "MassBotCreationResult", "BotValidationResult"]
\ No newline at end of file
+__all__ = ["BotService", "BotCreationResult", "MassBotCreationResult", "BotValidationResult",
+           "BulkBotCreator", "PlannedBot", "bot_idempotency_key", "AccountAllocationIndex"]
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""
+Account allocation index for pyHaasAPI v2
+
+Selecting an account per bot through AccountAPI.get_available_binancefutures_account
+lists all accounts and all bots again for every bot. The allocation index is
+built from one snapshot of both and answers every later selection locally:
+- Accounts are grouped by exchange and market type (spot or futures)
+- Each group keeps its accounts ordered by load (bots plus reservations)
+- Reservations are keyed by the planned bot, so the same plan always gets the
+  same account
+- reconcile() folds a fresh bot snapshot back in after the bots were created
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from ...core.logging import get_logger
+
+logger = get_logger("account_allocation")
+
+SPOT = "spot"
+FUTURES = "futures"
+
+
+def account_market_type(exchange: str, account_type: Optional[str] = None) -> str:
+    """Market type an account trades: futures for futures exchanges or account types, else spot"""
+    text = f"{exchange or ''} {account_type or ''}".upper()
+    return FUTURES if "FUTURE" in text or "PERPETUAL" in text else SPOT
+
+
+@dataclass
+class AccountSlot:
+    """Allocation state of one account"""
+    account_id: str
+    exchange: str
+    market_type: str
+    bots: int = 0  # Bots on the account in the last snapshot
+    reservations: Dict[str, Optional[str]] = field(default_factory=dict)  # Key -> created bot ID
+
+    @property
+    def load(self) -> int:
+        return self.bots + len(self.reservations)
+
+
+class AccountAllocationIndex:
+    """
+    In-memory index of free and loaded accounts
+
+    Usage:
+        index = await AccountAllocationIndex.build(account_api, bot_api)
+        account_id = index.reserve(plan_key, exchange="BINANCEFUTURES", exclusive=True)
+        index.confirm(plan_key, bot_id)
+        index.reconcile(await bot_api.get_all_bots())
+
+    Selections run on the event loop without awaiting, so a reservation can
+    never be handed out twice.
+    """
+
+    def __init__(self, accounts: Iterable[Any] = (), bots: Iterable[Any] = ()):
+        """
+        Args:
+            accounts: AccountDetails (or objects with account_id, exchange and account_type)
+            bots: BotDetails (or objects with bot_id and account_id)
+        """
+        self.slots: Dict[str, AccountSlot] = {}
+        self._keys: Dict[str, str] = {}  # Reservation key -> account ID
+        # Per (exchange, market type): heap of (load, account ID) and heap of unreserved (bots, account ID)
+        self._loaded: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        self._unreserved: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+
+        for account in accounts:
+            exchange = (getattr(account, 'exchange', '') or '').upper()
+            self.slots[account.account_id] = AccountSlot(
+                account_id=account.account_id,
+                exchange=exchange,
+                market_type=account_market_type(exchange, getattr(account, 'account_type', None))
+            )
+        self._count_bots(bots)
+        for slot in self.slots.values():
+            self._push(slot)
+
+    @classmethod
+    async def build(cls, account_api, bot_api) -> "AccountAllocationIndex":
+        """Index built from one account and one bot listing"""
+        index = cls(await account_api.get_accounts(), await bot_api.get_all_bots())
+        logger.info(f"Account index: {len(index.slots)} accounts, {index.free_count()} free")
+        return index
+
+    def _count_bots(self, bots: Iterable[Any]) -> Dict[str, List[str]]:
+        bot_ids: Dict[str, List[str]] = {}
+        for bot in bots:
+            if bot.account_id in self.slots:
+                bot_ids.setdefault(bot.account_id, []).append(bot.bot_id)
+        for slot in self.slots.values():
+            slot.bots = len(bot_ids.get(slot.account_id, []))
+        return bot_ids
+
+    def _push(self, slot: AccountSlot) -> None:
+        group = (slot.exchange, slot.market_type)
+        heapq.heappush(self._loaded.setdefault(group, []), (slot.load, slot.account_id))
+        if not slot.reservations:
+            heapq.heappush(self._unreserved.setdefault(group, []), (slot.bots, slot.account_id))
+
+    def _top(self, heap: List[Tuple[int, str]], exclusive: bool) -> Optional[Tuple[int, str]]:
+        # Entries are not updated in place; drop the ones a later change superseded
+        while heap:
+            load, account_id = heap[0]
+            slot = self.slots[account_id]
+            if exclusive and not slot.reservations and slot.bots == load:
+                return heap[0]
+            if not exclusive and slot.load == load:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def reserve(self, key: str, exchange: Optional[str] = None, market_type: Optional[str] = None,
+                exclusive: bool = False) -> Optional[str]:
+        """
+        Reserve the least loaded account for a planned bot.
+
+        Args:
+            key: Planned bot (e.g. its idempotency key); a reserved key returns its account again
+            exchange: Only accounts of this exchange
+            market_type: Only SPOT or FUTURES accounts
+            exclusive: Skip accounts already reserved for another bot
+
+        Returns:
+            Account ID, or None if no account matches
+        """
+        if key in self._keys:
+            return self._keys[key]
+        heaps = self._unreserved if exclusive else self._loaded
+        best = None
+        for (group_exchange, group_type), heap in heaps.items():
+            if (exchange and group_exchange != exchange.upper()) or (market_type and group_type != market_type):
+                continue
+            top = self._top(heap, exclusive)
+            if top and (best is None or top < best):
+                best = top
+        if best is None:
+            return None
+        slot = self.slots[best[1]]
+        slot.reservations[key] = None
+        self._keys[key] = slot.account_id
+        self._push(slot)
+        return slot.account_id
+
+    def hold(self, key: str, account_id: str) -> None:
+        """Record a reservation made earlier, e.g. by a resumed bulk creation plan"""
+        slot = self.slots.get(account_id)
+        if slot is not None and key not in self._keys:
+            slot.reservations[key] = None
+            self._keys[key] = account_id
+            self._push(slot)
+
+    def confirm(self, key: str, bot_id: str) -> None:
+        """Record the bot created for a reservation"""
+        account_id = self._keys.get(key)
+        if account_id:
+            self.slots[account_id].reservations[key] = bot_id
+
+    def release(self, key: str) -> None:
+        """Give up a reservation whose bot will not be created"""
+        account_id = self._keys.pop(key, None)
+        if account_id:
+            self.slots[account_id].reservations.pop(key, None)
+            self._push(self.slots[account_id])
+
+    def reconcile(self, bots: Iterable[Any], release_unconfirmed: bool = False) -> Dict[str, int]:
+        """
+        Fold a fresh bot snapshot into the index.
+
+        Reservations whose bot is on the server become part of the account's bot
+        count. Reservations of bots that are gone are released, and so are
+        unconfirmed reservations if release_unconfirmed is set.
+
+        Returns:
+            Counts of confirmed, released and still pending reservations
+        """
+        counts = {'confirmed': 0, 'released': 0, 'pending': 0}
+        bot_ids = self._count_bots(bots)
+        for slot in self.slots.values():
+            on_server = set(bot_ids.get(slot.account_id, []))
+            for key, bot_id in list(slot.reservations.items()):
+                if bot_id is None and not release_unconfirmed:
+                    counts['pending'] += 1
+                    continue
+                counts['confirmed' if bot_id in on_server else 'released'] += 1
+                del slot.reservations[key]
+                self._keys.pop(key, None)
+            self._push(slot)
+        logger.info(f"Account index reconciled: {counts}")
+        return counts
+
+    def account_of(self, key: str) -> Optional[str]:
+        return self._keys.get(key)
+
+    def free_count(self, exchange: Optional[str] = None, market_type: Optional[str] = None) -> int:
+        """Accounts without bots or reservations"""
+        return sum(1 for slot in self.slots.values() if slot.load == 0
+                   and (not exchange or slot.exchange == exchange.upper())
+                   and (not market_type or slot.market_type == market_type))
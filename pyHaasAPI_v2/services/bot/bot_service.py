@@ -21,6 +21,8 @@ from ...exceptions import BotError, BotNotFoundError, BotCreationError
 from ...core.logging import get_logger
 from ...models.bot import BotDetails, BotRecord, BotConfiguration, CreateBotRequest
 from ...models.backtest import BacktestResult
+from .bulk_creation import BulkBotCreator
+from .account_allocation import AccountAllocationIndex
 
 logger = get_logger("bot_service")
 
@@ -103,6 +105,7 @@ class BotService:
         leverage: float = 20.0,
         activate: bool = False,
         lab_name: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ) -> BotCreationResult:
         """
         Create a bot from lab analysis using proven working patterns.
@@ -115,6 +118,8 @@ class BotService:
             trade_amount_usdt: Trade amount in USDT
             leverage: Leverage for the bot
             activate: Whether to activate the bot immediately
+            lab_name: Optional lab name for the bot notes
+            idempotency_key: Optional bulk creation key, recorded in the bot notes
 
         Returns:
             BotCreationResult with creation details
@@ -146,9 +151,9 @@ class BotService:
             bot_details = await self.bot_api.create_bot_from_lab(
                 lab_id=lab_id,
                 backtest_id=backtest_id,
-                account_id=account_id,
                 bot_name=bot_name,
-                trade_amount_usdt=trade_amount_usdt,
+                account_id=account_id,
+                market=getattr(backtest_runtime, 'PriceMarket', ''),
                 leverage=leverage
             )
 
@@ -167,7 +172,8 @@ class BotService:
                         "population_idx": pop_idx,
                         "market": getattr(backtest_runtime, 'PriceMarket', ''),
                         "script_name": getattr(backtest_runtime, 'ScriptName', ''),
-                        "creation_ts": datetime.utcnow().isoformat()
+                        "creation_ts": datetime.utcnow().isoformat(),
+                        "idempotency_key": idempotency_key
                     },
                     "backtest_baseline": {
                         "roe_pct": metrics.get('roe_pct') if metrics else None,
@@ -259,11 +265,19 @@ class BotService:
         trade_amount_usdt: float = 2000.0,
         leverage: float = 20.0,
         activate: bool = False,
-        use_individual_accounts: bool = True
+        use_individual_accounts: bool = True,
+        max_concurrency: int = 8,
+        state_file: Optional[str] = None
     ) -> MassBotCreationResult:
         """
         Create bots from multiple labs using proven mass creation patterns.
 
+        Bots are planned first (backtest and account per bot), then created
+        concurrently by a BulkBotCreator. Accounts come from an allocation index
+        built from one account and one bot listing. With a state file, a rerun
+        after an interruption keeps the planned accounts and only creates the
+        bots that do not exist yet.
+
         Args:
             lab_ids: List of lab IDs to process
             top_count: Number of top backtests per lab
@@ -272,7 +286,10 @@ class BotService:
             trade_amount_usdt: Trade amount in USDT
             leverage: Leverage for bots
             activate: Whether to activate bots
-            use_individual_accounts: Whether to use individual accounts
+            use_individual_accounts: Whether to give every bot its own BinanceFutures account
+                (otherwise bots go to the least loaded account of any exchange)
+            max_concurrency: Bots created at once
+            state_file: Progress file used to resume (progress is not persisted if None)
 
         Returns:
             MassBotCreationResult with creation details
@@ -280,87 +297,81 @@ class BotService:
         try:
             self.logger.info(f"Creating mass bots from {len(lab_ids)} labs")
 
+            creator = BulkBotCreator(self, state_file, max_concurrency=max_concurrency)
             successful_labs = []
             failed_labs = []
-            bot_results = []
-            total_bots_created = 0
-            total_bots_activated = 0
-
-            # Get available accounts
-            if use_individual_accounts:
-                # Use auto-selection for individual accounts
-                used_accounts = set()
-            else:
-                accounts = await self.account_api.get_accounts()
-                if not accounts:
-                    raise BotCreationError("No accounts available for bot creation")
-                account_index = 0
-
-            for lab_id in lab_ids:
-                try:
-                    self.logger.info(f"Processing lab: {lab_id}")
-
-                    # Get top performing backtests for this lab
-                    top_backtests = await self.backtest_api.get_top_performing_backtests(
-                        lab_id, top_count, sort_by="roi"
-                    )
-
-                    # Filter backtests by criteria
-                    qualified_backtests = [
-                        bt for bt in top_backtests
-                        if bt.win_rate >= min_win_rate and bt.total_trades >= min_trades
-                    ]
-
-                    if not qualified_backtests:
-                        self.logger.warning(f"No qualified backtests found for lab {lab_id}")
-                        failed_labs.append(lab_id)
-                        continue
 
-                    # Create bots for qualified backtests
-                    for backtest in qualified_backtests:
-                        # Select account
-                        if use_individual_accounts:
-                            # Auto-select available BinanceFutures account
-                            available_account = await self.account_api.get_available_binancefutures_account(
-                                exclude_accounts=list(used_accounts)
-                            )
-                            if not available_account:
-                                self.logger.warning("No available BinanceFutures accounts for bot creation")
-                                failed_labs.append(lab_id)
-                                break
-                            account_id = available_account.account_id
-                            used_accounts.add(account_id)
-                        else:
-                            account_id = accounts[account_index % len(accounts)].account_id
-                            account_index += 1
-
-                        # Create bot
-                        bot_result = await self.create_bot_from_lab_analysis(
-                            lab_id=lab_id,
-                            backtest_id=backtest.backtest_id,
-                            account_id=account_id,
-                            trade_amount_usdt=trade_amount_usdt,
-                            leverage=leverage,
-                            activate=activate
-                        )
-
-                        bot_results.append(bot_result)
-                        
-                        if bot_result.success:
-                            total_bots_created += 1
-                            if bot_result.activated:
-                                total_bots_activated += 1
+            # Index accounts once; accounts of bots planned by an earlier run stay taken
+            account_index = await AccountAllocationIndex.build(self.account_api, self.bot_api)
+            if not account_index.slots:
+                raise BotCreationError("No accounts available for bot creation")
+            for plan in creator.plans.values():
+                account_index.hold(f"{plan.lab_id}:{plan.backtest_id}", plan.account_id)
+
+            # Get top performing backtests of all labs at once
+            top_backtests_per_lab = await asyncio.gather(
+                *(self.backtest_api.get_top_performing_backtests(lab_id, top_count, sort_by="roi")
+                  for lab_id in lab_ids),
+                return_exceptions=True
+            )
+
+            for lab_id, top_backtests in zip(lab_ids, top_backtests_per_lab):
+                if isinstance(top_backtests, Exception):
+                    self.logger.error(f"Failed to process lab {lab_id}: {top_backtests}")
+                    failed_labs.append(lab_id)
+                    continue
 
-                    successful_labs.append(lab_id)
+                # Filter backtests by criteria
+                qualified_backtests = [
+                    bt for bt in top_backtests
+                    if bt.win_rate >= min_win_rate and bt.total_trades >= min_trades
+                ]
 
-                except Exception as e:
-                    self.logger.error(f"Failed to process lab {lab_id}: {e}")
+                if not qualified_backtests:
+                    self.logger.warning(f"No qualified backtests found for lab {lab_id}")
                     failed_labs.append(lab_id)
+                    continue
+
+                # Plan bots for qualified backtests
+                lab_planned = True
+                for backtest in qualified_backtests:
+                    if creator.find(lab_id, backtest.backtest_id):
+                        continue
+
+                    # Select account
+                    reservation = f"{lab_id}:{backtest.backtest_id}"
+                    if use_individual_accounts:
+                        account_id = account_index.reserve(reservation, exchange="BINANCEFUTURES", exclusive=True)
+                    else:
+                        account_id = account_index.reserve(reservation)
+                    if not account_id:
+                        self.logger.warning("No available accounts for bot creation")
+                        lab_planned = False
+                        break
+
+                    creator.plan(lab_id, backtest.backtest_id, account_id)
+
+                (successful_labs if lab_planned else failed_labs).append(lab_id)
+
+            # Create the planned bots of the requested labs concurrently
+            bot_results = await creator.run(
+                trade_amount_usdt=trade_amount_usdt,
+                leverage=leverage,
+                activate=activate,
+                lab_ids=lab_ids
+            )
+            for plan in creator.plans.values():
+                if plan.bot_id:
+                    account_index.confirm(f"{plan.lab_id}:{plan.backtest_id}", plan.bot_id)
+            try:
+                account_index.reconcile(await self.bot_api.get_all_bots(), release_unconfirmed=True)
+            except Exception as e:
+                self.logger.warning(f"Could not reconcile account index: {e}")
 
             return MassBotCreationResult(
                 total_labs_processed=len(lab_ids),
-                total_bots_created=total_bots_created,
-                total_bots_activated=total_bots_activated,
+                total_bots_created=sum(1 for result in bot_results if result.success),
+                total_bots_activated=sum(1 for result in bot_results if result.activated),
                 successful_labs=successful_labs,
                 failed_labs=failed_labs,
                 bot_results=bot_results,
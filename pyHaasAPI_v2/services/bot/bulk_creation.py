@@ -0,0 +1,305 @@
+"""
+Bulk bot creation engine for pyHaasAPI v2
+
+Creating bots one after another from many labs takes a request round trip per
+step and per bot, and an interrupted run leaves no record of what was created.
+The bulk engine:
+- Creates planned bots concurrently, bounded by max_concurrency
+- Gives every bot a deterministic idempotency key (lab, backtest, account)
+- Persists each bot's progress to a state file, so a rerun resumes and never
+  creates a planned bot twice
+- Matches creations whose outcome is unknown (interrupted runs, failed
+  requests) against the server's bots before retrying them, by the
+  idempotency key in the bot notes
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union, Iterable
+
+from ...core.logging import get_logger
+
+logger = get_logger("bulk_bot_creation")
+
+PLANNED = "planned"
+CREATING = "creating"
+CREATED = "created"
+FAILED = "failed"
+
+
+def bot_idempotency_key(lab_id: str, backtest_id: str, account_id: str) -> str:
+    """Deterministic key of the bot created from a backtest on an account"""
+    return hashlib.sha256(f"{lab_id}|{backtest_id}|{account_id}".encode()).hexdigest()[:24]
+
+
+def notes_idempotency_key(bot: Any) -> Optional[str]:
+    """Idempotency key recorded in a bot's notes, if any"""
+    notes = getattr(bot, 'notes', None)
+    if isinstance(notes, str):
+        try:
+            notes = json.loads(notes)
+        except ValueError:
+            return None
+    origin = notes.get('origin') if isinstance(notes, dict) else None
+    return origin.get('idempotency_key') if isinstance(origin, dict) else None
+
+
+@dataclass
+class PlannedBot:
+    """A bot the engine is to create, and how far it got"""
+    idempotency_key: str
+    lab_id: str
+    backtest_id: str
+    account_id: str
+    status: str = PLANNED
+    bot_id: Optional[str] = None
+    bot_name: Optional[str] = None
+    market_tag: Optional[str] = None
+    activated: bool = False
+    attempts: int = 0
+    baseline_bot_ids: Optional[List[str]] = None  # Bots on the account before the first attempt
+    result: Dict[str, Any] = field(default_factory=dict)  # Last BotCreationResult
+    error_message: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlannedBot":
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+
+class BulkBotCreator:
+    """
+    Creates planned bots concurrently and resumably
+
+    Usage:
+        creator = BulkBotCreator(bot_service, "bot_creation_state.ndjson", max_concurrency=16)
+        creator.plan(lab_id, backtest_id, account_id)
+        results = await creator.run(trade_amount_usdt=2000.0, leverage=20.0, activate=True)
+
+    A backtest is planned once: later plan() calls for the same lab and
+    backtest return the existing plan, so rerunning with the same state file
+    finishes the remaining bots instead of creating new ones.
+    """
+
+    def __init__(self, bot_service, state_file: Optional[Union[str, Path]] = None,
+                 max_concurrency: int = 8, max_attempts: int = 3):
+        """
+        Args:
+            bot_service: BotService used to create the bots
+            state_file: Append-only progress file (progress is kept in memory only if None)
+            max_concurrency: Bots created at once
+            max_attempts: Creation attempts per bot and run
+        """
+        self.bot_service = bot_service
+        self.state_file = Path(state_file) if state_file else None
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.plans: Dict[str, PlannedBot] = {}
+        if self.state_file and self.state_file.exists():
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.state_file, 'r') as f:
+            for line in f:
+                try:
+                    plan = PlannedBot.from_dict(json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # Torn last line of an interrupted write
+                self.plans[plan.idempotency_key] = plan
+        logger.info(f"Resuming {len(self.plans)} planned bots from {self.state_file}")
+
+    def _save(self, plan: PlannedBot) -> None:
+        if self.state_file:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_file, 'a') as f:
+                f.write(json.dumps(asdict(plan), default=str) + "\n")
+
+    def _compact(self) -> None:
+        if self.state_file:
+            tmp_path = self.state_file.with_suffix(self.state_file.suffix + ".tmp")
+            with open(tmp_path, 'w') as f:
+                for plan in self.plans.values():
+                    f.write(json.dumps(asdict(plan), default=str) + "\n")
+            os.replace(tmp_path, self.state_file)
+
+    def find(self, lab_id: str, backtest_id: str) -> Optional[PlannedBot]:
+        """Existing plan for a backtest, on whichever account it was planned"""
+        for plan in self.plans.values():
+            if plan.lab_id == lab_id and plan.backtest_id == backtest_id:
+                return plan
+        return None
+
+    def plan(self, lab_id: str, backtest_id: str, account_id: str) -> PlannedBot:
+        """Plan a bot for a backtest, or return the backtest's existing plan"""
+        existing = self.find(lab_id, backtest_id)
+        if existing:
+            return existing
+        plan = PlannedBot(idempotency_key=bot_idempotency_key(lab_id, backtest_id, account_id),
+                          lab_id=lab_id, backtest_id=backtest_id, account_id=account_id)
+        self.plans[plan.idempotency_key] = plan
+        self._save(plan)
+        return plan
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for plan in self.plans.values():
+            counts[plan.status] = counts.get(plan.status, 0) + 1
+        return counts
+
+    async def run(self, trade_amount_usdt: float = 2000.0, leverage: float = 20.0,
+                  activate: bool = False, lab_names: Optional[Dict[str, str]] = None,
+                  lab_ids: Optional[Iterable[str]] = None) -> List[Any]:
+        """
+        Create every planned bot that does not exist yet.
+
+        Args:
+            trade_amount_usdt: Trade amount in USDT
+            leverage: Leverage for the bots
+            activate: Whether to activate the bots; created but inactive bots are activated
+            lab_names: Optional lab ID -> name for the bot notes
+            lab_ids: Only create the bots planned for these labs (all planned bots if None),
+                so plans a previous run left for other labs are not deployed
+
+        Returns:
+            BotCreationResult of every selected planned bot
+        """
+        lab_id_set = set(lab_ids) if lab_ids is not None else None
+        selected = [plan for plan in self.plans.values() if lab_id_set is None or plan.lab_id in lab_id_set]
+        pending = [plan for plan in selected
+                   if plan.status != CREATED or (activate and not plan.activated)]
+        if pending:
+            logger.info(f"Creating {len(pending)} of {len(selected)} planned bots, "
+                        f"{self.max_concurrency} at once")
+            # One snapshot records the bots each account already has, and settles
+            # creations a previous run left in flight
+            await self._reconcile(pending)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def deploy(plan: PlannedBot) -> None:
+            async with semaphore:
+                await self._deploy(plan, trade_amount_usdt, leverage, activate, lab_names or {})
+
+        for attempt in range(self.max_attempts):
+            todo = [plan for plan in pending
+                    if plan.status != CREATED or (activate and not plan.activated)]
+            if not todo:
+                break
+            if attempt:
+                # A failed request may still have created its bot
+                await self._reconcile(todo)
+                todo = [plan for plan in todo if plan.status != CREATED or (activate and not plan.activated)]
+            await asyncio.gather(*(deploy(plan) for plan in todo))
+
+        self._compact()
+        logger.info(f"Bulk bot creation finished: {self.summary()}")
+        return [self._result(plan, trade_amount_usdt, leverage) for plan in selected]
+
+    async def _reconcile(self, plans: List[PlannedBot]) -> None:
+        unsettled = [plan for plan in plans if plan.status in (CREATING, FAILED) or plan.baseline_bot_ids is None]
+        if not unsettled:
+            return
+        try:
+            bots = await self.bot_service.bot_api.get_all_bots()
+        except Exception as e:
+            logger.warning(f"Could not list bots to reconcile bulk creation: {e}")
+            return
+
+        owned = {plan.bot_id for plan in self.plans.values() if plan.bot_id}
+        by_key = {}
+        for bot in bots:
+            key = notes_idempotency_key(bot)
+            if key:
+                by_key.setdefault(key, bot)
+        for plan in unsettled:
+            on_account = [bot for bot in bots if bot.account_id == plan.account_id]
+            if plan.baseline_bot_ids is None:
+                plan.baseline_bot_ids = [bot.bot_id for bot in on_account]
+                self._save(plan)
+                continue
+            if plan.status not in (CREATING, FAILED) or plan.attempts == 0:
+                continue
+            bot = by_key.get(plan.idempotency_key)
+            if bot is None:
+                # Notes are written after creation, so a bot without notes that appeared on
+                # the account and belongs to no other plan was most likely created by this one
+                created = [bot for bot in on_account if bot.bot_id not in owned
+                           and bot.bot_id not in plan.baseline_bot_ids
+                           and not getattr(bot, 'notes', None)
+                           and (not plan.market_tag or bot.market_tag == plan.market_tag)]
+                bot = created[0] if created else None
+            if bot is not None and bot.bot_id not in owned:
+                owned.add(bot.bot_id)
+                plan.status = CREATED
+                plan.bot_id, plan.bot_name, plan.market_tag = bot.bot_id, bot.bot_name, bot.market_tag
+                plan.activated = bool(bot.is_active)
+                plan.error_message = None
+                self._save(plan)
+                logger.info(f"Found bot {bot.bot_id} of interrupted creation {plan.idempotency_key}")
+            elif plan.status == CREATING:
+                plan.status = FAILED
+                plan.error_message = "Creation interrupted before the bot was created"
+                self._save(plan)
+
+    async def _deploy(self, plan: PlannedBot, trade_amount_usdt: float, leverage: float,
+                      activate: bool, lab_names: Dict[str, str]) -> None:
+        if plan.status == CREATED:
+            # Created earlier; only the activation is missing
+            try:
+                await self.bot_service.bot_api.activate_bot(plan.bot_id)
+                plan.activated = True
+                plan.error_message = None
+            except Exception as e:
+                plan.error_message = f"Activation failed: {e}"
+            self._save(plan)
+            return
+
+        plan.status = CREATING
+        plan.attempts += 1
+        self._save(plan)
+        result = await self.bot_service.create_bot_from_lab_analysis(
+            lab_id=plan.lab_id,
+            backtest_id=plan.backtest_id,
+            account_id=plan.account_id,
+            trade_amount_usdt=trade_amount_usdt,
+            leverage=leverage,
+            activate=activate,
+            lab_name=lab_names.get(plan.lab_id),
+            idempotency_key=plan.idempotency_key
+        )
+        plan.result = asdict(result)
+        if result.success:
+            plan.status = CREATED
+            plan.bot_id, plan.bot_name, plan.market_tag = result.bot_id, result.bot_name, result.market_tag
+            plan.activated = result.activated
+            plan.error_message = None if result.activated or not activate else "Activation failed"
+        else:
+            plan.status = FAILED
+            plan.error_message = result.error_message
+        self._save(plan)
+
+    def _result(self, plan: PlannedBot, trade_amount_usdt: float, leverage: float):
+        from .bot_service import BotCreationResult
+
+        values = dict(plan.result)
+        values.update(
+            bot_id=plan.bot_id or "",
+            bot_name=plan.bot_name or values.get('bot_name', ""),
+            backtest_id=plan.backtest_id,
+            account_id=plan.account_id,
+            market_tag=plan.market_tag or values.get('market_tag', ""),
+            success=plan.status == CREATED,
+            activated=plan.activated,
+            error_message=plan.error_message
+        )
+        values.setdefault('leverage', leverage)
+        values.setdefault('margin_mode', "CROSS" if plan.status == CREATED else "")
+        values.setdefault('position_mode', "HEDGE" if plan.status == CREATED else "")
+        values.setdefault('trade_amount_usdt', trade_amount_usdt)
+        values.setdefault('creation_timestamp', datetime.now().isoformat())
+        return BotCreationResult(**{key: value for key, value in values.items()
+                                    if key in BotCreationResult.__dataclass_fields__})
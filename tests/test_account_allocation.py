@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test suite for the account allocation index
+
+This test suite covers:
+- Picking free, then least loaded accounts by exchange and market type
+- Stable reservations per planned bot
+- Reconciling reservations with a fresh bot snapshot
+- Concurrent reservations from several threads
+- Dry runs of the mass bot creator leaving the index untouched
+"""
+
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.accounts.allocation import AccountAllocationIndex, FUTURES, SPOT
+
+
+def _accounts():
+    futures = [{"AID": f"fut{i}", "EC": "BINANCEFUTURES", "N": f"4A{i}-10k"} for i in range(4)]
+    spot = [{"AID": f"spot{i}", "EC": "BINANCE", "N": f"4B{i}-10k"} for i in range(2)]
+    return futures + spot
+
+
+def _bots(*account_ids):
+    return [SimpleNamespace(bot_id=f"bot{i}", account_id=account_id) for i, account_id in enumerate(account_ids)]
+
+
+class TestAccountAllocationIndex:
+    """Test allocating accounts to planned bots"""
+
+    def test_free_accounts_first(self):
+        index = AccountAllocationIndex.from_snapshot(_accounts(), _bots("fut0", "fut0", "fut1"))
+        assert index.free_count(market_type=FUTURES) == 2 and index.free_count(market_type=SPOT) == 2
+
+        picks = [index.reserve(f"plan{i}", exchange="BINANCEFUTURES", exclusive=True) for i in range(4)]
+        assert picks == ["fut2", "fut3", "fut1", "fut0"]
+        assert index.reserve("plan4", exchange="BINANCEFUTURES", exclusive=True) is None
+        # The same plan keeps its account
+        assert index.reserve("plan1", exchange="BINANCEFUTURES", exclusive=True) == "fut3"
+
+        # Shared reservations spread over the least loaded accounts
+        assert index.reserve("spot-plan0", market_type=SPOT) == "spot0"
+        assert index.reserve("spot-plan1", market_type=SPOT) == "spot1"
+        assert index.reserve("spot-plan2", market_type=SPOT) == "spot0"
+
+        index.release("plan0")
+        assert index.reserve("plan5", exchange="BINANCEFUTURES", exclusive=True) == "fut2"
+
+    def test_reconcile(self):
+        index = AccountAllocationIndex(_accounts(), [])
+        for i in range(3):
+            index.reserve(f"plan{i}", market_type=FUTURES, exclusive=True)
+        index.confirm("plan0", "new0")
+        index.confirm("plan1", "lost1")  # Created, but gone from the server again
+
+        counts = index.reconcile([SimpleNamespace(bot_id="new0", account_id="fut0")])
+        assert counts == {'confirmed': 1, 'released': 1, 'pending': 1}
+        assert index.slots["fut0"].load == 1 and index.slots["fut1"].load == 0
+        assert index.account_of("plan2") == "fut2"
+
+        assert index.reconcile([], release_unconfirmed=True) == {'confirmed': 0, 'released': 1, 'pending': 0}
+        assert index.free_count() == 6
+
+    def test_concurrent_reservations(self):
+        accounts = [{"AID": f"acc{i:04d}", "EC": "BINANCEFUTURES"} for i in range(2000)]
+        index = AccountAllocationIndex(accounts, [])
+        picks = {}
+
+        def plan(worker):
+            for i in range(250):
+                picks[(worker, i)] = index.reserve(f"w{worker}-{i}", exclusive=True)
+
+        threads = [threading.Thread(target=plan, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(picks.values())) == 2000
+        assert index.free_count() == 0
+
+
+class TestMassBotCreatorDryRun:
+    """Test dry runs do not hold accounts"""
+
+    def test_dry_run_releases_reservations(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        from pyHaasAPI.cli.mass_bot_creator import MassBotCreator
+
+        backtests = [SimpleNamespace(backtest_id=f"bt{i}", roi_percentage=100.0, population_idx=i, generation_idx=1,
+                                     win_rate=0.6, script_name="Script", market_tag="BINANCEFUTURES_BTC_USDT_PERPETUAL")
+                     for i in range(3)]
+        creator = MassBotCreator()
+        creator.analyzer = SimpleNamespace(analyze_lab=lambda lab_id, top_count: SimpleNamespace(
+            lab_name="Lab", top_backtests=backtests))
+        creator.account_index = AccountAllocationIndex(_accounts(), _bots("fut0"))
+
+        results = creator.analyze_lab_and_create_bots(SimpleNamespace(lab_id="lab1", name="Lab"), top_count=3,
+                                                      dry_run=True, min_backtests=1)
+
+        assert len(results) == 3 and all(result.success for result in results)
+        assert all(not slot.reservations for slot in creator.account_index.slots.values())
+        assert creator.account_index.free_count() == 5
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test suite for batched BacktestManager job monitoring
+
+This test suite covers:
+- One GET_LABS listing per monitoring cycle
+- Result fetches only for labs that just completed
+- Cancelled and deleted labs failing their jobs
+- WFO job completion and skipping saves when nothing changed
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis import backtest_manager
+from pyHaasAPI.analysis.backtest_manager import BacktestManager, BacktestJob, WFOJob
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.parameters import LabStatus
+
+
+class FakeLabListing:
+    """GET_LABS stand-in that counts requests"""
+
+    def __init__(self, lab_ids):
+        self.statuses = {lab_id: LabStatus.RUNNING for lab_id in lab_ids}
+        self.cancel_reasons = {}
+        self.list_calls = 0
+        self.result_calls = []
+
+    def get_all_labs(self, executor):
+        self.list_calls += 1
+        return [SimpleNamespace(lab_id=lab_id, status=status, cancel_reason=self.cancel_reasons.get(lab_id))
+                for lab_id, status in self.statuses.items()]
+
+    def get_lab_details(self, executor, lab_id):
+        raise AssertionError("monitor_jobs should not fetch lab details")
+
+    def results(self, lab_id):
+        self.result_calls.append(lab_id)
+        return {"backtest_id": f"{lab_id}_best", "roi_percentage": 10.0, "win_rate": 0.5, "max_drawdown": 5.0}
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    manager = BacktestManager(UnifiedCacheManager(str(tmp_path / "cache")))
+    manager.connect(object())
+    listing = FakeLabListing([f"lab{i}" for i in range(200)])
+    monkeypatch.setattr(backtest_manager.api, 'get_all_labs', listing.get_all_labs)
+    monkeypatch.setattr(backtest_manager.api, 'get_lab_details', listing.get_lab_details)
+    monkeypatch.setattr(manager, '_get_backtest_results', listing.results)
+
+    for i in range(400):
+        job = BacktestJob(job_id=f"job{i}", job_type="individual", lab_id=f"lab{i // 2}", status="running")
+        manager.jobs[job.job_id] = job
+    return manager, listing
+
+
+class TestMonitorJobs:
+    """Test batched status reconciliation"""
+
+    def test_one_listing_per_cycle(self, manager):
+        manager, listing = manager
+
+        first = manager.monitor_jobs()
+        second = manager.monitor_jobs()
+
+        assert listing.list_calls == 2
+        assert first["api_requests"] == second["api_requests"] == 1
+        assert second["still_running"] == 400
+        assert listing.result_calls == []
+
+    def test_completed_labs_fetch_results_once(self, manager):
+        manager, listing = manager
+        manager.monitor_jobs()
+        for i in range(5):
+            listing.statuses[f"lab{i}"] = LabStatus.COMPLETED
+        listing.statuses["lab5"] = LabStatus.CANCELLED
+        listing.cancel_reasons["lab5"] = "No history"
+        del listing.statuses["lab6"]
+
+        result = manager.monitor_jobs()
+
+        assert sorted(listing.result_calls) == [f"lab{i}" for i in range(5)]
+        assert result["completed_jobs"] == 10
+        assert result["failed_jobs"] == 4
+        assert result["api_requests"] == 6
+        assert manager.jobs["job0"].results["backtest_id"] == "lab0_best"
+        assert "No history" in manager.jobs["job10"].error_message
+        assert manager.jobs["job12"].error_message == "Lab no longer exists"
+
+        # Finished jobs drop out of the next cycle
+        assert manager.monitor_jobs()["checked_jobs"] == 386
+
+    def test_saves_only_on_change(self, manager, monkeypatch):
+        manager, listing = manager
+        manager.monitor_jobs()
+        saves = []
+        monkeypatch.setattr(manager, '_save_jobs', lambda jobs=None: saves.append(len(jobs)))
+
+        manager.monitor_jobs()
+        assert saves == []
+
+        listing.statuses["lab0"] = LabStatus.COMPLETED
+        manager.monitor_jobs()
+        assert saves == [2]
+
+    def test_wfo_job_completes(self, manager):
+        manager, listing = manager
+        lab_jobs = [manager.jobs["job0"], manager.jobs["job1"]]
+        manager.wfo_jobs["wfo1"] = WFOJob(
+            wfo_id="wfo1", base_script_id="script", base_market_tag="BINANCE_BTC_USDT_",
+            base_account_id="account", time_periods=[], parameter_ranges={}, status="running",
+            lab_jobs=lab_jobs
+        )
+        listing.statuses["lab0"] = LabStatus.COMPLETED
+
+        manager.monitor_jobs()
+
+        assert manager.wfo_jobs["wfo1"].status == "completed"
+        assert manager.wfo_jobs["wfo1"].results["summary"]["completed_periods"] == 2
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Test suite for Bayesian optimization of lab parameters
+
+This test suite covers:
+- Gaussian-process fit and expected improvement
+- Seeding the surrogate from cached backtests of the same script, market and window length
+- Counting parameter sets that failed to start against the budget
+- Converging on a synthetic objective and stopping on expected improvement
+- Searching without cached priors
+- Reporting the backtests of each run of a reused optimizer
+"""
+
+import sys
+import copy
+import random
+import itertools
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI import successive_halving
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.analysis.fingerprint import ParameterFingerprintIndex
+from pyHaasAPI.bayesian_optimization import (
+    BayesianLabOptimizer, BayesianOptimizationConfig, GaussianProcess, expected_improvement
+)
+from pyHaasAPI.optimization import LabParameterOptimizer, OptimizationConfig
+from pyHaasAPI.parameters import LabStatus
+
+END_UNIX = 1_700_000_000
+DAY = 24 * 3600
+RANGES = {
+    '1-1-10-15.Fast': [str(v) for v in range(4, 20, 2)],
+    '2-2-10-15.Slow': [str(v) for v in range(20, 60, 5)],
+    '3-3-10-15.Mult': ['0.5', '1.0', '1.5', '2.0'],
+}
+
+
+def true_roi(parameters):
+    values = {key.split('.')[-1]: float(value) for key, value in parameters.items()}
+    return 100.0 - (values['Fast'] - 10) ** 2 - 0.2 * (values['Slow'] - 40) ** 2 - 20 * (values['Mult'] - 1.5) ** 2
+
+
+class FakeLabServer:
+    """Labs with fixed parameters complete after one poll and score the synthetic objective"""
+
+    def __init__(self):
+        self.labs = {}
+        self.executions = []
+        self.deleted = []
+        self.failing_starts = False
+        self._lock = threading.Lock()
+        self.labs["source"] = SimpleNamespace(
+            lab_id="source", name="Source", script_id="script",
+            settings=SimpleNamespace(market_tag="BINANCE_BTC_USDT_"),
+            parameters=[{'K': key, 'T': 0, 'O': [options[0]], 'I': False} for key, options in RANGES.items()],
+            status=LabStatus.CREATED
+        )
+
+    def clone_lab(self, executor, lab_id, new_name=None):
+        with self._lock:
+            clone = copy.deepcopy(self.labs[lab_id])
+            clone.lab_id = f"lab_{len(self.labs)}"
+            self.labs[clone.lab_id] = clone
+        return clone
+
+    def update_lab_details(self, executor, lab):
+        self.labs[lab.lab_id] = lab
+        return lab
+
+    def start_lab_execution(self, executor, request, ensure_config=True):
+        if self.failing_starts:
+            return {'Success': False, 'Error': "No backtest workers available"}
+        with self._lock:
+            self.executions.append(request.lab_id)
+            self.labs[request.lab_id].status = LabStatus.COMPLETED
+        return {'Success': True}
+
+    def get_lab_execution_update(self, executor, lab_id):
+        return SimpleNamespace(status=self.labs[lab_id].status, progress=100.0, message=None, error=None)
+
+    def fetch_backtests(self, executor, lab_id):
+        parameters = {p['K']: p['O'][0] for p in self.labs[lab_id].parameters}
+        return [SimpleNamespace(summary=SimpleNamespace(ReturnOnInvestment=true_roi(parameters)))]
+
+    def delete_lab(self, executor, lab_id):
+        self.deleted.append(lab_id)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeLabServer()
+    monkeypatch.setattr(successive_halving.api, 'get_lab_details', lambda executor, lab_id: server.labs[lab_id])
+    for name in ('clone_lab', 'update_lab_details', 'start_lab_execution', 'get_lab_execution_update', 'delete_lab'):
+        monkeypatch.setattr(successive_halving.api, name, getattr(server, name))
+    monkeypatch.setattr(successive_halving, 'fetch_all_lab_backtests', server.fetch_backtests)
+    return server
+
+
+def _grid():
+    return [dict(zip(RANGES, values)) for values in itertools.product(*RANGES.values())]
+
+
+def _cache_priors(tmp_path, count, seed=5):
+    cache = UnifiedCacheManager(str(tmp_path / "cache"))
+    index = ParameterFingerprintIndex(cache)
+    samples = random.Random(seed).sample(_grid(), count + 10)
+    for i, parameters in enumerate(samples):
+        # Backtests over a 90-day window score on another scale and are not used
+        days = 30 if i < count else 90
+        data = {
+            'script_id': "script", 'market_tag': "BINANCE_BTC_USDT_",
+            'roi_percentage': true_roi(parameters) * days / 30,
+            # Older backtests may store numbers in another text form
+            'parameter_values': {key.split('.')[-1]: f"{float(value):.2f}" for key, value in parameters.items()}
+        }
+        if i % 2:
+            data.update(start_unix=END_UNIX - days * DAY, end_unix=END_UNIX)
+        else:
+            # The window of older cache entries is only known from the fingerprint index
+            data.update(lab_id="old_lab", backtest_id=f"bt{i}")
+            index.put(f"script|BINANCE_BTC_USDT_|{END_UNIX - days * DAY}-{END_UNIX}||fp{i}", "old_lab", f"bt{i}",
+                      save=False)
+        cache.cache_backtest_data("old_lab", f"bt{i}", data)
+    index.save()
+    # Backtests without a known window are not used
+    cache.cache_backtest_data("old_lab", "bt_unknown", {
+        'script_id': "script", 'market_tag': "BINANCE_BTC_USDT_", 'roi_percentage': 500.0,
+        'parameter_values': {'Fast': '4', 'Slow': '20', 'Mult': '0.5'}
+    })
+    # Backtests of other scripts are ignored
+    cache.cache_backtest_data("other_lab", "bt", {
+        'script_id': "other", 'market_tag': "BINANCE_BTC_USDT_", 'roi_percentage': 500.0,
+        'start_unix': END_UNIX - 30 * DAY, 'end_unix': END_UNIX,
+        'parameter_values': {'Fast': '4', 'Slow': '20', 'Mult': '0.5'}
+    })
+    return cache
+
+
+def _optimize(**overrides):
+    values = dict(max_backtests=60, batch_size=3, initial_points=6, ei_threshold=0.5,
+                  poll_interval=0.001, max_concurrent_labs=4, seed=11)
+    values.update(overrides)
+    return LabParameterOptimizer(object()).optimize_with_bayesian_search(
+        "source", BayesianOptimizationConfig(**values), OptimizationConfig(custom_ranges=RANGES), END_UNIX
+    )
+
+
+class TestSurrogate:
+    """Test the Gaussian process and acquisition function"""
+
+    def test_gaussian_process_interpolates(self):
+        x = np.linspace(0, 1, 9).reshape(-1, 1)
+        y = np.sin(3 * x[:, 0]) * 10
+        model = GaussianProcess().fit(x, y)
+
+        mean, std = model.predict(x)
+        assert np.allclose(mean, y, atol=0.5)
+
+        mean, std = model.predict(np.array([[0.06], [3.0]]))
+        assert abs(mean[0] - np.sin(0.18) * 10) < 1.0
+        # Far from the data the model falls back to the prior
+        assert std[1] > 5 * std[0]
+
+    def test_expected_improvement(self):
+        improvement = expected_improvement(np.array([10.0, 10.0, 12.0]), np.array([1e-6, 2.0, 1e-6]), best=11.0)
+
+        assert improvement[0] == pytest.approx(0.0, abs=1e-6)
+        assert improvement[1] > 0
+        assert improvement[2] == pytest.approx(1.0)
+
+
+class TestBayesianOptimization:
+    """Test the optimizer against the stand-in server"""
+
+    def test_priors_converge_and_stop_early(self, server, tmp_path):
+        exhaustive = sorted((true_roi(p) for p in _grid()), reverse=True)
+        result = _optimize(history_cache=_cache_priors(tmp_path, count=20))
+
+        assert result.success
+        assert result.prior_points == 20
+        assert result.stopped_reason == "expected_improvement"
+        assert result.backtests_used < 60
+        assert len(server.executions) == result.backtests_used
+        # With the priors no random initial points are needed
+        assert result.backtests_used % 3 == 0
+        assert true_roi(result.best_parameters) >= exhaustive[2]
+        assert result.best_lab_id not in server.deleted
+        assert len(server.deleted) == result.backtests_used - 1
+        print(f"\nBest {result.best_score:.1f} vs exhaustive {exhaustive[0]:.1f} using "
+              f"{result.backtests_used}/{len(exhaustive)} backtests and {result.prior_points} priors")
+
+    def test_search_without_priors(self, server):
+        exhaustive = sorted((true_roi(p) for p in _grid()), reverse=True)
+        result = _optimize()
+
+        assert result.success
+        assert result.prior_points == 0
+        assert result.backtests_used <= 60
+        assert result.trials[0].parameters == result.best_parameters
+        assert true_roi(result.best_parameters) >= exhaustive[int(len(exhaustive) * 0.05)]
+
+    def test_budget_is_respected(self, server):
+        result = _optimize(max_backtests=8, ei_threshold=0.0)
+
+        assert result.success
+        assert result.stopped_reason == "budget"
+        assert result.backtests_used == 8
+
+    def test_failed_starts_count_against_budget(self, server):
+        server.failing_starts = True
+        result = _optimize(max_backtests=8)
+
+        assert not result.success
+        assert result.backtests_used == 0
+        assert len(result.trials) == 8
+        assert len(server.labs) == 1 + 8  # The source lab plus one clone per attempt
+
+    def test_reused_optimizer_reports_each_run(self, server):
+        optimizer = BayesianLabOptimizer(object(), BayesianOptimizationConfig(
+            max_backtests=8, batch_size=3, initial_points=6, ei_threshold=0.0, poll_interval=0.001,
+            max_concurrent_labs=4, seed=11))
+
+        first = optimizer.optimize("source", OptimizationConfig(custom_ranges=RANGES), END_UNIX)
+        second = optimizer.optimize("source", OptimizationConfig(custom_ranges=RANGES), END_UNIX)
+
+        assert first.success and second.success
+        assert first.backtests_used == 8 and second.backtests_used == 8
+        assert len(server.executions) == 16
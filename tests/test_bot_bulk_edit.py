@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test suite for batched bot parameter edits
+
+This test suite covers:
+- One EDIT_SETTINGS update per bot, with no-op edits skipped
+- Reading only bots whose settings are not cached
+- Rolling back applied edits from the journal after a restart
+- Checking updates whose response fails to parse against the bot
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI import bot_bulk_edit as bulk_edit_module
+from pyHaasAPI.bot_bulk_edit import BulkBotEditor, APPLIED, FAILED, ROLLED_BACK
+from pyHaasAPI.model import HaasBot
+
+
+def _bot(bot_id, stop_loss=2.0, take_profit=4.0, trade_amount=100.0):
+    return HaasBot.model_validate({
+        "UI": "user", "ID": bot_id, "BN": f"Bot {bot_id}", "SI": "script1", "SV": 1, "AI": "acc1",
+        "PM": "BINANCEFUTURES_BTC_USDT_PERPETUAL", "EI": "", "IA": True, "IP": False, "IF": False,
+        "NO": "", "SN": "", "NT": 0, "RP": 0.0, "UP": 0.0, "ROI": 0.0, "TAE": False, "AE": False,
+        "SE": False, "UC": 0, "CI": 15, "CS": 300, "CV": False, "IWL": False, "MBID": "", "F": 0,
+        "ST": {"tradeAmount": trade_amount, "leverage": 20.0,
+               "scriptParameters": {"12-Stop Loss": stop_loss, "13-Take Profit": take_profit, "14-Mode": "fast"}},
+    })
+
+
+class FakeBotServer:
+    def __init__(self, bots):
+        self.bots = {bot.bot_id: bot for bot in bots}
+        self.reads = []
+        self.writes = []
+        self.failing = set()
+        self.unparsable = set()  # Bots whose update is applied but its response fails to parse
+        self.ignored = set()  # Bots whose update is silently not applied
+        self._lock = threading.Lock()
+
+    def get_full_bot_runtime_data(self, executor, bot_id):
+        with self._lock:
+            self.reads.append(bot_id)
+        return self.bots[bot_id].model_copy(deep=True)
+
+    def edit_bot_parameter(self, executor, bot):
+        if bot.bot_id in self.failing:
+            raise RuntimeError("Request failed")
+        with self._lock:
+            self.writes.append(bot.bot_id)
+            if bot.bot_id not in self.ignored:
+                self.bots[bot.bot_id] = bot.model_copy(deep=True)
+        if bot.bot_id in self.unparsable:
+            raise ValueError("1 validation error for HaasBot")
+        return bot
+
+
+def _patch(monkeypatch, server):
+    monkeypatch.setattr(bulk_edit_module.api, "get_full_bot_runtime_data", server.get_full_bot_runtime_data)
+    monkeypatch.setattr(bulk_edit_module.api, "edit_bot_parameter", server.edit_bot_parameter)
+
+
+class TestBulkBotEditor:
+    """Test the bulk editor against a stand-in bot server"""
+
+    def test_one_update_per_bot_and_no_op_skipping(self, tmp_path, monkeypatch):
+        bots = [_bot(f"b{i}", stop_loss=3.0 if i < 5 else 2.0) for i in range(20)]
+        server = FakeBotServer(bots)
+        _patch(monkeypatch, server)
+        editor = BulkBotEditor(None, tmp_path / "edits.json", bots=bots[:10])
+
+        new_values = {"Stop Loss": "3", "take profit": 6.0, "14-Mode": "fast", "leverage": 20, "Missing": 1}
+        report = editor.edit({bot.bot_id: dict(new_values) for bot in bots})
+
+        assert report.reads == 10  # Only the uncached bots
+        assert report.writes == 20 and sorted(server.writes) == sorted(bot.bot_id for bot in bots)
+        assert report.requests == 30
+        assert server.bots["b7"].settings.script_parameters == {"12-Stop Loss": "3", "13-Take Profit": 6.0,
+                                                                "14-Mode": "fast"}
+        assert server.bots["b7"].settings.bot_id == "b7"
+        assert report.unknown_names["b0"] == ["Missing"]
+
+        # Repeating the edit is a no-op for every bot
+        server.writes.clear()
+        again = editor.edit({bot.bot_id: dict(new_values) for bot in bots})
+        assert again.requests == 0 and len(again.skipped) == 20
+        assert again.unchanged_values == 80
+
+    def test_failed_updates_are_reported(self, tmp_path, monkeypatch):
+        server = FakeBotServer([_bot("b1"), _bot("b2")])
+        server.failing.add("b2")
+        _patch(monkeypatch, server)
+        editor = BulkBotEditor(None, tmp_path / "edits.json")
+
+        report = editor.edit({"b1": {"trade_amount": 50.0}, "b2": {"trade_amount": 50.0}, "b3": {"leverage": 5}})
+
+        assert report.applied == ["b1"]
+        assert report.failed["b2"] == "Request failed"
+        assert report.failed["b3"] == "Bot settings not available"
+        assert server.bots["b1"].settings.trade_amount == 50.0
+        assert editor.edits["b1"]["status"] == APPLIED
+
+    def test_rollback_after_restart(self, tmp_path, monkeypatch):
+        server = FakeBotServer([_bot("b1"), _bot("b2")])
+        _patch(monkeypatch, server)
+        editor = BulkBotEditor(None, tmp_path / "edits.json")
+        editor.edit({"b1": {"Stop Loss": 1.0, "trade_amount": 75.0}, "b2": {"Take Profit": 9.0}})
+        editor.close()
+
+        restarted = BulkBotEditor(None, tmp_path / "edits.json")
+        report = restarted.rollback(["b1"])
+
+        assert report.applied == ["b1"]
+        assert server.bots["b1"].settings.script_parameters["12-Stop Loss"] == 2.0
+        assert server.bots["b1"].settings.trade_amount == 100.0
+        assert server.bots["b2"].settings.script_parameters["13-Take Profit"] == 9.0
+        assert restarted.edits["b1"]["status"] == ROLLED_BACK
+        assert restarted.rollback(["b1"]).planned == 0
+
+    def test_unparsable_responses_are_verified(self, tmp_path, monkeypatch):
+        server = FakeBotServer([_bot("b1"), _bot("b2")])
+        server.unparsable.update({"b1", "b2"})
+        server.ignored.add("b2")
+        _patch(monkeypatch, server)
+        editor = BulkBotEditor(None, tmp_path / "edits.json")
+
+        report = editor.edit({"b1": {"Stop Loss": 1.5}, "b2": {"Stop Loss": 1.5}})
+
+        assert report.applied == ["b1"]
+        assert report.failed["b2"] == "1 validation error for HaasBot"
+        assert editor.edits["b1"]["status"] == APPLIED and editor.edits["b2"]["status"] == FAILED
+        assert editor.cache["b1"].settings.script_parameters["12-Stop Loss"] == 1.5
+        assert editor.cache["b2"].settings.script_parameters["12-Stop Loss"] == 2.0
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test suite for the v2 bot registry
+
+This test suite covers:
+- Deltas (added, removed, changed) between GET_BOTS snapshots
+- Secondary indexes by status, account, market and script
+- Serving BotAPI.get_bots_by_* from the registry with one fetch per max_age
+- Scheduled refreshes
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI_v2.api.bot import BotAPI, BotRegistry
+
+
+def _bot(bot_id, status="ACTIVE", account_id="acc1", market_tag="BINANCEFUTURES_BTC_USDT_PERPETUAL",
+         script_id="script1"):
+    return SimpleNamespace(bot_id=bot_id, status=status, account_id=account_id, market_tag=market_tag,
+                           script_id=script_id)
+
+
+class FakeBotServer:
+    def __init__(self, bots):
+        self.bots = bots
+        self.requests = 0
+
+    async def get_all_bots(self):
+        self.requests += 1
+        await asyncio.sleep(0.01)
+        return [SimpleNamespace(**vars(bot)) for bot in self.bots]
+
+
+class TestBotRegistry:
+    """Test the registry against a stand-in GET_BOTS"""
+
+    def test_deltas_and_indexes(self):
+        server = FakeBotServer([_bot("b1"), _bot("b2", account_id="acc2"), _bot("b3", status="INACTIVE")])
+        registry = BotRegistry(server)
+        deltas = []
+
+        async def on_delta(delta):
+            deltas.append(delta.summary())
+
+        registry.subscribe(on_delta)
+
+        async def scenario():
+            await registry.refresh()
+            await registry.refresh()  # Nothing changed: subscribers are not called
+            server.bots[0].status = "PAUSED"
+            server.bots[1].market_tag = "BINANCEFUTURES_ETH_USDT_PERPETUAL"
+            del server.bots[2]
+            server.bots.append(_bot("b4", account_id="acc2", script_id="script2"))
+            return await registry.refresh()
+
+        delta = asyncio.run(scenario())
+
+        assert deltas == [{"added": 3, "removed": 0, "changed": 0}, {"added": 1, "removed": 1, "changed": 2}]
+        assert [before.status for before, after in delta.changed if after.bot_id == "b1"] == ["ACTIVE"]
+        assert [bot.bot_id for bot in registry.by_status("paused")] == ["b1"]
+        assert registry.by_status("INACTIVE") == []
+        assert [bot.bot_id for bot in registry.by_account("acc2")] == ["b2", "b4"]
+        assert [bot.bot_id for bot in registry.by_market("BINANCEFUTURES_ETH_USDT_PERPETUAL")] == ["b2"]
+        assert [bot.bot_id for bot in registry.by_script("script2")] == ["b4"]
+        assert registry.counts("status") == {"PAUSED": 1, "ACTIVE": 2}
+
+    def test_bot_api_queries_share_one_fetch(self):
+        server = FakeBotServer([_bot(f"b{i}", account_id=f"acc{i % 3}",
+                                     status="ACTIVE" if i % 2 else "INACTIVE") for i in range(30)])
+        bot_api = BotAPI(None, None)
+        bot_api.get_all_bots = server.get_all_bots
+
+        async def dashboard_cycle():
+            return await asyncio.gather(bot_api.get_active_bots(), bot_api.get_inactive_bots(),
+                                        bot_api.get_bots_by_account("acc1"),
+                                        bot_api.get_bots_by_market("BINANCEFUTURES_BTC_USDT_PERPETUAL"))
+
+        # Without a registry every query downloads all bots
+        active, inactive, on_acc1, on_market = asyncio.run(dashboard_cycle())
+        assert server.requests == 4
+        assert (len(active), len(inactive), len(on_acc1), len(on_market)) == (15, 15, 10, 30)
+
+        bot_api.registry = BotRegistry(bot_api, max_age=60)
+        assert [len(bots) for bots in asyncio.run(dashboard_cycle())] == [15, 15, 10, 30]
+        asyncio.run(dashboard_cycle())
+        assert server.requests == 5
+
+        bot_api.registry.max_age = 0
+        asyncio.run(bot_api.get_bots_by_account("acc1"))
+        assert server.requests == 6
+
+    def test_scheduled_refresh(self):
+        server = FakeBotServer([_bot("b1")])
+        registry = BotRegistry(server, refresh_interval=0.01)
+
+        async def run():
+            await registry.start()
+            await asyncio.sleep(0.15)
+            await registry.stop()
+
+        asyncio.run(run())
+        assert registry.refresh_count >= 3
+        assert registry.get("b1") is not None
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test suite for bulk bot creation in the v2 BotService
+
+This test suite covers:
+- Creating planned bots concurrently with bounded concurrency
+- Deterministic idempotency keys recorded in the bot notes
+- Reruns with the same state file not creating bots again
+- Failed and interrupted creations that did create their bot
+- Reruns only deploying the plans of the requested labs
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI_v2.services.bot import BotService, BulkBotCreator, bot_idempotency_key
+from pyHaasAPI_v2.services.bot.bulk_creation import CREATED, FAILED
+
+
+class FakeServer:
+    """Bot, account and backtest endpoints backed by in-memory state"""
+
+    def __init__(self, accounts=40, delay=0.01):
+        self.accounts = [SimpleNamespace(account_id=f"acc{i:03d}", exchange="BINANCEFUTURES", account_type="FUTURES")
+                         for i in range(accounts)]
+        self.delay = delay
+        self.bots = []
+        self.notes = {}
+        self.create_calls = 0
+        self.list_calls = {"accounts": 0, "bots": 0}
+        self.in_flight = 0
+        self.peak = 0
+        self.fail_after_create = set()  # Backtests whose creation request fails after creating the bot
+
+    # Backtest API
+    async def get_top_performing_backtests(self, lab_id, top_count, sort_by="roi"):
+        return [SimpleNamespace(backtest_id=f"{lab_id}-bt{i}", win_rate=0.7, total_trades=50)
+                for i in range(top_count)]
+
+    async def get_full_backtest_runtime_data(self, lab_id, backtest_id):
+        return SimpleNamespace(ScriptName="Script", PriceMarket=f"BINANCEFUTURES_{lab_id.upper()}_USDT_PERPETUAL",
+                               Reports={})
+
+    # Account API
+    async def get_accounts(self):
+        self.list_calls["accounts"] += 1
+        return list(self.accounts)
+
+    # Bot API
+    async def create_bot_from_lab(self, lab_id, backtest_id, bot_name, account_id, market, leverage=20.0):
+        self.create_calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            bot = SimpleNamespace(bot_id=f"bot{len(self.bots):04d}", bot_name=bot_name, account_id=account_id,
+                                  market_tag=market, is_active=False, notes=None)
+            self.bots.append(bot)
+        finally:
+            self.in_flight -= 1
+        if backtest_id in self.fail_after_create:
+            self.fail_after_create.discard(backtest_id)
+            raise TimeoutError("Request timed out")
+        return bot
+
+    async def get_all_bots(self):
+        self.list_calls["bots"] += 1
+        return list(self.bots)
+
+    async def get_bot_details(self, bot_id):
+        return None
+
+    async def activate_bot(self, bot_id):
+        next(bot for bot in self.bots if bot.bot_id == bot_id).is_active = True
+
+    async def change_bot_notes(self, bot_id, notes):
+        self.notes[bot_id] = json.loads(notes)
+        next(bot for bot in self.bots if bot.bot_id == bot_id).notes = notes
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+def _service(server):
+    return BotService(server, server, server, None, None, None)
+
+
+def _create(server, lab_ids, **kwargs):
+    return asyncio.run(_service(server).create_mass_bots_from_labs(lab_ids, top_count=4, **kwargs))
+
+
+class TestBulkBotCreation:
+    """Test bulk creation against a stand-in server"""
+
+    def test_concurrent_creation(self, server):
+        result = _create(server, [f"lab{i}" for i in range(5)], max_concurrency=6, activate=True)
+
+        assert result.total_bots_created == 20 and result.total_bots_activated == 20
+        assert sorted(result.successful_labs) == [f"lab{i}" for i in range(5)]
+        assert server.peak == 6 and server.create_calls == 20
+        # Accounts are chosen from one listing instead of listing accounts and bots per bot
+        assert server.list_calls == {"accounts": 1, "bots": 3}
+        # Every bot got its own account and carries its idempotency key
+        assert len({bot.account_id for bot in server.bots}) == 20
+        for bot_result in result.bot_results:
+            lab_id = bot_result.backtest_id.split("-")[0]
+            key = bot_idempotency_key(lab_id, bot_result.backtest_id, bot_result.account_id)
+            assert server.notes[bot_result.bot_id]["origin"]["idempotency_key"] == key
+
+    def test_rerun_does_not_duplicate(self, server, tmp_path):
+        state_file = tmp_path / "bots.ndjson"
+        first = _create(server, ["lab0", "lab1"], state_file=state_file)
+        second = _create(server, ["lab0", "lab1", "lab2"], state_file=state_file)
+
+        assert first.total_bots_created == 8
+        assert second.total_bots_created == 12
+        assert server.create_calls == 12 and len(server.bots) == 12
+        assert {r.bot_id for r in first.bot_results} <= {r.bot_id for r in second.bot_results}
+
+    def test_failed_and_interrupted_creations(self, server, tmp_path):
+        state_file = tmp_path / "bots.ndjson"
+        # The request for this bot fails although the server created it
+        server.fail_after_create.add("lab0-bt1")
+        result = _create(server, ["lab0"], state_file=state_file)
+        # The failed request's bot is found on the server instead of being created again
+        assert result.total_bots_created == 4 and len(server.bots) == 4 and server.create_calls == 4
+
+        # Interrupt a run while its creations are in flight
+        server.delay = 0.2
+
+        async def interrupted():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(_service(server).create_mass_bots_from_labs(
+                    ["lab1"], top_count=4, state_file=state_file), 0.1)
+
+        asyncio.run(interrupted())
+        assert len(server.bots) == 4
+
+        server.delay = 0.0
+        creator = BulkBotCreator(_service(server), state_file)
+        results = asyncio.run(creator.run())
+
+        # Only the four interrupted requests are sent again
+        assert len(server.bots) == 8 and server.create_calls == 12
+        assert all(result.success for result in results)
+        assert creator.summary() == {CREATED: 8}
+        assert len({result.bot_id for result in results}) == 8
+
+    def test_rerun_only_deploys_requested_labs(self, server, tmp_path):
+        state_file = tmp_path / "bots.ndjson"
+        server.delay = 0.2
+
+        async def interrupted():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(_service(server).create_mass_bots_from_labs(
+                    ["lab0"], top_count=4, state_file=state_file), 0.1)
+
+        asyncio.run(interrupted())
+        assert not server.bots
+
+        server.delay = 0.0
+        result = _create(server, ["lab1"], state_file=state_file)
+
+        # The plans left for lab0 are neither deployed nor reported
+        assert result.total_bots_created == 4 and len(server.bots) == 4
+        assert {bot_result.backtest_id.split("-")[0] for bot_result in result.bot_results} == {"lab1"}
+        plans = BulkBotCreator(_service(server), state_file).plans.values()
+        assert {plan.lab_id for plan in plans if plan.status != CREATED} == {"lab0"}
+
+    def test_notes_key_matched_before_account_diff(self, server):
+        creator = BulkBotCreator(_service(server))
+        first = creator.plan("lab0", "lab0-bt0", "acc000")
+        second = creator.plan("lab0", "lab0-bt1", "acc000")
+        for plan in (first, second):
+            plan.status, plan.attempts, plan.baseline_bot_ids = FAILED, 1, []
+        # Only the second creation reached the server, and its notes name it
+        notes = json.dumps({"origin": {"idempotency_key": second.idempotency_key}})
+        server.bots.append(SimpleNamespace(bot_id="existing", bot_name="Bot", account_id="acc000",
+                                           market_tag="", is_active=False, notes=notes))
+
+        results = asyncio.run(creator.run())
+
+        assert second.bot_id == "existing"
+        assert first.bot_id not in (None, "existing") and server.create_calls == 1
+        assert all(result.success for result in results)
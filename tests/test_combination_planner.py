@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test suite for the combination-budget planner
+
+This test suite covers:
+- Measuring parameter sensitivity from previous backtests
+- Loading backtest history of a script from the unified cache
+- Fitting ranges to a target backtest count and freezing insensitive parameters
+- Planning inside LabParameterOptimizer before the lab is updated
+"""
+
+import sys
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI import optimization
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.combination_planner import (
+    CombinationPlanner, load_script_history, measure_sensitivity, select_levels
+)
+from pyHaasAPI.optimization import LabParameterOptimizer, OptimizationConfig
+
+OPTIONS = [str(v) for v in range(10, 30, 2)]
+
+
+def _metric(parameters):
+    length, fast = float(parameters['Length']), float(parameters['Fast'])
+    return 50.0 - 0.5 * (length - 20) ** 2 - 0.05 * (fast - 14) ** 2
+
+
+def _history(count=400, seed=3):
+    rng = random.Random(seed)
+    history = []
+    for _ in range(count):
+        parameters = {name: rng.choice(OPTIONS) for name in ('Length', 'Fast', 'Noise')}
+        history.append((parameters, _metric(parameters) + rng.uniform(-0.5, 0.5)))
+    return history
+
+
+def _lab_parameters():
+    return [{'K': f'{i}-{i}-10-15.{name}', 'T': 0, 'O': list(OPTIONS), 'I': True}
+            for i, name in enumerate(('Length', 'Fast', 'Noise'), 1)]
+
+
+class TestSensitivity:
+    """Test sensitivity measurement"""
+
+    def test_effects_rank_parameters(self):
+        sensitivities = measure_sensitivity(_history())
+
+        assert sensitivities['Length'].effect > sensitivities['Fast'].effect > sensitivities['Noise'].effect
+        assert sensitivities['Length'].effect > 0.8
+        assert sensitivities['Noise'].effect < 0.02
+        assert sensitivities['Length'].best_value == '20'
+
+    def test_too_little_history(self):
+        assert measure_sensitivity(_history(count=5)) == {}
+
+    def test_load_script_history(self, tmp_path):
+        cache = UnifiedCacheManager(str(tmp_path / "cache"))
+        for i, (parameters, roi) in enumerate(_history(count=20)):
+            cache.cache_backtest_data("lab1", f"bt{i}", {
+                'script_id': "script" if i % 2 else "other", 'market_tag': "BINANCE_BTC_USDT_",
+                'roi_percentage': roi,
+                'runtime_data': {'InputFields': {
+                    f'{j}-{j}-10-15.{name}': {'K': f'{j}-{j}-10-15.{name}', 'N': name, 'V': value}
+                    for j, (name, value) in enumerate(parameters.items(), 1)
+                }}
+            })
+
+        history = load_script_history(cache, "script", "BINANCE_BTC_USDT_")
+
+        assert len(history) == 10
+        assert set(history[0][0]) == {'Length', 'Fast', 'Noise'}
+        assert load_script_history(cache, "script", "BINANCE_ETH_USDT_") == []
+
+
+class TestCombinationPlanner:
+    """Test step allocation"""
+
+    def test_select_levels_keeps_ends_and_anchor(self):
+        assert select_levels(OPTIONS, 3) == ['10', '18', '28']
+        assert select_levels(OPTIONS, 3, anchor='20') == ['10', '20', '28']
+        assert select_levels(OPTIONS, 1, anchor='14') == ['14']
+        assert select_levels(['2.0', '1', '3'], 5) == ['1', '2.0', '3']
+
+    def test_plan_fits_target_using_sensitivity(self):
+        planner = CombinationPlanner(target_backtests=50, seconds_per_backtest=2.0)
+        plan = planner.plan(_lab_parameters(), measure_sensitivity(_history()))
+
+        assert plan.original_combinations == 1000
+        assert plan.combinations <= 50
+        assert plan.frozen == {'3-3-10-15.Noise': plan.sensitivities['3-3-10-15.Noise'].best_value}
+        assert plan.steps['1-1-10-15.Length'] > plan.steps['2-2-10-15.Fast']
+        assert '20' in plan.parameters[0]['O']
+        assert plan.parameters[2]['I'] is False
+        assert plan.estimated_seconds == plan.combinations * 2.0
+        assert "1,000 ->" in plan.summary()
+
+    def test_plan_without_history_spreads_steps(self):
+        plan = CombinationPlanner(target_backtests=100).plan(_lab_parameters())
+
+        assert plan.combinations <= 100
+        assert plan.frozen == {}
+        assert sorted(plan.steps.values()) == [4, 5, 5]
+
+    def test_tiny_budget_freezes_parameters(self):
+        plan = CombinationPlanner(target_backtests=3).plan(_lab_parameters(), measure_sensitivity(_history()))
+
+        assert plan.combinations <= 3
+        assert list(plan.steps) == ['1-1-10-15.Length']
+
+
+class TestOptimizerIntegration:
+    """Test LabParameterOptimizer fits ranges before updating the lab"""
+
+    def test_optimize_with_target_backtests(self, tmp_path, monkeypatch):
+        cache = UnifiedCacheManager(str(tmp_path / "cache"))
+        for i, (parameters, roi) in enumerate(_history()):
+            cache.cache_backtest_data("lab0", f"bt{i}", {
+                'script_id': "script", 'market_tag': "BINANCE_BTC_USDT_",
+                'roi_percentage': roi, 'parameter_values': parameters
+            })
+        lab = SimpleNamespace(lab_id="lab1", script_id="script",
+                              settings=SimpleNamespace(market_tag="BINANCE_BTC_USDT_"),
+                              parameters=_lab_parameters())
+        updated = []
+        monkeypatch.setattr(optimization, 'get_lab_details', lambda executor, lab_id: lab)
+        monkeypatch.setattr(optimization, 'update_lab_details', lambda executor, details: updated.append(details))
+
+        ranges = {param['K']: list(OPTIONS) for param in _lab_parameters()}
+        result = LabParameterOptimizer(object()).optimize_lab_parameters("lab1", OptimizationConfig(
+            custom_ranges=ranges, target_backtests=40, history_cache=cache, seconds_per_backtest=1.5
+        ))
+
+        assert result.success
+        assert result.total_combinations <= 40
+        assert result.estimated_runtime_seconds == result.total_combinations * 1.5
+        assert list(result.frozen_parameters) == ['3-3-10-15.Noise']
+        assert updated and len(updated[0].parameters[2]['O']) == 1
+
+    def test_oversized_lab_is_rejected_with_estimate(self, monkeypatch):
+        lab = SimpleNamespace(lab_id="lab1", script_id="script", parameters=_lab_parameters())
+        monkeypatch.setattr(optimization, 'get_lab_details', lambda executor, lab_id: lab)
+        monkeypatch.setattr(optimization, 'update_lab_details', lambda executor, details: details)
+
+        ranges = {param['K']: list(OPTIONS) for param in _lab_parameters()}
+        result = LabParameterOptimizer(object()).optimize_lab_parameters(
+            "lab1", OptimizationConfig(custom_ranges=ranges, max_combinations=500)
+        )
+
+        assert not result.success
+        assert result.total_combinations == 1000
+        assert result.estimated_runtime_seconds == 3000.0
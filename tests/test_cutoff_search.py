@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test suite for the k-ary history cutoff search
+
+This test suite covers:
+- Finding known cutoffs within the requested precision
+- Fewer search rounds than a binary search
+- Many markets searched in parallel against a stand-in server
+- Priors from sibling markets and batch discovery seeded from them
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.cutoff_search import (
+    discover_with_sibling_priors, kary_cutoff_search, market_sibling_key, prior_cutoff_search, sibling_cutoff_prior
+)
+
+NOW = datetime(2025, 6, 1)
+EARLIEST = NOW - timedelta(days=1000)
+LATEST = NOW - timedelta(days=1)
+
+
+class FakeHistoryServer:
+    """Markets with known cutoffs; counts the probes"""
+
+    def __init__(self, cutoffs):
+        self.cutoffs = cutoffs
+        self.probes = 0
+        self._lock = threading.Lock()
+
+    def prober(self, market_tag):
+        def probe(test_date):
+            with self._lock:
+                self.probes += 1
+            return test_date >= self.cutoffs[market_tag]
+        return probe
+
+
+def _markets(count):
+    return {f"BINANCE_COIN{i}_USDT_": EARLIEST + timedelta(days=37 * i + 3.3) for i in range(count)}
+
+
+class TestKaryCutoffSearch:
+    """Test the search against known cutoffs"""
+
+    @pytest.mark.parametrize("fanout", [1, 3, 7])
+    def test_finds_known_cutoffs(self, fanout):
+        server = FakeHistoryServer(_markets(25))
+        for market_tag, cutoff in server.cutoffs.items():
+            result = kary_cutoff_search(server.prober(market_tag), EARLIEST, LATEST, fanout=fanout)
+
+            assert cutoff <= result.cutoff_date <= cutoff + timedelta(hours=24)
+            assert result.precision_hours <= 24
+
+    def test_fewer_rounds_than_binary_search(self):
+        probe = FakeHistoryServer(_markets(1)).prober("BINANCE_COIN0_USDT_")
+
+        binary = kary_cutoff_search(probe, EARLIEST, LATEST, fanout=1)
+        kary = kary_cutoff_search(probe, EARLIEST, LATEST, fanout=7)
+
+        assert binary.rounds == 10 and binary.probes == 10
+        assert kary.rounds == 4 and kary.probes == 28
+
+    def test_round_limit_and_empty_range(self):
+        probe = FakeHistoryServer(_markets(1)).prober("BINANCE_COIN0_USDT_")
+
+        limited = kary_cutoff_search(probe, EARLIEST, LATEST, fanout=7, max_rounds=2)
+        assert limited.rounds == 2 and limited.precision_hours > 24
+        assert kary_cutoff_search(probe, LATEST, LATEST).cutoff_date is None
+        with pytest.raises(ValueError):
+            kary_cutoff_search(probe, EARLIEST, LATEST, fanout=0)
+
+
+class TestParallelMarketSearch:
+    """Test many markets searched in parallel against a stand-in server"""
+
+    def test_many_markets_in_parallel(self):
+        server = FakeHistoryServer(_markets(20))
+
+        def run(fanout, markets_in_parallel):
+            server.probes = 0
+            search = lambda tag: kary_cutoff_search(server.prober(tag), EARLIEST, LATEST, fanout=fanout)
+            with ThreadPoolExecutor(max_workers=markets_in_parallel) as pool:
+                results = dict(zip(server.cutoffs, pool.map(search, server.cutoffs)))
+            return results, server.probes
+
+        binary, binary_probes = run(fanout=1, markets_in_parallel=1)
+        kary, kary_probes = run(fanout=7, markets_in_parallel=8)
+
+        for market_tag, cutoff in server.cutoffs.items():
+            assert cutoff <= kary[market_tag].cutoff_date <= cutoff + timedelta(hours=24)
+        # Each round costs one probe latency, and the k-ary rounds probe in parallel
+        assert sum(r.rounds for r in binary.values()) == 200 and binary_probes == 200
+        assert sum(r.rounds for r in kary.values()) == 80 and kary_probes == 560
+
+
+def _exchange(exchange, quote, listed, count, offset=0):
+    """Markets of one exchange and quote asset listed within a few hours of each other"""
+    return {f"{exchange}_COIN{offset + i}_{quote}_": listed + timedelta(hours=(5 * i) % 7) for i in range(count)}
+
+
+class TestSiblingPriors:
+    """Test priors derived from cutoffs of sibling markets"""
+
+    def test_sibling_key(self):
+        assert market_sibling_key("BINANCEFUTURES_BTC_USDT_PERPETUAL") == ("BINANCEFUTURES", "USDT")
+        assert market_sibling_key("BINANCE_ETH_BTC_") == ("BINANCE", "BTC")
+        assert market_sibling_key("KRAKEN") == ("KRAKEN", None)
+
+    def test_prior_confidence(self):
+        listed = EARLIEST + timedelta(days=400)
+        known = {"BINANCE_A_USDT_": listed, "BINANCE_B_USDT_": listed + timedelta(hours=10),
+                 "BINANCE_C_BTC_": listed + timedelta(days=90), "KRAKEN_D_USDT_": EARLIEST}
+
+        confident = sibling_cutoff_prior("BINANCE_E_USDT_", known)
+        assert confident.confident and confident.siblings == 2
+        assert confident.high - confident.low == timedelta(hours=24)
+
+        # One sibling of the same quote asset brackets the search without confidence
+        single = sibling_cutoff_prior("BINANCE_F_BTC_", known)
+        assert not single.confident and single.low < known["BINANCE_C_BTC_"] < single.high
+        # Without a sibling of the quote asset, the whole exchange is used
+        assert sibling_cutoff_prior("BINANCE_G_ETH_", known).siblings == 3
+        assert sibling_cutoff_prior("BITMEX_H_USD_", known) is None
+
+    def test_verification_round(self):
+        server = FakeHistoryServer(_exchange("BINANCE", "USDT", EARLIEST + timedelta(days=400), 5))
+        tags = list(server.cutoffs)
+        known = {tag: server.cutoffs[tag] + timedelta(hours=3) for tag in tags[:4]}
+        prior = sibling_cutoff_prior(tags[4], known)
+
+        result = prior_cutoff_search(server.prober(tags[4]), EARLIEST, LATEST, prior)
+        assert result.rounds == 1 and result.probes == 2
+        assert server.cutoffs[tags[4]] <= result.cutoff_date <= server.cutoffs[tags[4]] + timedelta(hours=24)
+
+    def test_missed_prior_falls_back_to_search(self):
+        server = FakeHistoryServer({"BINANCE_LATE_USDT_": EARLIEST + timedelta(days=700)})
+        known = {"BINANCE_A_USDT_": EARLIEST + timedelta(days=100), "BINANCE_B_USDT_": EARLIEST + timedelta(days=100)}
+        prior = sibling_cutoff_prior("BINANCE_LATE_USDT_", known)
+
+        result = prior_cutoff_search(server.prober("BINANCE_LATE_USDT_"), EARLIEST, LATEST, prior)
+        cutoff = server.cutoffs["BINANCE_LATE_USDT_"]
+        assert cutoff <= result.cutoff_date <= cutoff + timedelta(hours=24)
+        assert result.rounds > 1
+
+
+class TestBatchDiscovery:
+    """Test batch discovery against a stand-in server with listing eras"""
+
+    def test_priors_reduce_probes(self):
+        cutoffs = {}
+        cutoffs.update(_exchange("BINANCE", "USDT", EARLIEST + timedelta(days=200), 15))
+        cutoffs.update(_exchange("BINANCE", "BTC", EARLIEST + timedelta(days=450), 10, offset=20))
+        cutoffs.update(_exchange("BYBIT", "USDT", EARLIEST + timedelta(days=700), 10, offset=40))
+
+        def run(use_priors):
+            server = FakeHistoryServer(cutoffs)
+
+            def discover(market_tag, prior):
+                if use_priors and prior:
+                    return prior_cutoff_search(server.prober(market_tag), EARLIEST, LATEST, prior)
+                return kary_cutoff_search(server.prober(market_tag), EARLIEST, LATEST)
+
+            return discover_with_sibling_priors(list(cutoffs), discover, {}, max_workers=1), server.probes
+
+        independent, independent_probes = run(use_priors=False)
+        seeded, seeded_probes = run(use_priors=True)
+
+        for market_tag, cutoff in cutoffs.items():
+            assert cutoff <= seeded[market_tag].cutoff_date <= cutoff + timedelta(hours=24)
+        # Seed markets need the full search and the second market of a group has only
+        # one sibling; most later ones are confirmed by a single verification round
+        assert sum(r.rounds == 1 for r in seeded.values()) >= 25
+        print(f"\nprobes without priors: {independent_probes}, with priors: {seeded_probes}")
+        assert seeded_probes * 3 < independent_probes
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test suite for early termination of hopeless lab runs
+
+This test suite covers:
+- The decision rule on recorded result sequences
+- Sampling only new result pages of a running lab
+- Cancelling hopeless labs and freeing their queue slot
+"""
+
+import sys
+import random
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI import early_termination, lab_queue
+from pyHaasAPI.early_termination import EarlyTerminationMonitor, MetricTarget, TerminationRule, simulate
+from pyHaasAPI.lab_queue import LabExecutionQueue, LabQueueConfig, CANCELLED, COMPLETED
+from pyHaasAPI.lab_scheduler import LabSchedulerConfig
+from pyHaasAPI.parameters import LabStatus
+
+
+def _recorded(mean, std, count=500, seed=1, drawdown=None):
+    rng = random.Random(seed)
+    results = []
+    for _ in range(count):
+        result = {'roi': rng.gauss(mean, std)}
+        if drawdown is not None:
+            result['fee_costs'] = abs(rng.gauss(drawdown, 2))
+        results.append(result)
+    return results
+
+
+def _backtest(index, roi):
+    return SimpleNamespace(backtest_id=f"bt{index}", summary=SimpleNamespace(ReturnOnInvestment=roi))
+
+
+class FakeLabServer:
+    """Running labs expose their results page by page; page ids are result offsets"""
+
+    def __init__(self, results):
+        self.results = results  # lab_id -> list of ROI values produced so far
+        self.page_requests = []
+        self.cancelled = []
+        self._lock = threading.Lock()
+
+    def get_backtest_result(self, executor, request):
+        with self._lock:
+            self.page_requests.append((request.lab_id, request.next_page_id))
+            values = self.results[request.lab_id]
+            start = request.next_page_id
+            items = [_backtest(i, values[i]) for i in range(start, min(len(values), start + request.page_lenght))]
+        return SimpleNamespace(items=items, next_page_id=start + len(items))
+
+    def cancel_lab_execution(self, executor, lab_id):
+        self.cancelled.append(lab_id)
+
+
+class TestTerminationRule:
+    """Test decisions on recorded result sequences"""
+
+    def test_hopeless_run_is_cancelled_early(self):
+        rule = TerminationRule([MetricTarget('roi', 50.0)], min_samples=30, min_progress=0.1)
+        cancelled_at = simulate(rule, _recorded(mean=-5.0, std=4.0), every=10)
+
+        assert cancelled_at == 50
+
+    def test_promising_runs_continue(self):
+        rule = TerminationRule([MetricTarget('roi', 50.0)], min_samples=30, min_progress=0.1)
+
+        # A wide distribution keeps a real chance of reaching the target
+        assert simulate(rule, _recorded(mean=20.0, std=15.0), every=10) is None
+        # Once a backtest meets the target the lab is never cancelled
+        decision = rule.evaluate([{'roi': 10.0}] * 40 + [{'roi': 60.0}], 500)
+        assert not decision.cancel and decision.probability == 1.0
+        assert decision.best == {'roi': 60.0}
+
+    def test_guards_and_joint_targets(self):
+        rule = TerminationRule([MetricTarget('roi', 50.0), MetricTarget('fee_costs', 1.0, higher_is_better=False)],
+                               min_samples=30, min_progress=0.2)
+        results = _recorded(mean=45.0, std=5.0, drawdown=10.0)
+
+        # Too few results, or too little progress, never cancel
+        assert not rule.evaluate(results[:20], 500).cancel
+        assert "backtests finished" in rule.evaluate(results[:60], 500).reason
+        # ROI alone is reachable; together with the fee target it is not
+        assert rule.evaluate(results[:120], 500).cancel
+        roi_only = TerminationRule([MetricTarget('roi', 50.0)], min_samples=30, min_progress=0.2)
+        assert not roi_only.evaluate(results[:120], 500).cancel
+
+    def test_requires_targets(self):
+        with pytest.raises(ValueError):
+            TerminationRule([])
+
+
+class TestEarlyTerminationMonitor:
+    """Test sampling against a stand-in server"""
+
+    def test_samples_only_new_pages(self, monkeypatch):
+        values = [r['roi'] for r in _recorded(mean=-5.0, std=4.0)]
+        server = FakeLabServer({"lab1": values[:45]})
+        monkeypatch.setattr(early_termination.api, 'get_backtest_result', server.get_backtest_result)
+        monkeypatch.setattr(early_termination.api, 'cancel_lab_execution', server.cancel_lab_execution)
+        cancelled = []
+
+        monitor = EarlyTerminationMonitor(object(), TerminationRule([MetricTarget('roi', 50.0)], min_progress=0.2),
+                                          page_size=20, on_cancel=lambda lab_id, d: cancelled.append(lab_id))
+        monitor.watch("lab1", expected_total=250)
+        assert not monitor.run_once()["lab1"].cancel
+        assert server.page_requests == [("lab1", 0), ("lab1", 20), ("lab1", 40)]
+
+        server.results["lab1"] = values[:60]
+        decision = monitor.run_once()["lab1"]
+
+        # The partial page is read again, then sampling continues from there
+        assert server.page_requests[3:] == [("lab1", 40), ("lab1", 60)]
+        assert decision.cancel and decision.samples == 60
+        assert server.cancelled == cancelled == ["lab1"]
+        assert monitor.run_once() == {}
+
+
+class TestQueueIntegration:
+    """Test that cancelled labs free their slot for queued work"""
+
+    def test_hopeless_lab_frees_slot(self, monkeypatch, tmp_path):
+        server = FakeLabServer({"hopeless": [r['roi'] for r in _recorded(mean=-5.0, std=4.0, count=80)],
+                                "next": []})
+        started = []
+        statuses = {"hopeless": LabStatus.RUNNING, "next": LabStatus.COMPLETED}
+
+        def start_lab_execution(executor, request, ensure_config=True):
+            started.append(request.lab_id)
+            return {'Success': True}
+
+        def get_lab_execution_update(executor, lab_id):
+            return SimpleNamespace(status=statuses[lab_id], progress=50.0, message=None, error=None)
+
+        def cancel_lab_execution(executor, lab_id):
+            server.cancel_lab_execution(executor, lab_id)
+            statuses[lab_id] = LabStatus.CANCELLED
+
+        monkeypatch.setattr(lab_queue.api, 'start_lab_execution', start_lab_execution)
+        monkeypatch.setattr(lab_queue.api, 'get_lab_execution_update', get_lab_execution_update)
+        monkeypatch.setattr(early_termination.api, 'get_backtest_result', server.get_backtest_result)
+        monkeypatch.setattr(early_termination.api, 'cancel_lab_execution', cancel_lab_execution)
+        queue_locked = []
+
+        def get_lab_details(executor, lab_id):
+            # The queue must not hold its lock during this request
+            queue_locked.append(queue._condition._is_owned())
+            return SimpleNamespace(config=SimpleNamespace(max_population=20, max_generations=10))
+
+        monkeypatch.setattr(early_termination.api, 'get_lab_details', get_lab_details)
+
+        config = LabQueueConfig(
+            max_running_per_server=1,
+            scheduler=LabSchedulerConfig(min_interval=0.5, max_interval=1.0),
+            early_termination=TerminationRule([MetricTarget('roi', 50.0)], min_samples=30, min_progress=0.2),
+            sample_interval=0.01
+        )
+        queue = LabExecutionQueue({"srv1": object()}, tmp_path / "queue.json", config)
+        try:
+            hopeless = queue.enqueue("srv1", "hopeless", 0, 100)
+            queue.enqueue("srv1", "next", 0, 100)
+            assert queue.wait(timeout=30)
+        finally:
+            queue.close()
+
+        assert started == ["hopeless", "next"]
+        assert server.cancelled == ["hopeless"]
+        assert queue_locked == [False, False]
+        entries = {entry.lab_id: entry for entry in queue.entries()}
+        assert entries["hopeless"].status == CANCELLED
+        assert entries["hopeless"].error_message.startswith("Terminated early")
+        assert entries["next"].status == COMPLETED
+        assert queue.entries()[0].entry_id == hopeless.entry_id
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test suite for the SQLite history cutoff database
+
+This test suite covers:
+- Upserts and lookup by market and by exchange
+- Staleness of stored cutoffs
+- The one-time import of JSON cutoff files
+- Concurrent writers in several processes
+"""
+
+import os
+import sys
+import json
+import multiprocessing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.history_database import SQLiteHistoryDatabase
+
+CUTOFF = datetime(2022, 11, 13, 21, 58, 10)
+
+
+def _write_cutoffs(db_path, worker, count):
+    database = SQLiteHistoryDatabase(db_path)
+    for i in range(count):
+        market_tag = f"BINANCE_W{worker}C{i}_USDT_"
+        database.store_cutoff(market_tag, CUTOFF + timedelta(days=i), {"final_precision_hours": 23})
+        # Every worker also rewrites a shared market
+        database.store_cutoff("BINANCE_BTC_USDT_", CUTOFF, {"worker": worker})
+    database.close()
+
+
+class TestSQLiteHistoryDatabase:
+    """Test storing and looking up cutoffs"""
+
+    def test_upsert_and_lookup(self, tmp_path):
+        database = SQLiteHistoryDatabase(tmp_path / "cutoffs.db")
+        assert database.store_cutoff("BINANCEFUTURES_BTC_USDT_PERPETUAL", CUTOFF, {"final_precision_hours": 23})
+        database.store_cutoff("BINANCEFUTURES_ETH_BTC_PERPETUAL", CUTOFF + timedelta(days=3))
+        database.store_cutoff("KRAKEN_BTC_USDT_", CUTOFF - timedelta(days=300), precision_hours=12)
+        first = database.get_cutoff("BINANCEFUTURES_BTC_USDT_PERPETUAL")
+
+        database.store_cutoff("BINANCEFUTURES_BTC_USDT_PERPETUAL", CUTOFF - timedelta(days=1),
+                              {"final_precision_hours": 6})
+        record = database.get_cutoff("BINANCEFUTURES_BTC_USDT_PERPETUAL")
+
+        assert record.cutoff_date == CUTOFF - timedelta(days=1)
+        assert record.precision_hours == 6 and record.exchange == "BINANCEFUTURES"
+        assert record.discovered_at == first.discovered_at and record.updated_at >= first.updated_at
+        assert set(database.get_cutoffs_by_exchange("BINANCEFUTURES")) == {
+            "BINANCEFUTURES_BTC_USDT_PERPETUAL", "BINANCEFUTURES_ETH_BTC_PERPETUAL"}
+        assert list(database.get_cutoffs_by_exchange("BINANCEFUTURES", "BTC")) == ["BINANCEFUTURES_ETH_BTC_PERPETUAL"]
+        assert len(database.get_all_cutoffs()) == 3
+        assert database.get_database_stats()['exchanges'] == 2
+
+        assert database.delete_cutoff("KRAKEN_BTC_USDT_")
+        assert database.get_cutoff("KRAKEN_BTC_USDT_") is None
+
+    def test_staleness(self, tmp_path):
+        database = SQLiteHistoryDatabase(tmp_path / "cutoffs.db")
+        database.store_cutoff("BINANCE_BTC_USDT_", CUTOFF)
+
+        assert database.get_cutoff("BINANCE_BTC_USDT_", max_age_seconds=3600) is not None
+        assert database.get_cutoff("BINANCE_BTC_USDT_", max_age_seconds=-1) is None
+        assert database.get_stale_cutoffs(3600) == []
+        assert database.get_stale_cutoffs(-1) == ["BINANCE_BTC_USDT_"]
+
+    def test_json_import_runs_once(self, tmp_path):
+        json_path = tmp_path / "cutoffs.json"
+        json_path.write_text(json.dumps({"cutoffs": {
+            "BINANCE_BTC_USDT_": {"cutoff_date": CUTOFF.isoformat(), "precision_hours": 23},
+            "BINANCE_ETH_USDT_": {"cutoff_date": (CUTOFF + timedelta(days=5)).isoformat(),
+                                  "discovery_metadata": {"final_precision_hours": 20}},
+            "BINANCE_BAD_USDT_": {"cutoff_date": "not a date"}
+        }}))
+        os.utime(json_path, (1_600_000_000, 1_600_000_000))
+
+        database = SQLiteHistoryDatabase(tmp_path / "cutoffs.db")
+        assert database.get_cutoff("BINANCE_ETH_USDT_").precision_hours == 20
+        assert database.get_cutoff("BINANCE_BAD_USDT_") is None
+
+        # Newer rows survive, and reopening does not import the file again
+        database.store_cutoff("BINANCE_BTC_USDT_", CUTOFF - timedelta(days=2))
+        assert database.import_json(json_path) == 0
+        reopened = SQLiteHistoryDatabase(tmp_path / "cutoffs.db")
+        assert reopened.get_cutoff("BINANCE_BTC_USDT_").cutoff_date == CUTOFF - timedelta(days=2)
+        assert reopened.get_database_stats()['imported_sources'] == [str(json_path.resolve())]
+
+    def test_concurrent_processes(self, tmp_path):
+        db_path = tmp_path / "cutoffs.db"
+        # Connections must not be open across fork()
+        SQLiteHistoryDatabase(db_path).close()
+
+        workers = [multiprocessing.Process(target=_write_cutoffs, args=(db_path, worker, 25)) for worker in range(4)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join(timeout=60)
+            assert process.exitcode == 0
+
+        cutoffs = SQLiteHistoryDatabase(db_path).get_all_cutoffs()
+        assert len(cutoffs) == 4 * 25 + 1
+        assert cutoffs["BINANCE_W3C24_USDT_"].cutoff_date == CUTOFF + timedelta(days=24)
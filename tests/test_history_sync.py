@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test suite for the concurrent history sync pipeline
+
+This test suite covers:
+- Keeping at most the configured number of markets syncing per server
+- One GET_HISTORY_STATUS request per server and polling round
+- Resuming an interrupted run from persisted progress
+- Markets whose depth cannot be set or that never sync
+- Syncing requested markets again after they finished or their depth changed
+"""
+
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI import history_sync
+from pyHaasAPI.history_sync import HistorySyncConfig, HistorySyncPipeline, FAILED, QUEUED, SYNCED, SYNCING, TIMED_OUT
+
+
+class FakeHistoryServers:
+    """Markets report Status 3 a few status polls after their depth was set"""
+
+    def __init__(self, polls_to_sync=3):
+        self.polls_to_sync = polls_to_sync
+        self.depth_set = {}  # (executor, market) -> polls since the depth was set
+        self.status_requests = {}
+        self.peak = {}
+        self.refuse = set()
+        self.never_sync = set()
+        self._lock = threading.Lock()
+
+    def set_history_depth(self, executor, market_tag, months):
+        with self._lock:
+            if market_tag in self.refuse:
+                return False
+            self.depth_set.setdefault((executor, market_tag), 0)
+            return True
+
+    def get_history_status(self, executor):
+        with self._lock:
+            self.status_requests[executor] = self.status_requests.get(executor, 0) + 1
+            statuses = {}
+            syncing = 0
+            for (server, market_tag), polls in self.depth_set.items():
+                if server != executor:
+                    continue
+                self.depth_set[(server, market_tag)] = polls + 1
+                synched = polls + 1 >= self.polls_to_sync and market_tag not in self.never_sync
+                syncing += 0 if polls >= self.polls_to_sync else 1
+                statuses[market_tag] = {"Status": 3 if synched else 1}
+            self.peak[executor] = max(self.peak.get(executor, 0), syncing)
+        return statuses
+
+
+@pytest.fixture
+def servers(monkeypatch):
+    servers = FakeHistoryServers()
+    monkeypatch.setattr(history_sync.api, 'set_history_depth', servers.set_history_depth)
+    monkeypatch.setattr(history_sync.api, 'get_history_status', servers.get_history_status)
+    return servers
+
+
+def _config(**overrides):
+    values = dict(months=24, max_syncing_per_server=4, poll_interval=0.001, market_timeout=30)
+    values.update(overrides)
+    return HistorySyncConfig(**values)
+
+
+class TestHistorySyncPipeline:
+    """Test syncing against stand-in servers"""
+
+    def test_concurrency_and_batched_polls(self, servers, tmp_path):
+        pipeline = HistorySyncPipeline({"srv1": "exec1", "srv2": "exec2"}, tmp_path / "sync.json",
+                                       _config(server_capacity={"srv2": 6}))
+        markets = [("srv1", f"BINANCE_A{i}_USDT_") for i in range(20)] + \
+                  [("srv2", f"BINANCE_B{i}_USDT_") for i in range(30)]
+
+        states = asyncio.run(pipeline.run(markets))
+        pipeline.close()
+
+        assert all(state.status == SYNCED for state in states.values())
+        assert servers.peak == {"exec1": 4, "exec2": 6}
+        # 20 markets, 4 at once, 3 polls each: one status request per round, not per market
+        assert servers.status_requests["exec1"] == 15
+        assert servers.status_requests["exec2"] == 15
+
+    def test_resume_after_interruption(self, servers, tmp_path):
+        state_file = tmp_path / "sync.json"
+        servers.polls_to_sync = 10 ** 6
+        pipeline = HistorySyncPipeline({"srv1": "exec1"}, state_file, _config(max_syncing_per_server=2))
+
+        async def interrupted():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(pipeline.run([("srv1", f"BINANCE_C{i}_USDT_") for i in range(5)]), 0.05)
+
+        asyncio.run(interrupted())
+        pipeline.close()
+
+        servers.polls_to_sync = 2
+        resumed = HistorySyncPipeline({"srv1": "exec1"}, state_file, _config(max_syncing_per_server=2))
+        assert sorted(state.status for state in resumed.states.values()) == [QUEUED] * 3 + [SYNCING] * 2
+        depth_calls = len(servers.depth_set)
+
+        states = asyncio.run(resumed.run())
+        resumed.close()
+
+        assert all(state.status == SYNCED for state in states.values())
+        # Markets that were syncing do not get their depth set again
+        assert len(servers.depth_set) == depth_calls + 3
+        assert HistorySyncPipeline({"srv1": "exec1"}, state_file).summary() == {SYNCED: 5}
+
+    def test_failures(self, servers, tmp_path):
+        servers.refuse.add("BINANCE_REFUSED_USDT_")
+        servers.never_sync.add("BINANCE_STUCK_USDT_")
+        pipeline = HistorySyncPipeline({"srv1": "exec1"}, tmp_path / "sync.json",
+                                       _config(market_timeout=0.2, depth_attempts=3))
+
+        states = asyncio.run(pipeline.run([("srv1", "BINANCE_REFUSED_USDT_"), ("srv1", "BINANCE_STUCK_USDT_"),
+                                           ("srv1", "BINANCE_OK_USDT_")]))
+        pipeline.close()
+
+        assert states["srv1:BINANCE_REFUSED_USDT_"].status == FAILED
+        assert states["srv1:BINANCE_REFUSED_USDT_"].depth_attempts == 3
+        assert states["srv1:BINANCE_STUCK_USDT_"].status == TIMED_OUT
+        assert states["srv1:BINANCE_OK_USDT_"].status == SYNCED
+        with pytest.raises(ValueError):
+            pipeline.add([("srv9", "BINANCE_BTC_USDT_")])
+
+    def test_requested_markets_are_synced_again(self, servers, tmp_path):
+        state_file = tmp_path / "sync.json"
+        markets = [("srv1", "BINANCE_BTC_USDT_"), ("srv1", "BINANCE_ETH_USDT_")]
+        pipeline = HistorySyncPipeline({"srv1": "exec1"}, state_file, _config())
+        asyncio.run(pipeline.run(markets))
+        pipeline.close()
+
+        # Requesting finished markets again, at the same or another depth, queues them again
+        rerun = HistorySyncPipeline({"srv1": "exec1"}, state_file, _config())
+        assert [state.key for state in rerun.add(markets[:1])] == ["srv1:BINANCE_BTC_USDT_"]
+        assert rerun.summary() == {QUEUED: 1, SYNCED: 1}
+        deeper = HistorySyncPipeline({"srv1": "exec1"}, state_file, _config(months=48))
+        assert deeper.add(markets[:1])[0].months == 48
+        states = asyncio.run(deeper.run(markets[1:]))
+        assert states["srv1:BINANCE_BTC_USDT_"].status == SYNCED
+        assert states["srv1:BINANCE_BTC_USDT_"].months == 48
+        # An unfinished market at the same depth keeps its progress
+        deeper.states["srv1:BINANCE_BTC_USDT_"].status = SYNCING
+        assert deeper.add(markets[:1]) == []
+
+        deeper.clear()
+        deeper.close()
+        assert HistorySyncPipeline({"srv1": "exec1"}, state_file).states == {}
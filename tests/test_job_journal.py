@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test suite for the append-only job journal
+
+This test suite covers:
+- Replaying the snapshot plus journal events
+- Ignoring a torn last line after a crash
+- Compaction into an atomic snapshot
+- Loading job files written by the old full-rewrite format
+- BacktestManager persistence across restarts
+- Single-job updates appending one event instead of rewriting 10k jobs
+"""
+
+import sys
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis.backtest_manager import BacktestManager, BacktestJob
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.analysis.job_journal import JobJournal
+
+
+def _job(i, status="pending"):
+    return asdict(BacktestJob(job_id=f"job{i}", job_type="lab", lab_id=f"lab{i}", script_id="script",
+                              market_tag="BINANCE_BTC_USDT_", status=status, created_at="2025-01-01T00:00:00"))
+
+
+class TestJobJournal:
+    """Test journal replay and compaction"""
+
+    def test_replay_applies_events(self, tmp_path):
+        journal = JobJournal(tmp_path / "jobs.json")
+        journal.put_many({f"job{i}": _job(i) for i in range(3)})
+        journal.put("job1", _job(1, "running"))
+        journal.delete(["job2"])
+        journal.close()
+
+        records = JobJournal(tmp_path / "jobs.json").replay()
+
+        assert sorted(records) == ["job0", "job1"]
+        assert records["job1"]["status"] == "running"
+        assert not (tmp_path / "jobs.json").exists()
+
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        journal = JobJournal(tmp_path / "jobs.json")
+        journal.put("job0", _job(0))
+        journal.close()
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"op": "put", "id": "job1", "da')
+
+        reopened = JobJournal(tmp_path / "jobs.json")
+        assert list(reopened.replay()) == ["job0"]
+
+        # Appending after the crash must not merge into the torn line
+        reopened.put("job2", _job(2))
+        reopened.close()
+        assert sorted(JobJournal(tmp_path / "jobs.json").replay()) == ["job0", "job2"]
+
+    def test_compaction(self, tmp_path):
+        journal = JobJournal(tmp_path / "jobs.json", compact_every=10)
+        for i in range(25):
+            journal.put("job0", _job(0, "running" if i % 2 else "pending"))
+        journal.close()
+
+        assert journal.journal_events < 10
+        assert "job0" in json.loads((tmp_path / "jobs.json").read_text())
+        assert JobJournal(tmp_path / "jobs.json").replay()["job0"]["status"] == "pending"
+
+    def test_loads_legacy_job_file(self, tmp_path):
+        (tmp_path / "jobs.json").write_text(json.dumps({"job0": _job(0, "completed")}, indent=2))
+
+        journal = JobJournal(tmp_path / "jobs.json")
+        assert journal.replay()["job0"]["status"] == "completed"
+        journal.put("job1", _job(1))
+        journal.close()
+
+        assert sorted(JobJournal(tmp_path / "jobs.json").replay()) == ["job0", "job1"]
+
+
+class TestBacktestManagerPersistence:
+    """Test BacktestManager journals job changes"""
+
+    def test_jobs_survive_restart(self, tmp_path):
+        cache = UnifiedCacheManager(str(tmp_path / "cache"))
+        manager = BacktestManager(cache)
+        jobs = [BacktestJob(**_job(i)) for i in range(3)]
+        for job in jobs:
+            manager.jobs[job.job_id] = job
+        manager._save_jobs(jobs)
+        jobs[0].status = "completed"
+        jobs[0].completed_at = "2000-01-01T00:00:00"
+        manager._save_jobs([jobs[0]])
+        manager.job_journal.close()
+
+        restarted = BacktestManager(cache)
+        assert restarted.jobs["job0"].status == "completed"
+        assert restarted.cleanup_old_jobs() == 1
+        restarted.job_journal.close()
+
+        assert sorted(BacktestManager(cache).jobs) == ["job1", "job2"]
+
+
+class TestJournalWriteCost:
+    """Test single-job updates cost one event instead of a full-file rewrite"""
+
+    JOBS = 10_000
+    UPDATES = 50
+
+    def test_put_does_not_rewrite_snapshot(self, tmp_path):
+        records = {f"job{i}": _job(i) for i in range(self.JOBS)}
+        journal = JobJournal(tmp_path / "journal.json")
+        journal.compact(records)
+        snapshot = journal.snapshot_path.read_bytes()
+
+        for i in range(self.UPDATES):
+            records[f"job{i}"]["status"] = "completed"
+            journal.put(f"job{i}", records[f"job{i}"])
+        journal.close()
+
+        # The snapshot is untouched and each update appends one event of about one record
+        assert journal.snapshot_path.read_bytes() == snapshot
+        events = journal.journal_path.read_text().splitlines()
+        assert len(events) == self.UPDATES
+        record_size = len(json.dumps(records["job0"]))
+        assert journal.journal_path.stat().st_size < self.UPDATES * (record_size + 100)
+        assert journal.journal_path.stat().st_size * 100 < len(snapshot)
+
+        replayed = JobJournal(tmp_path / "journal.json").replay()
+        assert replayed["job0"]["status"] == "completed"
+        assert len(replayed) == self.JOBS
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Test suite for bulk lab cloning
+
+This test suite covers:
+- Fetching each template lab once per bulk run
+- Per-target failure results that do not stop the batch
+- Result order and progress callbacks
+- Opt-in reuse of existing labs
+- The request rate limiter shared across threads
+"""
+
+import sys
+import time
+import types
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pyHaasAPI
+from pyHaasAPI import api
+from pyHaasAPI.rate_limit import RequestRateLimiter
+from pyHaasAPI.analysis.fingerprint import ParameterFingerprintIndex
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+
+
+def _import_cloning():
+    """
+    Import pyHaasAPI.labs.cloning without running the labs and markets package
+    __init__ modules, which import submodules missing from this tree.
+    """
+    stubbed = []
+    for name in ("markets", "labs"):
+        full_name = f"pyHaasAPI.{name}"
+        if full_name not in sys.modules:
+            package = types.ModuleType(full_name)
+            package.__path__ = [str(Path(pyHaasAPI.__file__).parent / name)]
+            sys.modules[full_name] = package
+            stubbed.append(full_name)
+    try:
+        return importlib.import_module("pyHaasAPI.labs.cloning")
+    finally:
+        for full_name in stubbed:
+            sys.modules.pop(full_name, None)
+
+
+cloning = _import_cloning()
+discovery = sys.modules["pyHaasAPI.markets.discovery"]
+
+
+def _market(base):
+    return discovery.MarketInfo(market_tag=f"BINANCEFUTURES_{base}_USDT_PERPETUAL", exchange="BINANCEFUTURES",
+                                base_asset=base, quote_asset="USDT", market_type=discovery.MarketType.PERPETUAL)
+
+
+def _template(lab_id):
+    return SimpleNamespace(
+        lab_id=lab_id, name=f"Template {lab_id}", script_id=f"script_{lab_id}",
+        settings=SimpleNamespace(market_tag="", account_id="", interval=15, leverage=20.0),
+        config=SimpleNamespace(max_population=10, max_generations=10),
+        parameters=[{'K': "10-Length", 'O': ["14"]}],
+    )
+
+
+class FakeLabServer:
+    def __init__(self, templates, failing_clones=(), failing_updates=()):
+        self.templates = {lab_id: _template(lab_id) for lab_id in templates}
+        self.failing_clones = set(failing_clones)  # Lab names CLONE_LAB rejects
+        self.failing_updates = set(failing_updates)  # Market tags the update rejects
+        self.detail_requests = []
+        self.clones = []
+        self.updates = []
+        self.request_times = []
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.request_times.append(time.monotonic())
+
+    def get_lab_details(self, executor, lab_id):
+        self._request()
+        with self._lock:
+            self.detail_requests.append(lab_id)
+        if lab_id in self.templates:
+            return self.templates[lab_id]
+        if lab_id in self.clones:
+            return SimpleNamespace(lab_id=lab_id)
+        raise RuntimeError(f"Lab {lab_id} not found")
+
+    def clone_lab(self, executor, lab_id, new_name=None):
+        self._request()
+        time.sleep(0.01)
+        if new_name in self.failing_clones:
+            raise RuntimeError("CLONE_LAB failed")
+        template = self.templates[lab_id]
+        with self._lock:
+            new_lab_id = f"clone{len(self.clones)}"
+            self.clones.append(new_lab_id)
+        return SimpleNamespace(lab_id=new_lab_id, name=new_name, script_id=template.script_id,
+                               settings=SimpleNamespace(**vars(template.settings)),
+                               config=SimpleNamespace(**vars(template.config)),
+                               parameters=[dict(param) for param in template.parameters])
+
+    def update_lab_details(self, executor, lab):
+        self._request()
+        if lab.settings.market_tag in self.failing_updates:
+            raise RuntimeError("UPDATE_LAB_DETAILS failed")
+        with self._lock:
+            self.updates.append((lab.lab_id, lab.settings.market_tag, lab.settings.account_id))
+        return lab
+
+
+def _patch(monkeypatch, server):
+    for name in ("get_lab_details", "clone_lab", "update_lab_details"):
+        monkeypatch.setattr(api, name, getattr(server, name))
+
+
+def _requests(template_ids, bases):
+    return [
+        cloning.LabCloneRequest(base_lab_id=template_id, new_lab_name=f"{template_id}_{base}",
+                                market_info=_market(base), account_id="acc1")
+        for template_id in template_ids for base in bases
+    ]
+
+
+class TestBulkCloning:
+    """Test bulk cloning against a stand-in lab server"""
+
+    def test_one_template_fetch_per_base_lab(self, monkeypatch):
+        server = FakeLabServer(["t1", "t2"])
+        _patch(monkeypatch, server)
+        cloner = cloning.LabCloner(None)
+        progress = []
+
+        requests = _requests(["t1", "t2"], ["BTC", "ETH", "SOL", "XRP", "ADA"])
+        results = cloner.clone_labs_bulk(requests, max_workers=4,
+                                         progress_callback=lambda done, total: progress.append((done, total)))
+
+        assert sorted(server.detail_requests) == ["t1", "t2"]
+        assert all(result.success and not result.reused for result in results)
+        assert [result.clone_request for result in results] == requests
+        assert [result.market_tag for result in results] == [request.market_info.market_tag for request in requests]
+        assert sorted(progress) == [(done, 10) for done in range(1, 11)]
+        assert len(server.clones) == 10 and len(server.updates) == 10
+        assert {(market_tag, account_id) for _, market_tag, account_id in server.updates} == {
+            (request.market_info.market_tag, "acc1") for request in requests}
+
+        # A second run reuses the cached templates
+        cloner.clone_labs_bulk(_requests(["t1"], ["DOGE"]))
+        assert sorted(server.detail_requests) == ["t1", "t2"]
+
+    def test_failures_do_not_stop_the_batch(self, monkeypatch):
+        server = FakeLabServer(["t1"], failing_clones=["t1_ETH"],
+                               failing_updates=["BINANCEFUTURES_SOL_USDT_PERPETUAL"])
+        _patch(monkeypatch, server)
+        cloner = cloning.LabCloner(None)
+
+        requests = _requests(["t1", "missing"], ["BTC", "ETH", "SOL", "XRP"])
+        results = cloner.clone_labs_bulk(requests, max_workers=3)
+
+        by_name = {result.clone_request.new_lab_name: result for result in results}
+        assert [result.clone_request for result in results] == requests
+        assert by_name["t1_BTC"].success and by_name["t1_XRP"].success
+        assert not by_name["t1_ETH"].success and by_name["t1_ETH"].new_lab_id is None
+        assert by_name["t1_ETH"].error_message == "CLONE_LAB failed"
+        # Cloned but not configured: reported with the lab so it can be fixed or removed
+        assert not by_name["t1_SOL"].success and by_name["t1_SOL"].new_lab_id in server.clones
+        assert by_name["t1_SOL"].error_message == "UPDATE_LAB_DETAILS failed"
+        assert all(not by_name[f"missing_{base}"].success for base in ["BTC", "ETH", "SOL", "XRP"])
+        assert server.detail_requests.count("missing") == 1
+
+        stats = cloner.get_cloning_statistics()
+        assert (stats['total_attempts'], stats['total_successes']) == (8, 2)
+
+    def test_reuse_is_opt_in(self, tmp_path, monkeypatch):
+        server = FakeLabServer(["t1"])
+        _patch(monkeypatch, server)
+        index = ParameterFingerprintIndex(UnifiedCacheManager(str(tmp_path / "cache")))
+
+        assert cloning.LabCloner(None).fingerprint_index is None
+        cloner = cloning.LabCloner(None, fingerprint_index=index)
+        first = cloner.clone_labs_bulk(_requests(["t1"], ["BTC"]))
+        second = cloner.clone_labs_bulk(_requests(["t1"], ["BTC"]))
+        assert not second[0].reused and second[0].new_lab_id != first[0].new_lab_id
+
+        reused = cloner.clone_labs_bulk(_requests(["t1"], ["BTC"]), reuse_existing=True)
+        assert reused[0].reused and reused[0].new_lab_id == second[0].new_lab_id
+        assert len(server.clones) == 2
+
+
+class TestRequestRateLimiter:
+    """Test the rate limiter shared by concurrent workers"""
+
+    def test_limit_holds_across_threads(self):
+        limiter = RequestRateLimiter(max_requests=3, time_window=0.2)
+        times = []
+        lock = threading.Lock()
+
+        def request(_):
+            limiter.acquire()
+            with lock:
+                times.append(time.monotonic())
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=9) as pool:
+            list(pool.map(request, range(9)))
+
+        times.sort()
+        assert len(times) == 9
+        assert all(times[i + 3] - times[i] >= 0.19 for i in range(len(times) - 3))
+        assert times[-1] - started >= 0.38
+
+    def test_bulk_cloning_goes_through_limiter(self, monkeypatch):
+        server = FakeLabServer(["t1"])
+        _patch(monkeypatch, server)
+        cloner = cloning.LabCloner(None, rate_limiter=RequestRateLimiter(max_requests=4, time_window=0.2))
+
+        cloner.clone_labs_bulk(_requests(["t1"], ["BTC", "ETH", "SOL", "XRP", "ADA"]), max_workers=8)
+
+        times = sorted(server.request_times)
+        assert len(times) == 11  # One template fetch, then a clone and an update per target
+        assert all(times[i + 4] - times[i] >= 0.19 for i in range(len(times) - 4))
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test suite for the capacity-aware lab execution queue
+
+This test suite covers:
+- Keeping at most the configured number of labs running per server
+- Starting queued labs by priority as running labs finish
+- Resuming queued and running labs after a restart
+- Per-server utilization and queue wait statistics
+"""
+
+import sys
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI import lab_queue
+from pyHaasAPI.lab_queue import LabExecutionQueue, LabQueueConfig, COMPLETED, FAILED, QUEUED, RUNNING
+from pyHaasAPI.lab_scheduler import LabSchedulerConfig
+from pyHaasAPI.parameters import LabStatus
+
+
+class FakeServers:
+    """Labs complete after a few status polls; tracks how many run at once per server"""
+
+    def __init__(self, polls_to_complete=3):
+        self.polls_to_complete = polls_to_complete
+        self.started = []
+        self.running = {}
+        self.peak = {}
+        self._polls = {}
+        self._lock = threading.Lock()
+
+    def start_lab_execution(self, executor, request, ensure_config=True):
+        with self._lock:
+            if request.lab_id == "broken":
+                return {'Success': False, 'Error': "Script error"}
+            self.started.append((executor, request.lab_id))
+            self._polls[request.lab_id] = 0
+            self.running[executor] = self.running.get(executor, 0) + 1
+            self.peak[executor] = max(self.peak.get(executor, 0), self.running[executor])
+        return {'Success': True}
+
+    def get_lab_execution_update(self, executor, lab_id):
+        with self._lock:
+            self._polls[lab_id] = self._polls.get(lab_id, 0) + 1
+            done = self._polls[lab_id] >= self.polls_to_complete
+            if done and self._polls[lab_id] == self.polls_to_complete:
+                self.running[executor] -= 1
+        status = LabStatus.COMPLETED if done else LabStatus.RUNNING
+        return SimpleNamespace(status=status, progress=100.0 if done else 50.0, message=None, error=None)
+
+
+@pytest.fixture
+def servers(monkeypatch):
+    servers = FakeServers()
+    monkeypatch.setattr(lab_queue.api, 'start_lab_execution', servers.start_lab_execution)
+    monkeypatch.setattr(lab_queue.api, 'get_lab_execution_update', servers.get_lab_execution_update)
+    return servers
+
+
+def _config(**overrides):
+    values = dict(max_running_per_server=2,
+                  scheduler=LabSchedulerConfig(min_interval=0.005, max_interval=0.02))
+    values.update(overrides)
+    return LabQueueConfig(**values)
+
+
+class TestLabExecutionQueue:
+    """Test dispatching against stand-in servers"""
+
+    def test_capacity_per_server(self, servers, tmp_path):
+        queue = LabExecutionQueue({"srv1": "exec1", "srv2": "exec2"}, tmp_path / "queue.json",
+                                  _config(server_capacity={"srv2": 3}))
+        try:
+            for i in range(8):
+                queue.enqueue("srv1", f"a{i}", 0, 100)
+                queue.enqueue("srv2", f"b{i}", 0, 100)
+            assert queue.wait(timeout=30)
+        finally:
+            queue.close()
+
+        assert servers.peak == {"exec1": 2, "exec2": 3}
+        assert len(servers.started) == 16
+        assert all(entry.status == COMPLETED for entry in queue.entries())
+
+    def test_priority_order(self, servers, tmp_path):
+        queue = LabExecutionQueue({"srv1": "exec1"}, tmp_path / "queue.json", _config(max_running_per_server=1))
+        try:
+            queue.enqueue("srv1", "first", 0, 100)
+            queue.enqueue("srv1", "low", 0, 100, priority=0)
+            queue.enqueue("srv1", "high", 0, 100, priority=5)
+            queue.enqueue("srv1", "low2", 0, 100, priority=0)
+            queue.enqueue("srv1", "broken", 0, 100, priority=9)
+            assert queue.wait(timeout=30)
+        finally:
+            queue.close()
+
+        assert [lab_id for _, lab_id in servers.started] == ["first", "high", "low", "low2"]
+        assert queue.entries(status=FAILED)[0].error_message.endswith("Script error")
+
+    def test_resume_after_restart(self, servers, tmp_path):
+        state_file = tmp_path / "queue.json"
+        servers.polls_to_complete = 10 ** 6
+        queue = LabExecutionQueue({"srv1": "exec1"}, state_file, _config(max_running_per_server=1))
+        for i in range(3):
+            queue.enqueue("srv1", f"lab{i}", 0, 100, priority=i)
+        queue._dispatcher.submit(lambda: None).result()
+        loop = queue.schedulers["srv1"]._loop
+        queue.close()
+        assert [lab_id for _, lab_id in servers.started] == ["lab0"]
+        assert not asyncio.all_tasks(loop)  # Closing with a watched lab leaves no pending tasks
+
+        # The running lab finishes while no process watches it
+        servers.polls_to_complete = 1
+        restarted = LabExecutionQueue({"srv1": "exec1"}, state_file, _config(max_running_per_server=1))
+        assert [e.status for e in restarted.entries()] == [RUNNING, QUEUED, QUEUED]
+        try:
+            restarted.resume()
+            assert restarted.wait(timeout=30)
+        finally:
+            restarted.close()
+
+        assert [lab_id for _, lab_id in servers.started] == ["lab0", "lab2", "lab1"]
+        assert all(entry.status == COMPLETED for entry in restarted.entries())
+
+    def test_server_stats(self, servers, tmp_path):
+        queue = LabExecutionQueue({"srv1": "exec1"}, tmp_path / "queue.json", _config(max_running_per_server=2))
+        try:
+            for i in range(6):
+                queue.enqueue("srv1", f"lab{i}", 0, 100)
+            assert queue.wait(timeout=30)
+            stats = queue.server_stats()["srv1"]
+        finally:
+            queue.close()
+
+        assert stats.capacity == 2
+        assert stats.completed == 6 and stats.running == 0 and stats.queued == 0
+        assert 0.5 < stats.utilization <= 1.0
+        assert stats.max_wait >= stats.average_wait > 0
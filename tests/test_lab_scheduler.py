@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test suite for the lab execution scheduler
+
+This test suite covers:
+- Completion delivery through futures and callbacks
+- Adaptive poll intervals from lab progress
+- Backoff for labs without progress and timeout cancellation
+- Per-lab polling cost as the number of watched labs grows
+- Sharing one scheduler loop between threads
+- Failing pending waiters on close and raising for labs that did not complete
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI import lab_scheduler
+from pyHaasAPI.lab_scheduler import LabExecutionScheduler, LabSchedulerConfig, SchedulerClosedError, wait_for_labs
+from pyHaasAPI.parameters import LabStatus
+
+
+class FakeExecutionServer:
+    """Labs that progress linearly and finish after a fixed duration"""
+
+    def __init__(self, durations, stalled=()):
+        self.durations = durations
+        self.stalled = set(stalled)
+        self.started = {lab_id: time.monotonic() for lab_id in durations}
+        self.polls = {lab_id: 0 for lab_id in durations}
+        self.cancelled = []
+        self._lock = threading.Lock()
+
+    def get_lab_execution_update(self, executor, lab_id):
+        with self._lock:
+            self.polls[lab_id] += 1
+        if lab_id in self.cancelled:
+            return SimpleNamespace(status=LabStatus.CANCELLED, progress=0.0, message="Cancelled", error=None)
+        if lab_id in self.stalled:
+            return SimpleNamespace(status=LabStatus.QUEUED, progress=0.0, message=None, error=None)
+        progress = min(100.0, (time.monotonic() - self.started[lab_id]) / self.durations[lab_id] * 100)
+        status = LabStatus.COMPLETED if progress >= 100.0 else LabStatus.RUNNING
+        return SimpleNamespace(status=status, progress=progress, message=None, error=None)
+
+    def cancel_lab_execution(self, executor, lab_id):
+        self.cancelled.append(lab_id)
+
+
+@pytest.fixture
+def server_factory(monkeypatch):
+    def create(durations, stalled=()):
+        server = FakeExecutionServer(durations, stalled)
+        monkeypatch.setattr(lab_scheduler.api, 'get_lab_execution_update', server.get_lab_execution_update)
+        monkeypatch.setattr(lab_scheduler.api, 'cancel_lab_execution', server.cancel_lab_execution)
+        return server
+    return create
+
+
+def _config(**overrides):
+    values = dict(min_interval=0.01, max_interval=0.2, max_concurrent_requests=8)
+    values.update(overrides)
+    return LabSchedulerConfig(**values)
+
+
+class TestLabExecutionScheduler:
+    """Test the single-loop scheduler"""
+
+    def test_wait_and_callback(self, server_factory):
+        server_factory({"lab1": 0.2, "lab2": 0.4})
+        notified = []
+
+        async def run():
+            scheduler = LabExecutionScheduler(object(), _config())
+            first = scheduler.watch("lab1", callback=notified.append)
+            second = scheduler.watch("lab2")
+            return await first, await second, scheduler
+
+        first, second, scheduler = asyncio.run(run())
+
+        assert first.completed and second.completed
+        assert first.elapsed < second.elapsed
+        assert notified == [first]
+        assert scheduler.watched_labs == []
+
+    def test_progress_drives_poll_interval(self, server_factory):
+        server = server_factory({"lab1": 1.0})
+        completion = asyncio.run(LabExecutionScheduler(object(), _config(max_interval=1.0)).wait("lab1"))
+
+        # Fixed 10 ms polling would need ~100 requests
+        assert completion.completed
+        assert server.polls["lab1"] < 30
+
+    def test_stalled_lab_backs_off_and_times_out(self, server_factory):
+        server = server_factory({"lab1": 10.0}, stalled={"lab1"})
+        scheduler = LabExecutionScheduler(object(), _config(max_interval=10.0))
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(scheduler.wait("lab1", timeout=0.5))
+
+        assert server.cancelled == ["lab1"]
+        # Exponential backoff from 10 ms reaches 0.5 s in about ten polls
+        assert server.polls["lab1"] < 15
+
+    def test_cancelled_lab_is_reported(self, server_factory):
+        server = server_factory({"lab1": 10.0})
+        server.cancelled.append("lab1")
+
+        completion = asyncio.run(LabExecutionScheduler(object(), _config()).wait("lab1"))
+
+        assert completion.status == LabStatus.CANCELLED
+        assert not completion.completed
+        assert completion.message == "Cancelled"
+
+    def test_polling_cost_per_lab_is_constant(self, server_factory):
+        def polls_per_lab(count):
+            durations = {f"lab{i}": 0.3 + (i % 5) * 0.05 for i in range(count)}
+            server = server_factory(durations)
+            completions = wait_for_labs(object(), durations, config=_config())
+            assert len(completions) == count
+            return sum(server.polls.values()) / count
+
+        small, large = polls_per_lab(5), polls_per_lab(100)
+        assert large <= small * 2
+
+    def test_threads_share_one_loop(self, server_factory):
+        server_factory({f"lab{i}": 0.2 for i in range(6)})
+        scheduler = LabExecutionScheduler(object(), _config())
+        try:
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                completions = list(pool.map(scheduler.wait_sync, [f"lab{i}" for i in range(6)]))
+        finally:
+            scheduler.close()
+
+        assert all(c.completed for c in completions)
+        assert scheduler.request_count == sum(c.polls for c in completions)
+
+    def test_close_fails_pending_waiters(self, server_factory):
+        server_factory({"lab1": 10.0}, stalled={"lab1"})
+        scheduler = LabExecutionScheduler(object(), _config())
+        future = scheduler.submit("lab1")
+        time.sleep(0.05)
+        loop = scheduler._loop
+
+        scheduler.close()
+
+        with pytest.raises(SchedulerClosedError):
+            future.result(timeout=1)
+        assert not asyncio.all_tasks(loop)
+        assert scheduler.watched_labs == []
+
+        # The scheduler starts a new loop when used again
+        server_factory({"lab2": 0.05})
+        assert scheduler.wait_sync("lab2").completed
+        scheduler.close()
+
+    def test_wait_for_execution_raises_unless_completed(self, server_factory):
+        from pyHaasAPI.lab import wait_for_execution
+        from pyHaasAPI.api import HaasApiError
+
+        server = server_factory({"lab1": 0.05, "lab2": 10.0, "lab3": 10.0}, stalled={"lab3"})
+        server.cancelled.append("lab2")
+
+        async def inside_running_loop():
+            return wait_for_execution(object(), "lab1", config=_config())
+
+        assert asyncio.run(inside_running_loop()).completed
+        with pytest.raises(HaasApiError, match="CANCELLED"):
+            wait_for_execution(object(), "lab2", config=_config())
+        with pytest.raises(TimeoutError):
+            wait_for_execution(object(), "lab3", timeout=0.05, config=_config())
+
+
+class TestLabManagerScheduling:
+    """Test LabManager waits through the scheduler"""
+
+    def test_wait_for_completion(self, server_factory, tmp_path):
+        from pyHaasAPI.analysis.cache import UnifiedCacheManager
+        from pyHaasAPI.analysis.fingerprint import ParameterFingerprintIndex
+        from pyHaasAPI.lab_manager import LabManager
+
+        server = server_factory({"lab1": 0.1, "lab2": 10.0}, stalled={"lab2"})
+        manager = LabManager(object(), ParameterFingerprintIndex(UnifiedCacheManager(str(tmp_path / "cache"))))
+        manager.scheduler = LabExecutionScheduler(object(), _config())
+        try:
+            assert manager._wait_for_completion("lab1", timeout_minutes=1) is True
+            assert manager._wait_for_completion("lab2", timeout_minutes=0.005) is False
+            assert manager.scheduler._thread is not None
+        finally:
+            manager.close()
+
+        assert manager.scheduler._thread is None
+        assert server.cancelled == ["lab2"]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test suite for fleet validation of live bots
+
+This test suite covers:
+- Fetching price, history cutoff and labs once per market
+- One lab backtest per script and market, shared by its bots
+- Validating markets concurrently
+- The structured fleet report, including failed markets
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis import live_bot_validator as validator_module
+from pyHaasAPI.analysis.live_bot_validator import LiveBotValidator
+from pyHaasAPI.model import HaasBot
+
+
+def _bot(bot_id, market, script_id="script1", roi=5.0, active=True):
+    return HaasBot.model_validate({
+        "UI": "user", "ID": bot_id, "BN": f"Bot {bot_id}", "SI": script_id, "SV": 1, "AI": f"acc_{bot_id}",
+        "PM": market, "EI": "", "IA": active, "IP": False, "IF": False, "NO": "", "SN": "", "NT": 0,
+        "RP": 12.0, "UP": 1.0, "ROI": roi, "TAE": False, "AE": False, "SE": False, "UC": 0, "CI": 15,
+        "CS": 300, "CV": False, "IWL": False, "MBID": "", "F": 0,
+    })
+
+
+class FakeServer:
+    def __init__(self, bots, broken_markets=()):  # Base assets whose lab cannot be created
+        self.bots = bots
+        self.broken_markets = set(broken_markets)
+        self.calls = {"bots": 0, "labs": 0, "price": 0, "create_lab": 0, "start": 0, "bot": 0}
+        self.started_labs = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+
+    def get_all_bots(self, executor):
+        self._count("bots")
+        return self.bots
+
+    def get_all_labs(self, executor):
+        self._count("labs")
+        return []
+
+    def get_price_data(self, executor, market):
+        self._count("price")
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self._lock:
+            self.in_flight -= 1
+        return {"C": 100.0 + len(market)}
+
+    def create_lab(self, executor, request):
+        self._count("create_lab")
+        if request.market.split('_')[1] in self.broken_markets:
+            raise RuntimeError("Lab creation failed")
+        return SimpleNamespace(lab_id=f"lab_{request.script_id}_{request.market.split('_')[1]}")
+
+    def start_lab_execution(self, executor, request):
+        self._count("start")
+        if request.end_unix - request.start_unix > 3600:
+            with self._lock:
+                self.started_labs.append(request.lab_id)
+        return {"Success": True}
+
+    def get_lab_details(self, executor, lab_id):
+        return SimpleNamespace(is_running=False)
+
+    def get_full_bot_runtime_data(self, executor, bot_id):
+        self._count("bot")
+        raise AssertionError("Live performance should come from the GET_BOTS snapshot")
+
+
+def _patch(monkeypatch, server):
+    for name in ("get_all_bots", "get_all_labs", "get_price_data", "create_lab", "start_lab_execution",
+                 "get_lab_details", "get_full_bot_runtime_data"):
+        monkeypatch.setattr(validator_module.api, name, getattr(server, name))
+
+
+class TestFleetValidation:
+    """Test validating a fleet against a stand-in server"""
+
+    def test_market_data_fetched_once_per_market(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        markets = ["BINANCEFUTURES_BTC_USDT_PERPETUAL", "BINANCEFUTURES_ETH_USDT_PERPETUAL",
+                   "BINANCEFUTURES_SOL_USDT_PERPETUAL"]
+        bots = [_bot(f"bot{i:02d}", markets[i % 3], script_id="script2" if i in (0, 3) else "script1")
+                for i in range(30)]
+        bots.append(_bot("idle", markets[0], active=False))
+        server = FakeServer(bots)
+        _patch(monkeypatch, server)
+        validator = LiveBotValidator(None)
+        validator.connect(object())
+
+        run = validator.validate_fleet(max_workers=3)
+
+        assert (run.total_bots, run.total_markets, run.jobs_created) == (30, 3, 30)
+        assert server.calls["bots"] == 1 and server.calls["labs"] == 1 and server.calls["bot"] == 0
+        assert server.calls["price"] == 3
+        assert server.calls["create_lab"] == 4  # One lab per script and market
+        assert sorted(server.started_labs) == ["lab_script1_BTC", "lab_script1_ETH", "lab_script1_SOL",
+                                               "lab_script2_BTC"]
+        assert server.max_in_flight >= 2
+
+        btc = next(summary for summary in run.markets if summary.market_tag == markets[0])
+        assert len(btc.bot_ids) == 10 and set(btc.lab_ids) == {"script1", "script2"}
+        assert btc.price == 100.0 + len(markets[0]) and btc.cutoff_date is not None
+        assert all(job.status == "running" and job.live_roi == 5.0 for job in run.jobs)
+        assert len(validator.jobs) == 30 and validator.jobs_file.exists()
+
+    def test_failed_market_is_reported(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        bots = [_bot("a1", "BINANCEFUTURES_BTC_USDT_PERPETUAL"), _bot("a2", "BINANCEFUTURES_BTC_USDT_PERPETUAL"),
+                _bot("b1", "BINANCEFUTURES_XRP_USDT_PERPETUAL")]
+        server = FakeServer(bots, broken_markets=["XRP"])
+        _patch(monkeypatch, server)
+        validator = LiveBotValidator(None)
+        validator.connect(object())
+
+        run = validator.validate_fleet()
+        report = run.to_dict()
+
+        assert [job.bot_id for job in validator.validate_all_live_bots(max_bots=2)] == ["a1", "a2"]
+        assert run.jobs_created == 2
+        assert run.failed_bots == {"b1": "Lab creation failed"}
+        assert {market["market_tag"]: market["error_message"] for market in report["markets"]} == {
+            "BINANCEFUTURES_BTC_USDT_PERPETUAL": None,
+            "BINANCEFUTURES_XRP_USDT_PERPETUAL": "Lab creation failed",
+        }
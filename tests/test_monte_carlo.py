@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test suite for Monte Carlo trade resampling
+
+This test suite covers:
+- Seeded reproducibility and batch-order independence
+- Bootstrap and permutation distributions
+- Risk of ruin and drawdown percentiles
+- Integration with StrategyRobustnessAnalyzer
+"""
+
+import sys
+import time
+import tempfile
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.analysis.models import BacktestAnalysis
+from pyHaasAPI.analysis.monte_carlo import MonteCarloSimulator, MonteCarloConfig, MonteCarloMethod
+from pyHaasAPI.analysis.robustness import StrategyRobustnessAnalyzer
+
+
+def _backtest_data(pnls):
+    return {'runtime_data': {'FinishedPositions': [
+        {'ct': 1_700_000_000 + i * 3600, 'rp': pnl, 'fe': 0.0, 'eno': [{'m': 100.0}]}
+        for i, pnl in enumerate(pnls)
+    ]}}
+
+
+class TestMonteCarloSimulator:
+    """Test Monte Carlo simulations"""
+
+    def test_seeded_reproducibility(self):
+        pnls = np.random.default_rng(0).normal(5, 50, 200)
+        first = MonteCarloSimulator(MonteCarloConfig(simulations=500, seed=7)).simulate_trades("bt1", pnls, 1000.0)
+        second = MonteCarloSimulator(MonteCarloConfig(simulations=500, seed=7)).simulate_trades("bt1", pnls, 1000.0)
+        other_seed = MonteCarloSimulator(MonteCarloConfig(simulations=500, seed=8)).simulate_trades("bt1", pnls, 1000.0)
+
+        assert first == second
+        assert first.terminal_return_percentiles != other_seed.terminal_return_percentiles
+
+    def test_batch_is_order_independent(self):
+        simulator = MonteCarloSimulator(MonteCarloConfig(simulations=300))
+        data = {"a": _backtest_data([10, -5, 20, -15]), "b": _backtest_data([1, 2, -3])}
+        forward = simulator.simulate_batch(data, {"a": 1000.0, "b": 500.0})
+        reverse = simulator.simulate_batch(dict(reversed(list(data.items()))), {"a": 1000.0, "b": 500.0})
+
+        assert forward == reverse
+
+    def test_permutation_keeps_terminal_return(self):
+        simulator = MonteCarloSimulator(MonteCarloConfig(simulations=200, method=MonteCarloMethod.PERMUTATION))
+        result = simulator.simulate_trades("bt1", [100.0, -50.0, 30.0, -80.0], 1000.0)
+
+        assert list(result.terminal_return_percentiles.values()) == pytest.approx([0.0] * 5)
+        assert result.probability_of_loss == 0.0
+        # Worst ordering puts both losses first: 130 / 1000
+        assert result.max_drawdown_percentiles["p95"] <= 13.0 + 1e-9
+        assert result.max_drawdown_percentiles["p5"] >= 0.0
+
+    def test_risk_of_ruin(self):
+        config = MonteCarloConfig(simulations=1000, ruin_loss_percentage=50.0)
+        losing = MonteCarloSimulator(config).simulate_trades("bt1", [-100.0] * 10, 1000.0)
+        winning = MonteCarloSimulator(config).simulate_trades("bt2", [100.0] * 10, 1000.0)
+
+        assert losing.risk_of_ruin == 1.0
+        assert losing.max_drawdown_percentiles["p50"] == pytest.approx(100.0)
+        assert winning.risk_of_ruin == 0.0
+        assert winning.terminal_return_percentiles["p50"] == pytest.approx(100.0)
+        assert winning.equity_bands["p50"][-1] == pytest.approx(2000.0)
+
+    def test_chunked_matches_unchunked(self):
+        pnls = np.random.default_rng(1).normal(2, 20, 100)
+        whole = MonteCarloSimulator(MonteCarloConfig(simulations=400)).simulate_trades("bt1", pnls, 1000.0)
+        chunked = MonteCarloSimulator(
+            MonteCarloConfig(simulations=400, max_matrix_elements=1000)
+        ).simulate_trades("bt1", pnls, 1000.0)
+
+        assert whole == chunked
+
+    def test_lab_top_n_in_seconds(self):
+        rng = np.random.default_rng(2)
+        pnls = {f"bt{i}": rng.normal(3, 40, 500) for i in range(20)}
+        simulator = MonteCarloSimulator(MonteCarloConfig(simulations=5000))
+
+        start = time.time()
+        results = {bt: simulator.simulate_trades(bt, trades, 10000.0) for bt, trades in pnls.items()}
+        elapsed = time.time() - start
+
+        assert len(results) == 20
+        assert elapsed < 30
+
+
+class TestRobustnessMonteCarlo:
+    """Test Monte Carlo results feed RobustnessMetrics"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = UnifiedCacheManager(str(Path(self.temp_dir) / "cache"))
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_metrics_include_monte_carlo(self):
+        backtest = BacktestAnalysis(
+            backtest_id="bt1", lab_id="lab_1", generation_idx=0, population_idx=0,
+            market_tag="BINANCE_BTC_USDT_", script_id="script", script_name="Script",
+            roi_percentage=50.0, calculated_roi_percentage=40.0, roi_difference=10.0,
+            win_rate=0.9, total_trades=10, max_drawdown=5.0, realized_profits_usdt=100.0,
+            pc_value=0.0, avg_profit_per_trade=10.0, profit_factor=1.5, sharpe_ratio=0.0,
+            starting_balance=1000.0, final_balance=100.0, peak_balance=1000.0,
+            analysis_timestamp="2024-01-01T00:00:00"
+        )
+        self.cache.cache_backtest_data("lab_1", "bt1", _backtest_data([-100.0] * 9 + [10.0]))
+        analyzer = StrategyRobustnessAnalyzer(self.cache, monte_carlo_config=MonteCarloConfig(simulations=200))
+
+        metrics = analyzer.analyze_backtest_robustness(backtest)
+
+        assert metrics.monte_carlo is not None
+        assert metrics.monte_carlo.risk_of_ruin > 0.5
+        assert metrics.risk_level == "HIGH"
+        assert "Risk of Ruin" in analyzer.generate_robustness_report({"bt1": metrics})
+
+        # A pre-computed result is judged with the default limits on an analyzer without a simulator
+        result = MonteCarloSimulator(MonteCarloConfig(simulations=200)).simulate_backtest(
+            "bt1", _backtest_data([-100.0] * 9 + [10.0]), 1000.0)
+        plain = StrategyRobustnessAnalyzer(self.cache)
+        assert plain.analyze_backtest_robustness(backtest, monte_carlo=result).risk_level == "HIGH"
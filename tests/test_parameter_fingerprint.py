@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test suite for canonical parameter fingerprints
+
+This test suite covers:
+- Numeric normalization and input key canonicalization
+- The persistent fingerprint index
+- Skipping runtime fetches for parameter sets analyzed before
+- Collapsing duplicates in cached analysis reports
+- Reusing identical lab runs in LabManager
+"""
+
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis import analyzer as analyzer_module
+from pyHaasAPI.analysis.analyzer import HaasAnalyzer
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.analysis.fingerprint import (
+    ParameterFingerprintIndex, canonical_parameters, normalize_parameter_value, parameter_fingerprint
+)
+
+
+class TestParameterFingerprint:
+    """Test fingerprint canonicalization"""
+
+    def test_normalize_values(self):
+        assert normalize_parameter_value("10.0") == "10"
+        assert normalize_parameter_value("0.50") == "0.5"
+        assert normalize_parameter_value(1e-3) == "0.001"
+        assert normalize_parameter_value("-0.0") == "0"
+        assert normalize_parameter_value("True") == "true"
+        assert normalize_parameter_value(" 5 Minutes ") == "5 Minutes"
+
+    def test_sources_agree(self):
+        input_fields = {'InputFields': {
+            '20-20-18-30.Low TF': {'K': '20-20-18-30.Low TF', 'N': 'Low TF', 'V': '5 Minutes'},
+            '21-21-18-30.Length': {'K': '21-21-18-30.Length', 'N': 'Length', 'V': '10.0'},
+        }}
+        lab_backtest = SimpleNamespace(parameters={'21-21-18-30.Length': '10', '20-20-18-30.Low TF': '5 Minutes'})
+
+        assert canonical_parameters(input_fields) == {'Low TF': '5 Minutes', 'Length': '10'}
+        assert parameter_fingerprint(input_fields) == parameter_fingerprint(lab_backtest)
+        assert parameter_fingerprint({'parameter_values': {'Length': '11'}}) != parameter_fingerprint(lab_backtest)
+
+    def test_lab_parameter_ranges(self):
+        first = [{'K': '1-1.Length', 'O': ['10', '20.0'], 'I': True}]
+        reordered = [{'K': '1-1.Length', 'O': [20, 10.0], 'I': True}]
+        assert parameter_fingerprint(first) == parameter_fingerprint(reordered)
+        assert parameter_fingerprint(first) != parameter_fingerprint([{'K': '1-1.Length', 'O': ['10'], 'I': False}])
+
+    def test_unknown_parameters_have_no_fingerprint(self):
+        assert parameter_fingerprint(None) is None
+        assert parameter_fingerprint(SimpleNamespace(parameters={})) is None
+
+    def test_index_persists(self, tmp_path):
+        cache = UnifiedCacheManager(str(tmp_path / "cache"))
+        key = ParameterFingerprintIndex.make_key("script", "BINANCE_BTC_USDT_", "abc", 1, 2)
+        ParameterFingerprintIndex(cache).put(key, "lab1", "bt1")
+
+        entry = ParameterFingerprintIndex(cache).get(key)
+        assert (entry['lab_id'], entry['backtest_id']) == ("lab1", "bt1")
+        assert ParameterFingerprintIndex.make_key("script", "BINANCE_BTC_USDT_", "abc") != key
+
+
+def _runtime(roi):
+    report = {'PR': {'RP': roi * 10, 'ROI': roi, 'RM': 5.0, 'PC': 0.0, 'SB': 1000.0, 'RPH': [roi * 10]},
+              'P': {'C': 10, 'W': 6}}
+    return SimpleNamespace(
+        Reports={'report': SimpleNamespace(
+            PR=SimpleNamespace(**{k: v for k, v in report['PR'].items() if k not in ('SB', 'RPH')}),
+            P=SimpleNamespace(**report['P'])
+        )},
+        FinishedPositions=[],
+        model_dump=lambda: {'Reports': {'report': report}}
+    )
+
+
+class TestAnalyzerDeduplication:
+    """Test HaasAnalyzer skips duplicate parameter sets"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = UnifiedCacheManager(str(Path(self.temp_dir) / "cache"))
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir)
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        server = SimpleNamespace(fetched=[], labs={}, backtests={})
+
+        def fetch_runtime(executor, lab_id, backtest_id):
+            server.fetched.append((lab_id, backtest_id))
+            return _runtime(float(backtest_id[-1]) + 1)
+
+        class Fetcher:
+            def __init__(self, executor, config=None):
+                pass
+
+            def fetch_all_backtests(self, lab_id):
+                return server.backtests[lab_id]
+
+        monkeypatch.setattr(analyzer_module, 'get_full_backtest_runtime_data', fetch_runtime)
+        monkeypatch.setattr(analyzer_module, 'BacktestFetcher', Fetcher)
+        monkeypatch.setattr(analyzer_module.api, 'get_all_labs', lambda executor: list(server.labs.values()))
+        return server
+
+    def _add_lab(self, server, lab_id, lengths):
+        server.labs[lab_id] = SimpleNamespace(lab_id=lab_id, name=lab_id, script_id="script",
+                                              start_unix=1_700_000_000, end_unix=1_700_086_400)
+        server.backtests[lab_id] = [
+            SimpleNamespace(
+                backtest_id=f"{lab_id}_bt{i}", generation_idx=0, population_idx=i,
+                parameters={'1-1-10-15.Length': length},
+                settings=SimpleNamespace(market_tag="BINANCE_BTC_USDT_", script_id="script", script_name="Script",
+                                         interval=15, leverage=0.0, position_mode=0, margin_mode=0,
+                                         trade_amount=100.0)
+            )
+            for i, length in enumerate(lengths)
+        ]
+
+    def test_collapses_duplicates_within_lab(self, server):
+        self._add_lab(server, "lab1", ["10", "10.0", "20"])
+
+        result = HaasAnalyzer(self.cache).analyze_lab("lab1", top_count=5)
+
+        assert result.analyzed_backtests == 2
+        assert result.duplicate_backtests == 1
+        assert server.fetched == [("lab1", "lab1_bt0"), ("lab1", "lab1_bt2")]
+
+    def test_reuses_results_across_labs(self, server):
+        self._add_lab(server, "lab1", ["10", "20"])
+        self._add_lab(server, "lab2", ["20.0", "30"])
+
+        HaasAnalyzer(self.cache).analyze_lab("lab1")
+        server.fetched.clear()
+        result = HaasAnalyzer(self.cache).analyze_lab("lab2")
+
+        assert server.fetched == [("lab2", "lab2_bt1")]
+        reused = next(bt for bt in result.top_backtests if bt.backtest_id == "lab2_bt0")
+        assert reused.lab_id == "lab2"
+        assert reused.roi_percentage == pytest.approx(2.0)
+        assert self.cache.load_backtest_cache("lab2", "lab2_bt0")['backtest_id'] == "lab2_bt0"
+
+
+class TestCachedReportDeduplication:
+    """Test analyze_from_cache collapses identical parameter sets"""
+
+    def test_report_keeps_best_duplicate(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        from pyHaasAPI.cli.analyze_from_cache import CacheAnalyzer
+
+        analyzer = CacheAnalyzer()
+        for backtest_id, length, profit in [("bt0", "10", 50.0), ("bt1", "10.0", 50.0), ("bt2", "20", 30.0)]:
+            analyzer.cache.cache_backtest_data("lab1", backtest_id, {
+                'roi_percentage': profit, 'realized_profits_usdt': profit * 100,
+                'starting_balance': 10000.0, 'total_trades': 20, 'win_rate': 0.5,
+                'market_tag': "BINANCE_BTC_USDT_", 'parameter_values': {'Length': length}
+            })
+
+        result = analyzer.analyze_cached_lab("lab1", top_count=5)
+
+        assert len(result.top_backtests) == 2
+        assert result.top_backtests[1].backtest_id == "bt2"
+
+
+class TestLabManagerReuse:
+    """Test LabManager reuses identical lab runs"""
+
+    def test_run_backtest_reuses_identical_lab(self, tmp_path, monkeypatch):
+        from pyHaasAPI import lab_manager
+        from pyHaasAPI.lab_manager import LabManager
+
+        labs = {
+            lab_id: SimpleNamespace(
+                lab_id=lab_id, script_id="script", status=3,
+                settings=SimpleNamespace(market_tag="BINANCE_BTC_USDT_", interval=15, leverage=0.0,
+                                         position_mode=0, margin_mode=0, trade_amount=100.0),
+                parameters=[{'K': '1-1.Length', 'O': options, 'I': True}]
+            )
+            for lab_id, options in [("lab1", ['10', '20']), ("lab2", ['10.0', '20'])]
+        }
+        started = []
+        monkeypatch.setattr(lab_manager.api, 'get_lab_details', lambda executor, lab_id: labs[lab_id])
+        monkeypatch.setattr(lab_manager.api, 'start_lab_execution',
+                            lambda executor, request: started.append(request.lab_id))
+        monkeypatch.setattr(LabManager, '_wait_for_completion', lambda self, lab_id, timeout: True)
+        monkeypatch.setattr(LabManager, '_get_backtest_results',
+                            lambda self, lab_id: {"total_results": 2, "top_performers": [], "lab_status": 3})
+
+        index = ParameterFingerprintIndex(UnifiedCacheManager(str(tmp_path / "cache")))
+        manager = LabManager(object(), fingerprint_index=index)
+        first = manager.run_backtest("lab1", hours=24, end_unix=1_700_000_000)
+        second = manager.run_backtest("lab2", hours=24, end_unix=1_700_000_000)
+        shifted = manager.run_backtest("lab2", hours=48, end_unix=1_700_000_000)
+
+        assert first["success"] and second["success"]
+        assert second["reused_from"] == "lab1"
+        assert "reused_from" not in shifted
+        assert started == ["lab1", "lab2"]
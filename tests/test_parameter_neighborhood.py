@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test suite for parameter-neighborhood stability scoring
+
+This test suite covers:
+- Grid coordinates and neighbor lookup
+- Stability-adjusted scores for fragile peaks and plateaus
+- Parameter extraction from InputFields and parameter_values
+- Stability sorting in analyze_from_cache and the v2 AnalysisService
+- Scoring every backtest of a lab before filtering
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis.neighborhood import (
+    ParameterNeighborhoodIndex, NeighborhoodConfig, extract_parameter_vector, score_backtests
+)
+
+
+def _grid(metric_fn):
+    """5x5 grid of (Fast, Slow) parameter combinations"""
+    vectors, metrics = {}, {}
+    for fast in range(5):
+        for slow in range(5):
+            backtest_id = f"bt_{fast}_{slow}"
+            vectors[backtest_id] = {'Fast': str(fast * 2), 'Slow': str(10 + slow * 5), 'Trade Amount': '100'}
+            metrics[backtest_id] = metric_fn(fast, slow)
+    return vectors, metrics
+
+
+class TestParameterNeighborhoodIndex:
+    """Test the hashed grid index"""
+
+    def test_coordinates_and_neighbors(self):
+        vectors, _ = _grid(lambda f, s: 0.0)
+        index = ParameterNeighborhoodIndex().build(vectors)
+
+        # Constant parameters do not become dimensions
+        assert index.dimensions == ['Fast', 'Slow']
+        assert index.coordinates("bt_2_3") == (2, 3)
+        assert len(index.neighbors("bt_2_2")) == 8
+        assert sorted(index.neighbors("bt_0_0")) == ["bt_0_1", "bt_1_0", "bt_1_1"]
+
+    def test_numeric_levels_sort_numerically(self):
+        index = ParameterNeighborhoodIndex().build({
+            "a": {'Length': '9'}, "b": {'Length': '10'}, "c": {'Length': '100'}
+        })
+        assert [index.coordinates(b) for b in ("a", "b", "c")] == [(0,), (1,), (2,)]
+        assert index.neighbors("a") == ["b"]
+
+    def test_fragile_peak_ranks_below_plateau(self):
+        def metric(fast, slow):
+            if (fast, slow) == (0, 4):
+                return 100.0  # Isolated spike in a poor corner
+            if fast >= 2 and slow <= 2:
+                return 60.0  # Broad plateau
+            return 0.0
+
+        vectors, metrics = _grid(metric)
+        scores = ParameterNeighborhoodIndex().build(vectors).score(metrics)
+
+        peak, plateau = scores["bt_0_4"], scores["bt_3_1"]
+        assert peak.neighbor_mean == pytest.approx(0.0)
+        assert peak.stability_adjusted_score == pytest.approx(50.0)
+        assert plateau.stability_ratio == pytest.approx(1.0)
+        assert plateau.stability_adjusted_score == pytest.approx(60.0)
+        assert max(scores.values(), key=lambda s: s.metric).backtest_id == "bt_0_4"
+        assert max(scores.values(), key=lambda s: s.stability_adjusted_score).backtest_id in {"bt_3_1", "bt_3_0", "bt_4_1", "bt_4_0"}
+
+    def test_duplicates_share_a_cell(self):
+        scores = ParameterNeighborhoodIndex().build({
+            "a": {'Length': '1'}, "a_dup": {'Length': '1'}, "b": {'Length': '2'}
+        }).score({"a": 10.0, "a_dup": 20.0, "b": 40.0})
+
+        assert scores["b"].neighbor_count == 1
+        assert scores["b"].neighbor_mean == pytest.approx(15.0)
+
+    def test_axis_neighbors_for_many_dimensions(self):
+        vectors = {f"bt{i}": {f"p{d}": str((i >> d) & 1) for d in range(8)} for i in range(256)}
+        index = ParameterNeighborhoodIndex(NeighborhoodConfig(max_neighbor_offsets=100)).build(vectors)
+        assert len(index.neighbors("bt0")) == 8
+
+    def test_scales_without_pairwise_comparisons(self):
+        vectors = {f"bt_{a}_{b}_{c}": {'A': str(a), 'B': str(b), 'C': str(c)}
+                   for a in range(30) for b in range(30) for c in range(20)}
+        metrics = {backtest_id: float(hash(backtest_id) % 100) for backtest_id in vectors}
+
+        start = time.time()
+        scores = ParameterNeighborhoodIndex().build(vectors).score(metrics)
+        elapsed = time.time() - start
+
+        assert len(scores) == 18000
+        assert elapsed < 30
+
+
+class TestParameterExtraction:
+    """Test parameter vector extraction"""
+
+    def test_input_fields(self):
+        data = {'InputFields': {
+            '1': {'N': 'Fast Length', 'V': '12'},
+            '2': {'N': 'Trade Amount', 'V': '100'},
+            '3': {'N': 'Slow Length', 'V': '26'},
+        }}
+        assert extract_parameter_vector(data) == {'Fast Length': '12', 'Slow Length': '26'}
+
+    def test_parameter_values(self):
+        assert extract_parameter_vector({'parameter_values': {'Length': 5}}) == {'Length': '5'}
+        assert extract_parameter_vector(SimpleNamespace(parameter_values={'Length': '5'})) == {'Length': '5'}
+
+    def test_score_backtests(self):
+        backtests = [SimpleNamespace(backtest_id=f"bt{i}", parameter_values={'Length': str(i)}, roe=float(i))
+                     for i in range(3)]
+        scores = score_backtests(backtests, metric=lambda b: b.roe)
+        assert scores["bt1"].neighbor_mean == pytest.approx(1.0)
+
+
+class TestStabilitySorting:
+    """Test stability-adjusted sorting in analysis entry points"""
+
+    def test_analyze_from_cache_sorts_by_stability(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        from pyHaasAPI.cli.analyze_from_cache import CacheAnalyzer
+
+        analyzer = CacheAnalyzer()
+        profits = {0: 50.0, 1: 0.0, 2: 30.0, 3: 35.0, 4: 28.0}  # Spike at 0, plateau around 3
+        for length, profit in profits.items():
+            analyzer.cache.cache_backtest_data("lab1", f"bt{length}", {
+                'roi_percentage': profit, 'realized_profits_usdt': profit * 100,
+                'starting_balance': 10000.0, 'total_trades': 20, 'win_rate': 0.5,
+                'parameter_values': {'Length': str(length)}
+            })
+
+        by_roe = analyzer.analyze_cached_lab("lab1", top_count=5, sort_by='roe')
+        by_stability = analyzer.analyze_cached_lab("lab1", top_count=5, sort_by='stability')
+
+        assert by_roe.top_backtests[0].backtest_id == "bt0"
+        assert by_stability.top_backtests[0].backtest_id == "bt3"
+        assert by_stability.top_backtests[0].stability_score == pytest.approx(32.0)
+
+    def test_analysis_service_sorts_by_stability(self):
+        from pyHaasAPI_v2.services.analysis.analysis_service import AnalysisService
+
+        lab_api = MagicMock()
+        lab_api.get_lab_details = AsyncMock(return_value=SimpleNamespace(
+            lab_name="Lab", script_name="Script", market_tag="BINANCE_BTC_USDT_"
+        ))
+        backtest_api = MagicMock()
+        rois = {0: 50.0, 1: 0.0, 2: 30.0, 3: 35.0, 4: 28.0}
+        backtest_api.get_all_backtests_for_lab = AsyncMock(return_value=[
+            SimpleNamespace(backtest_id=f"bt{i}", win_rate=0.6, total_trades=20, max_drawdown=0.0,
+                            roi_percentage=roi, realized_profits_usdt=roi, parameters={'Length': i})
+            for i, roi in rois.items()
+        ])
+        service = AnalysisService(lab_api, backtest_api, MagicMock(), MagicMock(), MagicMock())
+
+        result = asyncio.run(service.analyze_lab_comprehensive("lab1", top_count=3, sort_by="stability"))
+
+        assert [p.backtest_id for p in result.top_performers][0] == "bt3"
+        assert result.top_performers[0].stability_score == pytest.approx(32.0)
+
+    def test_analysis_service_scores_before_filtering(self):
+        from pyHaasAPI_v2.services.analysis.analysis_service import AnalysisService
+
+        lab_api = MagicMock()
+        lab_api.get_lab_details = AsyncMock(return_value=SimpleNamespace(
+            lab_name="Lab", script_name="Script", market_tag="BINANCE_BTC_USDT_"
+        ))
+        backtest_api = MagicMock()
+        # A spike whose neighbors lost money and fail the win rate filter
+        rois = {0: -20.0, 1: 50.0, 2: -20.0}
+        backtest_api.get_all_backtests_for_lab = AsyncMock(return_value=[
+            SimpleNamespace(backtest_id=f"bt{i}", win_rate=0.6 if i == 1 else 0.1, total_trades=20,
+                            max_drawdown=0.0, roi_percentage=roi, realized_profits_usdt=roi, parameters={'Length': i})
+            for i, roi in rois.items()
+        ])
+        service = AnalysisService(lab_api, backtest_api, MagicMock(), MagicMock(), MagicMock())
+
+        result = asyncio.run(service.analyze_lab_comprehensive("lab1", sort_by="stability"))
+
+        assert [p.backtest_id for p in result.top_performers] == ["bt1"]
+        assert result.total_backtests == 1
+        assert result.top_performers[0].stability_score == pytest.approx(15.0)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test suite for the streaming closed-position collector
+
+This test suite covers:
+- Fetching only pages that can hold new positions
+- Resuming watermarks and metrics after a restart
+- Running metrics and subscriber updates
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis import position_collector as collector_module
+from pyHaasAPI.analysis.position_collector import ClosedPositionCollector
+
+
+def _position(index, profit):
+    return {'g': f"pos{index}", 'rp': profit, 'fe': 0.1, 'd': 1, 'roi': profit,
+            'eno': [{'ct': 1000 + index * 10, 'ep': 100.0, 'm': 50.0}],
+            'exo': [{'ct': 1005 + index * 10, 'ep': 101.0}]}
+
+
+class PagedServer:
+    """Stand-in for GET_RUNTIME_CLOSED_POSITIONS paging oldest first with I/NP pages"""
+
+    def __init__(self, positions=None):
+        self.positions = positions or []
+        self.requests = []
+
+    def page(self, executor, bot_id, next_page_id=-1, page_length=250):
+        self.requests.append(next_page_id)
+        page = max(next_page_id, 0)
+        items = self.positions[page * page_length:(page + 1) * page_length]
+        return items, page + 1 if len(items) == page_length else page
+
+
+class HeadServer:
+    """Stand-in returning a plain list of the newest positions, newest first"""
+
+    def __init__(self, positions=None):
+        self.positions = positions or []
+        self.requests = 0
+
+    def page(self, executor, bot_id, next_page_id=-1, page_length=250):
+        self.requests += 1
+        return list(reversed(self.positions))[:page_length], None
+
+
+class TestClosedPositionCollector:
+    """Test the collector against stand-in position endpoints"""
+
+    def test_fetches_only_new_pages(self, tmp_path, monkeypatch):
+        server = PagedServer([_position(i, 1.0) for i in range(25)])
+        monkeypatch.setattr(collector_module.api, "get_bot_closed_positions_page", server.page)
+        collector = ClosedPositionCollector(None, tmp_path, page_length=10)
+        collector.watch(["bot1"])
+
+        assert collector.run_once() == {"bot1": 25}
+        assert server.requests == [-1, 1, 2]
+
+        server.requests.clear()
+        assert collector.run_once() == {"bot1": 0}
+        assert server.requests == [2]  # Only the short last page is read again
+
+        server.positions.extend(_position(i, -1.0) for i in range(25, 32))
+        server.requests.clear()
+        new = collector.collect("bot1")
+        assert [position['g'] for position in new] == [f"pos{i}" for i in range(25, 32)]
+        assert server.requests == [2, 3]
+        assert len(list(collector.store.read("bot1"))) == 32
+
+    def test_resumes_after_restart(self, tmp_path, monkeypatch):
+        server = HeadServer([_position(i, 2.0) for i in range(5)])
+        monkeypatch.setattr(collector_module.api, "get_bot_closed_positions_page", server.page)
+        collector = ClosedPositionCollector(None, tmp_path)
+        collector.watch(["bot1"])
+        collector.run_once()
+        collector.stop()
+
+        server.positions.append(_position(5, -3.0))
+        restarted = ClosedPositionCollector(None, tmp_path)
+        restarted.watch(["bot1"])
+        assert [position['g'] for position in restarted.collect("bot1")] == ["pos5"]
+        assert restarted.metrics("bot1").trades == 6
+        assert len(list(restarted.store.read("bot1"))) == 6
+
+    def test_running_metrics_and_subscribers(self, tmp_path, monkeypatch):
+        server = HeadServer([_position(0, 10.0), _position(1, -4.0), _position(2, -2.0), _position(3, 5.0)])
+        monkeypatch.setattr(collector_module.api, "get_bot_closed_positions_page", server.page)
+        collector = ClosedPositionCollector(None, tmp_path)
+        updates = []
+        collector.subscribe(lambda bot_id, positions, metrics: updates.append((bot_id, len(positions))))
+        collector.watch(["bot1", "bot2"])
+        collector.run_once()
+
+        metrics = collector.metrics("bot1")
+        assert (metrics.trades, metrics.wins, metrics.losses) == (4, 2, 2)
+        assert metrics.net_profit == 9.0
+        assert metrics.max_drawdown == 6.0
+        assert metrics.profit_factor == 2.5
+        assert metrics.win_rate == 0.5
+        assert round(metrics.fees, 6) == 0.4
+        assert sorted(updates) == [("bot1", 4), ("bot2", 4)]
+
+        updates.clear()
+        collector.run_once()
+        assert updates == []
+        assert collector.fleet_summary()['trades'] == 8
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test suite for incremental result harvesting
+
+This test suite covers:
+- Reading only new result pages of a running lab
+- Caching each backtest once while the lab runs
+- Resuming the page cursor after a restart
+- A final lab analysis served from the cache
+"""
+
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis import analyzer as analyzer_module
+from pyHaasAPI.analysis import harvester as harvester_module
+from pyHaasAPI.analysis.analyzer import HaasAnalyzer
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.analysis.harvester import ResultHarvester, ResultPageCursor
+
+
+def _runtime(roi):
+    report = {'PR': {'RP': roi * 10, 'ROI': roi, 'RM': 5.0, 'PC': 0.0, 'SB': 1000.0, 'RPH': [roi * 10]},
+              'P': {'C': 10, 'W': 6}}
+    return SimpleNamespace(
+        Reports={'report': SimpleNamespace(
+            PR=SimpleNamespace(**{k: v for k, v in report['PR'].items() if k not in ('SB', 'RPH')}),
+            P=SimpleNamespace(**report['P'])
+        )},
+        FinishedPositions=[],
+        model_dump=lambda: {'Reports': {'report': report}}
+    )
+
+
+def _backtest(lab_id, index):
+    return SimpleNamespace(
+        backtest_id=f"{lab_id}_bt{index}", generation_idx=0, population_idx=index,
+        parameters={'1-1-10-15.Length': str(index)},
+        settings=SimpleNamespace(market_tag="BINANCE_BTC_USDT_", script_id="script", script_name="Script",
+                                 interval=15, leverage=0.0, position_mode=0, margin_mode=0, trade_amount=100.0)
+    )
+
+
+class FakeLabServer:
+    """A running lab whose results grow between harvests; page ids are result offsets"""
+
+    def __init__(self):
+        self.backtests = {}  # lab_id -> backtests produced so far
+        self.labs = {}
+        self.page_requests = []
+        self.fetched = []
+        self._lock = threading.Lock()
+
+    def run(self, lab_id, count):
+        self.labs[lab_id] = SimpleNamespace(lab_id=lab_id, name=lab_id, script_id="script",
+                                            start_unix=1_700_000_000, end_unix=1_700_086_400)
+        produced = self.backtests.setdefault(lab_id, [])
+        produced.extend(_backtest(lab_id, i) for i in range(len(produced), count))
+
+    def get_backtest_result(self, executor, request):
+        with self._lock:
+            self.page_requests.append(request.next_page_id)
+            produced = self.backtests[request.lab_id]
+            start = request.next_page_id
+            items = produced[start:start + request.page_lenght]
+        return SimpleNamespace(items=items, next_page_id=start + len(items))
+
+    def fetch_runtime(self, executor, lab_id, backtest_id):
+        with self._lock:
+            self.fetched.append(backtest_id)
+        return _runtime(1.0 + int(backtest_id.rsplit("bt", 1)[1]) % 7)
+
+
+def _patch(monkeypatch, server):
+    class Fetcher:
+        def __init__(self, executor, config=None):
+            pass
+
+        def fetch_all_backtests(self, lab_id):
+            return list(server.backtests[lab_id])
+
+    monkeypatch.setattr(harvester_module.api, 'get_backtest_result', server.get_backtest_result)
+    monkeypatch.setattr(harvester_module.api, 'get_lab_details', lambda executor, lab_id: server.labs[lab_id])
+    monkeypatch.setattr(harvester_module.api, 'get_all_labs', lambda executor: list(server.labs.values()))
+    monkeypatch.setattr(analyzer_module, 'get_full_backtest_runtime_data', server.fetch_runtime)
+    monkeypatch.setattr(analyzer_module, 'BacktestFetcher', Fetcher)
+
+
+class TestResultPageCursor:
+    """Test reading only the pages a lab produced since the last read"""
+
+    def test_reads_new_pages(self, monkeypatch):
+        server = FakeLabServer()
+        _patch(monkeypatch, server)
+        server.run("lab1", 45)
+        cursor = ResultPageCursor(object(), "lab1", page_size=20)
+
+        assert len(cursor.read_new()) == 45
+        assert server.page_requests == [0, 20, 40]
+
+        server.run("lab1", 70)
+        new = cursor.read_new()
+
+        # The partial page is read again, without returning its backtests twice
+        assert [bt.backtest_id for bt in new] == [f"lab1_bt{i}" for i in range(45, 70)]
+        assert server.page_requests[3:] == [40, 60]
+        assert cursor.read_new() == []
+
+
+class TestResultHarvester:
+    """Test harvesting a running lab into the cache"""
+
+    def test_harvests_while_running(self, monkeypatch, tmp_path):
+        server = FakeLabServer()
+        _patch(monkeypatch, server)
+        cache = UnifiedCacheManager(str(tmp_path / "cache"))
+        server.run("lab1", 30)
+
+        harvester = ResultHarvester(HaasAnalyzer(cache), page_size=20, max_workers=4)
+        harvester.watch("lab1")
+        for count in (30, 55, 90):
+            server.run("lab1", count)
+            progress = harvester.run_once()["lab1"]
+            assert progress.harvested == count
+        harvester.stop()
+
+        assert sorted(server.fetched) == sorted(f"lab1_bt{i}" for i in range(90))
+        assert all(cache.load_backtest_cache("lab1", f"lab1_bt{i}") for i in range(90))
+
+        # The final analysis only reads the harvested results back from the cache
+        server.fetched.clear()
+        result = HaasAnalyzer(cache).analyze_lab("lab1", top_count=3)
+        assert server.fetched == []
+        assert result.analyzed_backtests == 90
+
+    def test_resumes_after_restart(self, monkeypatch, tmp_path):
+        server = FakeLabServer()
+        _patch(monkeypatch, server)
+        cache = UnifiedCacheManager(str(tmp_path / "cache"))
+        server.run("lab1", 50)
+
+        harvester = ResultHarvester(HaasAnalyzer(cache), page_size=20)
+        harvester.watch("lab1")
+        harvester.run_once()
+        harvester.stop()
+
+        server.run("lab1", 75)
+        server.page_requests.clear()
+        server.fetched.clear()
+        restarted = ResultHarvester(HaasAnalyzer(cache), page_size=20)
+        assert restarted.progress["lab1"].next_page_id == 40
+        restarted.watch("lab1")
+        progress = restarted.unwatch("lab1")
+        restarted.stop()
+
+        # Pages before the stored cursor are not read again; cached backtests are not re-fetched
+        assert server.page_requests == [40, 60]
+        assert sorted(server.fetched) == sorted(f"lab1_bt{i}" for i in range(50, 75))
+        assert progress.harvested == 75 and progress.next_page_id == 60
+        assert restarted.run_once() == {}
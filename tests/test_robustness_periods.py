@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test suite for trade-sliced time period analysis
+
+This test suite covers:
+- Calendar (monthly/quarterly) and equal trade-count slicing
+- Per-period ROI, win rate and drawdown
+- Batch slicing across several backtests
+- Integration with StrategyRobustnessAnalyzer
+"""
+
+import sys
+import tempfile
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.analysis.models import BacktestAnalysis, LabAnalysisResult
+from pyHaasAPI.analysis.periods import TradePeriodSlicer, PeriodSlicing, PeriodSlicingConfig
+from pyHaasAPI.analysis.robustness import StrategyRobustnessAnalyzer
+
+
+def _ts(year, month, day):
+    return int(datetime(year, month, day, tzinfo=timezone.utc).timestamp())
+
+
+def _position(close_time, profit, fees=0.0, margin=100.0):
+    return {'ct': close_time, 'rp': profit, 'fe': fees, 'eno': [{'m': margin}]}
+
+
+def _backtest_data(positions):
+    return {'runtime_data': {'FinishedPositions': positions}}
+
+
+def _analysis(backtest_id, starting_balance=1000.0):
+    return BacktestAnalysis(
+        backtest_id=backtest_id, lab_id="lab_1", generation_idx=0, population_idx=0,
+        market_tag="BINANCE_BTC_USDT_", script_id="script", script_name="Script",
+        roi_percentage=50.0, calculated_roi_percentage=40.0, roi_difference=10.0,
+        win_rate=0.6, total_trades=6, max_drawdown=10.0, realized_profits_usdt=100.0,
+        pc_value=0.0, avg_profit_per_trade=10.0, profit_factor=1.5, sharpe_ratio=0.0,
+        starting_balance=starting_balance, final_balance=1100.0, peak_balance=1150.0,
+        analysis_timestamp="2024-01-01T00:00:00"
+    )
+
+
+POSITIONS = [
+    # Out of order on purpose: slicing must sort by close time
+    _position(_ts(2024, 2, 10), -50.0),
+    _position(_ts(2024, 1, 5), 100.0),
+    _position(_ts(2024, 1, 20), -20.0, fees=5.0),
+    _position(_ts(2024, 2, 1), 30.0),
+    _position(_ts(2024, 4, 15), 60.0),
+    _position(_ts(2024, 5, 2), 10.0),
+]
+
+
+class TestTradePeriodSlicer:
+    """Test trade period slicing"""
+
+    def test_monthly_slicing(self):
+        slicer = TradePeriodSlicer(PeriodSlicingConfig(mode=PeriodSlicing.MONTHLY))
+        periods = slicer.slice_backtest("bt1", _backtest_data(POSITIONS), starting_balance=1000.0)
+
+        assert [p.period_label for p in periods] == ["2024-01", "2024-02", "2024-04", "2024-05"]
+        january = periods[0]
+        assert january.period_trades == 2
+        assert january.period_profit == pytest.approx(75.0)
+        assert january.period_roi == pytest.approx(7.5)
+        assert january.period_win_rate == pytest.approx(0.5)
+        # Peak 1100 after the first trade, then -25 net
+        assert january.period_max_drawdown == pytest.approx(25.0 / 1100.0 * 100)
+        assert january.period_start == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert january.period_end == datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+        february = periods[1]
+        # Equity at start of February is 1075
+        assert february.period_roi == pytest.approx(-20.0 / 1075.0 * 100)
+        assert february.period_max_drawdown == pytest.approx(50.0 / 1105.0 * 100)
+
+    def test_quarterly_slicing(self):
+        slicer = TradePeriodSlicer(PeriodSlicingConfig(mode=PeriodSlicing.QUARTERLY))
+        periods = slicer.slice_backtest("bt1", _backtest_data(POSITIONS), starting_balance=1000.0)
+
+        assert [p.period_label for p in periods] == ["2024-Q1", "2024-Q2"]
+        assert [p.period_trades for p in periods] == [4, 2]
+        assert periods[1].period_max_drawdown == pytest.approx(0.0)
+
+    def test_equal_trade_slicing(self):
+        slicer = TradePeriodSlicer(PeriodSlicingConfig(mode=PeriodSlicing.EQUAL_TRADES, trade_buckets=3))
+        periods = slicer.slice_backtest("bt1", _backtest_data(POSITIONS))
+
+        assert [p.period_trades for p in periods] == [2, 2, 2]
+        # Without a balance the ROI is relative to the bucket margin
+        assert periods[0].period_roi == pytest.approx(75.0 / 200.0 * 100)
+
+    def test_batch_slicing_matches_single(self):
+        slicer = TradePeriodSlicer(PeriodSlicingConfig(mode=PeriodSlicing.MONTHLY))
+        other = [_position(_ts(2024, 1, 3), -10.0), _position(_ts(2024, 3, 3), 40.0)]
+        batch = slicer.slice_batch(
+            {"bt1": _backtest_data(POSITIONS), "bt2": _backtest_data(other), "bt3": {}},
+            {"bt1": 1000.0, "bt2": 500.0}
+        )
+
+        assert batch["bt3"] == []
+        assert batch["bt1"] == slicer.slice_backtest("bt1", _backtest_data(POSITIONS), 1000.0)
+        assert [p.period_label for p in batch["bt2"]] == ["2024-01", "2024-03"]
+        assert batch["bt2"][1].period_roi == pytest.approx(40.0 / 490.0 * 100)
+
+    def test_min_trades_filter(self):
+        slicer = TradePeriodSlicer(PeriodSlicingConfig(mode=PeriodSlicing.MONTHLY, min_trades_per_period=2))
+        periods = slicer.slice_backtest("bt1", _backtest_data(POSITIONS), 1000.0)
+        assert [p.period_label for p in periods] == ["2024-01", "2024-02"]
+
+
+class TestRobustnessTimePeriods:
+    """Test StrategyRobustnessAnalyzer uses real trade periods"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = UnifiedCacheManager(str(Path(self.temp_dir) / "cache"))
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_lab_robustness_uses_cached_positions(self):
+        self.cache.cache_backtest_data("lab_1", "bt1", _backtest_data(POSITIONS))
+        analyzer = StrategyRobustnessAnalyzer(
+            self.cache, PeriodSlicingConfig(mode=PeriodSlicing.QUARTERLY)
+        )
+        lab_result = LabAnalysisResult(
+            lab_id="lab_1", lab_name="Lab", total_backtests=2, analyzed_backtests=2,
+            top_backtests=[_analysis("bt1"), _analysis("bt_missing")], bots_created=[],
+            analysis_timestamp="2024-01-01T00:00:00", processing_time=0.0
+        )
+
+        results = analyzer.analyze_lab_robustness(lab_result)
+
+        assert [p.period_label for p in results["bt1"].time_periods] == ["2024-Q1", "2024-Q2"]
+        assert results["bt_missing"].time_periods == []
+        assert "2024-Q1" in analyzer.generate_robustness_report(results)
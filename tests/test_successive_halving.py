@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test suite for budget-aware successive halving
+
+This test suite covers:
+- Rung windows and per-rung budgets
+- Finding a top parameter set with a fraction of an exhaustive search
+- Hyperband brackets staying within the budget
+- Reporting budgets that cannot cover the rungs
+"""
+
+import sys
+import copy
+import hashlib
+import itertools
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI import successive_halving
+from pyHaasAPI.optimization import LabParameterOptimizer, OptimizationConfig
+from pyHaasAPI.parameters import LabStatus
+from pyHaasAPI.successive_halving import SuccessiveHalvingConfig, plan_rungs, rung_windows
+
+END_UNIX = 1_700_000_000
+RANGES = {
+    '1-1.Fast': [str(v) for v in range(4, 20, 2)],
+    '2-2.Slow': [str(v) for v in range(20, 60, 5)],
+    '3-3.Mult': ['0.5', '1.0', '1.5', '2.0'],
+}
+
+
+class FakeHalvingServer:
+    """Labs with fixed parameters complete after two polls with a window-dependent ROI"""
+
+    def __init__(self):
+        self.labs = {}
+        self.executions = []
+        self.deleted = []
+        self._windows = {}
+        self._polls = {}
+        self._lock = threading.Lock()
+        self.labs["source"] = SimpleNamespace(
+            lab_id="source", name="Source", script_id="script",
+            parameters=[{'K': key, 'T': 0, 'O': [options[0]], 'I': False} for key, options in RANGES.items()]
+            + [{'K': '4-4.Fee', 'T': 1, 'O': ['0.1'], 'I': False}],
+            status=LabStatus.CREATED
+        )
+
+    @staticmethod
+    def true_roi(parameters):
+        fast, slow, mult = float(parameters['1-1.Fast']), float(parameters['2-2.Slow']), float(parameters['3-3.Mult'])
+        return 100.0 - (fast - 10) ** 2 - 0.2 * (slow - 40) ** 2 - 20 * (mult - 1.5) ** 2
+
+    @classmethod
+    def roi(cls, parameters, window_days):
+        # Short windows are noisy: the noise shrinks with the square root of the window
+        digest = hashlib.sha1(repr((sorted(parameters.items()), round(window_days))).encode()).digest()
+        noise = (digest[0] / 255.0 - 0.5) * 60.0 / window_days ** 0.5
+        return cls.true_roi(parameters) + noise
+
+    def clone_lab(self, executor, lab_id, new_name=None):
+        with self._lock:
+            clone = copy.deepcopy(self.labs[lab_id])
+            clone.lab_id = f"lab_{len(self.labs)}"
+            clone.name = new_name
+            self.labs[clone.lab_id] = clone
+        return clone
+
+    def update_lab_details(self, executor, lab):
+        self.labs[lab.lab_id] = lab
+        return lab
+
+    def start_lab_execution(self, executor, request, ensure_config=True):
+        with self._lock:
+            self.executions.append(request.lab_id)
+            self._windows[request.lab_id] = (request.end_unix - request.start_unix) / 86400
+            self._polls[request.lab_id] = 0
+            self.labs[request.lab_id].status = LabStatus.RUNNING
+        return {'Success': True}
+
+    def get_lab_execution_update(self, executor, lab_id):
+        lab = self.labs[lab_id]
+        with self._lock:
+            self._polls[lab_id] += 1
+            if self._polls[lab_id] >= 2:
+                lab.status = LabStatus.COMPLETED
+        progress = 100.0 if lab.status == LabStatus.COMPLETED else 50.0
+        return SimpleNamespace(status=lab.status, progress=progress, message=None, error=None)
+
+    def fetch_backtests(self, executor, lab_id):
+        lab = self.labs[lab_id]
+        assert all(not p['I'] and len(p['O']) == 1 for p in lab.parameters)
+        parameters = {p['K']: p['O'][0] for p in lab.parameters}
+        return [SimpleNamespace(summary=SimpleNamespace(ReturnOnInvestment=self.roi(parameters, self._windows[lab_id])))]
+
+    def delete_lab(self, executor, lab_id):
+        self.deleted.append(lab_id)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeHalvingServer()
+    monkeypatch.setattr(successive_halving.api, 'get_lab_details', lambda executor, lab_id: server.labs[lab_id])
+    for name in ('clone_lab', 'update_lab_details', 'start_lab_execution', 'get_lab_execution_update', 'delete_lab'):
+        monkeypatch.setattr(successive_halving.api, name, getattr(server, name))
+    monkeypatch.setattr(successive_halving, 'fetch_all_lab_backtests', server.fetch_backtests)
+    return server
+
+
+def _optimize(budget, **overrides):
+    values = dict(max_backtests=budget, eta=3, min_window_days=10, max_window_days=90,
+                  poll_interval=0.001, max_concurrent_labs=8, seed=7)
+    values.update(overrides)
+    return LabParameterOptimizer(object()).optimize_with_successive_halving(
+        "source", SuccessiveHalvingConfig(**values),
+        OptimizationConfig(custom_ranges={**RANGES, '4-4.Fee': ['0.1']}), END_UNIX
+    )
+
+
+class TestPlanning:
+    """Test rung windows and budgets"""
+
+    def test_rung_windows(self):
+        assert [w // 86400 for w in rung_windows(10, 90, 3)] == [10, 30, 90]
+        assert [w // 86400 for w in rung_windows(7, 90, 3)] == [10, 30, 90]
+        assert len(rung_windows(30, 30, 3)) == 1
+
+    def test_plan_fits_budget(self):
+        assert plan_rungs(52, 3, 3) == [36, 12, 4]
+        assert sum(plan_rungs(100, 4, 3)) <= 100
+        assert plan_rungs(100, 3, 3, max_candidates=9) == [9, 3, 1]
+        assert plan_rungs(2, 3, 3) == []
+
+
+class TestSuccessiveHalving:
+    """Test the optimizer against the stand-in server"""
+
+    def test_finds_top_parameters_with_fraction_of_budget(self, server):
+        grid = [dict(zip(RANGES, values)) for values in itertools.product(*RANGES.values())]
+        exhaustive = sorted((server.true_roi(p) for p in grid), reverse=True)
+
+        found = []
+        for seed in range(5):
+            result = _optimize(budget=80, seed=seed)
+
+            assert result.success
+            assert result.search_space_size == len(grid) == 256
+            assert result.backtests_used <= 80
+            assert result.best_parameters['4-4.Fee'] == '0.1'
+            assert [r['window_days'] for r in result.rungs] == [10.0, 30.0, 90.0]
+            # Only the winning lab is kept
+            assert result.best_lab_id not in server.deleted
+            found.append(server.true_roi(result.best_parameters))
+
+        assert len(server.executions) <= 5 * 80
+        # Every winner ranks in the top 10% of what an exhaustive 256-backtest search
+        # finds, and on average in the top 5%
+        assert min(found) >= exhaustive[int(len(grid) * 0.10)]
+        assert sum(found) / len(found) >= exhaustive[int(len(grid) * 0.05)]
+        print(f"\nWinners {found} vs exhaustive best {exhaustive[0]:.1f} using at most 80/{len(grid)} backtests")
+
+    def test_hyperband_stays_within_budget(self, server):
+        result = _optimize(budget=90, hyperband=True)
+
+        assert result.success
+        assert result.backtests_used <= 90
+        assert {r['bracket'] for r in result.rungs} == {0, 1, 2}
+        assert result.trials[0].window == 90 * 86400
+
+    def test_budget_too_small(self, server):
+        result = _optimize(budget=2)
+
+        assert not result.success
+        assert "too small" in result.error_message
+        assert server.executions == []
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test suite for the WFO execution engine
+
+This test suite covers:
+- Real training and testing lab executions per period
+- Concurrency bounded by the server lab budget
+- Reuse of cached runs for identical parameters and periods
+- Streaming of period results into WFOAnalysisResult
+"""
+
+import sys
+import copy
+import threading
+import tempfile
+import shutil
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyHaasAPI.analysis import wfo_engine
+from pyHaasAPI.analysis.cache import UnifiedCacheManager
+from pyHaasAPI.analysis.models import BacktestAnalysis
+from pyHaasAPI.analysis.wfo import WFOAnalyzer, WFOConfig, WFOMode
+from pyHaasAPI.analysis.wfo_engine import WFOExecutionEngine, WFOEngineConfig
+from pyHaasAPI.parameters import LabStatus
+
+
+class FakeLabServer:
+    """Stand-in for the lab endpoints: every lab completes after two polls"""
+
+    def __init__(self):
+        self.labs = {}
+        self.executions = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+        self._polls = {}
+        self.labs["source"] = SimpleNamespace(
+            lab_id="source", name="Source", script_id="script_1",
+            settings=SimpleNamespace(market_tag="BINANCE_BTC_USDT_"),
+            parameters=[{'K': 'Length', 'O': [10, 20, 30], 'I': True}],
+            status=LabStatus.CREATED, cancel_message=None
+        )
+
+    def clone_lab(self, executor, lab_id, new_name=None):
+        with self._lock:
+            clone = copy.deepcopy(self.labs[lab_id])
+            clone.lab_id = f"lab_{len(self.labs)}"
+            clone.name = new_name
+            self.labs[clone.lab_id] = clone
+        return clone
+
+    def update_lab_details(self, executor, lab):
+        self.labs[lab.lab_id] = lab
+        return lab
+
+    def start_lab_execution(self, executor, request, ensure_config=True):
+        with self._lock:
+            self.executions.append((request.lab_id, request.start_unix, request.end_unix))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self._polls[request.lab_id] = 0
+            self.labs[request.lab_id].status = LabStatus.RUNNING
+        return {'Success': True}
+
+    def get_lab_details(self, executor, lab_id):
+        lab = self.labs[lab_id]
+        with self._lock:
+            if lab.status == LabStatus.RUNNING:
+                self._polls[lab_id] += 1
+                if self._polls[lab_id] >= 2:
+                    lab.status = LabStatus.COMPLETED
+                    self.running -= 1
+        return lab
+
+    def get_lab_execution_update(self, executor, lab_id):
+        lab = self.get_lab_details(executor, lab_id)
+        progress = 100.0 if lab.status == LabStatus.COMPLETED else 50.0
+        return SimpleNamespace(status=lab.status, progress=progress, message=None, error=None)
+
+    def fetch_backtests(self, executor, lab_id):
+        lab = self.labs[lab_id]
+        start_unix = next(start for lid, start, _ in self.executions if lid == lab_id)
+        return [
+            SimpleNamespace(
+                backtest_id=f"{lab_id}_bt{length}", parameters={'Length': str(length)},
+                summary=SimpleNamespace(ReturnOnInvestment=self.roi(length, start_unix))
+            )
+            for length in lab.parameters[0]['O']
+        ]
+
+    @staticmethod
+    def roi(length, start_unix):
+        # The best length shifts over time so periods pick different parameters
+        preferred = 20 if start_unix < 1_680_000_000 else 30
+        return 100.0 - abs(int(length) - preferred)
+
+
+class FakeBacktestAnalyzer:
+    """Turns fake backtests into BacktestAnalysis objects"""
+
+    def analyze_backtest(self, lab_id, backtest):
+        roi = backtest.summary.ReturnOnInvestment
+        return BacktestAnalysis(
+            backtest_id=backtest.backtest_id, lab_id=lab_id, generation_idx=0, population_idx=0,
+            market_tag="BINANCE_BTC_USDT_", script_id="script_1", script_name="Script",
+            roi_percentage=roi, calculated_roi_percentage=roi, roi_difference=0.0,
+            win_rate=0.6, total_trades=50, max_drawdown=10.0, realized_profits_usdt=roi * 10,
+            pc_value=0.0, avg_profit_per_trade=1.0, profit_factor=1.5, sharpe_ratio=1.2,
+            starting_balance=10000.0, final_balance=10000.0 + roi * 10, peak_balance=11000.0,
+            analysis_timestamp="2024-01-01T00:00:00"
+        )
+
+
+class TestWFOExecutionEngine:
+    """Test real WFO lab execution"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = UnifiedCacheManager(str(Path(self.temp_dir) / "cache"))
+        self.config = WFOConfig(
+            total_start_date=datetime(2023, 1, 1), total_end_date=datetime(2023, 12, 31),
+            training_duration_days=90, testing_duration_days=30, step_size_days=60,
+            mode=WFOMode.ROLLING_WINDOW
+        )
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir)
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        server = FakeLabServer()
+        for name in ('clone_lab', 'update_lab_details', 'start_lab_execution', 'get_lab_details',
+                     'get_lab_execution_update'):
+            monkeypatch.setattr(wfo_engine.api, name, getattr(server, name))
+        monkeypatch.setattr(wfo_engine, 'fetch_all_lab_backtests', server.fetch_backtests)
+        return server
+
+    def _engine(self, budget=2):
+        return WFOExecutionEngine(
+            object(), self.cache, WFOEngineConfig(max_concurrent_labs=budget, poll_interval=0.001),
+            backtest_analyzer=FakeBacktestAnalyzer()
+        )
+
+    def test_runs_training_and_testing_labs(self, server):
+        streamed = []
+        engine = self._engine()
+        result = engine.run_lab_wfo(
+            "source", self.config, on_result=lambda r, res: streamed.append(len(res.results))
+        )
+        assert engine.scheduler._thread is not None
+        engine.close()
+        assert engine.scheduler._thread is None
+
+        assert result.total_periods == 5
+        assert result.successful_periods == 5
+        assert streamed == [1, 2, 3, 4, 5]
+        assert [r.period.period_id for r in result.results] == list(range(5))
+        assert len(server.executions) == 10
+
+        first = result.results[0]
+        assert first.best_parameters == {'Length': '20'}
+        assert first.training_metrics['roi'] == pytest.approx(100.0)
+        # The testing lab runs only the chosen parameters on the testing window
+        testing_window = (wfo_engine._to_unix(first.period.testing_start), wfo_engine._to_unix(first.period.testing_end))
+        testing_labs = [lab_id for lab_id, start, end in server.executions if (start, end) == testing_window]
+        assert len(testing_labs) == 1
+        assert server.labs[testing_labs[0]].parameters[0]['O'] == ['20']
+        assert server.labs[testing_labs[0]].parameters[0]['I'] is False
+        assert result.results[-1].best_parameters == {'Length': '30'}
+
+    def test_concurrency_respects_budget(self, server):
+        self._engine(budget=3).run_lab_wfo("source", self.config)
+        assert server.max_running <= 3
+
+    def test_single_lab_budget_runs_serially(self, server):
+        self._engine(budget=1).run_lab_wfo("source", self.config)
+        assert server.max_running == 1
+
+    def test_reuses_cached_runs(self, server):
+        first = self._engine().run_lab_wfo("source", self.config)
+        executions = len(server.executions)
+
+        second = self._engine().run_lab_wfo("source", self.config)
+
+        assert len(server.executions) == executions
+        assert [r.out_of_sample_return for r in second.results] == [r.out_of_sample_return for r in first.results]
+
+    def test_failed_period_is_reported(self, server, monkeypatch):
+        def failing_start(executor, request, ensure_config=True):
+            return {'Success': False, 'Error': 'queue full'}
+        monkeypatch.setattr(wfo_engine.api, 'start_lab_execution', failing_start)
+
+        result = self._engine().run_lab_wfo("source", self.config)
+
+        assert result.failed_periods == 5
+        assert "queue full" in result.results[0].error_message
+        assert result.summary_metrics == {}
+
+    def test_analyzer_reuses_engine_and_deletes_failed_labs(self, server, monkeypatch):
+        deleted = []
+        monkeypatch.setattr(wfo_engine.api, 'start_lab_execution',
+                            lambda executor, request, ensure_config=True: {'Success': False, 'Error': 'queue full'})
+        monkeypatch.setattr(wfo_engine.api, 'delete_lab', lambda executor, lab_id: deleted.append(lab_id))
+        analyzer = WFOAnalyzer(self.cache)
+        analyzer.executor = object()
+        engine_config = WFOEngineConfig(poll_interval=0.001, delete_labs=True)
+        period = analyzer.generate_wfo_periods(self.config)[0]
+
+        first = analyzer.analyze_wfo_period("source", period, self.config, engine_config)
+        engine = analyzer._engine
+        second = analyzer.analyze_wfo_period("source", period, self.config, engine_config)
+
+        assert not first.success and not second.success
+        assert analyzer._engine is engine
+        assert engine.scheduler._thread is None
+        assert deleted == ["lab_1", "lab_2"]  # Each failed training clone is removed